@@ -1,26 +1,49 @@
 from rest_framework import status
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import api_view, permission_classes, renderer_classes
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 from django.db.models import Q
-from apps.products.models import Product
-from apps.products.serializers import ProductListSerializer
+from django.utils import timezone
+from apps.products.models import Product, TochkaProcessingJob
+from apps.products.serializers import ProductListValuesSerializer
 from apps.products.services.reserve_calculator import ReserveCalculatorService
+from apps.products.services.tochka_merge import TochkaMergeEngine
+from apps.products.services.tochka_ingest import is_supported_file, read_tochka_table
+from apps.products.services.tochka_parse_cache import TochkaParseCache
+from apps.products.services.tochka_processor import TochkaProcessingService, compute_file_hash
+from apps.products.tasks import process_tochka_file_task
+from apps.core.data_version import PRODUCTS_DATA, conditional_on_data_version, get_data_version
+from apps.core.exceptions import TochkaProcessingException
+from apps.core.pagination import KeysetPagination
+from apps.core.renderers import ORJSONRenderer
+from apps.reports.exporters import (
+    EXPORT_FORMATS, HAS_PYARROW, TOCHKA_DEDUPLICATED_COLUMNS, TOCHKA_MERGE_COLUMNS,
+    TOCHKA_PRODUCTION_COLUMNS, TochkaListExporter
+)
 from apps.core.utils.article_normalizer import normalize_article
 import pandas as pd
-import io
-from openpyxl import Workbook
-from openpyxl.styles import Font, PatternFill, Alignment
-from django.http import HttpResponse
+import time
 from datetime import datetime
 
+@conditional_on_data_version
 @api_view(['GET'])
+@renderer_classes([ORJSONRenderer])
 @permission_classes([AllowAny])
 def get_products_for_tochka(request):
     """
     API для получения списка всех товаров для вкладки Точка
     Поддерживает параметр include_reserve для отображения колонки Резерв
+    
+    Параметр pagination=cursor (или cursor) включает постраничную загрузку
+    по ключу (приоритет, артикул, id): page_size, count=false
     """
+    # Получаем параметр include_reserve
+    include_reserve = request.GET.get('include_reserve', '').lower() in ['true', '1', 'yes']
+    
+    # Ошибки курсора возвращаются как 400/404 обработчиком DRF
+    if request.GET.get('pagination') == 'cursor' or 'cursor' in request.GET:
+        return _get_products_page_for_tochka(request, include_reserve)
+    
     try:
         # Получаем все товары с базовой информацией
         products = Product.objects.all().order_by('-updated_at')
@@ -34,22 +57,19 @@ def get_products_for_tochka(request):
             except ValueError:
                 pass
         
-        # Получаем параметр include_reserve
-        include_reserve = request.GET.get('include_reserve', '').lower() in ['true', '1', 'yes']
-        
         # Сериализация данных с контекстом include_reserve
-        serializer = ProductListSerializer(
+        serializer = ProductListValuesSerializer(
             products, 
-            many=True, 
             context={
                 'request': request,
                 'include_reserve': include_reserve
             }
         )
+        results = serializer.data
         
         return Response({
-            'results': serializer.data,
-            'count': len(serializer.data),
+            'results': results,
+            'count': len(results),
             'include_reserve': include_reserve,
             'message': 'Товары успешно загружены'
         })
@@ -59,7 +79,9 @@ def get_products_for_tochka(request):
             'error': f'Ошибка при загрузке товаров: {str(e)}'
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+@conditional_on_data_version
 @api_view(['GET'])
+@renderer_classes([ORJSONRenderer])
 @permission_classes([AllowAny])
 def get_production_list_for_tochka(request):
     """
@@ -87,9 +109,8 @@ def get_production_list_for_tochka(request):
         include_reserve = request.GET.get('include_reserve', '').lower() in ['true', '1', 'yes']
         
         # Сериализация данных с контекстом include_reserve
-        serializer = ProductListSerializer(
+        serializer = ProductListValuesSerializer(
             products, 
-            many=True, 
             context={
                 'request': request,
                 'include_reserve': include_reserve
@@ -108,35 +129,11 @@ def get_production_list_for_tochka(request):
             item_with_highlight['has_reserve'] = has_reserve
             item_with_highlight['reserve_amount'] = reserved_stock
             
-            # Используем новый алгоритм расчета резерва с цветовой индикацией
-            if include_reserve:
-                current_stock = float(item.get('current_stock', 0))
-                reserve_calculator = ReserveCalculatorService()
-                reserve_calc = reserve_calculator.calculate_reserve_display(
-                    reserved_stock=reserved_stock,
-                    current_stock=current_stock
-                )
-                reserve_ui = reserve_calculator.format_reserve_for_display(reserve_calc)
-                
-                # Добавляем результаты расчета резерва
-                item_with_highlight['calculated_reserve'] = float(reserve_calc['calculated_reserve'])
-                item_with_highlight['reserve_color'] = reserve_calc['color_indicator']
-                item_with_highlight['reserve_display_text'] = reserve_ui['display_text']
-                item_with_highlight['reserve_tooltip'] = reserve_ui['tooltip_text']
-                item_with_highlight['reserve_needs_attention'] = reserve_ui['needs_attention']
-                
-                # Обратная совместимость со старым полем
-                item_with_highlight['reserve_minus_stock'] = float(reserve_calc['calculated_reserve'])
-            else:
-                item_with_highlight['calculated_reserve'] = None
-                item_with_highlight['reserve_color'] = 'gray'
-                item_with_highlight['reserve_display_text'] = None
-                item_with_highlight['reserve_tooltip'] = None
-                item_with_highlight['reserve_needs_attention'] = False
-                item_with_highlight['reserve_minus_stock'] = None
-            
             results_with_highlight.append(item_with_highlight)
         
+        # Расчет резерва с цветовой индикацией - одним проходом для всех товаров
+        _add_reserve_fields(results_with_highlight, include_reserve)
+        
         return Response({
             'results': results_with_highlight,
             'count': len(results_with_highlight),
@@ -149,6 +146,7 @@ def get_production_list_for_tochka(request):
             'error': f'Ошибка при загрузке списка на производство: {str(e)}'
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+@conditional_on_data_version
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def get_products_stats_for_tochka(request):
@@ -177,11 +175,14 @@ def get_products_stats_for_tochka(request):
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 @api_view(['POST'])
+@renderer_classes([ORJSONRenderer])
 @permission_classes([AllowAny])
 def upload_excel_file_for_tochka(request):
     """
-    API для загрузки Excel файла с данными для вкладки Точка
+    API для загрузки файла с данными для вкладки Точка
+    Поддерживает Excel (.xlsx, .xls), CSV (.csv, .csv.gz) и Parquet
     Ищет колонки "Артикул товара" и "Заказов, шт."
+    Результат разбора кэшируется по хэшу файла (parse_cached=true при повторной загрузке)
     """
     try:
         if 'file' not in request.FILES:
@@ -192,20 +193,26 @@ def upload_excel_file_for_tochka(request):
         excel_file = request.FILES['file']
         
         # Проверяем расширение файла
-        if not excel_file.name.endswith(('.xlsx', '.xls')):
+        if not is_supported_file(excel_file.name):
             return Response({
-                'error': 'Неверный формат файла. Поддерживаются только .xlsx и .xls файлы.'
+                'error': 'Неверный формат файла. Поддерживаются .xlsx, .xls, .csv, .csv.gz и .parquet файлы.'
             }, status=status.HTTP_400_BAD_REQUEST)
         
-        # Читаем Excel файл
+        file_content = excel_file.read()
+        file_hash = compute_file_hash(file_content)
+        
+        # Тот же файл уже разбирался - сразу возвращаем результат
+        parse_cache = TochkaParseCache('upload')
+        cached_result = parse_cache.get(file_hash)
+        if cached_result is not None:
+            return Response({**cached_result, 'parse_cached': True})
+        
+        # Читаем файл парсером, подходящим для формата
         try:
-            if excel_file.name.endswith('.xlsx'):
-                df = pd.read_excel(io.BytesIO(excel_file.read()), engine='openpyxl')
-            else:
-                df = pd.read_excel(io.BytesIO(excel_file.read()), engine='xlrd')
+            df = read_tochka_table(file_content, excel_file.name)
         except Exception as e:
             return Response({
-                'error': f'Ошибка при чтении Excel файла: {str(e)}'
+                'error': f'Ошибка при чтении файла: {str(e)}'
             }, status=status.HTTP_400_BAD_REQUEST)
         
         # Ищем нужные колонки
@@ -318,7 +325,7 @@ def upload_excel_file_for_tochka(request):
         # Сортируем по убыванию количества заказов
         extracted_data.sort(key=lambda x: x['orders'], reverse=True)
         
-        return Response({
+        result = {
             'message': f'Файл успешно обработан. Уникальных артикулов: {len(extracted_data)}, дубликатов обработано: {duplicate_count}.',
             'data': extracted_data,  # Показываем все записи без ограничений
             'total_records': len(extracted_data),
@@ -331,7 +338,10 @@ def upload_excel_file_for_tochka(request):
                 'article_column': article_column,
                 'orders_column': orders_column
             }
-        })
+        }
+        parse_cache.set(file_hash, result)
+        
+        return Response({**result, 'parse_cached': False})
         
     except Exception as e:
         return Response({
@@ -339,6 +349,7 @@ def upload_excel_file_for_tochka(request):
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 @api_view(['POST'])
+@renderer_classes([ORJSONRenderer])
 @permission_classes([AllowAny])
 def merge_excel_with_products(request):
     """
@@ -353,114 +364,26 @@ def merge_excel_with_products(request):
                 'error': 'Нет данных Excel для объединения'
             }, status=status.HTTP_400_BAD_REQUEST)
         
-        # Нормализуем артикулы из Excel данных и создаем словари
-        excel_articles = set()
-        excel_dict = {}
-        normalized_to_original = {}  # Словарь для обратного поиска
-        
-        for item in excel_data:
-            if item.get('article'):
-                original_article = item['article']
-                normalized_article = normalize_article(original_article)
-                
-                if normalized_article:  # Если артикул не пустой после нормализации
-                    excel_articles.add(normalized_article)
-                    excel_dict[normalized_article] = item
-                    normalized_to_original[normalized_article] = original_article
-        
-        if not excel_articles:
+        merge_engine = TochkaMergeEngine()
+        try:
+            merge_result = merge_engine.merge(excel_data)
+        except ValueError as e:
             return Response({
-                'error': 'Не найдены артикулы в данных Excel'
+                'error': str(e)
             }, status=status.HTTP_400_BAD_REQUEST)
         
-        
-        # Загружаем ВСЕ товары из базы данных (МойСклад) которые требуют производства (включая товары с резервом)
-        from django.db.models import Q
-        products_for_production = Product.objects.filter(
-            Q(production_needed__gt=0) | Q(reserved_stock__gt=0)
-        ).order_by('-production_priority', 'article')
-        
-        
-        # Объединяем данные
-        merged_data = []
-        in_tochka_count = 0
-        not_in_tochka_count = 0
-        
-        for product in products_for_production:
-            # Нормализуем артикул из базы данных для сравнения
-            normalized_product_article = normalize_article(product.article)
-            
-            # Проверяем есть ли товар в Excel (Точке)
-            excel_item = excel_dict.get(normalized_product_article)
-            
-            
-            if excel_item:
-                # Товар ЕСТЬ в Точке - объединяем данные
-                merged_item = {
-                    # Данные из товаров МойСклад
-                    'article': product.article,
-                    'product_id': product.id,
-                    'product_name': product.name,
-                    'product_description': product.description,
-                    'current_stock': float(product.current_stock),
-                    'sales_last_2_months': float(product.sales_last_2_months),
-                    'product_type': product.product_type,
-                    'color': product.color or '',
-                    'production_needed': float(product.production_needed),
-                    'production_priority': product.production_priority,
-                    'days_of_stock': float(product.days_of_stock) if product.days_of_stock else None,
-                    
-                    # Данные из Excel (Точка)
-                    'orders_in_tochka': excel_item.get('orders', 0),
-                    'excel_row_number': excel_item.get('row_number', 0),
-                    'has_duplicates': excel_item.get('has_duplicates', False),
-                    'duplicate_rows': excel_item.get('duplicate_rows'),
-                    
-                    # Статус
-                    'is_in_tochka': True,
-                    'needs_registration': False,
-                }
-                in_tochka_count += 1
-            else:
-                # Товара НЕТ в Точке - помечаем специально
-                merged_item = {
-                    # Данные из товаров МойСклад
-                    'article': product.article,
-                    'product_id': product.id,
-                    'product_name': product.name,
-                    'product_description': product.description,
-                    'current_stock': float(product.current_stock),
-                    'sales_last_2_months': float(product.sales_last_2_months),
-                    'product_type': product.product_type,
-                    'color': product.color or '',
-                    'production_needed': float(product.production_needed),
-                    'production_priority': product.production_priority,
-                    'days_of_stock': float(product.days_of_stock) if product.days_of_stock else None,
-                    
-                    # Пустые данные Точки
-                    'orders_in_tochka': 0,
-                    'excel_row_number': None,
-                    'has_duplicates': False,
-                    'duplicate_rows': None,
-                    
-                    # Статус
-                    'is_in_tochka': False,
-                    'needs_registration': True,  # Нужно завести в Точке!
-                }
-                not_in_tochka_count += 1
-            
-            merged_data.append(merged_item)
-        
-        # Сортируем: сначала товары которых нет в Точке, потом по приоритету производства
-        merged_data.sort(key=lambda x: (not x['needs_registration'], -x['production_priority']))
+        in_tochka_count = merge_result['products_in_tochka']
+        not_in_tochka_count = merge_result['products_not_in_tochka']
         
         return Response({
             'message': f'Анализ завершен. Товаров в Точке: {in_tochka_count}, отсутствует в Точке: {not_in_tochka_count}',
-            'data': merged_data,
-            'total_production_needed': len(merged_data),
+            'data': merge_result['data'],
+            'total_production_needed': len(merge_result['data']),
             'products_in_tochka': in_tochka_count,
             'products_not_in_tochka': not_in_tochka_count,
-            'coverage_rate': round((in_tochka_count / len(merged_data)) * 100, 1) if merged_data else 0,
+            'coverage_rate': merge_result['coverage_rate'],
+            # Артикулы Точки без товара в МойСклад и похожие артикулы (опечатки, суффиксы)
+            'unmatched_excel_articles': merge_engine.find_unmatched_articles(excel_data),
         })
         
     except Exception as e:
@@ -469,6 +392,7 @@ def merge_excel_with_products(request):
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 @api_view(['POST'])
+@renderer_classes([ORJSONRenderer])
 @permission_classes([AllowAny])
 def get_filtered_production_list(request):
     """
@@ -508,16 +432,16 @@ def get_filtered_production_list(request):
         ).order_by('-production_priority', 'article')
         
         # Фильтруем товары, которые есть в Excel (Точке)
-        products_in_tochka = []
-        for product in all_products_for_production:
-            normalized_product_article = normalize_article(product.article)
-            if normalized_product_article in excel_articles:
-                products_in_tochka.append(product)
+        product_ids_in_tochka = [
+            product_id
+            for product_id, article in all_products_for_production.values_list('id', 'article')
+            if normalize_article(article) in excel_articles
+        ]
+        products_in_tochka = all_products_for_production.filter(id__in=product_ids_in_tochka)
         
         # Используем сериализатор для корректной обработки резерва
-        serializer = ProductListSerializer(
+        serializer = ProductListValuesSerializer(
             products_in_tochka, 
-            many=True, 
             context={
                 'request': request,
                 'include_reserve': include_reserve
@@ -545,36 +469,12 @@ def get_filtered_production_list(request):
             item['has_reserve'] = has_reserve
             item['reserve_amount'] = reserved_stock
             
-            # Используем новый алгоритм расчета резерва с цветовой индикацией
-            if include_reserve:
-                current_stock = float(item.get('current_stock', 0))
-                reserve_calculator = ReserveCalculatorService()
-                reserve_calc = reserve_calculator.calculate_reserve_display(
-                    reserved_stock=reserved_stock,
-                    current_stock=current_stock
-                )
-                reserve_ui = reserve_calculator.format_reserve_for_display(reserve_calc)
-                
-                # Добавляем результаты расчета резерва
-                item['calculated_reserve'] = float(reserve_calc['calculated_reserve'])
-                item['reserve_color'] = reserve_calc['color_indicator']
-                item['reserve_display_text'] = reserve_ui['display_text']
-                item['reserve_tooltip'] = reserve_ui['tooltip_text']
-                item['reserve_needs_attention'] = reserve_ui['needs_attention']
-                
-                # Обратная совместимость со старым полем
-                item['reserve_minus_stock'] = float(reserve_calc['calculated_reserve'])
-            else:
-                item['calculated_reserve'] = None
-                item['reserve_color'] = 'gray'
-                item['reserve_display_text'] = None
-                item['reserve_tooltip'] = None
-                item['reserve_needs_attention'] = False
-                item['reserve_minus_stock'] = None
-            
             production_list.append(item)
             total_quantity += float(item.get('production_needed', 0))
         
+        # Расчет резерва с цветовой индикацией - одним проходом для всех товаров
+        _add_reserve_fields(production_list, include_reserve)
+        
         return Response({
             'message': f'Отфильтрованный список готов: {len(production_list)} товаров к производству',
             'data': production_list,
@@ -594,6 +494,7 @@ def get_filtered_production_list(request):
 def export_deduplicated_excel(request):
     """
     API для экспорта дедуплицированных данных Excel в файл
+    Поле format в теле запроса: xlsx (по умолчанию), csv или parquet
     """
     try:
         data = request.data.get('data', [])
@@ -603,62 +504,30 @@ def export_deduplicated_excel(request):
                 'error': 'Нет данных для экспорта'
             }, status=status.HTTP_400_BAD_REQUEST)
         
-        # Создаем Excel файл
-        wb = Workbook()
-        ws = wb.active
-        ws.title = "Данные Excel без дублей"
-        
-        # Стили для заголовков
-        header_font = Font(bold=True, color="FFFFFF")
-        header_fill = PatternFill(start_color="06EAFC", end_color="06EAFC", fill_type="solid")
-        header_alignment = Alignment(horizontal="center", vertical="center")
-        
-        # Заголовки колонок
-        headers = ['Артикул', 'Заказов (шт.)', 'Номер строки', 'Есть дубликаты', 'Строки дубликатов']
-        for col, header in enumerate(headers, 1):
-            cell = ws.cell(row=1, column=col, value=header)
-            cell.font = header_font
-            cell.fill = header_fill
-            cell.alignment = header_alignment
-        
-        # Данные
-        for row, item in enumerate(data, 2):
-            ws.cell(row=row, column=1, value=item.get('article', ''))
-            ws.cell(row=row, column=2, value=item.get('orders', 0))
-            ws.cell(row=row, column=3, value=item.get('row_number', ''))
-            ws.cell(row=row, column=4, value='Да' if item.get('has_duplicates') else 'Нет')
-            
+        file_format, error_response = _get_export_format(request)
+        if error_response:
+            return error_response
+        
+        rows = []
+        for item in data:
             # Объединяем номера строк дубликатов
             duplicate_rows = item.get('duplicate_rows', [])
-            if duplicate_rows:
-                ws.cell(row=row, column=5, value=', '.join(map(str, duplicate_rows)))
-            else:
-                ws.cell(row=row, column=5, value='')
-        
-        # Автоширина колонок
-        for column in ws.columns:
-            max_length = 0
-            column_letter = column[0].column_letter
-            for cell in column:
-                try:
-                    if len(str(cell.value)) > max_length:
-                        max_length = len(str(cell.value))
-                except:
-                    pass
-            adjusted_width = min(max_length + 2, 50)
-            ws.column_dimensions[column_letter].width = adjusted_width
-        
-        # Подготавливаем ответ
-        response = HttpResponse(
-            content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+            rows.append([
+                item.get('article', ''),
+                item.get('orders', 0),
+                item.get('row_number', ''),
+                bool(item.get('has_duplicates')),
+                ', '.join(map(str, duplicate_rows)) if duplicate_rows else '',
+            ])
+        
+        exporter = TochkaListExporter(
+            title="Данные Excel без дублей",
+            columns=TOCHKA_DEDUPLICATED_COLUMNS,
+            header_color="06EAFC"
         )
         
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f'Данные_Excel_без_дублей_{timestamp}.xlsx'
-        response['Content-Disposition'] = f'attachment; filename="{filename}"'
-        
-        wb.save(response)
-        return response
+        return exporter.export(rows, f'Данные_Excel_без_дублей_{timestamp}', file_format=file_format)
         
     except Exception as e:
         return Response({
@@ -670,6 +539,7 @@ def export_deduplicated_excel(request):
 def export_production_list(request):
     """
     API для экспорта списка к производству в Excel файл
+    Поле format в теле запроса: xlsx (по умолчанию), csv или parquet
     """
     try:
         # ИСПРАВЛЕНИЕ: Поддержка как 'production_data' (новое), так и 'data' (старое) для обратной совместимости
@@ -680,87 +550,76 @@ def export_production_list(request):
                 'error': 'Нет данных для экспорта'
             }, status=status.HTTP_400_BAD_REQUEST)
         
-        # Создаем Excel файл
-        wb = Workbook()
-        ws = wb.active
-        ws.title = "Список к производству"
-        
-        # Стили для заголовков
-        header_font = Font(bold=True, color="FFFFFF")
-        header_fill = PatternFill(start_color="13C2C2", end_color="13C2C2", fill_type="solid")
-        header_alignment = Alignment(horizontal="center", vertical="center")
+        file_format, error_response = _get_export_format(request)
+        if error_response:
+            return error_response
         
-        # Заголовки колонок
-        headers = [
-            'Артикул', 'Название товара', 'К производству (шт.)', 'Приоритет', 
-            'Текущий остаток', 'Тип товара', 'Продажи за 2 мес.', 'Заказов в Точке'
-        ]
-        for col, header in enumerate(headers, 1):
-            cell = ws.cell(row=1, column=col, value=header)
-            cell.font = header_font
-            cell.fill = header_fill
-            cell.alignment = header_alignment
-        
-        # Данные
+        rows = []
         total_production = 0
-        for row, item in enumerate(data, 2):
-            ws.cell(row=row, column=1, value=item.get('article', ''))
-            ws.cell(row=row, column=2, value=item.get('product_name', ''))
-            
+        for item in data:
             production_needed = item.get('production_needed', 0)
-            ws.cell(row=row, column=3, value=production_needed)
             total_production += production_needed
             
-            ws.cell(row=row, column=4, value=item.get('production_priority', 0))
-            ws.cell(row=row, column=5, value=item.get('current_stock', 0))
-            
-            # Переводим тип товара на русский
-            product_type = item.get('product_type', '')
-            type_translation = {
-                'new': 'Новый',
-                'old': 'Старый', 
-                'critical': 'Критичный'
-            }
-            ws.cell(row=row, column=6, value=type_translation.get(product_type, product_type))
-            
-            ws.cell(row=row, column=7, value=item.get('sales_last_2_months', 0))
-            ws.cell(row=row, column=8, value=item.get('orders_in_tochka', 0))
-        
-        # Добавляем итоговую строку
-        total_row = len(data) + 3
-        ws.cell(row=total_row, column=2, value="ИТОГО К ПРОИЗВОДСТВУ:")
-        ws.cell(row=total_row, column=3, value=total_production)
-        
-        # Стиль для итоговой строки
-        for col in [2, 3]:
-            cell = ws.cell(row=total_row, column=col)
-            cell.font = Font(bold=True)
-            cell.fill = PatternFill(start_color="E6F7FF", end_color="E6F7FF", fill_type="solid")
-        
-        # Автоширина колонок
-        for column in ws.columns:
-            max_length = 0
-            column_letter = column[0].column_letter
-            for cell in column:
-                try:
-                    if len(str(cell.value)) > max_length:
-                        max_length = len(str(cell.value))
-                except:
-                    pass
-            adjusted_width = min(max_length + 2, 50)
-            ws.column_dimensions[column_letter].width = adjusted_width
-        
-        # Подготавливаем ответ
-        response = HttpResponse(
-            content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+            rows.append([
+                item.get('article', ''),
+                item.get('product_name', ''),
+                production_needed,
+                item.get('production_priority', 0),
+                item.get('current_stock', 0),
+                item.get('product_type', ''),
+                item.get('sales_last_2_months', 0),
+                item.get('orders_in_tochka', 0),
+            ])
+        
+        exporter = TochkaListExporter(
+            title="Список к производству",
+            columns=TOCHKA_PRODUCTION_COLUMNS,
+            header_color="13C2C2"
         )
         
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f'Список_к_производству_{timestamp}.xlsx'
-        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return exporter.export(
+            rows,
+            f'Список_к_производству_{timestamp}',
+            total_row=[None, "ИТОГО К ПРОИЗВОДСТВУ:", total_production],
+            file_format=file_format
+        )
+        
+    except Exception as e:
+        return Response({
+            'error': f'Ошибка при экспорте: {str(e)}'
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+@api_view(['POST'])
+@permission_classes([AllowAny])
+def export_merge_results(request):
+    """
+    API для экспорта результата объединения с данными Точки
+    Принимает записи merge-with-products в 'data'
+    Поле format в теле запроса: xlsx (по умолчанию), csv или parquet
+    """
+    try:
+        data = request.data.get('data', [])
+        
+        if not data:
+            return Response({
+                'error': 'Нет данных для экспорта'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        file_format, error_response = _get_export_format(request)
+        if error_response:
+            return error_response
+        
+        rows = [[item.get(column.field) for column in TOCHKA_MERGE_COLUMNS] for item in data]
+        
+        exporter = TochkaListExporter(
+            title="Объединение с Точкой",
+            columns=TOCHKA_MERGE_COLUMNS,
+            header_color="06EAFC"
+        )
         
-        wb.save(response)
-        return response
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        return exporter.export(rows, f'Объединение_с_Точкой_{timestamp}', file_format=file_format)
         
     except Exception as e:
         return Response({
@@ -770,7 +629,9 @@ def export_production_list(request):
 
 
 
+
 @api_view(['POST'])
+@renderer_classes([ORJSONRenderer])
 @permission_classes([AllowAny])
 def upload_and_auto_process_excel(request):
     """
@@ -779,9 +640,12 @@ def upload_and_auto_process_excel(request):
     2. Автоматически выполняет анализ производства
     3. Автоматически формирует список к производству
     
+    Параметр async=true ставит обработку в очередь Celery и сразу возвращает
+    job_id для опроса прогресса через tochka/jobs/<job_id>/.
+    Повторная загрузка того же файла возвращает сохраненный результат.
+    
     Возвращает полный результат всех операций
     """
-    import time
     start_time = time.time()
     
     try:
@@ -792,242 +656,63 @@ def upload_and_auto_process_excel(request):
             }, status=status.HTTP_400_BAD_REQUEST)
         
         excel_file = request.FILES['file']
+        file_content = excel_file.read()
+        file_hash = compute_file_hash(file_content)
         
-        # Этап 1: Загрузка и дедупликация Excel файла
-        try:
-            file_content = excel_file.read()
-            df = pd.read_excel(io.BytesIO(file_content))
-            
-            # Поиск нужных колонок с различными вариантами названий
-            article_column = None
-            orders_column = None
-            
-            for col in df.columns:
-                col_lower = str(col).lower().strip()
-                if 'артикул' in col_lower and 'товар' in col_lower:
-                    article_column = col
-                elif 'заказ' in col_lower and 'шт' in col_lower:
-                    orders_column = col
-            
-            if not article_column or not orders_column:
-                return Response({
-                    'error': 'Не найдены необходимые колонки "Артикул товара" и "Заказов, шт."'
-                }, status=status.HTTP_400_BAD_REQUEST)
-            
-            # Фильтруем и очищаем данные
-            df_filtered = df[[article_column, orders_column]].copy()
-            df_filtered = df_filtered.dropna()
-            
-            # Приводим к нужным типам
-            df_filtered[article_column] = df_filtered[article_column].astype(str)
-            df_filtered[orders_column] = pd.to_numeric(df_filtered[orders_column], errors='coerce')
-            df_filtered = df_filtered.dropna()
-            
-            # Дедупликация по артикулу с суммированием заказов
-            deduplicated_data = []
-            article_groups = df_filtered.groupby(article_column)
-            
-            for article, group in article_groups:
-                normalized_article = normalize_article(article)
-                if not normalized_article:
-                    continue
-                    
-                total_orders = group[orders_column].sum()
-                row_numbers = group.index.tolist()
-                
-                item = {
-                    'article': normalized_article,
-                    'orders': int(total_orders),
-                    'row_number': row_numbers[0] + 2,  # +2 для Excel нумерации (1-based + header)
-                    'has_duplicates': len(row_numbers) > 1,
-                    'duplicate_rows': row_numbers[1:] if len(row_numbers) > 1 else []
-                }
-                deduplicated_data.append(item)
-            
-            # Сортируем по убыванию количества заказов
-            deduplicated_data.sort(key=lambda x: x['orders'], reverse=True)
-            
-            upload_result = {
-                'message': f'Excel файл обработан успешно',
-                'total_records': len(df_filtered),
-                'unique_articles': len(deduplicated_data),
-                'data': deduplicated_data
-            }
-            
-        except Exception as e:
-            return Response({
-                'error': f'Ошибка при обработке Excel файла: {str(e)}'
-            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        async_param = request.data.get('async', request.query_params.get('async', ''))
+        async_mode = str(async_param).lower() in ['true', '1', 'yes']
         
-        # Этап 2: Автоматический анализ производства
-        try:
-            excel_articles = [item['article'] for item in deduplicated_data]
-            
-            # Получаем товары из базы данных
-            products = Product.objects.filter(article__in=excel_articles)
-            products_dict = {}
-            
-            for product in products:
-                normalized_article = normalize_article(product.article)
-                if normalized_article:
-                    products_dict[normalized_article] = product
-            
-            # Объединяем данные Excel с товарами
-            merged_data = []
-            found_products = 0
-            
-            for excel_item in deduplicated_data:
-                product = products_dict.get(excel_item['article'])
-                
-                if product:
-                    found_products += 1
-                    merged_item = {
-                        'article': excel_item['article'],
-                        'orders': excel_item['orders'],
-                        'orders_in_tochka': excel_item['orders'],
-                        'has_duplicates': excel_item.get('has_duplicates', False),
-                        'product_name': product.name,
-                        'current_stock': float(product.current_stock),
-                        'sales_last_2_months': float(product.sales_last_2_months),
-                        'product_type': product.product_type,
-                        'color': product.color or '',
-                        'production_needed': float(product.production_needed),
-                        'production_priority': product.production_priority,
-                        'product_matched': True,
-                        'has_product_data': True,
-                        'is_in_tochka': True,
-                        'needs_registration': False,
-                    }
-                else:
-                    merged_item = {
-                        'article': excel_item['article'],
-                        'orders': excel_item['orders'],
-                        'orders_in_tochka': excel_item['orders'],
-                        'has_duplicates': excel_item.get('has_duplicates', False),
-                        'product_name': None,
-                        'current_stock': None,
-                        'sales_last_2_months': None,
-                        'product_type': None,
-                        'production_needed': None,
-                        'production_priority': None,
-                        'product_matched': False,
-                        'has_product_data': False,
-                        'is_in_tochka': False,
-                        'needs_registration': True,
-                    }
-                
-                merged_data.append(merged_item)
-            
-            # Сортируем: сначала требующие регистрации, потом по количеству заказов
-            merged_data.sort(key=lambda x: (not x['needs_registration'], -x['orders']))
-            
-            coverage_rate = round((found_products / len(deduplicated_data)) * 100, 1) if deduplicated_data else 0
-            
-            analysis_result = {
-                'message': f'Анализ производства завершен',
-                'total_articles': len(deduplicated_data),
-                'found_products': found_products,
-                'coverage_rate': coverage_rate,
-                'merged_data': merged_data
-            }
-            
-        except Exception as e:
-            return Response({
-                'error': f'Ошибка при анализе производства: {str(e)}'
-            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        service = TochkaProcessingService()
         
-        # Этап 3: Автоматическое формирование списка к производству
-        try:
-            # Получаем товары на производство из МойСклад
-            products_for_production = Product.objects.filter(
-                production_needed__gt=0
-            ).order_by('-production_priority')
-            
-            # Создаем множество артикулов из Excel (товары Точки)
-            tochka_articles = {item['article'] for item in deduplicated_data}
-            
-            filtered_production = []
-            for product in products_for_production:
-                normalized_article = normalize_article(product.article)
-                
-                if normalized_article in tochka_articles:
-                    # Находим соответствующую запись из Excel для orders_in_tochka
-                    excel_item = next((item for item in deduplicated_data if item['article'] == normalized_article), None)
-                    orders_in_tochka = excel_item['orders'] if excel_item else 0
-                    
-                    # Рассчитываем резерв с новым алгоритмом
-                    reserved_stock = float(getattr(product, 'reserved_stock', 0))
-                    current_stock = float(product.current_stock)
-                    
-                    reserve_calculator = ReserveCalculatorService()
-                    reserve_calc = reserve_calculator.calculate_reserve_display(
-                        reserved_stock=reserved_stock,
-                        current_stock=current_stock
-                    )
-                    reserve_ui = reserve_calculator.format_reserve_for_display(reserve_calc)
-                    
-                    item = {
-                        'article': product.article,
-                        'product_name': product.name,
-                        'production_needed': float(product.production_needed),
-                        'production_priority': product.production_priority,
-                        'current_stock': current_stock,
-                        'sales_last_2_months': float(product.sales_last_2_months),
-                        'product_type': product.product_type,
-                        'color': product.color or '',
-                        'reserved_stock': reserved_stock,
-                        'orders_in_tochka': orders_in_tochka,
-                        'is_in_tochka': True,
-                        'needs_registration': False,
-                        
-                        # Новые поля расчета резерва
-                        'calculated_reserve': float(reserve_calc['calculated_reserve']),
-                        'reserve_color': reserve_calc['color_indicator'],
-                        'reserve_display_text': reserve_ui['display_text'],
-                        'reserve_tooltip': reserve_ui['tooltip_text'],
-                        'reserve_needs_attention': reserve_ui['needs_attention'],
-                        
-                        # Дополнительные поля для UI
-                        'has_reserve': reserved_stock > 0,
-                        'reserve_amount': reserved_stock,
-                        'reserve_minus_stock': float(reserve_calc['calculated_reserve'])  # Обратная совместимость
-                    }
-                    filtered_production.append(item)
-            
-            production_result = {
-                'message': f'Список к производству сформирован',
-                'total_products': len(filtered_production),
-                'products_in_tochka': len(filtered_production),
-                'products_need_registration': 0,
-                'filtered_production': filtered_production
-            }
-            
-        except Exception as e:
+        # Тот же файл уже обработан и товары с тех пор не менялись
+        cached_job = service.find_cached_job(file_hash)
+        if cached_job:
+            if async_mode:
+                return Response(_serialize_tochka_job(cached_job, cached=True), status=status.HTTP_200_OK)
             return Response({
-                'error': f'Ошибка при формировании списка производства: {str(e)}'
-            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
-        
-        # Финальный ответ с результатами всех этапов
-        end_time = time.time()
-        processing_time = round(end_time - start_time, 2)
+                **cached_job.result,
+                'cached': True,
+                'job_id': str(cached_job.job_id),
+            }, status=status.HTTP_200_OK)
+        
+        if async_mode:
+            job = TochkaProcessingJob.objects.create(
+                file_name=excel_file.name,
+                file_hash=file_hash,
+                source_file=file_content,
+            )
+            process_tochka_file_task.delay(str(job.job_id))
+            job.refresh_from_db()
+            
+            return Response(_serialize_tochka_job(job), status=status.HTTP_202_ACCEPTED)
+        
+        data_version, _ = get_data_version(PRODUCTS_DATA)
+        result = service.process(file_content, file_hash=file_hash, file_name=excel_file.name)
+        
+        # Сохраняем результат для мгновенной повторной загрузки того же файла
+        job = TochkaProcessingJob.objects.create(
+            file_name=excel_file.name,
+            file_hash=file_hash,
+            status='success',
+            stage='completed',
+            progress=100,
+            result=result,
+            finished_at=timezone.now(),
+            data_version=data_version,
+        )
         
         return Response({
-            'success': True,
-            'processing_time_seconds': processing_time,
-            'upload_result': upload_result,
-            'analysis_result': analysis_result,
-            'production_result': production_result,
-            'summary': {
-                'excel_file_processed': True,
-                'analysis_completed': True,
-                'production_list_ready': True,
-                'total_excel_records': len(deduplicated_data),
-                'products_found_in_db': found_products,
-                'coverage_percentage': coverage_rate,
-                'production_items_count': len(filtered_production)
-            }
+            **result,
+            'cached': False,
+            'job_id': str(job.job_id),
         }, status=status.HTTP_200_OK)
         
+    except TochkaProcessingException as e:
+        return Response({
+            'error': str(e),
+            'stage': e.stage,
+        }, status=e.status_code)
+        
     except Exception as e:
         end_time = time.time()
         processing_time = round(end_time - start_time, 2)
@@ -1036,3 +721,133 @@ def upload_and_auto_process_excel(request):
             'error': f'Ошибка при автоматической обработке: {str(e)}',
             'processing_time_seconds': processing_time
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+@api_view(['GET'])
+@renderer_classes([ORJSONRenderer])
+@permission_classes([AllowAny])
+def get_tochka_processing_job(request, job_id):
+    """
+    API для опроса статуса фоновой обработки файла Точки
+    Возвращает текущий этап, прогресс и итоговый результат после завершения
+    """
+    try:
+        job = TochkaProcessingJob.objects.defer('source_file').get(job_id=job_id)
+    except TochkaProcessingJob.DoesNotExist:
+        return Response({
+            'error': 'Задача обработки не найдена'
+        }, status=status.HTTP_404_NOT_FOUND)
+    
+    return Response(_serialize_tochka_job(job))
+
+def _get_products_page_for_tochka(request, include_reserve):
+    """
+    Страница товаров для постепенной загрузки вкладки Точка
+    """
+    products = Product.objects.order_by('-production_priority', 'article').values(
+        *ProductListValuesSerializer.value_fields
+    )
+    
+    paginator = KeysetPagination()
+    page = paginator.paginate_queryset(products, request)
+    serializer = ProductListValuesSerializer(
+        page,
+        context={
+            'request': request,
+            'include_reserve': include_reserve
+        }
+    )
+    
+    response = paginator.get_paginated_response(serializer.data)
+    response.data['include_reserve'] = include_reserve
+    return response
+
+def _serialize_tochka_job(job, cached=False):
+    """
+    Сформировать ответ о состоянии задачи обработки файла Точки
+    """
+    data = {
+        'job_id': str(job.job_id),
+        'file_name': job.file_name,
+        'status': job.status,
+        'stage': job.stage,
+        'stage_display': job.get_stage_display(),
+        'progress': job.progress,
+        'ready': job.status in ['success', 'failed'],
+        'cached': cached,
+        'created_at': job.created_at,
+        'finished_at': job.finished_at,
+    }
+    
+    if job.status == 'success':
+        data['result'] = job.result
+    elif job.status == 'failed':
+        data['error'] = job.error_details
+    
+    return data
+
+
+def _add_reserve_fields(items, include_reserve):
+    """
+    Добавить к товарам поля расчета резерва (колонка "Резерв")
+    
+    Ожидает в каждом товаре reserve_amount и current_stock.
+    Расчет выполняется одним векторным вызовом для всего списка.
+    """
+    if not include_reserve:
+        for item in items:
+            item.update({
+                'calculated_reserve': None,
+                'reserve_color': 'gray',
+                'reserve_display_text': None,
+                'reserve_tooltip': None,
+                'reserve_needs_attention': False,
+                'reserve_minus_stock': None,
+            })
+        return
+    
+    reserve_columns = ReserveCalculatorService().calculate_reserve_columns(
+        reserved_stock=[item['reserve_amount'] for item in items],
+        current_stock=[float(item.get('current_stock', 0)) for item in items]
+    )
+    
+    for item, calculated_reserve, color, display_text, tooltip, needs_attention in zip(
+        items,
+        reserve_columns['calculated_reserve'],
+        reserve_columns['color_indicator'],
+        reserve_columns['display_text'],
+        reserve_columns['tooltip_text'],
+        reserve_columns['needs_attention'],
+    ):
+        item.update({
+            'calculated_reserve': calculated_reserve,
+            'reserve_color': color,
+            'reserve_display_text': display_text,
+            'reserve_tooltip': tooltip,
+            'reserve_needs_attention': needs_attention,
+            # Обратная совместимость со старым полем
+            'reserve_minus_stock': calculated_reserve,
+        })
+
+def _get_export_format(request):
+    """
+    Получить формат экспорта из поля format в теле запроса
+
+    Query-параметр ?format= не используется: его перехватывает DRF
+    (URL_FORMAT_OVERRIDE) для выбора рендерера и отвечает 404.
+    
+    Returns:
+        (format, None) или (None, Response с ошибкой 400)
+    """
+    file_format = str(request.data.get('format') or 'xlsx').lower()
+    
+    if file_format not in EXPORT_FORMATS:
+        return None, Response({
+            'error': f'Неподдерживаемый формат экспорта: {file_format}'
+        }, status=status.HTTP_400_BAD_REQUEST)
+    
+    if file_format == 'parquet' and not HAS_PYARROW:
+        return None, Response({
+            'error': 'Экспорт в Parquet недоступен: не установлен pyarrow'
+        }, status=status.HTTP_400_BAD_REQUEST)
+    
+    return file_format, None
@@ -8,7 +8,9 @@ from .tochka_views import (
     get_filtered_production_list,
     export_deduplicated_excel,
     export_production_list,
-    upload_and_auto_process_excel
+    export_merge_results,
+    upload_and_auto_process_excel,
+    get_tochka_processing_job
 )
 from .health import (
     health_check,
@@ -41,5 +43,7 @@ urlpatterns = [
     path('tochka/filtered-production/', get_filtered_production_list, name='tochka-filtered-production'),
     path('tochka/export-deduplicated/', export_deduplicated_excel, name='tochka-export-deduplicated'),
     path('tochka/export-production/', export_production_list, name='tochka-export-production'),
+    path('tochka/export-merge/', export_merge_results, name='tochka-export-merge'),
     path('tochka/upload-and-auto-process/', upload_and_auto_process_excel, name='tochka-upload-and-auto-process'),
+    path('tochka/jobs/<uuid:job_id>/', get_tochka_processing_job, name='tochka-processing-job'),
 ]
\ No newline at end of file
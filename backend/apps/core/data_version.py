@@ -0,0 +1,127 @@
+"""
+Global data version and HTTP conditional requests for read APIs.
+
+Product data changes only after a МойСклад sync, a recalculation or a
+new production list, while dashboards poll the read endpoints much more
+often. Those writers call bump_data_version(); read views decorated with
+conditional_on_data_version get ETag/Last-Modified headers derived from
+the version and answer 304 Not Modified to a matching conditional
+request before the view runs.
+
+The version is kept in the DataVersion table and mirrored in the cache,
+so a 304 normally costs one cache lookup and no SQL. Writers store the
+new version in the cache when their transaction commits; readers only
+fill a missing entry (cache.add), so a reader that loaded the old row
+cannot overwrite the new version. The entry expires after
+DATA_VERSION_CACHE_TIMEOUT, which bounds staleness if two writers race.
+"""
+import logging
+from datetime import datetime
+from functools import wraps
+from typing import Optional, Tuple
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+
+from .models import DataVersion
+
+logger = logging.getLogger(__name__)
+
+PRODUCTS_DATA = 'products'
+SIMPLEPRINT_FILES_DATA = 'simpleprint_files'
+DATA_VERSION_CACHE_PREFIX = 'data_version:'
+DATA_VERSION_CACHE_TIMEOUT = 60  # seconds
+
+
+def _cache_key(name: str) -> str:
+    return f'{DATA_VERSION_CACHE_PREFIX}{name}'
+
+
+def _load_data_version(name: str) -> Tuple[int, Optional[datetime]]:
+    return DataVersion.objects.filter(name=name).values_list('version', 'updated_at').first() or (0, None)
+
+
+def get_data_version(name: str = PRODUCTS_DATA) -> Tuple[int, Optional[datetime]]:
+    """
+    Current (version, updated_at) of a data set; (0, None) before the first bump.
+    """
+    try:
+        state = cache.get(_cache_key(name))
+    except Exception as e:
+        logger.warning(f"Data version cache read failed: {str(e)}")
+        state = None
+
+    if state is None:
+        state = _load_data_version(name)
+        try:
+            cache.add(_cache_key(name), state, DATA_VERSION_CACHE_TIMEOUT)
+        except Exception as e:
+            logger.warning(f"Data version cache write failed: {str(e)}")
+
+    return state
+
+
+def bump_data_version(name: str = PRODUCTS_DATA) -> None:
+    """
+    Mark a data set as changed. Inside a transaction the cached version
+    is replaced on commit, so readers never see the new version before
+    the new data.
+    """
+    updated = DataVersion.objects.filter(name=name).update(version=F('version') + 1, updated_at=timezone.now())
+    if not updated:
+        _, created = DataVersion.objects.get_or_create(name=name, defaults={'version': 1})
+        if not created:
+            DataVersion.objects.filter(name=name).update(version=F('version') + 1, updated_at=timezone.now())
+
+    def publish():
+        try:
+            cache.set(_cache_key(name), _load_data_version(name), DATA_VERSION_CACHE_TIMEOUT)
+        except Exception as e:
+            logger.warning(f"Data version cache update failed: {str(e)}")
+
+    transaction.on_commit(publish)
+
+
+def conditional_on_data_version(view_func=None, name: str = PRODUCTS_DATA):
+    """
+    Decorator for GET views whose response depends only on the request
+    and the data set version.
+
+    Successful responses carry ETag and Last-Modified and
+    "Cache-Control: private, no-cache", so browsers revalidate every
+    poll; If-None-Match / If-Modified-Since matching the current version
+    returns 304 without calling the view.
+
+    Apply it outside @api_view, or to dispatch() of a class-based view
+    via method_decorator.
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return func(request, *args, **kwargs)
+
+            version, updated_at = get_data_version(name)
+            etag = quote_etag(f'{name}-{version}')
+            last_modified = int(updated_at.timestamp()) if updated_at else None
+
+            response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+            if response is None:
+                response = func(request, *args, **kwargs)
+                if response.status_code != 200:
+                    return response
+
+            response.headers.setdefault('ETag', etag)
+            if last_modified is not None:
+                response.headers.setdefault('Last-Modified', http_date(last_modified))
+            patch_cache_control(response, private=True, no_cache=True)
+            return response
+        return wrapper
+
+    if view_func is not None:
+        return decorator(view_func)
+    return decorator
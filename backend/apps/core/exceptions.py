@@ -19,4 +19,11 @@ class SyncException(PrintFarmException):
 
 class ProductionCalculationException(PrintFarmException):
     """Exception for production calculation errors."""
-    pass
\ No newline at end of file
+    pass
+
+class TochkaProcessingException(PrintFarmException):
+    """Exception for Tochka file processing errors."""
+    def __init__(self, message: str, status_code: int = 500, stage: str = None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.stage = stage
@@ -9,3 +9,20 @@ class TimestampedModel(models.Model):
 
     class Meta:
         abstract = True
+
+
+class DataVersion(models.Model):
+    """
+    Monotonic counter of a data set, bumped whenever the data changes.
+    Used to build ETag/Last-Modified headers of read APIs.
+    """
+    name = models.CharField(max_length=50, primary_key=True)
+    version = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = 'Data version'
+        verbose_name_plural = 'Data versions'
+
+    def __str__(self):
+        return f"{self.name}: {self.version}"
@@ -0,0 +1,153 @@
+"""
+Custom DRF paginators for PrintFarm production system.
+"""
+import base64
+import json
+from collections import OrderedDict
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError as DjangoValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Keyset (seek) pagination over a multi-column ordering.
+
+    The cursor holds the ordering values of the last row of the page and
+    the next page is selected by comparing the ordering columns with
+    them instead of using OFFSET, so every page costs the same no matter
+    how deep it is. The primary key is appended to the ordering as a
+    tie-breaker. Ordering columns must not be nullable.
+
+    The total count is returned unless ?count=false is passed.
+    """
+    page_size = 100
+    max_page_size = 1000
+    page_size_query_param = 'page_size'
+    cursor_query_param = 'cursor'
+    count_query_param = 'count'
+    default_ordering = ('-production_priority', 'article')
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.model = queryset.model
+        self.ordering = self.get_ordering(queryset)
+        queryset = queryset.order_by(*self.ordering)
+
+        self.count = queryset.count() if self.include_count(request) else None
+
+        cursor = self.decode_cursor(request)
+        if cursor is not None:
+            queryset = queryset.filter(self.build_after_filter(cursor))
+
+        rows = list(queryset[:self.page_size + 1])
+        self.has_next = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+
+        self.next_cursor = self.encode_cursor(rows[-1]) if self.has_next else None
+        return rows
+
+    def get_paginated_response(self, data):
+        response = OrderedDict()
+        if self.count is not None:
+            response['count'] = self.count
+        response['next'] = self.get_next_link()
+        response['next_cursor'] = self.next_cursor
+        response['results'] = data
+        return Response(response)
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params.get(self.page_size_query_param, self.page_size))
+        except (TypeError, ValueError):
+            return self.page_size
+        return max(1, min(page_size, self.max_page_size))
+
+    def include_count(self, request):
+        return request.query_params.get(self.count_query_param, 'true').lower() not in ('false', '0', 'no')
+
+    def get_ordering(self, queryset):
+        """
+        Ordering of the queryset (or default_ordering) with pk appended.
+        """
+        ordering = list(queryset.query.order_by) or list(self.default_ordering)
+        model = queryset.model
+
+        for field in ordering:
+            name = field.lstrip('-')
+            if name == 'pk':
+                continue
+            try:
+                model_field = model._meta.get_field(name)
+            except FieldDoesNotExist:
+                raise ValidationError({'ordering': f'Cursor pagination does not support ordering by {name}'})
+            if model_field.null:
+                raise ValidationError({'ordering': f'Cursor pagination does not support ordering by nullable field {name}'})
+
+        pk_name = model._meta.pk.name
+        if not any(field.lstrip('-') in ('pk', pk_name) for field in ordering):
+            ordering.append(pk_name)
+        return ordering
+
+    def build_after_filter(self, values):
+        """
+        Rows that come after the cursor values in the ordering:
+        (a > x) OR (a = x AND b > y) OR (a = x AND b = y AND c > z) ...
+        """
+        condition = Q()
+        equal = Q()
+        for field, value in zip(self.ordering, values):
+            name = field.lstrip('-')
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            condition |= equal & Q(**{f'{name}__{lookup}': value})
+            equal &= Q(**{name: value})
+        return condition
+
+    def encode_cursor(self, row):
+        values = [
+            row[field.lstrip('-')] if isinstance(row, dict) else getattr(row, field.lstrip('-'))
+            for field in self.ordering
+        ]
+        payload = json.dumps(values, cls=DjangoJSONEncoder, separators=(',', ':'))
+        return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii')
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+
+        try:
+            values = json.loads(base64.urlsafe_b64decode(encoded.encode('ascii')).decode('utf-8'))
+        except (TypeError, ValueError, UnicodeError):
+            raise ValidationError({self.cursor_query_param: 'Invalid cursor'})
+
+        if not isinstance(values, list) or len(values) != len(self.ordering):
+            raise ValidationError({self.cursor_query_param: 'Invalid cursor'})
+        return [self.to_cursor_value(field, value) for field, value in zip(self.ordering, values)]
+
+    def to_cursor_value(self, field, value):
+        """
+        Convert a cursor value with its ordering field, so a tampered
+        cursor is rejected here instead of failing inside the query.
+        """
+        name = field.lstrip('-')
+        model_field = self.model._meta.pk if name == 'pk' else self.model._meta.get_field(name)
+        try:
+            value = model_field.to_python(value)
+        except (DjangoValidationError, TypeError, ValueError):
+            value = None
+        if value is None:
+            raise ValidationError({self.cursor_query_param: 'Invalid cursor'})
+        return value
+
+    def get_next_link(self):
+        if not self.next_cursor:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.next_cursor)
@@ -0,0 +1,40 @@
+"""
+Custom DRF renderers for PrintFarm production system.
+"""
+import decimal
+
+import orjson
+from rest_framework.renderers import BaseRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+
+def orjson_default(obj):
+    """
+    Convert types orjson does not support natively.
+
+    Decimal is rendered as float, the same way DRF's JSONEncoder does.
+    Everything else (lazy strings, timedelta, querysets...) falls back
+    to DRF's JSONEncoder.
+    """
+    if isinstance(obj, decimal.Decimal):
+        return float(obj)
+    return JSONEncoder().default(obj)
+
+
+class ORJSONRenderer(BaseRenderer):
+    """
+    Fast JSON renderer based on orjson.
+
+    Drop-in replacement for rest_framework.renderers.JSONRenderer for views
+    returning large lists (Tochka analysis, product lists). Enable per view
+    via renderer_classes / @renderer_classes.
+    """
+    media_type = 'application/json'
+    format = 'json'
+    charset = None
+    options = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return orjson.dumps(data, default=orjson_default, option=self.options)
@@ -0,0 +1,204 @@
+"""
+Cross-process single-flight locks for background syncs.
+
+A sync of each kind (SimplePrint, МойСклад) may run only once at a time,
+whether it was started by celery beat, a manual trigger or the DEBUG
+synchronous path. The lock lives in the Django cache (Redis in
+production) as a lease: the holder extends it from a heartbeat thread,
+so a lock left by a crashed or killed worker expires after
+SYNC_LOCK_TTL seconds.
+
+Triggers call start_single_flight(), which takes the lock on behalf of
+the Celery task id before queueing the task; a duplicate trigger gets
+the running task id back instead of starting another sync. Tasks
+decorated with single_flight() adopt a lock taken for their id, take a
+free one, or return without running when another sync holds it.
+
+If the cache is unavailable the lock fails open and syncs run
+unguarded, as they did before.
+"""
+import logging
+import threading
+import uuid
+from functools import wraps
+from typing import Dict, Optional, Tuple
+
+from django.core.cache import cache
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+SIMPLEPRINT_SYNC = 'simpleprint'
+MOYSKLAD_SYNC = 'moysklad'
+
+SYNC_LOCK_TTL = 120  # seconds without a heartbeat before the lock expires
+SYNC_LOCK_CACHE_PREFIX = 'sync_lock:'
+
+
+class SyncAlreadyRunning(Exception):
+    """A sync of this kind is held by another owner."""
+
+    def __init__(self, kind: str, holder: Optional[Dict]):
+        self.kind = kind
+        self.holder = holder or {}
+        super().__init__(f"{kind} sync is already running (owner={self.holder.get('owner')})")
+
+
+def _cache_key(kind: str) -> str:
+    return f'{SYNC_LOCK_CACHE_PREFIX}{kind}'
+
+
+def get_sync_holder(kind: str) -> Optional[Dict]:
+    """
+    Current holder of a sync lock: {'owner', 'acquired_at'}, or None.
+    """
+    try:
+        return cache.get(_cache_key(kind))
+    except Exception as e:
+        logger.warning(f"Sync lock read failed: {str(e)}")
+        return None
+
+
+class SyncLock:
+    """
+    Lease on a sync kind, owned by a Celery task id or a random token.
+
+    Used as a context manager it raises SyncAlreadyRunning when the lock
+    is held by someone else, refreshes the lease from a daemon thread
+    while the block runs and releases it on exit.
+    """
+
+    def __init__(self, kind: str, owner: Optional[str] = None, ttl: int = SYNC_LOCK_TTL):
+        self.kind = kind
+        self.owner = owner or uuid.uuid4().hex
+        self.ttl = ttl
+        self._stop_heartbeat = threading.Event()
+        self._heartbeat_thread = None
+
+    @property
+    def key(self) -> str:
+        return _cache_key(self.kind)
+
+    def acquire(self) -> bool:
+        """
+        Take the lock, or confirm that this owner already holds it.
+        """
+        holder = {'owner': self.owner, 'acquired_at': timezone.now().isoformat()}
+        try:
+            if cache.add(self.key, holder, self.ttl):
+                return True
+            return self.refresh()
+        except Exception as e:
+            logger.warning(f"Sync lock unavailable, running {self.kind} sync without it: {str(e)}")
+            return True
+
+    def refresh(self) -> bool:
+        """
+        Extend the lease if this owner still holds the lock.
+        """
+        try:
+            current = cache.get(self.key)
+            if current is None or current.get('owner') != self.owner:
+                return False
+            return bool(cache.touch(self.key, self.ttl))
+        except Exception as e:
+            logger.warning(f"Sync lock refresh failed: {str(e)}")
+            return False
+
+    def release(self) -> None:
+        """
+        Drop the lock if this owner holds it.
+        """
+        try:
+            current = cache.get(self.key)
+            if current is not None and current.get('owner') == self.owner:
+                cache.delete(self.key)
+        except Exception as e:
+            logger.warning(f"Sync lock release failed: {str(e)}")
+
+    def _heartbeat(self) -> None:
+        while not self._stop_heartbeat.wait(self.ttl / 3):
+            if not self.refresh():
+                logger.warning(f"{self.kind} sync lock lease lost (owner={self.owner})")
+
+    def __enter__(self) -> 'SyncLock':
+        if not self.acquire():
+            raise SyncAlreadyRunning(self.kind, get_sync_holder(self.kind))
+
+        self._stop_heartbeat.clear()
+        self._heartbeat_thread = threading.Thread(
+            target=self._heartbeat, name=f'sync-lock-{self.kind}', daemon=True
+        )
+        self._heartbeat_thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self._stop_heartbeat.set()
+        if self._heartbeat_thread is not None:
+            self._heartbeat_thread.join()
+        self.release()
+
+
+def release_sync_lock(kind: str, owner: str) -> None:
+    """
+    Release a lock on behalf of its owner, e.g. after revoking its task.
+    """
+    SyncLock(kind, owner=owner).release()
+
+
+def start_single_flight(kind: str, task, **kwargs) -> Tuple[Optional[str], bool]:
+    """
+    Queue a Celery sync task unless a sync of this kind is running.
+
+    The lock is taken for the new task id before the task is queued, so
+    concurrent triggers cannot both start one.
+
+    Returns:
+        (task_id, started): the new task id and True, or the running
+        owner's id and False
+    """
+    for _ in range(2):
+        task_id = str(uuid.uuid4())
+        lock = SyncLock(kind, owner=task_id)
+        if lock.acquire():
+            try:
+                task.apply_async(kwargs=kwargs, task_id=task_id)
+            except Exception:
+                lock.release()
+                raise
+            return task_id, True
+
+        holder = get_sync_holder(kind)
+        if holder is not None:
+            return holder.get('owner'), False
+        # The holder expired between the two cache calls - try again
+
+    return None, False
+
+
+def single_flight(kind: str):
+    """
+    Decorator for Celery task functions that run a sync of the given kind.
+
+    The task runs under SyncLock owned by its task id. If another sync
+    holds the lock the task is skipped and returns
+    {'status': 'already_running', 'task_id': <owner>}.
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            from celery import current_task
+
+            owner = getattr(current_task.request, 'id', None) if current_task else None
+            try:
+                lock = SyncLock(kind, owner=owner).__enter__()
+            except SyncAlreadyRunning as e:
+                logger.info(f"Skipping {kind} sync: already running as {e.holder.get('owner')}")
+                return {'status': 'already_running', 'task_id': e.holder.get('owner')}
+
+            try:
+                return func(*args, **kwargs)
+            finally:
+                lock.__exit__(None, None, None)
+        return wrapper
+    return decorator
@@ -0,0 +1,101 @@
+"""
+Тесты для версии данных и условных запросов
+"""
+from decimal import Decimal
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.test import APIRequestFactory
+
+from apps.api.v1.tochka_views import get_products_stats_for_tochka
+from apps.core import data_version
+from apps.core.data_version import bump_data_version, get_data_version
+from apps.products.models import Product
+from apps.products.services.recalculation import recalculate_all_products
+from apps.products.views import ProductListView
+
+LOCMEM_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'data-version-tests'}}
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class DataVersionTestCase(TestCase):
+    """Тесты для версии данных"""
+
+    def setUp(self):
+        cache.clear()
+        self.factory = APIRequestFactory()
+        Product.objects.create(
+            moysklad_id='data-version-1',
+            article='DV-1',
+            name='Data version',
+            current_stock=Decimal('2'),
+            sales_last_2_months=Decimal('30'),
+        )
+
+    def test_bump_increments_version(self):
+        """Тест: версия растет при каждом изменении данных"""
+        self.assertEqual(get_data_version(), (0, None))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            bump_data_version()
+        version, updated_at = get_data_version()
+        self.assertEqual(version, 1)
+        self.assertIsNotNone(updated_at)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            bump_data_version()
+        self.assertEqual(get_data_version()[0], 2)
+
+    def test_stale_reader_does_not_overwrite_new_version(self):
+        """Тест: читатель, загрузивший старую версию до коммита, не затирает новую"""
+        load_data_version = data_version._load_data_version
+        calls = []
+
+        def load_then_bump(name):
+            state = load_data_version(name)
+            if not calls:
+                calls.append(name)
+                with self.captureOnCommitCallbacks(execute=True):
+                    bump_data_version(name)
+            return state
+
+        with mock.patch.object(data_version, '_load_data_version', side_effect=load_then_bump):
+            self.assertEqual(get_data_version(), (0, None))
+
+        self.assertEqual(get_data_version()[0], 1)
+
+    def test_not_modified_skips_database(self):
+        """Тест: совпавший ETag дает 304 без запросов к базе"""
+        with self.captureOnCommitCallbacks(execute=True):
+            bump_data_version()
+        view = ProductListView.as_view()
+
+        response = view(self.factory.get('/api/v1/products/'))
+        response.render()
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('no-cache', response['Cache-Control'])
+        etag = response['ETag']
+
+        with self.assertNumQueries(0):
+            response = view(self.factory.get('/api/v1/products/', HTTP_IF_NONE_MATCH=etag))
+        self.assertEqual(response.status_code, 304)
+
+        with self.assertNumQueries(0):
+            response = get_products_stats_for_tochka(
+                self.factory.get('/api/v1/tochka/stats/', HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+            )
+        self.assertEqual(response.status_code, 304)
+
+    def test_recalculation_changes_etag(self):
+        """Тест: после пересчета клиент получает новые данные"""
+        response = get_products_stats_for_tochka(self.factory.get('/api/v1/tochka/stats/'))
+        etag = response['ETag']
+
+        Product.objects.update(production_priority=0)
+        with self.captureOnCommitCallbacks(execute=True):
+            recalculate_all_products()
+
+        response = get_products_stats_for_tochka(self.factory.get('/api/v1/tochka/stats/', HTTP_IF_NONE_MATCH=etag))
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
@@ -0,0 +1,126 @@
+"""
+Тесты для KeysetPagination
+"""
+import base64
+import json
+from decimal import Decimal
+
+from django.test import TestCase
+from rest_framework.exceptions import ValidationError
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from apps.api.v1.tochka_views import get_products_for_tochka
+from apps.core.pagination import KeysetPagination
+from apps.products.models import Product
+from apps.products.views import ProductListView
+
+
+class KeysetPaginationTestCase(TestCase):
+    """Тесты для KeysetPagination"""
+
+    def setUp(self):
+        self.factory = APIRequestFactory()
+        # Остаток 2 и продажи 30 - приоритет 100, остаток 100 без продаж - приоритет 20
+        for index in range(7):
+            Product.objects.create(
+                moysklad_id=f'keyset-{index}',
+                article=f'KEY-{index % 3}',
+                name=f'Keyset {index}',
+                current_stock=Decimal('2') if index % 2 else Decimal('100'),
+                sales_last_2_months=Decimal('30') if index % 2 else Decimal('0'),
+            )
+        self.expected = list(
+            Product.objects.order_by('-production_priority', 'article', 'id').values_list('id', flat=True)
+        )
+
+    def paginate(self, queryset, **params):
+        paginator = KeysetPagination()
+        request = Request(self.factory.get('/products/', params))
+        page = paginator.paginate_queryset(queryset, request)
+        return paginator, page
+
+    def test_pages_follow_ordering_with_duplicate_keys(self):
+        """Тест: страницы по курсору совпадают с полной сортировкой без пропусков и повторов"""
+        queryset = Product.objects.order_by('-production_priority', 'article')
+        ids = []
+        params = {'page_size': 3}
+
+        while True:
+            paginator, page = self.paginate(queryset, **params)
+            ids.extend(product.id for product in page)
+            if not paginator.next_cursor:
+                break
+            params['cursor'] = paginator.next_cursor
+
+        self.assertEqual(ids, self.expected)
+        self.assertEqual(paginator.count, 7)
+
+    def test_values_rows_and_count_suppression(self):
+        """Тест: курсор строится по строкам values(), count=false отключает подсчет"""
+        queryset = Product.objects.values('id', 'article', 'production_priority')
+        paginator, page = self.paginate(queryset, page_size=5, count='false')
+
+        self.assertEqual([row['id'] for row in page], self.expected[:5])
+        self.assertIsNone(paginator.count)
+
+        data = paginator.get_paginated_response([]).data
+        self.assertNotIn('count', data)
+        self.assertIn('cursor=', data['next'])
+
+    def test_invalid_cursor(self):
+        """Тест: поврежденный курсор - ошибка 400"""
+        with self.assertRaises(ValidationError) as ctx:
+            self.paginate(Product.objects.all(), cursor='not-a-cursor')
+        self.assertIn('cursor', ctx.exception.detail)
+
+    def test_cursor_with_wrong_value_types(self):
+        """Тест: корректно закодированный курсор с неверными типами - ошибка 400"""
+        for values in (['x', 'y', 1], ['20', None, 1], [20, 'A1', 'zz'], [20, 'A1', [1]]):
+            cursor = base64.urlsafe_b64encode(json.dumps(values).encode('utf-8')).decode('ascii')
+            with self.subTest(values=values), self.assertRaises(ValidationError) as ctx:
+                self.paginate(Product.objects.all(), cursor=cursor)
+            self.assertIn('cursor', ctx.exception.detail)
+
+        response = ProductListView.as_view()(self.factory.get(
+            '/api/v1/products/', {'pagination': 'cursor', 'cursor': cursor}
+        ))
+        self.assertEqual(response.status_code, 400)
+
+    def test_nullable_ordering_is_rejected(self):
+        """Тест: сортировка по nullable полю не поддерживается"""
+        with self.assertRaises(ValidationError):
+            self.paginate(Product.objects.order_by('days_of_stock'))
+
+    def test_product_list_cursor_mode(self):
+        """Тест: ProductListView переключается на курсорную пагинацию"""
+        view = ProductListView.as_view()
+
+        response = view(self.factory.get('/api/v1/products/', {'pagination': 'cursor', 'page_size': 4}))
+        data = json.loads(response.rendered_content)
+        self.assertEqual([item['id'] for item in data['results']], self.expected[:4])
+
+        response = view(self.factory.get('/api/v1/products/', {'cursor': data['next_cursor'], 'page_size': 4}))
+        data = json.loads(response.rendered_content)
+        self.assertEqual([item['id'] for item in data['results']], self.expected[4:])
+        self.assertIsNone(data['next'])
+
+    def test_product_list_page_number_mode_is_default(self):
+        """Тест: без параметров сохраняется постраничная пагинация"""
+        response = ProductListView.as_view()(self.factory.get('/api/v1/products/'))
+        data = json.loads(response.rendered_content)
+
+        self.assertEqual(data['count'], 7)
+        self.assertIn('previous', data)
+
+    def test_tochka_products_cursor_mode(self):
+        """Тест: товары для Точки загружаются порциями"""
+        response = get_products_for_tochka(self.factory.get('/api/v1/tochka/products/', {
+            'pagination': 'cursor', 'page_size': 5, 'include_reserve': 'true'
+        }))
+        data = json.loads(response.rendered_content)
+
+        self.assertEqual([item['id'] for item in data['results']], self.expected[:5])
+        self.assertEqual(data['count'], 7)
+        self.assertTrue(data['include_reserve'])
+        self.assertIsNotNone(data['next_cursor'])
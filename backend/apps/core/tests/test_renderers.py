@@ -0,0 +1,49 @@
+"""
+Тесты для ORJSONRenderer
+"""
+import datetime
+import json
+from decimal import Decimal
+
+from django.test import TestCase
+from django.utils import timezone
+from django.utils.translation import gettext_lazy
+from rest_framework.renderers import JSONRenderer
+
+from apps.core.renderers import ORJSONRenderer
+
+
+class ORJSONRendererTestCase(TestCase):
+    """Тесты для ORJSONRenderer"""
+
+    def setUp(self):
+        self.renderer = ORJSONRenderer()
+
+    def test_render_matches_drf_json_renderer(self):
+        """Тест: результат совпадает со стандартным JSONRenderer"""
+        data = {
+            'results': [{'article': 'N323-13W', 'stock': Decimal('5.50'), 'color': 'красный'}],
+            'count': 1,
+            'date': datetime.date(2025, 1, 15),
+            'synced_at': datetime.datetime(2025, 1, 15, 10, 30, tzinfo=datetime.timezone.utc),
+            'label': gettext_lazy('Товары'),
+        }
+
+        self.assertEqual(
+            json.loads(self.renderer.render(data)),
+            json.loads(JSONRenderer().render(data))
+        )
+
+    def test_render_decimal_as_float(self):
+        """Тест: Decimal сериализуется как число"""
+        self.assertEqual(json.loads(self.renderer.render({'value': Decimal('1.25')})), {'value': 1.25})
+
+    def test_render_aware_datetime(self):
+        """Тест: datetime с часовым поясом сохраняет смещение"""
+        value = timezone.make_aware(datetime.datetime(2025, 1, 15, 10, 30))
+        rendered = json.loads(self.renderer.render({'value': value}))
+        self.assertEqual(datetime.datetime.fromisoformat(rendered['value']), value)
+
+    def test_render_none(self):
+        """Тест: пустой ответ"""
+        self.assertEqual(self.renderer.render(None), b'')
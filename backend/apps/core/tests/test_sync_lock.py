@@ -0,0 +1,74 @@
+"""
+Тесты для блокировки синхронизаций
+"""
+from unittest.mock import MagicMock, patch
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+
+from apps.core.sync_lock import (
+    SIMPLEPRINT_SYNC, SyncAlreadyRunning, SyncLock, get_sync_holder, single_flight, start_single_flight
+)
+
+LOCMEM_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'sync-lock-tests'}}
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class SyncLockTestCase(SimpleTestCase):
+    """Тесты для SyncLock"""
+
+    def setUp(self):
+        cache.clear()
+
+    def test_second_owner_is_rejected(self):
+        """Тест: пока блокировка удерживается, второй владелец ее не получает"""
+        with SyncLock(SIMPLEPRINT_SYNC, owner='first'):
+            self.assertEqual(get_sync_holder(SIMPLEPRINT_SYNC)['owner'], 'first')
+            with self.assertRaises(SyncAlreadyRunning) as context:
+                with SyncLock(SIMPLEPRINT_SYNC, owner='second'):
+                    pass
+            self.assertEqual(context.exception.holder['owner'], 'first')
+
+        self.assertIsNone(get_sync_holder(SIMPLEPRINT_SYNC))
+
+    def test_stale_lock_expires(self):
+        """Тест: блокировка упавшего воркера истекает по таймауту аренды"""
+        self.assertTrue(SyncLock(SIMPLEPRINT_SYNC, owner='crashed', ttl=1).acquire())
+        self.assertFalse(SyncLock(SIMPLEPRINT_SYNC, owner='next').acquire())
+
+        with patch('django.core.cache.backends.locmem.time.time', return_value=10 ** 10):
+            self.assertTrue(SyncLock(SIMPLEPRINT_SYNC, owner='next').acquire())
+
+    def test_duplicate_trigger_attaches_to_running_task(self):
+        """Тест: повторный запуск возвращает task_id выполняющейся задачи"""
+        task = MagicMock()
+
+        task_id, started = start_single_flight(SIMPLEPRINT_SYNC, task, full_sync=True)
+        self.assertTrue(started)
+        task.apply_async.assert_called_once_with(kwargs={'full_sync': True}, task_id=task_id)
+
+        self.assertEqual(start_single_flight(SIMPLEPRINT_SYNC, task), (task_id, False))
+        self.assertEqual(task.apply_async.call_count, 1)
+
+    def test_task_adopts_lock_taken_by_trigger(self):
+        """Тест: задача работает под блокировкой, взятой для ее task_id, и освобождает ее"""
+        calls = []
+
+        @single_flight(SIMPLEPRINT_SYNC)
+        def sync():
+            calls.append(get_sync_holder(SIMPLEPRINT_SYNC)['owner'])
+            return 'done'
+
+        SyncLock(SIMPLEPRINT_SYNC, owner='task-1').acquire()
+        current_task = MagicMock()
+
+        current_task.request.id = 'task-2'
+        with patch('celery.current_task', current_task):
+            self.assertEqual(sync(), {'status': 'already_running', 'task_id': 'task-1'})
+
+        current_task.request.id = 'task-1'
+        with patch('celery.current_task', current_task):
+            self.assertEqual(sync(), 'done')
+
+        self.assertEqual(calls, ['task-1'])
+        self.assertIsNone(get_sync_holder(SIMPLEPRINT_SYNC))
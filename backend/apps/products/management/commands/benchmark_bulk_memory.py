@@ -0,0 +1,92 @@
+"""
+Management command to benchmark memory of bulk product paths as the catalogue grows.
+"""
+import tempfile
+import time
+import tracemalloc
+from decimal import Decimal
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from apps.products.models import Product
+from apps.products.services.recalculation import recalculate_all_products
+from apps.reports.exporters import ProductsExporter
+
+
+class Command(BaseCommand):
+    help = 'Measure peak memory of exports and recalculation for growing catalogue sizes'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes',
+            type=str,
+            default='1000,5000,20000',
+            help='Comma-separated catalogue sizes to generate'
+        )
+        parser.add_argument(
+            '--formats',
+            type=str,
+            default='csv,xlsx',
+            help='Comma-separated export formats to measure'
+        )
+
+    def handle(self, *args, **options):
+        sizes = [int(size) for size in options['sizes'].split(',')]
+        formats = [file_format.strip() for file_format in options['formats'].split(',') if file_format.strip()]
+
+        steps = [(f'export_{file_format}', self._export(file_format)) for file_format in formats]
+        steps += [
+            ('recalculate', recalculate_all_products),
+            # Reference: every model instance loaded at once
+            ('load_all', lambda: list(Product.objects.all())),
+        ]
+
+        peaks = {name: [] for name, _ in steps}
+        for size in sizes:
+            # Generated products are rolled back after the measurements
+            with transaction.atomic():
+                self._create_products(size)
+                for name, step in steps:
+                    peak, elapsed = self._measure(step)
+                    peaks[name].append(peak)
+                    self.stdout.write(f'{size:>8} products  {name:<12} peak {peak / 1024 / 1024:8.1f} MB  {elapsed:6.2f} s')
+                transaction.set_rollback(True)
+
+        self.stdout.write('')
+        for name, values in peaks.items():
+            growth = values[-1] / values[0] if values[0] else 0
+            self.stdout.write(f'{name:<12} peak growth x{growth:.1f} for x{sizes[-1] / sizes[0]:.0f} products')
+
+    def _export(self, file_format):
+        def run():
+            queryset = Product.objects.order_by('-production_priority', 'article')
+            with tempfile.TemporaryFile() as output:
+                ProductsExporter().write(queryset, output, file_format)
+        return run
+
+    def _measure(self, step):
+        """Peak Python heap allocations (tracemalloc) and wall time of one step."""
+        tracemalloc.start()
+        start = time.perf_counter()
+        try:
+            step()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        return peak, time.perf_counter() - start
+
+    def _create_products(self, size):
+        # Calculated fields are left stale so that recalculation writes every product
+        Product.objects.bulk_create(
+            [
+                Product(
+                    moysklad_id=f'bench-memory-{index}',
+                    article=f'BENCH-MEM-{index:07d}',
+                    name=f'Benchmark product {index}',
+                    description='Generated by benchmark_bulk_memory',
+                    current_stock=Decimal(index % 40),
+                    sales_last_2_months=Decimal(index % 90),
+                )
+                for index in range(size)
+            ],
+            batch_size=2000
+        )
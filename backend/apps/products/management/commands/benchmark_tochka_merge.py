@@ -0,0 +1,124 @@
+"""
+Management command to benchmark the Tochka merge engine against the row-by-row loop.
+"""
+import random
+import time
+from typing import Any, Dict, List
+from django.core.management.base import BaseCommand
+from apps.core.utils.article_normalizer import normalize_article
+from apps.products.services.tochka_merge import TochkaMergeEngine
+
+
+def merge_loop(engine: TochkaMergeEngine, excel_data: List[Dict]) -> Dict[str, Any]:
+    """
+    Row-by-row reference implementation of TochkaMergeEngine.merge().
+    """
+    excel_dict = {}
+    for item in excel_data:
+        if item.get('article'):
+            normalized_article = normalize_article(item['article'])
+            if normalized_article:
+                excel_dict[normalized_article] = item
+
+    if not excel_dict:
+        raise ValueError('Не найдены артикулы в данных Excel')
+
+    merged_data = []
+    in_tochka_count = 0
+
+    for product in engine.get_products_queryset():
+        excel_item = excel_dict.get(normalize_article(product.article))
+        is_in_tochka = excel_item is not None
+
+        merged_data.append({
+            'article': product.article,
+            'product_id': product.id,
+            'product_name': product.name,
+            'product_description': product.description,
+            'current_stock': float(product.current_stock),
+            'sales_last_2_months': float(product.sales_last_2_months),
+            'product_type': product.product_type,
+            'color': product.color or '',
+            'production_needed': float(product.production_needed),
+            'production_priority': product.production_priority,
+            'days_of_stock': float(product.days_of_stock) if product.days_of_stock else None,
+            'orders_in_tochka': excel_item.get('orders', 0) if is_in_tochka else 0,
+            'excel_row_number': excel_item.get('row_number', 0) if is_in_tochka else None,
+            'has_duplicates': excel_item.get('has_duplicates', False) if is_in_tochka else False,
+            'duplicate_rows': excel_item.get('duplicate_rows') if is_in_tochka else None,
+            'is_in_tochka': is_in_tochka,
+            'needs_registration': not is_in_tochka,
+        })
+        in_tochka_count += is_in_tochka
+
+    merged_data.sort(key=lambda x: (not x['needs_registration'], -x['production_priority']))
+
+    total = len(merged_data)
+    return {
+        'data': merged_data,
+        'products_in_tochka': in_tochka_count,
+        'products_not_in_tochka': total - in_tochka_count,
+        'coverage_rate': round((in_tochka_count / total) * 100, 1) if total else 0,
+    }
+
+
+class Command(BaseCommand):
+    help = 'Benchmark columnar Tochka merge against the row-by-row implementation'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--coverage',
+            type=float,
+            default=0.7,
+            help='Share of production products present in the generated Tochka data'
+        )
+        parser.add_argument(
+            '--extra-articles',
+            type=int,
+            default=1000,
+            help='Number of Tochka articles that do not exist in the database'
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=3,
+            help='Number of runs per implementation (best time is reported)'
+        )
+
+    def handle(self, *args, **options):
+        engine = TochkaMergeEngine()
+
+        # Excel data is generated from existing products, the database is not modified
+        articles = list(engine.get_products_queryset().values_list('article', flat=True))
+        if not articles:
+            self.stdout.write(self.style.WARNING('No production products found, run create_bulk_data first'))
+            return
+
+        sample = random.sample(articles, int(len(articles) * options['coverage']))
+        sample += [f'BENCH-{i:06d}' for i in range(options['extra_articles'])]
+        excel_data = [
+            {'article': article, 'orders': random.randint(1, 50), 'row_number': i + 2,
+             'has_duplicates': False, 'duplicate_rows': []}
+            for i, article in enumerate(sample)
+        ]
+
+        self.stdout.write(f'Products: {len(articles)}, Tochka articles: {len(excel_data)}')
+
+        timings = {}
+        results = {}
+        for name, method in (('loop', lambda data: merge_loop(engine, data)), ('columnar', engine.merge)):
+            best = None
+            for _ in range(options['repeat']):
+                start = time.perf_counter()
+                results[name] = method(excel_data)
+                elapsed = time.perf_counter() - start
+                best = elapsed if best is None else min(best, elapsed)
+            timings[name] = best
+            self.stdout.write(f'{name:>9}: {best * 1000:.1f} ms')
+
+        if results['loop'] != results['columnar']:
+            self.stdout.write(self.style.ERROR('Results differ between implementations'))
+            return
+
+        speedup = timings['loop'] / timings['columnar'] if timings['columnar'] else 0
+        self.stdout.write(self.style.SUCCESS(f'Results match, speedup: {speedup:.1f}x'))
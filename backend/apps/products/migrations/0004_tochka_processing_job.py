@@ -0,0 +1,36 @@
+# Generated by Django 4.2.7 on 2026-10-19 10:43
+
+from django.db import migrations, models
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0003_add_color_field'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TochkaProcessingJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('job_id', models.UUIDField(default=uuid.uuid4, editable=False, unique=True)),
+                ('file_name', models.CharField(blank=True, max_length=255)),
+                ('file_hash', models.CharField(db_index=True, max_length=64)),
+                ('source_file', models.BinaryField(blank=True, help_text='Содержимое файла до завершения обработки', null=True)),
+                ('status', models.CharField(choices=[('pending', 'В очереди'), ('processing', 'Обрабатывается'), ('success', 'Успешно'), ('failed', 'Ошибка')], default='pending', max_length=20)),
+                ('stage', models.CharField(choices=[('queued', 'Ожидает обработки'), ('upload', 'Загрузка и дедупликация'), ('analysis', 'Анализ производства'), ('production', 'Формирование списка к производству'), ('completed', 'Завершено')], default='queued', max_length=20)),
+                ('progress', models.IntegerField(default=0, help_text='Прогресс обработки, %')),
+                ('result', models.JSONField(blank=True, null=True)),
+                ('error_details', models.TextField(blank=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['file_hash', 'status'], name='products_to_file_ha_7dc74a_idx')],
+            },
+        ),
+    ]
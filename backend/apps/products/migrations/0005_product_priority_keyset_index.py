@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-19 11:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0004_tochka_processing_job'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['-production_priority', 'article', 'id'], name='product_priority_keyset_idx'),
+        ),
+    ]
@@ -0,0 +1,67 @@
+# Generated by Django 4.2.7 on 2026-10-19 12:02
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+# PostgreSQL only: trigram indexes for icontains on article/name,
+# trigger-maintained search_vector and its GIN index
+POSTGRESQL_FORWARD = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS product_article_trgm_idx ON products_product "
+    "USING gin (UPPER(article::text) gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS product_name_trgm_idx ON products_product "
+    "USING gin (UPPER(name::text) gin_trgm_ops)",
+    """
+    CREATE OR REPLACE FUNCTION products_product_search_vector_update() RETURNS trigger AS $$
+    BEGIN
+        NEW.search_vector :=
+            setweight(to_tsvector('pg_catalog.russian', coalesce(NEW.name, '')), 'A') ||
+            setweight(to_tsvector('pg_catalog.russian', coalesce(NEW.description, '')), 'B');
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    "DROP TRIGGER IF EXISTS product_search_vector_trigger ON products_product",
+    """
+    CREATE TRIGGER product_search_vector_trigger
+    BEFORE INSERT OR UPDATE OF name, description ON products_product
+    FOR EACH ROW EXECUTE FUNCTION products_product_search_vector_update()
+    """,
+    # Backfill: the trigger recalculates search_vector for every row
+    "UPDATE products_product SET name = name",
+    "CREATE INDEX IF NOT EXISTS product_search_vector_idx ON products_product USING gin (search_vector)",
+]
+
+POSTGRESQL_BACKWARD = [
+    "DROP INDEX IF EXISTS product_search_vector_idx",
+    "DROP TRIGGER IF EXISTS product_search_vector_trigger ON products_product",
+    "DROP FUNCTION IF EXISTS products_product_search_vector_update()",
+    "DROP INDEX IF EXISTS product_name_trgm_idx",
+    "DROP INDEX IF EXISTS product_article_trgm_idx",
+]
+
+
+def run_postgresql(statements):
+    def run(apps, schema_editor):
+        if schema_editor.connection.vendor != 'postgresql':
+            return
+        for statement in statements:
+            schema_editor.execute(statement)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0005_product_priority_keyset_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(run_postgresql(POSTGRESQL_FORWARD), run_postgresql(POSTGRESQL_BACKWARD)),
+    ]
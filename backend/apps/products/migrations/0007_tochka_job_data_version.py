@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-19 12:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0006_product_search_vector'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tochkaprocessingjob',
+            name='data_version',
+            field=models.IntegerField(blank=True, help_text='Версия данных товаров, на которых получен результат', null=True),
+        ),
+    ]
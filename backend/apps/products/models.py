@@ -1,3 +1,5 @@
+import uuid
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 from decimal import Decimal
 from apps.core.models import TimestampedModel
@@ -41,6 +43,10 @@ class Product(TimestampedModel):
     # Sync metadata
     last_synced_at = models.DateTimeField(null=True, blank=True)
     
+    # Full-text search over name and description, maintained by a
+    # database trigger on PostgreSQL (see services/product_search.py)
+    search_vector = SearchVectorField(null=True, editable=False)
+    
     class Meta:
         ordering = ['-production_priority', 'article']
         indexes = [
@@ -48,6 +54,8 @@ class Product(TimestampedModel):
             models.Index(fields=['current_stock', 'product_type']),
             models.Index(fields=['article']),
             models.Index(fields=['moysklad_id']),
+            # Default ordering + tie-breaker, used by keyset pagination
+            models.Index(fields=['-production_priority', 'article', 'id'], name='product_priority_keyset_idx'),
         ]
     
     def __str__(self):
@@ -210,3 +218,62 @@ class ProductImage(TimestampedModel):
     
     def __str__(self):
         return f"Image for {self.product.article}"
+
+
+class TochkaProcessingJob(TimestampedModel):
+    """
+    Фоновая задача автоматической обработки файла Точки.
+
+    Хранит исходный файл до начала обработки, текущий этап и прогресс
+    для опроса с фронтенда, а также итоговый результат. Успешные задачи
+    переиспользуются как кэш по хэшу файла.
+    """
+    STATUS_CHOICES = [
+        ('pending', 'В очереди'),
+        ('processing', 'Обрабатывается'),
+        ('success', 'Успешно'),
+        ('failed', 'Ошибка'),
+    ]
+
+    STAGE_CHOICES = [
+        ('queued', 'Ожидает обработки'),
+        ('upload', 'Загрузка и дедупликация'),
+        ('analysis', 'Анализ производства'),
+        ('production', 'Формирование списка к производству'),
+        ('completed', 'Завершено'),
+    ]
+
+    job_id = models.UUIDField(default=uuid.uuid4, unique=True, editable=False)
+    file_name = models.CharField(max_length=255, blank=True)
+    file_hash = models.CharField(max_length=64, db_index=True)
+    source_file = models.BinaryField(null=True, blank=True,
+                                     help_text="Содержимое файла до завершения обработки")
+
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    stage = models.CharField(max_length=20, choices=STAGE_CHOICES, default='queued')
+    progress = models.IntegerField(default=0, help_text="Прогресс обработки, %")
+
+    result = models.JSONField(null=True, blank=True)
+    error_details = models.TextField(blank=True)
+
+    finished_at = models.DateTimeField(null=True, blank=True)
+    data_version = models.IntegerField(null=True, blank=True,
+                                       help_text="Версия данных товаров, на которых получен результат")
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['file_hash', 'status']),
+        ]
+
+    def __str__(self):
+        return f"Tochka job {self.job_id} - {self.status} ({self.stage})"
+
+    @property
+    def duration(self):
+        """
+        Calculate processing duration if finished.
+        """
+        if self.finished_at:
+            return self.finished_at - self.created_at
+        return None
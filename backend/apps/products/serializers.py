@@ -1,3 +1,5 @@
+from collections import defaultdict
+from django.core.files.storage import default_storage
 from rest_framework import serializers
 from .models import Product, ProductImage
 
@@ -33,7 +35,8 @@ class ProductListSerializer(serializers.ModelSerializer):
         return float(obj.get_effective_stock(include_reserve))
     
     def get_main_image(self, obj):
-        main_image = obj.images.filter(is_main=True).first()
+        # images.all() uses the list view's prefetch instead of a query per product
+        main_image = next((img for img in obj.images.all() if img.is_main), None)
         if main_image and main_image.thumbnail:
             return self.context['request'].build_absolute_uri(main_image.thumbnail.url)
         return None
@@ -55,6 +58,81 @@ class ProductListSerializer(serializers.ModelSerializer):
             images.append(image_data)
         return images
 
+class ProductListValuesSerializer:
+    """
+    Lightweight alternative to ProductListSerializer for large lists.
+
+    Works on queryset.values() without building model instances and loads
+    images with one extra query. Output matches ProductListSerializer.
+    Also accepts a list of rows already fetched with values(value_fields),
+    e.g. a page returned by a paginator.
+    """
+    value_fields = [
+        'id', 'article', 'name', 'product_type', 'color',
+        'current_stock', 'reserved_stock',
+        'sales_last_2_months', 'average_daily_consumption',
+        'production_needed', 'production_priority',
+        'days_of_stock', 'last_synced_at'
+    ]
+    decimal_fields = [
+        'current_stock', 'reserved_stock', 'sales_last_2_months',
+        'average_daily_consumption', 'production_needed', 'days_of_stock'
+    ]
+    
+    def __init__(self, queryset, context=None):
+        self.queryset = queryset
+        self.context = context or {}
+    
+    @property
+    def data(self):
+        if isinstance(self.queryset, list):
+            rows = self.queryset
+            product_ids = [row['id'] for row in rows]
+        else:
+            rows = list(self.queryset.values(*self.value_fields))
+            product_ids = self.queryset.values('id')
+        request = self.context.get('request')
+        include_reserve = self.context.get('include_reserve', False)
+        images_by_product = self._load_images(product_ids) if request else {}
+        last_synced_field = serializers.DateTimeField()
+        
+        results = []
+        for row in rows:
+            effective_stock = row['current_stock'] + row['reserved_stock'] if include_reserve else row['current_stock']
+            images = images_by_product.get(row['id'], [])
+            main_image = next((img for img in images if img['is_main']), None)
+            
+            item = {field: row[field] for field in self.value_fields}
+            for field in self.decimal_fields:
+                if item[field] is not None:
+                    item[field] = str(item[field])
+            item['effective_stock'] = float(effective_stock)
+            item['main_image'] = main_image['thumbnail'] if main_image else None
+            item['images'] = images
+            item['last_synced_at'] = last_synced_field.to_representation(row['last_synced_at']) if row['last_synced_at'] else None
+            results.append(item)
+        return results
+    
+    def _load_images(self, product_ids):
+        """Load images for all products with a single query."""
+        request = self.context['request']
+        
+        def absolute_url(name):
+            return request.build_absolute_uri(default_storage.url(name)) if name else None
+        
+        images_by_product = defaultdict(list)
+        images = ProductImage.objects.filter(product_id__in=product_ids).values(
+            'id', 'product_id', 'is_main', 'image', 'thumbnail'
+        )
+        for img in images:
+            images_by_product[img['product_id']].append({
+                'id': img['id'],
+                'is_main': img['is_main'],
+                'image': absolute_url(img['image']),
+                'thumbnail': absolute_url(img['thumbnail']),
+            })
+        return images_by_product
+
 class ProductDetailSerializer(serializers.ModelSerializer):
     """
     Detailed serializer for product detail view.
@@ -0,0 +1,171 @@
+"""
+Индекс нечеткого поиска артикулов товаров
+
+Артикулы из файла Точки, не найденные среди товаров МойСклад, часто
+отличаются от существующих опечаткой, регистром или суффиксом
+(код цвета). Индекс строится в памяти по нормализованным артикулам
+всех товаров и возвращает ближайших кандидатов для такого артикула.
+
+Поиск в два шага:
+1. Триграммный инвертированный индекс отбирает артикулы с наибольшим
+   числом общих триграмм
+2. Отобранные кандидаты ранжируются по SequenceMatcher.ratio()
+
+Индекс пересобирается после синхронизации с МойСклад, а в других
+процессах - лениво, при изменении набора товаров.
+"""
+
+import logging
+import threading
+from collections import Counter
+from difflib import SequenceMatcher
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from django.db.models import Count, Max
+
+from apps.core.utils.article_normalizer import normalize_article
+from apps.products.models import Product
+
+logger = logging.getLogger(__name__)
+
+NGRAM_SIZE = 3
+
+# Сколько кандидатов по триграммам проверяется на каждый итоговый результат
+CANDIDATES_PER_RESULT = 4
+
+
+def _ngrams(key: str) -> set:
+    """Триграммы артикула с маркерами начала и конца строки"""
+    padded = f'^{key}$'
+    return {padded[i:i + NGRAM_SIZE] for i in range(len(padded) - NGRAM_SIZE + 1)}
+
+
+def _fuzzy_key(article: str) -> str:
+    """Ключ для нечеткого сравнения - без учета регистра"""
+    return article.lower()
+
+
+class ArticleIndex:
+    """
+    Триграммный индекс нормализованных артикулов товаров
+
+    Args:
+        entries: Пары (product_id, article)
+    """
+
+    def __init__(self, entries: Iterable[Tuple[int, str]]):
+        self.product_ids: List[int] = []
+        self.articles: List[str] = []
+        self.keys: List[str] = []
+        self.exact_articles = set()
+        self.postings: Dict[str, List[int]] = {}
+
+        for product_id, article in entries:
+            normalized_article = normalize_article(article)
+            if not normalized_article:
+                continue
+
+            position = len(self.articles)
+            key = _fuzzy_key(normalized_article)
+
+            self.product_ids.append(product_id)
+            self.articles.append(normalized_article)
+            self.keys.append(key)
+            self.exact_articles.add(normalized_article)
+
+            for gram in _ngrams(key):
+                self.postings.setdefault(gram, []).append(position)
+
+    @classmethod
+    def build(cls) -> 'ArticleIndex':
+        """Построить индекс по всем товарам"""
+        index = cls(Product.objects.values_list('id', 'article').iterator(chunk_size=5000))
+        logger.info(f"Article index built: {len(index)} articles, {len(index.postings)} n-grams")
+        return index
+
+    def __len__(self) -> int:
+        return len(self.articles)
+
+    def __contains__(self, normalized_article: str) -> bool:
+        return normalized_article in self.exact_articles
+
+    def search(self, article: str, limit: int = 3, min_score: float = 0.6) -> List[Dict[str, Any]]:
+        """
+        Найти похожие артикулы
+
+        Args:
+            article: Артикул (нормализуется перед поиском)
+            limit: Максимальное количество кандидатов
+            min_score: Минимальная похожесть (0..1)
+
+        Returns:
+            List[Dict[str, Any]]: Кандидаты по убыванию похожести:
+                [{'article', 'product_id', 'score'}, ...]
+        """
+        key = _fuzzy_key(normalize_article(article))
+        if not key:
+            return []
+
+        overlaps = Counter()
+        for gram in _ngrams(key):
+            overlaps.update(self.postings.get(gram, ()))
+
+        matcher = SequenceMatcher(b=key, autojunk=False)
+        candidates = []
+        for position, _ in overlaps.most_common(limit * CANDIDATES_PER_RESULT):
+            matcher.set_seq1(self.keys[position])
+            score = matcher.ratio()
+            if score >= min_score:
+                candidates.append((score, position))
+
+        candidates.sort(key=lambda candidate: (-candidate[0], self.articles[candidate[1]]))
+
+        return [
+            {
+                'article': self.articles[position],
+                'product_id': self.product_ids[position],
+                'score': round(score, 3),
+            }
+            for score, position in candidates[:limit]
+        ]
+
+
+_index: Optional[ArticleIndex] = None
+_index_fingerprint = None
+_index_lock = threading.Lock()
+
+
+def _products_fingerprint():
+    """Признак изменения набора товаров: количество и время последнего обновления"""
+    stats = Product.objects.aggregate(count=Count('id'), last_update=Max('updated_at'))
+    return stats['count'], stats['last_update']
+
+
+def get_article_index() -> ArticleIndex:
+    """
+    Получить индекс артикулов текущего процесса
+
+    Индекс пересобирается, если товары изменились с момента построения
+    (например, синхронизация прошла в другом процессе).
+    """
+    global _index, _index_fingerprint
+
+    fingerprint = _products_fingerprint()
+    if _index is not None and _index_fingerprint == fingerprint:
+        return _index
+
+    with _index_lock:
+        if _index is None or _index_fingerprint != fingerprint:
+            _index = ArticleIndex.build()
+            _index_fingerprint = fingerprint
+        return _index
+
+
+def rebuild_article_index() -> ArticleIndex:
+    """Пересобрать индекс (вызывается после синхронизации товаров)"""
+    global _index, _index_fingerprint
+
+    with _index_lock:
+        _index_fingerprint = _products_fingerprint()
+        _index = ArticleIndex.build()
+        return _index
@@ -0,0 +1,108 @@
+"""
+Поиск товаров по артикулу, названию и описанию
+
+На PostgreSQL:
+- Артикул и название ищутся по подстроке (icontains); запрос
+  UPPER(...) LIKE ускоряется GIN-индексами pg_trgm на UPPER(article)
+  и UPPER(name)
+- Название и описание ищутся полнотекстово по колонке search_vector
+  (конфигурация russian, название с весом A, описание - B). Колонка
+  поддерживается триггером БД, поэтому актуальна и после bulk_create,
+  bulk_update и update()
+- Результаты ранжируются: точное совпадение артикула, затем близость
+  артикула (триграммы) и релевантность полнотекстового поиска
+
+На других БД (SQLite в разработке) используется icontains, а для
+кириллицы, которую LIKE в SQLite не сравнивает без учета регистра, -
+проверка в Python по товарам, прочитанным порциями.
+
+Индексы, триггер и расширение pg_trgm создаются миграцией
+0006_product_search_vector.
+"""
+
+import logging
+
+from django.db import connection
+from django.db.models import Case, F, IntegerField, Q, Value, When
+
+logger = logging.getLogger(__name__)
+
+SEARCH_CONFIG = 'russian'
+
+# Порция товаров при поиске в Python (SQLite, кириллица)
+PYTHON_SEARCH_CHUNK_SIZE = 2000
+
+
+def is_postgresql() -> bool:
+    return connection.vendor == 'postgresql'
+
+
+def search_products(queryset, search: str, ranked: bool = True):
+    """
+    Отфильтровать товары по поисковой строке
+
+    Args:
+        queryset: Исходная выборка товаров
+        search: Поисковая строка
+        ranked: Упорядочить по релевантности (только PostgreSQL)
+
+    Returns:
+        QuerySet: Найденные товары
+    """
+    search = search.strip()
+    if not search:
+        return queryset
+
+    if is_postgresql():
+        return _search_postgresql(queryset, search, ranked)
+    return _search_fallback(queryset, search)
+
+
+def _search_postgresql(queryset, search: str, ranked: bool):
+    from django.contrib.postgres.search import SearchQuery, SearchRank, TrigramSimilarity
+
+    search_query = SearchQuery(search, config=SEARCH_CONFIG, search_type='websearch')
+
+    queryset = queryset.filter(
+        Q(article__icontains=search) |
+        Q(name__icontains=search) |
+        Q(search_vector=search_query)
+    )
+
+    if not ranked:
+        return queryset
+
+    return queryset.annotate(
+        exact_article=Case(
+            When(article__iexact=search, then=Value(1)),
+            default=Value(0),
+            output_field=IntegerField()
+        ),
+        article_similarity=TrigramSimilarity('article', search),
+        search_rank=SearchRank(F('search_vector'), search_query),
+    ).order_by('-exact_article', '-article_similarity', '-search_rank', '-production_priority', 'article')
+
+
+def _search_fallback(queryset, search: str):
+    base_queryset = queryset.filter(
+        Q(article__icontains=search) |
+        Q(name__icontains=search) |
+        Q(description__icontains=search)
+    )
+
+    if not any('\u0400' <= char <= '\u04FF' for char in search):
+        return base_queryset
+
+    # LIKE в SQLite не учитывает регистр только для латиницы
+    search_lower = search.lower()
+    matching_ids = [
+        product_id
+        for product_id, article, name, description in queryset.values_list(
+            'id', 'article', 'name', 'description'
+        ).iterator(chunk_size=PYTHON_SEARCH_CHUNK_SIZE)
+        if any(search_lower in (field or '').lower() for field in (article, name, description))
+    ]
+
+    if not matching_ids:
+        return base_queryset
+    return (base_queryset | queryset.filter(id__in=matching_ids)).distinct()
@@ -0,0 +1,82 @@
+"""
+Пересчет производственных показателей всех товаров
+
+Товары читаются курсором порциями по RECALCULATION_CHUNK_SIZE (на
+PostgreSQL - серверный курсор) и только с полями, нужными для расчета,
+поэтому потребление памяти не зависит от размера каталога. Измененные
+товары записываются обратно одним bulk_update на порцию.
+
+Расчет выполняется Product.update_calculated_fields(), как и при save().
+"""
+
+import logging
+from typing import Dict
+
+from django.utils import timezone
+
+from apps.core.data_version import bump_data_version
+from apps.products.models import Product
+
+logger = logging.getLogger(__name__)
+
+# Размер порции чтения и записи
+RECALCULATION_CHUNK_SIZE = 2000
+
+# Поля, которые вычисляет Product.update_calculated_fields()
+RECALCULATED_FIELDS = [
+    'average_daily_consumption', 'product_type', 'days_of_stock',
+    'production_needed', 'production_priority', 'updated_at',
+]
+
+# Поля, которые читает расчет
+RECALCULATION_FIELDS = [
+    'id', 'current_stock', 'reserved_stock', 'sales_last_2_months',
+    *RECALCULATED_FIELDS,
+]
+
+
+def recalculate_all_products(chunk_size: int = RECALCULATION_CHUNK_SIZE) -> Dict[str, int]:
+    """
+    Пересчитать потребность в производстве и приоритет всех товаров
+
+    Сохраняются только товары, у которых изменились потребность
+    или приоритет.
+
+    Returns:
+        Dict[str, int]: {'total_products', 'updated_products'}
+    """
+    products = Product.objects.only(*RECALCULATION_FIELDS).order_by('pk')
+
+    total_count = 0
+    updated_count = 0
+    changed = []
+
+    for product in products.iterator(chunk_size=chunk_size):
+        total_count += 1
+        old_priority = product.production_priority
+        old_needed = product.production_needed
+
+        product.update_calculated_fields()
+
+        if product.production_priority != old_priority or product.production_needed != old_needed:
+            product.updated_at = timezone.now()
+            changed.append(product)
+
+        if len(changed) >= chunk_size:
+            Product.objects.bulk_update(changed, RECALCULATED_FIELDS)
+            updated_count += len(changed)
+            changed = []
+
+    if changed:
+        Product.objects.bulk_update(changed, RECALCULATED_FIELDS)
+        updated_count += len(changed)
+
+    if updated_count:
+        bump_data_version()
+
+    logger.info(f"Recalculated {updated_count} of {total_count} products")
+
+    return {
+        'total_products': total_count,
+        'updated_products': updated_count,
+    }
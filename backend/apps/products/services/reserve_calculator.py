@@ -14,11 +14,19 @@
 
 import logging
 from decimal import Decimal
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, Sequence
+import numpy as np
 from django.utils import timezone
 
 logger = logging.getLogger(__name__)
 
+# CSS цвета для цветовой индикации резерва
+RESERVE_CSS_COLORS = {
+    'blue': '#1890ff',    # Синий - хорошо
+    'red': '#ff4d4f',     # Красный - внимание
+    'gray': '#8c8c8c'     # Серый - нет данных
+}
+
 
 class ReserveCalculatorService:
     """
@@ -140,13 +148,6 @@ class ReserveCalculatorService:
             original_reserve = calculation_result['original_reserve']
             current_stock = calculation_result['current_stock']
             
-            # Определение CSS цветов
-            css_colors = {
-                'blue': '#1890ff',    # Синий - хорошо
-                'red': '#ff4d4f',     # Красный - внимание
-                'gray': '#8c8c8c'     # Серый - нет данных
-            }
-            
             # Форматирование текста для отображения
             if not calculation_result['should_show_calculation']:
                 display_text = f"{original_reserve} шт"
@@ -165,7 +166,7 @@ class ReserveCalculatorService:
             
             return {
                 'display_text': display_text,
-                'css_color': css_colors.get(color_indicator, css_colors['gray']),
+                'css_color': RESERVE_CSS_COLORS.get(color_indicator, RESERVE_CSS_COLORS['gray']),
                 'tooltip_text': tooltip_text,
                 'color_indicator': color_indicator,
                 'calculated_value': calculated_reserve,
@@ -177,7 +178,7 @@ class ReserveCalculatorService:
             
             return {
                 'display_text': "0 шт",
-                'css_color': css_colors['gray'],
+                'css_color': RESERVE_CSS_COLORS['gray'],
                 'tooltip_text': "Ошибка расчета",
                 'color_indicator': 'gray',
                 'calculated_value': Decimal('0'),
@@ -192,6 +193,10 @@ class ReserveCalculatorService:
         """
         Массовый расчет резервов для списка товаров
         
+        Считается через calculate_reserve_columns() одним проходом
+        по всем товарам, поэтому числовые значения расчета - float,
+        а тексты совпадают с построчным расчетом для float-остатков.
+        
         Args:
             products_data: Список словарей с данными товаров
                 [{'reserved_stock': Decimal, 'current_stock': Decimal, ...}, ...]
@@ -202,62 +207,146 @@ class ReserveCalculatorService:
         logger.info(f"Начало массового расчета резервов для {len(products_data)} товаров")
         
         start_time = timezone.now()
-        results = []
         
-        for i, product_data in enumerate(products_data):
-            try:
-                # Расчет резерва
-                reserve_calc = self.calculate_reserve_display(
-                    reserved_stock=product_data.get('reserved_stock', Decimal('0')),
-                    current_stock=product_data.get('current_stock', Decimal('0'))
-                )
-                
-                # Форматирование для UI
-                ui_format = self.format_reserve_for_display(reserve_calc)
-                
-                # Добавляем расчетные поля к исходным данным товара
-                enhanced_product = {
-                    **product_data,
-                    'reserve_calculation': reserve_calc,
-                    'reserve_ui_format': ui_format,
-                    'calculated_reserve': reserve_calc['calculated_reserve'],
-                    'reserve_color': reserve_calc['color_indicator']
-                }
-                
-                results.append(enhanced_product)
-                
-            except Exception as e:
-                logger.error(f"Ошибка расчета резерва для товара {i}: {e}")
-                
-                # Добавляем товар с безопасными значениями
-                enhanced_product = {
-                    **product_data,
-                    'reserve_calculation': None,
-                    'reserve_ui_format': None,
-                    'calculated_reserve': Decimal('0'),
-                    'reserve_color': 'gray',
-                    'calculation_error': str(e)
-                }
-                
-                results.append(enhanced_product)
+        reserved_stock = [product_data.get('reserved_stock') for product_data in products_data]
+        current_stock = [product_data.get('current_stock') for product_data in products_data]
+        columns = self.calculate_reserve_columns(reserved_stock, current_stock)
         
-        end_time = timezone.now()
-        execution_time = (end_time - start_time).total_seconds()
+        originals = np.nan_to_num(np.asarray(reserved_stock, dtype=float)).tolist()
+        stocks = np.nan_to_num(np.asarray(current_stock, dtype=float)).tolist()
+        
+        results = []
+        for index, product_data in enumerate(products_data):
+            calculated_reserve = columns['calculated_reserve'][index]
+            color_indicator = columns['color_indicator'][index]
+            
+            reserve_calc = {
+                'calculated_reserve': calculated_reserve,
+                'color_indicator': color_indicator,
+                'is_positive': columns['is_positive'][index],
+                'should_show_calculation': color_indicator != 'gray',
+                'original_reserve': originals[index],
+                'current_stock': stocks[index],
+                'calculation_timestamp': start_time
+            }
+            ui_format = {
+                'display_text': columns['display_text'][index],
+                'css_color': RESERVE_CSS_COLORS[color_indicator],
+                'tooltip_text': columns['tooltip_text'][index],
+                'color_indicator': color_indicator,
+                'calculated_value': calculated_reserve,
+                'needs_attention': columns['needs_attention'][index]
+            }
+            
+            # Добавляем расчетные поля к исходным данным товара
+            results.append({
+                **product_data,
+                'reserve_calculation': reserve_calc,
+                'reserve_ui_format': ui_format,
+                'calculated_reserve': calculated_reserve,
+                'reserve_color': color_indicator
+            })
+        
+        execution_time = (timezone.now() - start_time).total_seconds()
         
         logger.info(
             f"Завершен массовый расчет резервов: {len(results)} товаров, "
             f"время выполнения: {execution_time:.3f} сек"
         )
         
-        # Проверка требования производительности (< 5 сек)
-        if execution_time > 5.0:
-            logger.warning(
-                f"Время расчета резервов ({execution_time:.2f} сек) "
-                f"превышает требование 5 сек для {len(products_data)} товаров"
-            )
-        
         return results
 
+    def calculate_reserve_columns(
+        self,
+        reserved_stock: Sequence[float],
+        current_stock: Sequence[float]
+    ) -> Dict[str, List[Any]]:
+        """
+        Векторный расчет резерва для массивов значений
+        
+        Дает те же значения, что calculate_reserve_display() +
+        format_reserve_for_display() для float-значений остатков
+        (как их передают API вкладки Точка), но за один проход
+        по массивам: без Decimal, логирования и timezone.now() на строку.
+        
+        Args:
+            reserved_stock: Резервы товаров (None считается нулем)
+            current_stock: Остатки товаров в том же порядке
+            
+        Returns:
+            Dict[str, List[Any]]: Колонки результата, по значению на товар:
+                - calculated_reserve: Резерв - Остаток (float)
+                - color_indicator: 'blue', 'red' или 'gray'
+                - is_positive: Резерв больше остатка
+                - display_text: Текст для отображения
+                - tooltip_text: Текст всплывающей подсказки
+                - needs_attention: Красная индикация
+        """
+        reserve = np.nan_to_num(np.asarray(reserved_stock, dtype=float))
+        stock = np.nan_to_num(np.asarray(current_stock, dtype=float))
+        
+        # + 0.0 убирает отрицательный ноль
+        calculated = reserve - stock + 0.0
+        has_reserve = reserve != 0
+        is_positive = has_reserve & (reserve > stock)
+        color_indicator = np.where(has_reserve, np.where(is_positive, 'blue', 'red'), 'gray')
+        
+        calculated_values = []
+        display_texts = []
+        tooltip_texts = []
+        
+        for reserve_value, stock_value, calculated_value, show_calculation in zip(
+            reserve.tolist(), stock.tolist(), calculated.tolist(), has_reserve.tolist()
+        ):
+            reserve_text = _decimal_text(reserve_value)
+            
+            if not show_calculation:
+                calculated_values.append(calculated_value)
+                display_texts.append(f"{reserve_text} шт")
+                tooltip_texts.append("Резерв отсутствует")
+                continue
+            
+            # Точность разности как у Decimal: максимум знаков операндов
+            places = max(_decimal_places(reserve_text), _decimal_places(_decimal_text(stock_value)))
+            calculated_value = round(calculated_value, places) + 0.0
+            calculated_text = f"{calculated_value:.{places}f}"
+            
+            sign = "+" if calculated_value >= 0 else ""
+            display_texts.append(f"{reserve_text} → {sign}{calculated_text} шт")
+            
+            if calculated_value > 0:
+                tooltip_texts.append(f"Резерв превышает остаток на {calculated_text} шт")
+            elif calculated_value == 0:
+                tooltip_texts.append("Резерв равен остатку")
+            else:
+                tooltip_texts.append(f"Резерв меньше остатка на {calculated_text.lstrip('-')} шт")
+            
+            calculated_values.append(calculated_value)
+        
+        return {
+            'calculated_reserve': calculated_values,
+            'color_indicator': color_indicator.tolist(),
+            'is_positive': is_positive.tolist(),
+            'display_text': display_texts,
+            'tooltip_text': tooltip_texts,
+            'needs_attention': (color_indicator == 'red').tolist(),
+        }
+
+
+def _decimal_text(value: float) -> str:
+    """Текст числа так, как его выводит Decimal(str(value))"""
+    if not value:
+        return '0'
+    text = repr(value)
+    if 'e' in text:
+        text = str(Decimal(text))
+    return text
+
+
+def _decimal_places(text: str) -> int:
+    """Количество знаков после запятой в тексте числа"""
+    return len(text) - text.index('.') - 1 if '.' in text else 0
+
 
 # Функция-утилита для быстрого доступа
 def calculate_product_reserve(reserved_stock: Decimal, current_stock: Decimal) -> Dict[str, Any]:
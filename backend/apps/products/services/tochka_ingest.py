@@ -0,0 +1,149 @@
+"""
+Чтение файлов Точки в DataFrame
+
+Поддерживаемые форматы:
+- Excel (.xlsx через openpyxl, .xls через xlrd)
+- CSV, в том числе сжатый gzip (.csv, .csv.gz)
+- Parquet (.parquet)
+
+Формат определяется по сигнатуре содержимого, а при ее отсутствии
+(CSV) - по расширению. Для каждого формата используется самый быстрый
+доступный парсер: CSV и Parquet читаются через pyarrow, если он
+установлен, иначе CSV читается C-движком pandas.
+"""
+
+import csv
+import gzip
+import io
+import logging
+from typing import Optional
+
+import pandas as pd
+
+from apps.core.exceptions import TochkaProcessingException
+
+logger = logging.getLogger(__name__)
+
+try:
+    import pyarrow  # noqa: F401
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+SUPPORTED_EXTENSIONS = ('.xlsx', '.xls', '.csv', '.csv.gz', '.gz', '.parquet')
+
+# Сигнатуры форматов
+GZIP_MAGIC = b'\x1f\x8b'
+PARQUET_MAGIC = b'PAR1'
+XLSX_MAGIC = b'PK\x03\x04'
+XLS_MAGIC = b'\xd0\xcf\x11\xe0'
+
+CSV_DELIMITERS = ',;\t'
+CSV_SNIFF_LINES = 20
+
+
+def is_supported_file(file_name: str) -> bool:
+    """Проверить расширение загружаемого файла"""
+    return file_name.lower().endswith(SUPPORTED_EXTENSIONS)
+
+
+def detect_format(file_content: bytes, file_name: Optional[str] = None) -> str:
+    """
+    Определить формат файла
+
+    Returns:
+        'xlsx', 'xls', 'parquet', 'csv_gz' или 'csv'
+    """
+    if file_content.startswith(XLSX_MAGIC):
+        return 'xlsx'
+    if file_content.startswith(XLS_MAGIC):
+        return 'xls'
+    if file_content.startswith(PARQUET_MAGIC):
+        return 'parquet'
+    if file_content.startswith(GZIP_MAGIC):
+        return 'csv_gz'
+
+    name = (file_name or '').lower()
+    if name.endswith(('.xlsx', '.xls', '.parquet')):
+        raise TochkaProcessingException(
+            f'Файл {file_name} поврежден или не соответствует расширению',
+            status_code=400,
+            stage='upload'
+        )
+    return 'csv'
+
+
+def read_tochka_table(file_content: bytes, file_name: Optional[str] = None) -> pd.DataFrame:
+    """
+    Прочитать файл Точки любого поддерживаемого формата
+
+    Args:
+        file_content: Байты файла
+        file_name: Имя файла (используется, если формат не определен по содержимому)
+
+    Returns:
+        pd.DataFrame: Таблица с исходными колонками файла
+
+    Raises:
+        TochkaProcessingException: Если формат не поддерживается
+    """
+    file_format = detect_format(file_content, file_name)
+    logger.debug(f"Reading Tochka file {file_name} as {file_format}")
+
+    if file_format == 'xlsx':
+        return pd.read_excel(io.BytesIO(file_content), engine='openpyxl')
+    if file_format == 'xls':
+        return pd.read_excel(io.BytesIO(file_content), engine='xlrd')
+    if file_format == 'parquet':
+        if not HAS_PYARROW:
+            raise TochkaProcessingException(
+                'Чтение Parquet недоступно: не установлен pyarrow',
+                status_code=400,
+                stage='upload'
+            )
+        return pd.read_parquet(io.BytesIO(file_content), engine='pyarrow')
+    if file_format == 'csv_gz':
+        file_content = gzip.decompress(file_content)
+
+    return _read_csv(file_content)
+
+
+def _read_csv(file_content: bytes) -> pd.DataFrame:
+    """Прочитать CSV с определением кодировки и разделителя"""
+    try:
+        text = file_content.decode('utf-8-sig')
+    except UnicodeDecodeError:
+        # Выгрузки из 1С и Excel под Windows
+        text = file_content.decode('cp1251')
+        file_content = text.encode('utf-8')
+    else:
+        if file_content.startswith(b'\xef\xbb\xbf'):
+            file_content = file_content[3:]
+
+    sample_lines = [line.rstrip('\r') for line in text.split('\n', CSV_SNIFF_LINES)[:CSV_SNIFF_LINES]]
+    delimiter = _detect_delimiter(sample_lines)
+
+    # Все колонки как строки - артикулы вида "00123" не теряют ведущие нули
+    return pd.read_csv(
+        io.BytesIO(file_content),
+        sep=delimiter,
+        dtype=str,
+        engine='pyarrow' if HAS_PYARROW else 'c'
+    )
+
+
+def _detect_delimiter(lines) -> str:
+    """
+    Выбрать разделитель, дающий одинаковое и наибольшее число колонок
+
+    csv.Sniffer ошибается на заголовке "Артикул товара;Заказов, шт.",
+    поэтому разделитель проверяется на первых строках файла.
+    """
+    best_delimiter, best_columns = ',', 1
+    for delimiter in CSV_DELIMITERS:
+        columns = {len(row) for row in csv.reader(lines, delimiter=delimiter) if row}
+        if len(columns) == 1:
+            column_count = columns.pop()
+            if column_count > best_columns:
+                best_delimiter, best_columns = delimiter, column_count
+    return best_delimiter
@@ -0,0 +1,250 @@
+"""
+Колоночный движок объединения данных Точки с товарами МойСклад
+
+Вместо построчного цикла по моделям Product товары загружаются одним
+запросом values() в DataFrame, объединяются с данными Excel через
+left join по нормализованному артикулу, а флаги и покрытие считаются
+векторными операциями pandas.
+
+Используется endpoint'ом merge-with-products (merge) и этапом анализа
+автоматической обработки файла Точки (analyze). Построчная реализация
+merge для сравнения результатов находится в бенчмарке
+(manage.py benchmark_tochka_merge).
+"""
+
+import logging
+from typing import Any, Dict, List
+
+import pandas as pd
+from django.db.models import Q
+
+from apps.core.utils.article_normalizer import normalize_article
+from apps.products.models import Product
+from apps.products.services.article_index import get_article_index
+
+logger = logging.getLogger(__name__)
+
+# Поля товара, необходимые для анализа
+PRODUCT_COLUMNS = [
+    'id', 'article', 'name', 'description', 'current_stock',
+    'sales_last_2_months', 'product_type', 'color',
+    'production_needed', 'production_priority', 'days_of_stock',
+]
+
+# Поля Excel и значения по умолчанию для товаров, которые есть в Точке
+EXCEL_COLUMNS = {
+    'orders': 0,
+    'row_number': 0,
+    'has_duplicates': False,
+    'duplicate_rows': None,
+}
+
+# Порядок полей в результате analyze()
+ANALYSIS_COLUMNS = [
+    'article', 'orders', 'orders_in_tochka', 'has_duplicates',
+    'product_name', 'current_stock', 'sales_last_2_months', 'product_type', 'color',
+    'production_needed', 'production_priority',
+    'product_matched', 'has_product_data', 'is_in_tochka', 'needs_registration',
+]
+
+# Порядок полей в ответе merge()
+RESULT_COLUMNS = [
+    'article', 'product_id', 'product_name', 'product_description',
+    'current_stock', 'sales_last_2_months', 'product_type', 'color',
+    'production_needed', 'production_priority', 'days_of_stock',
+    'orders_in_tochka', 'excel_row_number', 'has_duplicates',
+    'duplicate_rows', 'is_in_tochka', 'needs_registration',
+]
+
+
+class TochkaMergeEngine:
+    """
+    Объединение товаров, требующих производства, с данными Точки
+    """
+
+    def get_products_queryset(self):
+        """Товары, требующие производства (включая товары с резервом)"""
+        return Product.objects.filter(
+            Q(production_needed__gt=0) | Q(reserved_stock__gt=0)
+        ).order_by('-production_priority', 'article')
+
+    def build_excel_frame(self, excel_data: List[Dict]) -> pd.DataFrame:
+        """
+        Построить DataFrame Точки, индексированный нормализованным артикулом
+
+        При повторе артикула используется последняя запись,
+        как и в построчной реализации.
+        """
+        rows = [
+            [item['article']] + [item.get(column, default) for column, default in EXCEL_COLUMNS.items()]
+            for item in excel_data
+            if item.get('article')
+        ]
+        # object - чтобы сохранить исходные типы значений (int, list, None)
+        frame = pd.DataFrame(rows, columns=['article', *EXCEL_COLUMNS], dtype=object)
+
+        frame['normalized_article'] = frame['article'].map(normalize_article)
+        frame = frame[frame['normalized_article'] != '']
+        frame = frame.drop_duplicates('normalized_article', keep='last')
+
+        return frame.drop(columns='article').set_index('normalized_article')
+
+    def load_products_frame(self, queryset=None) -> pd.DataFrame:
+        """Загрузить товары (по умолчанию - требующие производства) одним запросом values()"""
+        queryset = self.get_products_queryset() if queryset is None else queryset
+        frame = pd.DataFrame.from_records(
+            list(queryset.values(*PRODUCT_COLUMNS)),
+            columns=PRODUCT_COLUMNS
+        )
+        frame['normalized_article'] = frame['article'].map(normalize_article)
+        return frame
+
+    def merge(self, excel_data: List[Dict]) -> Dict[str, Any]:
+        """
+        Объединить данные Точки с товарами
+
+        Args:
+            excel_data: Дедуплицированные записи Excel ('article', 'orders', ...)
+
+        Returns:
+            Dict[str, Any]: Объединенные записи и счетчики покрытия
+
+        Raises:
+            ValueError: Если в данных Excel нет ни одного артикула
+        """
+        excel = self.build_excel_frame(excel_data)
+        if excel.empty:
+            raise ValueError('Не найдены артикулы в данных Excel')
+
+        products = self.load_products_frame()
+        merged = products.join(excel, on='normalized_article', how='left')
+
+        in_tochka = merged['normalized_article'].isin(excel.index)
+
+        days_of_stock = merged['days_of_stock'].astype(float)
+
+        result = pd.DataFrame({
+            'article': merged['article'],
+            'product_id': merged['id'],
+            'product_name': merged['name'],
+            'product_description': merged['description'],
+            'current_stock': merged['current_stock'].astype(float),
+            'sales_last_2_months': merged['sales_last_2_months'].astype(float),
+            'product_type': merged['product_type'],
+            'color': merged['color'].fillna(''),
+            'production_needed': merged['production_needed'].astype(float),
+            'production_priority': merged['production_priority'],
+            # Нулевой запас отдается как None - как в построчной реализации
+            'days_of_stock': days_of_stock.astype(object).where(days_of_stock.fillna(0) != 0, None),
+            'orders_in_tochka': merged['orders'].where(in_tochka, 0),
+            'excel_row_number': merged['row_number'].where(in_tochka, None),
+            'has_duplicates': merged['has_duplicates'].where(in_tochka, False),
+            'duplicate_rows': merged['duplicate_rows'].where(in_tochka, None),
+            'is_in_tochka': in_tochka,
+            'needs_registration': ~in_tochka,
+        }, columns=RESULT_COLUMNS)
+
+        # Сначала товары, которых нет в Точке, затем по приоритету;
+        # при равенстве сохраняется порядок выборки из БД
+        result['_position'] = range(len(result))
+        result = result.sort_values(
+            ['needs_registration', 'production_priority', '_position'],
+            ascending=[False, False, True]
+        ).drop(columns='_position')
+
+        in_tochka_count = int(in_tochka.sum())
+        total = len(result)
+
+        return {
+            'data': result.to_dict('records'),
+            'products_in_tochka': in_tochka_count,
+            'products_not_in_tochka': total - in_tochka_count,
+            'coverage_rate': round((in_tochka_count / total) * 100, 1) if total else 0,
+        }
+
+    def analyze(self, excel_data: List[Dict]) -> Dict[str, Any]:
+        """
+        Сопоставить записи Точки с товарами
+
+        В отличие от merge() строки результата - записи Точки: каждая
+        дополняется данными товара с тем же артикулом, если он найден.
+        Записи без товара идут первыми, затем по убыванию заказов.
+
+        Args:
+            excel_data: Дедуплицированные записи с нормализованным 'article' и 'orders'
+
+        Returns:
+            Dict[str, Any]: {'merged_data', 'found_products', 'coverage_rate'}
+        """
+        excel = pd.DataFrame.from_records(
+            [(item['article'], item['orders'], item.get('has_duplicates', False)) for item in excel_data],
+            columns=['article', 'orders', 'has_duplicates']
+        )
+
+        products = self.load_products_frame(Product.objects.filter(article__in=excel['article'].tolist()))
+        # object - чтобы после left join целые значения не превращались в float
+        products = products.astype(object).drop_duplicates('normalized_article', keep='last')
+        merged = excel.join(products.set_index('normalized_article'), on='article', rsuffix='_product')
+
+        matched = merged['article'].isin(products['normalized_article'])
+
+        def product_value(column, cast=None):
+            values = merged[column]
+            if cast is not None:
+                values = values.map(cast, na_action='ignore')
+            return values.astype(object).where(matched, None)
+
+        result = pd.DataFrame({
+            'article': merged['article'],
+            'orders': merged['orders'],
+            'orders_in_tochka': merged['orders'],
+            'has_duplicates': merged['has_duplicates'],
+            'product_name': product_value('name'),
+            'current_stock': product_value('current_stock', float),
+            'sales_last_2_months': product_value('sales_last_2_months', float),
+            'product_type': product_value('product_type'),
+            'color': product_value('color').where(~matched, merged['color'].fillna('')),
+            'production_needed': product_value('production_needed', float),
+            'production_priority': product_value('production_priority'),
+            'product_matched': matched,
+            'has_product_data': matched,
+            'is_in_tochka': matched,
+            'needs_registration': ~matched,
+        }, columns=ANALYSIS_COLUMNS)
+
+        result['_position'] = range(len(result))
+        result = result.sort_values(
+            ['needs_registration', 'orders', '_position'],
+            ascending=[False, False, True]
+        ).drop(columns='_position')
+
+        found_products = int(matched.sum())
+        return {
+            'merged_data': result.to_dict('records'),
+            'found_products': found_products,
+            'coverage_rate': round((found_products / len(excel_data)) * 100, 1) if excel_data else 0,
+        }
+
+    def find_unmatched_articles(self, excel_data: List[Dict], limit: int = 3) -> List[Dict[str, Any]]:
+        """
+        Артикулы Точки, которых нет среди товаров, с похожими артикулами МойСклад
+
+        Args:
+            excel_data: Записи Excel ('article', 'orders', ...)
+            limit: Количество кандидатов на артикул
+
+        Returns:
+            List[Dict[str, Any]]: [{'article', 'orders', 'candidates': [...]}, ...]
+        """
+        article_index = get_article_index()
+        excel = self.build_excel_frame(excel_data)
+
+        return [
+            {
+                'article': normalized_article,
+                'orders': orders,
+                'candidates': article_index.search(normalized_article, limit=limit),
+            }
+            for normalized_article, orders in zip(excel.index, excel['orders'])
+            if normalized_article not in article_index
+        ]
@@ -0,0 +1,64 @@
+"""
+Кэш результатов разбора Excel файлов Точки
+
+Операторы несколько раз в день загружают одну и ту же выгрузку
+маркетплейса. Результат разбора (дедуплицированные артикулы/заказы
+и найденные колонки) зависит только от содержимого файла, поэтому
+хранится в кэше по SHA-256 хэшу файла и при повторной загрузке
+разбор пропускается.
+
+Вытеснение: записи живут PARSE_CACHE_TIMEOUT секунд с момента
+последнего обращения (срок продлевается при попадании), дальше
+работает политика вытеснения Redis.
+"""
+
+import logging
+from typing import Any, Dict, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+# Версия формата - увеличить при изменении логики разбора
+PARSE_CACHE_VERSION = 1
+
+PARSE_CACHE_TIMEOUT = getattr(settings, 'TOCHKA_PARSE_CACHE_TIMEOUT', 6 * 60 * 60)
+
+
+class TochkaParseCache:
+    """
+    Кэш разобранных файлов Точки по хэшу содержимого
+
+    Args:
+        parser: Код парсера ('upload' - загрузка для ручного анализа,
+            'auto' - автоматическая обработка). Форматы результатов
+            у парсеров разные, поэтому ключи не пересекаются.
+    """
+
+    def __init__(self, parser: str):
+        self.parser = parser
+
+    def get_cache_key(self, file_hash: str) -> str:
+        return f'tochka_parse:v{PARSE_CACHE_VERSION}:{self.parser}:{file_hash}'
+
+    def get(self, file_hash: str) -> Optional[Dict[str, Any]]:
+        """Получить результат разбора или None"""
+        cache_key = self.get_cache_key(file_hash)
+        try:
+            result = cache.get(cache_key)
+            if result is not None:
+                # Продлеваем срок жизни часто загружаемых файлов
+                cache.touch(cache_key, PARSE_CACHE_TIMEOUT)
+                logger.debug(f"Using cached Tochka parse result for {file_hash}")
+            return result
+        except Exception as e:
+            logger.debug(f"Cache unavailable: {e}")
+            return None
+
+    def set(self, file_hash: str, result: Dict[str, Any]):
+        """Сохранить результат разбора"""
+        try:
+            cache.set(self.get_cache_key(file_hash), result, PARSE_CACHE_TIMEOUT)
+        except Exception as e:
+            logger.debug(f"Could not cache Tochka parse result: {e}")
@@ -0,0 +1,427 @@
+"""
+Сервис автоматической обработки файла Точки
+
+Этапы обработки:
+1. Загрузка и дедупликация файла Excel, CSV или Parquet (upload)
+2. Анализ производства - сопоставление с товарами МойСклад (analysis)
+3. Формирование списка к производству с расчетом резерва (production)
+
+Используется как синхронным endpoint'ом upload-and-auto-process,
+так и фоновой Celery задачей с опросом прогресса.
+"""
+
+import hashlib
+import logging
+import time
+from datetime import timedelta
+from typing import Any, Callable, Dict, List, Optional
+
+import pandas as pd
+from django.conf import settings
+from django.db.models import OuterRef, Subquery
+from django.utils import timezone
+
+from apps.core.data_version import PRODUCTS_DATA, get_data_version
+from apps.core.exceptions import TochkaProcessingException
+from apps.core.utils.article_normalizer import normalize_article
+from apps.products.models import Product, TochkaProcessingJob
+from apps.products.services.reserve_calculator import ReserveCalculatorService
+from apps.products.services.tochka_ingest import read_tochka_table
+from apps.products.services.tochka_merge import TochkaMergeEngine
+from apps.products.services.tochka_parse_cache import TochkaParseCache
+
+logger = logging.getLogger(__name__)
+
+# Возраст (в секундах), после которого задачи обработки удаляются;
+# последняя успешная задача для каждого файла сохраняется как кэш
+TOCHKA_JOB_MAX_AGE = getattr(settings, 'TOCHKA_JOB_MAX_AGE', 7 * 24 * 60 * 60)
+
+# Прогресс (в процентах) на момент начала каждого этапа
+STAGE_PROGRESS = {
+    'queued': 0,
+    'upload': 10,
+    'analysis': 40,
+    'production': 70,
+    'completed': 100,
+}
+
+
+def compute_file_hash(file_content: bytes) -> str:
+    """
+    Вычислить SHA-256 хэш содержимого файла
+
+    Args:
+        file_content: Байты загруженного файла
+
+    Returns:
+        Хэш в hex-представлении
+    """
+    return hashlib.sha256(file_content).hexdigest()
+
+
+class TochkaProcessingService:
+    """
+    Сервис полного цикла обработки файла Точки
+    """
+
+    def process(
+        self,
+        file_content: bytes,
+        on_stage: Optional[Callable[[str], None]] = None,
+        file_hash: Optional[str] = None,
+        file_name: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Выполнить все этапы обработки файла
+
+        Args:
+            file_content: Байты файла (Excel, CSV, CSV.GZ или Parquet)
+            on_stage: Callback, вызываемый перед началом каждого этапа
+                с его кодом ('upload', 'analysis', 'production')
+            file_hash: Хэш файла, если уже посчитан
+            file_name: Имя файла для определения формата
+
+        Returns:
+            Dict[str, Any]: Результат всех этапов в формате ответа
+                upload-and-auto-process
+
+        Raises:
+            TochkaProcessingException: При ошибке на любом из этапов
+        """
+        start_time = time.time()
+
+        def notify(stage: str):
+            if on_stage:
+                on_stage(stage)
+
+        notify('upload')
+        upload_result = self.parse_file(file_content, file_hash=file_hash, file_name=file_name)
+        deduplicated_data = upload_result['data']
+
+        notify('analysis')
+        analysis_result = self.analyze_production(deduplicated_data)
+
+        notify('production')
+        production_result = self.build_production_list(deduplicated_data)
+
+        processing_time = round(time.time() - start_time, 2)
+
+        return {
+            'success': True,
+            'processing_time_seconds': processing_time,
+            'upload_result': upload_result,
+            'analysis_result': analysis_result,
+            'production_result': production_result,
+            'summary': {
+                'excel_file_processed': True,
+                'analysis_completed': True,
+                'production_list_ready': True,
+                'total_excel_records': len(deduplicated_data),
+                'products_found_in_db': analysis_result['found_products'],
+                'coverage_percentage': analysis_result['coverage_rate'],
+                'production_items_count': production_result['total_products']
+            }
+        }
+
+    def parse_file(
+        self,
+        file_content: bytes,
+        file_hash: Optional[str] = None,
+        file_name: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Этап 1: Загрузка и дедупликация файла (Excel, CSV, CSV.GZ или Parquet)
+
+        Результат кэшируется по хэшу файла - повторная загрузка
+        того же файла не разбирается заново.
+
+        Args:
+            file_content: Байты файла
+            file_hash: Хэш файла, если уже посчитан
+            file_name: Имя файла для определения формата
+
+        Returns:
+            Dict[str, Any]: Результат загрузки с дедуплицированными данными
+        """
+        parse_cache = TochkaParseCache('auto')
+        file_hash = file_hash or compute_file_hash(file_content)
+
+        cached_result = parse_cache.get(file_hash)
+        if cached_result is not None:
+            return {**cached_result, 'parse_cached': True}
+
+        try:
+            df = read_tochka_table(file_content, file_name)
+        except TochkaProcessingException:
+            raise
+        except Exception as e:
+            raise TochkaProcessingException(
+                f'Ошибка при обработке файла: {str(e)}', stage='upload'
+            )
+
+        # Поиск нужных колонок с различными вариантами названий
+        article_column = None
+        orders_column = None
+
+        for col in df.columns:
+            col_lower = str(col).lower().strip()
+            if 'артикул' in col_lower and 'товар' in col_lower:
+                article_column = col
+            elif 'заказ' in col_lower and 'шт' in col_lower:
+                orders_column = col
+
+        if not article_column or not orders_column:
+            raise TochkaProcessingException(
+                'Не найдены необходимые колонки "Артикул товара" и "Заказов, шт."',
+                status_code=400,
+                stage='upload'
+            )
+
+        try:
+            # Фильтруем и очищаем данные
+            df_filtered = df[[article_column, orders_column]].copy()
+            df_filtered = df_filtered.dropna()
+
+            # Приводим к нужным типам
+            df_filtered[article_column] = df_filtered[article_column].astype(str)
+            df_filtered[orders_column] = pd.to_numeric(df_filtered[orders_column], errors='coerce')
+            df_filtered = df_filtered.dropna()
+
+            # Дедупликация по артикулу с суммированием заказов
+            deduplicated_data = []
+            article_groups = df_filtered.groupby(article_column)
+
+            for article, group in article_groups:
+                normalized_article = normalize_article(article)
+                if not normalized_article:
+                    continue
+
+                total_orders = group[orders_column].sum()
+                row_numbers = group.index.tolist()
+
+                deduplicated_data.append({
+                    'article': normalized_article,
+                    'orders': int(total_orders),
+                    'row_number': row_numbers[0] + 2,  # +2 для Excel нумерации (1-based + header)
+                    'has_duplicates': len(row_numbers) > 1,
+                    'duplicate_rows': row_numbers[1:] if len(row_numbers) > 1 else []
+                })
+
+            # Сортируем по убыванию количества заказов
+            deduplicated_data.sort(key=lambda x: x['orders'], reverse=True)
+        except Exception as e:
+            raise TochkaProcessingException(
+                f'Ошибка при обработке файла: {str(e)}', stage='upload'
+            )
+
+        result = {
+            'message': 'Excel файл обработан успешно',
+            'total_records': len(df_filtered),
+            'unique_articles': len(deduplicated_data),
+            'data': deduplicated_data,
+            'columns_found': {
+                'article_column': str(article_column),
+                'orders_column': str(orders_column)
+            }
+        }
+        parse_cache.set(file_hash, result)
+
+        return {**result, 'parse_cached': False}
+
+    def analyze_production(self, deduplicated_data: List[Dict]) -> Dict[str, Any]:
+        """
+        Этап 2: Сопоставление артикулов файла с товарами МойСклад
+
+        Выполняется колоночным движком TochkaMergeEngine, как и
+        объединение в merge-with-products.
+
+        Args:
+            deduplicated_data: Дедуплицированные данные из файла
+
+        Returns:
+            Dict[str, Any]: Результат анализа с объединенными данными
+        """
+        try:
+            analysis = TochkaMergeEngine().analyze(deduplicated_data)
+        except Exception as e:
+            raise TochkaProcessingException(
+                f'Ошибка при анализе производства: {str(e)}', stage='analysis'
+            )
+
+        return {
+            'message': 'Анализ производства завершен',
+            'total_articles': len(deduplicated_data),
+            'found_products': analysis['found_products'],
+            'coverage_rate': analysis['coverage_rate'],
+            'merged_data': analysis['merged_data']
+        }
+
+    def build_production_list(self, deduplicated_data: List[Dict]) -> Dict[str, Any]:
+        """
+        Этап 3: Формирование списка к производству для товаров из Точки
+
+        Args:
+            deduplicated_data: Дедуплицированные данные из файла
+
+        Returns:
+            Dict[str, Any]: Список к производству с расчетом резерва
+        """
+        try:
+            products_for_production = Product.objects.filter(
+                production_needed__gt=0
+            ).order_by('-production_priority')
+
+            # Заказы Точки по нормализованному артикулу
+            tochka_orders = {item['article']: item['orders'] for item in deduplicated_data}
+
+            products_in_tochka = []
+            for product in products_for_production:
+                normalized_article = normalize_article(product.article)
+                if normalized_article in tochka_orders:
+                    products_in_tochka.append((product, tochka_orders[normalized_article]))
+
+            reserved_stocks = [float(getattr(product, 'reserved_stock', 0)) for product, _ in products_in_tochka]
+            current_stocks = [float(product.current_stock) for product, _ in products_in_tochka]
+
+            # Резерв считается одним векторным проходом для всего списка
+            reserve_columns = ReserveCalculatorService().calculate_reserve_columns(
+                reserved_stock=reserved_stocks,
+                current_stock=current_stocks
+            )
+
+            filtered_production = []
+
+            for index, (product, orders_in_tochka) in enumerate(products_in_tochka):
+                reserved_stock = reserved_stocks[index]
+                calculated_reserve = reserve_columns['calculated_reserve'][index]
+
+                filtered_production.append({
+                    'article': product.article,
+                    'product_name': product.name,
+                    'production_needed': float(product.production_needed),
+                    'production_priority': product.production_priority,
+                    'current_stock': current_stocks[index],
+                    'sales_last_2_months': float(product.sales_last_2_months),
+                    'product_type': product.product_type,
+                    'color': product.color or '',
+                    'reserved_stock': reserved_stock,
+                    'orders_in_tochka': orders_in_tochka,
+                    'is_in_tochka': True,
+                    'needs_registration': False,
+
+                    # Новые поля расчета резерва
+                    'calculated_reserve': calculated_reserve,
+                    'reserve_color': reserve_columns['color_indicator'][index],
+                    'reserve_display_text': reserve_columns['display_text'][index],
+                    'reserve_tooltip': reserve_columns['tooltip_text'][index],
+                    'reserve_needs_attention': reserve_columns['needs_attention'][index],
+
+                    # Дополнительные поля для UI
+                    'has_reserve': reserved_stock > 0,
+                    'reserve_amount': reserved_stock,
+                    'reserve_minus_stock': calculated_reserve  # Обратная совместимость
+                })
+        except Exception as e:
+            raise TochkaProcessingException(
+                f'Ошибка при формировании списка производства: {str(e)}', stage='production'
+            )
+
+        return {
+            'message': 'Список к производству сформирован',
+            'total_products': len(filtered_production),
+            'products_in_tochka': len(filtered_production),
+            'products_need_registration': 0,
+            'filtered_production': filtered_production
+        }
+
+    def find_cached_job(self, file_hash: str) -> Optional[TochkaProcessingJob]:
+        """
+        Найти успешную задачу для того же файла, результат которой актуален
+
+        Результат считается актуальным, если он получен на текущей
+        версии данных товаров: синхронизация и пересчет (в том числе
+        удаление товаров) меняют версию.
+
+        Args:
+            file_hash: Хэш содержимого файла
+
+        Returns:
+            TochkaProcessingJob или None
+        """
+        data_version, _ = get_data_version(PRODUCTS_DATA)
+
+        return TochkaProcessingJob.objects.filter(
+            file_hash=file_hash, status='success', data_version=data_version
+        ).order_by('-finished_at').first()
+
+    def cleanup_jobs(self, max_age: Optional[int] = None) -> int:
+        """
+        Удалить задачи, не изменявшиеся дольше max_age секунд
+
+        Последняя успешная задача для каждого хэша файла не удаляется:
+        она используется find_cached_job при повторной загрузке файла.
+
+        Returns:
+            Количество удаленных задач
+        """
+        max_age = TOCHKA_JOB_MAX_AGE if max_age is None else max_age
+        cutoff = timezone.now() - timedelta(seconds=max_age)
+
+        latest_success = TochkaProcessingJob.objects.filter(
+            file_hash=OuterRef('file_hash'), status='success'
+        ).order_by('-finished_at', '-pk').values('pk')[:1]
+
+        deleted, _ = TochkaProcessingJob.objects.filter(updated_at__lt=cutoff).exclude(
+            status='success', pk=Subquery(latest_success)
+        ).delete()
+
+        if deleted:
+            logger.info(f"Deleted {deleted} old Tochka processing jobs")
+        return deleted
+
+    def run_job(self, job: TochkaProcessingJob) -> TochkaProcessingJob:
+        """
+        Выполнить обработку для фоновой задачи с сохранением прогресса
+
+        Args:
+            job: Задача с сохраненным исходным файлом
+
+        Returns:
+            Обновленная задача
+        """
+        # Версия берется до обработки: изменения товаров во время
+        # обработки делают результат устаревшим
+        data_version, _ = get_data_version(PRODUCTS_DATA)
+
+        job.status = 'processing'
+        job.save(update_fields=['status', 'updated_at'])
+
+        def on_stage(stage: str):
+            job.stage = stage
+            job.progress = STAGE_PROGRESS[stage]
+            job.save(update_fields=['stage', 'progress', 'updated_at'])
+
+        try:
+            result = self.process(
+                bytes(job.source_file),
+                on_stage=on_stage,
+                file_hash=job.file_hash,
+                file_name=job.file_name
+            )
+
+            job.status = 'success'
+            job.stage = 'completed'
+            job.progress = STAGE_PROGRESS['completed']
+            job.result = result
+            job.data_version = data_version
+        except Exception as e:
+            logger.error(f"Tochka job {job.job_id} failed at stage {job.stage}: {e}")
+            job.status = 'failed'
+            job.error_details = str(e)
+
+        # Исходный файл больше не нужен - результат хранится в задаче
+        job.source_file = None
+        job.finished_at = timezone.now()
+        job.save()
+
+        return job
@@ -0,0 +1,37 @@
+"""
+Celery tasks for products.
+"""
+import logging
+from celery import shared_task
+from .models import TochkaProcessingJob
+from .services.tochka_processor import TochkaProcessingService
+
+logger = logging.getLogger(__name__)
+
+@shared_task(bind=True, time_limit=1800)
+def process_tochka_file_task(self, job_id: str):
+    """
+    Asynchronous task to process an uploaded Tochka file.
+    """
+    try:
+        job = TochkaProcessingJob.objects.get(job_id=job_id)
+    except TochkaProcessingJob.DoesNotExist:
+        logger.error(f"Tochka processing job {job_id} not found")
+        return {'error': 'Job not found'}
+
+    job = TochkaProcessingService().run_job(job)
+
+    logger.info(f"Tochka processing job {job_id} finished with status {job.status}")
+    return {
+        'job_id': str(job.job_id),
+        'status': job.status,
+    }
+
+
+@shared_task
+def cleanup_tochka_jobs_task():
+    """
+    Periodic cleanup of old Tochka processing jobs.
+    """
+    deleted = TochkaProcessingService().cleanup_jobs()
+    return {'deleted': deleted}
@@ -2,11 +2,18 @@
 Tests for Products API endpoints.
 """
 from decimal import Decimal
-from django.test import TestCase
+from django.core.cache import cache
+from django.test import TestCase, override_settings
 from django.urls import reverse
-from rest_framework.test import APIClient
+from django.utils import timezone
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory
 from rest_framework import status
-from apps.products.models import Product
+from apps.core.data_version import get_data_version
+from apps.products.models import Product, ProductImage
+from apps.products.serializers import ProductListSerializer, ProductListValuesSerializer
+from apps.products.views import ProductListView
+from apps.api.v1.tochka_views import get_production_list_for_tochka, get_products_for_tochka
 from apps.sync.models import ProductionList
 
 
@@ -194,4 +201,114 @@ class ProductModelTestCase(TestCase):
         product.update_calculated_fields()
         
         self.assertEqual(product.product_type, 'new')  # Should become new product
-        # Priority might change based on new classification
\ No newline at end of file
+        # Priority might change based on new classification
+
+class ProductListValuesSerializerTestCase(TestCase):
+    """Test cases for values()-based product list serialization."""
+    
+    def setUp(self):
+        """Set up test data."""
+        self.factory = APIRequestFactory()
+        for index in range(3):
+            product = Product.objects.create(
+                moysklad_id=f'values-{index}',
+                article=f'VAL-00{index}',
+                name=f'Values Product {index}',
+                color='черный' if index else '',
+                current_stock=Decimal(index),
+                reserved_stock=Decimal('2'),
+                sales_last_2_months=Decimal('12'),
+                last_synced_at=timezone.now() if index else None
+            )
+            ProductImage.objects.create(product=product, moysklad_url='https://example.com/1.jpg')
+            ProductImage.objects.create(
+                product=product, is_main=True, thumbnail=f'products/thumbnails/{index}.jpg'
+            )
+    
+    def test_output_matches_model_serializer(self):
+        """Values serializer returns the same data as ProductListSerializer."""
+        request = Request(self.factory.get('/api/v1/products/'))
+        queryset = Product.objects.order_by('article')
+        
+        for include_reserve in (False, True):
+            context = {'request': request, 'include_reserve': include_reserve}
+            expected = ProductListSerializer(queryset, many=True, context=context).data
+            actual = ProductListValuesSerializer(queryset, context=context).data
+            
+            self.assertEqual([dict(item) for item in expected], actual)
+    
+    def test_sliced_queryset(self):
+        """Values serializer works with limited querysets."""
+        request = Request(self.factory.get('/api/v1/products/'))
+        data = ProductListValuesSerializer(
+            Product.objects.order_by('article')[:2], context={'request': request}
+        ).data
+        
+        self.assertEqual([item['article'] for item in data], ['VAL-000', 'VAL-001'])
+        self.assertEqual(len(data[0]['images']), 2)
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class ProductListQueryCountTestCase(TestCase):
+    """The number of queries per page does not depend on the number of products."""
+    
+    def setUp(self):
+        """Set up request factory and cache the data version."""
+        self.factory = APIRequestFactory()
+        cache.clear()
+        get_data_version()
+    
+    def create_products(self, count):
+        start = Product.objects.count()
+        for index in range(start, start + count):
+            product = Product.objects.create(
+                moysklad_id=f'queries-{index}',
+                article=f'QRY-{index:03d}',
+                name=f'Query Product {index}',
+                current_stock=Decimal('1'),
+                reserved_stock=Decimal('1'),
+                sales_last_2_months=Decimal('12')
+            )
+            ProductImage.objects.create(product=product, moysklad_url='https://example.com/1.jpg')
+            ProductImage.objects.create(product=product, is_main=True, thumbnail=f'products/thumbnails/{index}.jpg')
+    
+    def assert_constant_queries(self, num_queries, make_response):
+        for count in (2, 10):
+            self.create_products(count)
+            with self.assertNumQueries(num_queries):
+                response = make_response()
+                response.render()
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+    
+    def test_product_list_page(self):
+        """Count, products and prefetched images."""
+        view = ProductListView.as_view()
+        self.assert_constant_queries(3, lambda: view(self.factory.get('/api/v1/products/')))
+    
+    def test_product_list_cursor_page(self):
+        """Products and prefetched images without COUNT(*)."""
+        view = ProductListView.as_view()
+        self.assert_constant_queries(2, lambda: view(
+            self.factory.get('/api/v1/products/', {'pagination': 'cursor', 'count': 'false'})
+        ))
+    
+    def test_main_image_comes_from_prefetch(self):
+        """Main image is the thumbnail of the image flagged as main."""
+        self.create_products(1)
+        response = ProductListView.as_view()(self.factory.get('/api/v1/products/'))
+        item = response.data['results'][0]
+        
+        self.assertTrue(item['main_image'].endswith('products/thumbnails/0.jpg'))
+        self.assertEqual(len(item['images']), 2)
+    
+    def test_tochka_products(self):
+        """Products and images for the Tochka tab."""
+        self.assert_constant_queries(2, lambda: get_products_for_tochka(
+            self.factory.get('/api/v1/tochka/products/')
+        ))
+    
+    def test_tochka_production_list(self):
+        """Production products and images for the Tochka tab."""
+        self.assert_constant_queries(2, lambda: get_production_list_for_tochka(
+            self.factory.get('/api/v1/tochka/production/')
+        ))
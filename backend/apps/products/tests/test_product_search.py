@@ -0,0 +1,70 @@
+"""
+Tests for product search.
+"""
+import unittest
+from decimal import Decimal
+from django.db import connection
+from django.test import TestCase
+from rest_framework.test import APIRequestFactory
+from apps.products.models import Product
+from apps.products.services.product_search import search_products
+from apps.products.views import ProductListView
+
+
+class ProductSearchTestCase(TestCase):
+    """Test cases for search_products."""
+
+    def setUp(self):
+        """Set up test data."""
+        self.factory = APIRequestFactory()
+        self.create_product('375-42108', 'Держатель телефона', 'Крепление на велосипед', priority_stock=1)
+        self.create_product('375-42180', 'Подставка для наушников', 'Настольная подставка')
+        self.create_product('N323-13W', 'Phone holder', 'Bike mount')
+
+    def create_product(self, article, name, description, priority_stock=100):
+        return Product.objects.create(
+            moysklad_id=f'search-{article}',
+            article=article,
+            name=name,
+            description=description,
+            current_stock=Decimal(priority_stock),
+            sales_last_2_months=Decimal('30')
+        )
+
+    def search(self, query, **kwargs):
+        return set(search_products(Product.objects.all(), query, **kwargs).values_list('article', flat=True))
+
+    def test_article_substring(self):
+        """Article is matched by substring."""
+        self.assertEqual(self.search('42108'), {'375-42108'})
+        self.assertEqual(self.search('n323'), {'N323-13W'})
+
+    def test_cyrillic_is_case_insensitive(self):
+        """Cyrillic names are matched regardless of case."""
+        self.assertEqual(self.search('держатель'), {'375-42108'})
+        self.assertEqual(self.search('ПОДСТАВКА'), {'375-42180'})
+
+    def test_empty_query(self):
+        """Blank query does not filter."""
+        self.assertEqual(len(self.search('  ')), 3)
+
+    def test_product_list_search(self):
+        """Product list applies search together with other filters."""
+        response = ProductListView.as_view()(self.factory.get('/api/v1/products/', {
+            'search': 'подставка', 'min_priority': 0
+        }))
+
+        self.assertEqual([item['article'] for item in response.data['results']], ['375-42180'])
+
+    @unittest.skipUnless(connection.vendor == 'postgresql', 'PostgreSQL full-text search')
+    def test_full_text_search_is_ranked(self):
+        """Word forms are matched by the search vector, exact article comes first."""
+        self.assertEqual(self.search('велосипеда'), {'375-42108'})
+
+        ranked = search_products(Product.objects.all(), '375-42108')
+        self.assertEqual(ranked.first().article, '375-42108')
+
+        product = Product.objects.get(article='N323-13W')
+        product.description = 'Держатель для самоката'
+        product.save()
+        self.assertIn('N323-13W', self.search('самокат'))
@@ -257,4 +257,33 @@ class ProductionAlgorithmTestCase(TestCase):
             sales_last_2_months=2
         )
         self.assertGreater(case2.production_needed, Decimal('0'))
-        self.assertEqual(case2.production_needed, Decimal('2'))  # 10 - 8
\ No newline at end of file
+        self.assertEqual(case2.production_needed, Decimal('2'))  # 10 - 8
+
+class RecalculateAllProductsTestCase(TestCase):
+    """Test cases for chunked recalculation of all products."""
+    
+    def test_only_changed_products_are_written(self):
+        """Stale calculated fields are fixed, up-to-date products are left alone."""
+        from apps.products.services.recalculation import recalculate_all_products
+        
+        for index in range(5):
+            Product.objects.create(
+                moysklad_id=f'recalc-{index}',
+                article=f'RECALC-{index}',
+                name=f'Recalc {index}',
+                current_stock=Decimal('2'),
+                sales_last_2_months=Decimal('30')
+            )
+        # Simulate stale values written without save()
+        Product.objects.filter(article__in=['RECALC-1', 'RECALC-3']).update(
+            production_needed=Decimal('0'), production_priority=20
+        )
+        untouched = Product.objects.get(article='RECALC-0').updated_at
+        
+        result = recalculate_all_products(chunk_size=2)
+        
+        self.assertEqual(result, {'total_products': 5, 'updated_products': 2})
+        product = Product.objects.get(article='RECALC-1')
+        self.assertEqual(product.production_priority, 100)
+        self.assertGreater(product.production_needed, 0)
+        self.assertEqual(Product.objects.get(article='RECALC-0').updated_at, untouched)
@@ -223,6 +223,96 @@ class ProductReserveIntegrationTest(TestCase):
         self.assertEqual(results[1]['color_indicator'], 'red')
 
 
+class ReserveColumnsCalculationTest(TestCase):
+    """
+    Тестирование векторного расчета резерва для массивов значений
+    """
+    
+    def setUp(self):
+        """Подготовка тестовых данных"""
+        self.calculator = ReserveCalculatorService()
+        
+    def test_columns_match_row_calculation(self):
+        """
+        Тест: Векторный расчет совпадает с построчным для всех случаев
+        (синий, красный, серый, дробные значения, нулевой остаток, None)
+        """
+        reserved = [15.0, 5.0, 10.0, 0.0, 10.35, 6.0, 2.5, None, 0.3, 1e-05]
+        stock = [10.0, 10.0, 10.0, 5.0, 0.1, 0.0, 2.25, 3.0, 0.1, 0.0]
+        
+        columns = self.calculator.calculate_reserve_columns(reserved, stock)
+        
+        for index, (reserve_value, stock_value) in enumerate(zip(reserved, stock)):
+            calc = self.calculator.calculate_reserve_display(reserve_value, stock_value)
+            ui = self.calculator.format_reserve_for_display(calc)
+            
+            self.assertEqual(columns['calculated_reserve'][index], float(calc['calculated_reserve']))
+            self.assertEqual(columns['color_indicator'][index], calc['color_indicator'])
+            self.assertEqual(columns['is_positive'][index], calc['is_positive'])
+            self.assertEqual(columns['display_text'][index], ui['display_text'])
+            self.assertEqual(columns['tooltip_text'][index], ui['tooltip_text'])
+            self.assertEqual(columns['needs_attention'][index], ui['needs_attention'])
+    
+    def test_columns_performance(self):
+        """
+        Тест: Расчет 20000 товаров занимает доли секунды
+        """
+        import time
+        
+        reserved = [float(i % 50) for i in range(20000)]
+        stock = [float(i % 30) + 0.5 for i in range(20000)]
+        
+        start_time = time.time()
+        columns = self.calculator.calculate_reserve_columns(reserved, stock)
+        execution_time = time.time() - start_time
+        
+        self.assertEqual(len(columns['display_text']), 20000)
+        self.assertLess(execution_time, 1.0,
+                       f"Время выполнения {execution_time:.2f} сек превышает лимит 1 сек")
+    
+    def test_bulk_calculation_matches_row_calculation(self):
+        """
+        Тест: Массовый расчет дает те же значения, что построчный
+        (для float-остатков, как их передают API)
+        """
+        products_data = [
+            {'article': 'A-1', 'reserved_stock': 15.0, 'current_stock': 10.0},
+            {'article': 'A-2', 'reserved_stock': 5.0, 'current_stock': 10.0},
+            {'article': 'A-3', 'reserved_stock': 0.0, 'current_stock': 5.0},
+            {'article': 'A-4', 'reserved_stock': 10.35, 'current_stock': 0.1},
+            {'article': 'A-5', 'current_stock': 3.0},
+        ]
+
+        results = self.calculator.bulk_calculate_reserves(products_data)
+
+        self.assertEqual(len(results), len(products_data))
+        for product_data, result in zip(products_data, results):
+            calc = self.calculator.calculate_reserve_display(
+                product_data.get('reserved_stock', Decimal('0')),
+                product_data['current_stock']
+            )
+            ui = self.calculator.format_reserve_for_display(calc)
+
+            self.assertEqual(result['article'], product_data['article'])
+            self.assertEqual(result['calculated_reserve'], calc['calculated_reserve'])
+            self.assertEqual(result['reserve_color'], calc['color_indicator'])
+            self.assertEqual(
+                result['reserve_calculation']['should_show_calculation'],
+                calc['should_show_calculation']
+            )
+            self.assertEqual(result['reserve_ui_format']['display_text'], ui['display_text'])
+            self.assertEqual(result['reserve_ui_format']['css_color'], ui['css_color'])
+            self.assertEqual(result['reserve_ui_format']['tooltip_text'], ui['tooltip_text'])
+
+    def test_empty_columns(self):
+        """
+        Тест: Пустой список товаров
+        """
+        columns = self.calculator.calculate_reserve_columns([], [])
+        self.assertEqual(columns['calculated_reserve'], [])
+        self.assertEqual(columns['color_indicator'], [])
+
+
 class BackwardCompatibilityTest(TestCase):
     """
     Тесты обратной совместимости
@@ -0,0 +1,98 @@
+"""
+Тесты чтения файлов Точки разных форматов.
+
+Покрывает:
+1. Определение формата по содержимому и расширению
+2. CSV с разными разделителями и кодировками, CSV.GZ
+3. Обработку CSV файла сервисом автоматической обработки
+"""
+import gzip
+import io
+import unittest
+from decimal import Decimal
+
+import pandas as pd
+from django.test import SimpleTestCase, TestCase
+
+from apps.core.exceptions import TochkaProcessingException
+from apps.products.models import Product
+from apps.products.services.tochka_ingest import (
+    HAS_PYARROW, detect_format, is_supported_file, read_tochka_table
+)
+from apps.products.services.tochka_processor import TochkaProcessingService
+
+COLUMNS = ['Артикул товара', 'Заказов, шт.']
+ROWS = [['00123', '3'], ['375-42108', '5']]
+
+
+class TochkaIngestTest(SimpleTestCase):
+    """Тесты модуля чтения файлов Точки."""
+
+    def assert_rows(self, df):
+        self.assertEqual(list(df.columns), COLUMNS)
+        self.assertEqual(df.astype(str).values.tolist(), ROWS)
+
+    def test_supported_extensions(self):
+        """Тест: проверка расширений загружаемых файлов."""
+        for name in ['tochka.xlsx', 'tochka.XLS', 'tochka.csv', 'tochka.csv.gz', 'tochka.parquet']:
+            self.assertTrue(is_supported_file(name), name)
+        self.assertFalse(is_supported_file('tochka.pdf'))
+
+    def test_detect_format_by_content(self):
+        """Тест: формат определяется по сигнатуре, а не по имени файла."""
+        buffer = io.BytesIO()
+        pd.DataFrame(ROWS, columns=COLUMNS).to_excel(buffer, index=False)
+
+        self.assertEqual(detect_format(buffer.getvalue(), 'export.csv'), 'xlsx')
+        self.assertEqual(detect_format(gzip.compress(b'a,b'), 'export'), 'csv_gz')
+        self.assertEqual(detect_format(b'a,b\n1,2', 'export.csv'), 'csv')
+
+    def test_corrupted_excel_rejected(self):
+        """Тест: текстовый файл с расширением .xlsx - ошибка 400."""
+        with self.assertRaises(TochkaProcessingException) as ctx:
+            detect_format(b'not an excel file', 'tochka.xlsx')
+
+        self.assertEqual(ctx.exception.status_code, 400)
+
+    def test_read_comma_csv(self):
+        """Тест: CSV с запятой и заголовком в кавычках, ведущие нули сохраняются."""
+        content = '"Артикул товара","Заказов, шт."\n00123,3\n375-42108,5\n'.encode('utf-8')
+        self.assert_rows(read_tochka_table(content, 'tochka.csv'))
+
+    def test_read_semicolon_cp1251_csv(self):
+        """Тест: CSV из Excel под Windows - точка с запятой и cp1251."""
+        content = 'Артикул товара;Заказов, шт.\r\n00123;3\r\n375-42108;5\r\n'.encode('cp1251')
+        self.assert_rows(read_tochka_table(content, 'tochka.csv'))
+
+    def test_read_gzip_csv(self):
+        """Тест: сжатый CSV с BOM."""
+        content = gzip.compress('﻿Артикул товара\tЗаказов, шт.\n00123\t3\n375-42108\t5\n'.encode('utf-8'))
+        self.assert_rows(read_tochka_table(content, 'tochka.csv.gz'))
+
+    @unittest.skipUnless(HAS_PYARROW, 'pyarrow не установлен')
+    def test_read_parquet(self):
+        """Тест: чтение Parquet."""
+        buffer = io.BytesIO()
+        pd.DataFrame(ROWS, columns=COLUMNS).to_parquet(buffer, index=False)
+        self.assert_rows(read_tochka_table(buffer.getvalue(), 'tochka.parquet'))
+
+
+class TochkaProcessingCSVTest(TestCase):
+    """Тест автоматической обработки CSV файла."""
+
+    def test_process_csv_file(self):
+        """Тест: CSV обрабатывается так же, как Excel."""
+        Product.objects.create(
+            moysklad_id='tochka-csv-1',
+            article='375-42108',
+            name='Товар из CSV',
+            current_stock=Decimal('2'),
+            sales_last_2_months=Decimal('10'),
+        )
+        content = 'Артикул товара;Заказов, шт.\n375-42108;3\n375-42108;2\n999-00000;7\n'.encode('utf-8')
+
+        result = TochkaProcessingService().process(content, file_name='tochka.csv')
+
+        self.assertEqual(result['upload_result']['unique_articles'], 2)
+        self.assertEqual(result['analysis_result']['found_products'], 1)
+        self.assertEqual(result['production_result']['filtered_production'][0]['orders_in_tochka'], 5)
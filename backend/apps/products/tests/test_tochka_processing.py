@@ -0,0 +1,371 @@
+"""
+Тесты для автоматической обработки файла Точки (синхронный и фоновый режимы).
+
+Покрывает:
+1. Этапы обработки в TochkaProcessingService
+2. Фоновую задачу с сохранением этапа и прогресса
+3. Опрос статуса задачи по job_id
+4. Переиспользование результата по хэшу файла
+5. Кэш разбора Excel файла по хэшу
+6. Нечеткий поиск артикулов для несовпавших позиций
+"""
+import io
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
+
+import pandas as pd
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory
+
+from apps.api.v1.tochka_views import (
+    upload_and_auto_process_excel, get_tochka_processing_job, upload_excel_file_for_tochka
+)
+from apps.core.data_version import bump_data_version
+from apps.core.exceptions import TochkaProcessingException
+from apps.products.management.commands.benchmark_tochka_merge import merge_loop
+from apps.products.models import Product, TochkaProcessingJob
+from apps.products.services.article_index import ArticleIndex, get_article_index
+from apps.products.services.tochka_merge import TochkaMergeEngine
+from apps.products.services.tochka_processor import TochkaProcessingService, compute_file_hash
+
+
+def build_excel(rows):
+    """Создать Excel файл Точки в памяти."""
+    buffer = io.BytesIO()
+    pd.DataFrame(rows, columns=['Артикул товара', 'Заказов, шт.']).to_excel(buffer, index=False)
+    return buffer.getvalue()
+
+
+class TochkaProcessingServiceTest(TestCase):
+    """Тесты этапов обработки файла Точки."""
+
+    def setUp(self):
+        self.service = TochkaProcessingService()
+        self.product = Product.objects.create(
+            moysklad_id='tochka-job-1',
+            article='375-42108',
+            name='Товар в Точке',
+            current_stock=Decimal('2'),
+            reserved_stock=Decimal('6'),
+            sales_last_2_months=Decimal('10'),
+        )
+        self.file_content = build_excel([
+            ['375-42108', 3],
+            ['375-42108', 2],  # дубликат - заказы суммируются
+            ['999-00000', 7],
+        ])
+
+    def test_process_returns_all_stages(self):
+        """Тест: результат содержит все три этапа и сводку."""
+        stages = []
+        result = self.service.process(self.file_content, on_stage=stages.append)
+
+        self.assertEqual(stages, ['upload', 'analysis', 'production'])
+        self.assertTrue(result['success'])
+        self.assertEqual(result['upload_result']['unique_articles'], 2)
+        self.assertEqual(result['analysis_result']['found_products'], 1)
+        self.assertEqual(result['summary']['production_items_count'], 1)
+
+        production_item = result['production_result']['filtered_production'][0]
+        self.assertEqual(production_item['article'], '375-42108')
+        self.assertEqual(production_item['orders_in_tochka'], 5)
+        self.assertEqual(production_item['reserve_color'], 'blue')
+
+    def test_missing_columns_raise_bad_request(self):
+        """Тест: файл без нужных колонок - ошибка 400 на этапе загрузки."""
+        buffer = io.BytesIO()
+        pd.DataFrame({'Что-то': [1]}).to_excel(buffer, index=False)
+
+        with self.assertRaises(TochkaProcessingException) as ctx:
+            self.service.process(buffer.getvalue())
+
+        self.assertEqual(ctx.exception.status_code, 400)
+        self.assertEqual(ctx.exception.stage, 'upload')
+
+    def test_cached_job_invalidated_by_data_version(self):
+        """Тест: результат устаревает при смене версии данных товаров."""
+        file_hash = compute_file_hash(self.file_content)
+        job = TochkaProcessingJob.objects.create(file_hash=file_hash, source_file=self.file_content)
+        self.service.run_job(job)
+
+        self.assertEqual(self.service.find_cached_job(file_hash), job)
+
+        self.product.current_stock = Decimal('1')
+        self.product.save()
+        bump_data_version()
+
+        self.assertIsNone(self.service.find_cached_job(file_hash))
+
+    def test_cached_job_invalidated_by_product_deletion(self):
+        """Тест: удаление товаров при синхронизации делает результат устаревшим."""
+        file_hash = compute_file_hash(self.file_content)
+        job = TochkaProcessingJob.objects.create(file_hash=file_hash, source_file=self.file_content)
+        self.service.run_job(job)
+
+        self.product.delete()
+        bump_data_version()
+
+        self.assertIsNone(self.service.find_cached_job(file_hash))
+
+    def test_cleanup_keeps_latest_success_per_file(self):
+        """Тест: старые задачи удаляются, кроме последней успешной для файла."""
+        old = timezone.now() - timedelta(days=30)
+
+        def make_job(file_hash, status, finished_at):
+            job = TochkaProcessingJob.objects.create(file_hash=file_hash, status=status, finished_at=finished_at)
+            TochkaProcessingJob.objects.filter(pk=job.pk).update(updated_at=finished_at)
+            return job
+
+        kept = make_job('a', 'success', old)
+        make_job('a', 'success', old - timedelta(days=1))
+        make_job('a', 'failed', old)
+        make_job('b', 'pending', old)
+        recent = make_job('c', 'failed', timezone.now())
+
+        self.assertEqual(self.service.cleanup_jobs(max_age=24 * 60 * 60), 3)
+        self.assertEqual(set(TochkaProcessingJob.objects.values_list('pk', flat=True)), {kept.pk, recent.pk})
+
+
+class TochkaProcessingJobAPITest(TestCase):
+    """Тесты API фоновой обработки файла Точки."""
+
+    def setUp(self):
+        self.factory = APIRequestFactory()
+        Product.objects.create(
+            moysklad_id='tochka-job-2',
+            article='N323-13W',
+            name='Товар для фоновой обработки',
+            current_stock=Decimal('1'),
+            sales_last_2_months=Decimal('8'),
+        )
+        self.file_content = build_excel([['N323-13W', 4]])
+
+    def _upload(self, **data):
+        upload = SimpleUploadedFile('tochka.xlsx', self.file_content)
+        request = self.factory.post(
+            '/api/v1/tochka/upload-and-auto-process/',
+            {'file': upload, **data},
+            format='multipart'
+        )
+        return upload_and_auto_process_excel(request)
+
+    def test_async_upload_returns_job_and_result_via_polling(self):
+        """Тест: async режим возвращает job_id, результат доступен при опросе."""
+        response = self._upload(**{'async': 'true'})
+
+        self.assertEqual(response.status_code, 202)
+        job_id = response.data['job_id']
+
+        request = self.factory.get(f'/api/v1/tochka/jobs/{job_id}/')
+        poll_response = get_tochka_processing_job(request, job_id=job_id)
+
+        self.assertEqual(poll_response.status_code, 200)
+        self.assertEqual(poll_response.data['status'], 'success')
+        self.assertEqual(poll_response.data['stage'], 'completed')
+        self.assertEqual(poll_response.data['progress'], 100)
+        self.assertEqual(poll_response.data['result']['summary']['products_found_in_db'], 1)
+
+        # Исходный файл не хранится после обработки
+        job = TochkaProcessingJob.objects.get(job_id=job_id)
+        self.assertIsNone(job.source_file)
+
+    def test_repeated_upload_uses_cached_result(self):
+        """Тест: повторная загрузка того же файла возвращает сохраненный результат."""
+        first = self._upload()
+        self.assertEqual(first.status_code, 200)
+        self.assertFalse(first.data['cached'])
+
+        second = self._upload()
+        self.assertEqual(second.status_code, 200)
+        self.assertTrue(second.data['cached'])
+        self.assertEqual(second.data['job_id'], first.data['job_id'])
+        self.assertEqual(second.data['summary'], first.data['summary'])
+
+
+class TochkaMergeEngineTest(TestCase):
+    """Тесты колоночного объединения данных Точки с товарами."""
+
+    def setUp(self):
+        self.engine = TochkaMergeEngine()
+        products = [
+            ('merge-1', '375-42108', Decimal('5'), Decimal('0'), Decimal('3.5')),
+            ('merge-2', 'N323-13W', Decimal('0'), Decimal('4'), None),
+            ('merge-3', '15-00001', Decimal('2'), Decimal('0'), Decimal('0')),
+            ('merge-4', '15-00002', Decimal('0'), Decimal('0'), None),  # не требует производства
+        ]
+        for moysklad_id, article, production_needed, reserved_stock, days_of_stock in products:
+            Product.objects.create(
+                moysklad_id=moysklad_id,
+                article=article,
+                name=f'Товар {article}',
+                current_stock=Decimal('1'),
+                reserved_stock=reserved_stock,
+                sales_last_2_months=Decimal('10'),
+            )
+            # Поля расчета перезаписываются при save() - задаем напрямую
+            Product.objects.filter(moysklad_id=moysklad_id).update(
+                production_needed=production_needed,
+                production_priority=50 if article == '15-00001' else 10,
+                days_of_stock=days_of_stock,
+            )
+
+        self.excel_data = [
+            {'article': '375–42108', 'orders': 3, 'row_number': 2,
+             'has_duplicates': True, 'duplicate_rows': [4]},
+            {'article': 'N323-13W', 'orders': 1},
+            {'article': 'N323-13W', 'orders': 7, 'row_number': 5},  # последняя запись побеждает
+            {'article': '999-00000', 'orders': 9, 'row_number': 6},
+            {'article': ''},
+        ]
+
+    def test_merge_matches_loop_implementation(self):
+        """Тест: колоночный движок дает тот же результат, что и построчный цикл."""
+        self.assertEqual(self.engine.merge(self.excel_data), merge_loop(self.engine, self.excel_data))
+
+    def test_merge_flags_and_coverage(self):
+        """Тест: флаги наличия в Точке, порядок и покрытие."""
+        result = self.engine.merge(self.excel_data)
+
+        self.assertEqual([item['article'] for item in result['data']], ['15-00001', '375-42108', 'N323-13W'])
+        self.assertTrue(result['data'][0]['needs_registration'])
+        self.assertIsNone(result['data'][0]['excel_row_number'])
+        self.assertIsNone(result['data'][0]['days_of_stock'])
+
+        in_tochka = {item['article']: item for item in result['data'][1:]}
+        self.assertEqual(in_tochka['N323-13W']['orders_in_tochka'], 7)
+        self.assertEqual(in_tochka['375-42108']['duplicate_rows'], [4])
+        self.assertEqual(in_tochka['375-42108']['days_of_stock'], 3.5)
+
+        self.assertEqual(result['products_in_tochka'], 2)
+        self.assertEqual(result['products_not_in_tochka'], 1)
+        self.assertEqual(result['coverage_rate'], 66.7)
+
+    def test_analyze_keeps_tochka_rows(self):
+        """Тест: анализ возвращает записи Точки - сначала без товара, затем по заказам."""
+        result = self.engine.analyze([
+            {'article': '375-42108', 'orders': 3, 'has_duplicates': True},
+            {'article': '999-00000', 'orders': 9},
+            {'article': 'N323-13W', 'orders': 7},
+        ])
+
+        rows = result['merged_data']
+        self.assertEqual([row['article'] for row in rows], ['999-00000', 'N323-13W', '375-42108'])
+        self.assertIsNone(rows[0]['product_name'])
+        self.assertTrue(rows[0]['needs_registration'])
+        self.assertEqual((rows[2]['current_stock'], rows[2]['has_duplicates']), (1.0, True))
+        self.assertIsInstance(rows[2]['production_priority'], int)
+        self.assertEqual((result['found_products'], result['coverage_rate']), (2, 66.7))
+
+    def test_merge_without_articles_raises(self):
+        """Тест: данные без артикулов - ошибка."""
+        with self.assertRaises(ValueError):
+            self.engine.merge([{'article': ''}, {'orders': 5}])
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class TochkaParseCacheTest(TestCase):
+    """Тесты кэша разбора Excel файла по хэшу."""
+
+    def setUp(self):
+        cache.clear()
+        self.factory = APIRequestFactory()
+        self.file_content = build_excel([
+            ['375-42108', 3],
+            ['375-42108', 2],
+            ['N323-13W', 1],
+        ])
+
+    def test_service_parse_skipped_for_same_file(self):
+        """Тест: повторный разбор того же файла берется из кэша."""
+        service = TochkaProcessingService()
+        first = service.parse_file(self.file_content)
+
+        with mock.patch('apps.products.services.tochka_processor.read_tochka_table') as read_table:
+            second = service.parse_file(self.file_content)
+
+        read_table.assert_not_called()
+        self.assertFalse(first['parse_cached'])
+        self.assertTrue(second['parse_cached'])
+        self.assertEqual(second['data'], first['data'])
+        self.assertEqual(second['columns_found'], {
+            'article_column': 'Артикул товара',
+            'orders_column': 'Заказов, шт.'
+        })
+
+    def test_upload_endpoint_uses_cached_parse(self):
+        """Тест: повторная загрузка файла не разбирает Excel заново."""
+        def upload():
+            request = self.factory.post(
+                '/api/v1/tochka/upload-excel/',
+                {'file': SimpleUploadedFile('tochka.xlsx', self.file_content)},
+                format='multipart'
+            )
+            return upload_excel_file_for_tochka(request)
+
+        first = upload()
+        with mock.patch('apps.api.v1.tochka_views.read_tochka_table') as read_table:
+            second = upload()
+
+        read_table.assert_not_called()
+        self.assertEqual(second.status_code, 200)
+        self.assertFalse(first.data['parse_cached'])
+        self.assertTrue(second.data['parse_cached'])
+        self.assertEqual(second.data['data'], first.data['data'])
+        self.assertEqual(second.data['duplicates_merged'], 1)
+
+
+class ArticleIndexTest(TestCase):
+    """Тесты нечеткого поиска артикулов для несовпавших позиций Точки."""
+
+    def setUp(self):
+        self.index = ArticleIndex([
+            (1, '375-42108'),
+            (2, 'N323-13W'),
+            (3, '375-42109'),
+            (4, '999-11111'),
+            (5, ''),
+        ])
+
+    def test_typo_and_suffix_candidates(self):
+        """Тест: опечатка и суффикс цвета находят исходный артикул."""
+        typo = self.index.search('375-42180')
+        self.assertEqual(typo[0]['article'], '375-42108')
+
+        suffix = self.index.search('N323-13W-BLK')
+        self.assertEqual(suffix[0], {'article': 'N323-13W', 'product_id': 2, 'score': 0.8})
+
+        case = self.index.search('n323-13w')
+        self.assertEqual(case[0]['score'], 1.0)
+
+    def test_limit_and_threshold(self):
+        """Тест: количество кандидатов ограничено, непохожие отсеиваются."""
+        self.assertEqual(len(self.index.search('375-4210', limit=1)), 1)
+        self.assertEqual(self.index.search('ABCDEF'), [])
+        self.assertNotIn('', self.index)
+        self.assertIn('999-11111', self.index)
+
+    def test_index_rebuilt_after_products_change(self):
+        """Тест: индекс пересобирается при изменении товаров."""
+        Product.objects.create(moysklad_id='index-1', article='375-42108', name='Товар')
+        self.assertIn('375-42108', get_article_index())
+
+        Product.objects.create(moysklad_id='index-2', article='N323-13W', name='Товар 2')
+        self.assertIn('N323-13W', get_article_index())
+
+    def test_merge_engine_returns_unmatched_candidates(self):
+        """Тест: несовпавшие артикулы Точки возвращаются с кандидатами."""
+        Product.objects.create(moysklad_id='index-3', article='375-42108', name='Товар')
+
+        unmatched = TochkaMergeEngine().find_unmatched_articles([
+            {'article': '375-42108', 'orders': 1},
+            {'article': '375-42180', 'orders': 4},
+        ])
+
+        self.assertEqual(len(unmatched), 1)
+        self.assertEqual(unmatched[0]['article'], '375-42180')
+        self.assertEqual(unmatched[0]['orders'], 4)
+        self.assertEqual(unmatched[0]['candidates'][0]['article'], '375-42108')
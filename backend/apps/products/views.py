@@ -5,22 +5,43 @@ from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
 from django.db.models import Q, Count, Sum, Value
 from django.db.models.functions import Lower
+from django.utils.decorators import method_decorator
+from apps.core.data_version import bump_data_version, conditional_on_data_version
+from apps.core.pagination import KeysetPagination
+from apps.core.renderers import ORJSONRenderer
 from .models import Product
 from .serializers import ProductListSerializer, ProductDetailSerializer, ProductStatsSerializer
+from .services.product_search import is_postgresql, search_products
+from .services.recalculation import recalculate_all_products
 # from .services import ProductionService  # Circular import fix
 from apps.sync.models import ProductionList
 from apps.sync.services import SyncService
 
+@method_decorator(conditional_on_data_version, name='dispatch')
 class ProductListView(generics.ListAPIView):
     """
     List view for products with filtering and search.
     Supports include_reserve parameter for calculating effective stock.
+    
+    Page-number pagination by default; ?pagination=cursor (or a cursor
+    parameter) switches to keyset pagination for infinite scroll.
     """
     serializer_class = ProductListSerializer
+    renderer_classes = [ORJSONRenderer]
     # # permission_classes = [IsAuthenticated]  # Временно отключено  # Временно отключено для разработки
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ['product_type', 'product_group_id']
     
+    @property
+    def paginator(self):
+        if not hasattr(self, '_paginator'):
+            params = self.request.query_params
+            if params.get('pagination') == 'cursor' or 'cursor' in params:
+                self._paginator = KeysetPagination()
+            else:
+                self._paginator = self.pagination_class() if self.pagination_class else None
+        return self._paginator
+    
     def get_serializer_context(self):
         """Pass include_reserve flag to serializer context."""
         context = super().get_serializer_context()
@@ -31,57 +52,14 @@ class ProductListView(generics.ListAPIView):
     def get_queryset(self):
         queryset = Product.objects.select_related().prefetch_related('images')
         
-        # Search functionality - universal case-insensitive search
+        # Search: full-text + trigram on PostgreSQL, icontains elsewhere.
+        # Without explicit ordering results are ranked by relevance
+        # (not in cursor mode - keyset pagination needs plain columns)
         search = self.request.query_params.get('search', None)
+        ordering = self.request.query_params.get('ordering', None)
+        rank_search = bool(search) and not ordering and not isinstance(self.paginator, KeysetPagination)
         if search:
-            from django.db import connection
-            
-            if connection.vendor == 'sqlite':
-                # Для SQLite используем комбинированный подход
-                # 1. Обычный icontains для латиницы
-                # 2. Ручной поиск для кириллицы
-                
-                # Сначала пробуем обычный icontains
-                base_queryset = queryset.filter(
-                    Q(article__icontains=search) | 
-                    Q(name__icontains=search) |
-                    Q(description__icontains=search)
-                )
-                
-                # Если поиск содержит кириллицу, добавляем дополнительную логику
-                if any('\u0400' <= char <= '\u04FF' for char in search):
-                    # Получаем все товары для фильтрации в Python
-                    all_products = list(queryset.values('id', 'article', 'name', 'description'))
-                    search_lower = search.lower()
-                    
-                    matching_ids = []
-                    for product in all_products:
-                        # Проверяем каждое поле на регистронезависимое вхождение
-                        fields_to_check = [
-                            (product.get('article') or '').lower(),
-                            (product.get('name') or '').lower(),
-                            (product.get('description') or '').lower()
-                        ]
-                        
-                        if any(search_lower in field for field in fields_to_check):
-                            matching_ids.append(product['id'])
-                    
-                    # Объединяем результаты
-                    if matching_ids:
-                        cyrillic_queryset = queryset.filter(id__in=matching_ids)
-                        # Объединяем с base_queryset и убираем дубликаты
-                        queryset = (base_queryset | cyrillic_queryset).distinct()
-                    else:
-                        queryset = base_queryset
-                else:
-                    queryset = base_queryset
-            else:
-                # Для PostgreSQL и других БД используем стандартный icontains
-                queryset = queryset.filter(
-                    Q(article__icontains=search) | 
-                    Q(name__icontains=search) |
-                    Q(description__icontains=search)
-                )
+            queryset = search_products(queryset, search, ranked=rank_search)
         
         # Stock filters
         min_stock = self.request.query_params.get('min_stock', None)
@@ -114,7 +92,6 @@ class ProductListView(generics.ListAPIView):
             queryset = queryset.filter(images__isnull=True)
         
         # Sorting
-        ordering = self.request.query_params.get('ordering', None)
         if ordering:
             # Допустимые поля для сортировки
             allowed_fields = [
@@ -131,12 +108,13 @@ class ProductListView(generics.ListAPIView):
             else:
                 # Если поле не разрешено, используем сортировку по умолчанию
                 queryset = queryset.order_by('-production_priority', 'article')
-        else:
+        elif not (rank_search and is_postgresql()):
             # Сортировка по умолчанию
             queryset = queryset.order_by('-production_priority', 'article')
         
         return queryset
 
+@method_decorator(conditional_on_data_version, name='dispatch')
 class ProductDetailView(generics.RetrieveAPIView):
     """
     Detail view for a single product.
@@ -145,6 +123,7 @@ class ProductDetailView(generics.RetrieveAPIView):
     serializer_class = ProductDetailSerializer
     # permission_classes = [IsAuthenticated]  # Временно отключено
 
+@conditional_on_data_version
 @api_view(['GET'])
 # @permission_classes([IsAuthenticated])  # Временно отключено
 def product_stats(request):
@@ -224,6 +203,7 @@ def calculate_production_list(request):
             min_priority=min_priority,
             apply_coefficients=apply_coefficients
         )
+        bump_data_version()
         
         return Response({
             'message': 'Production list calculated successfully',
@@ -237,6 +217,7 @@ def calculate_production_list(request):
             'error': str(e)
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+@conditional_on_data_version
 @api_view(['GET'])
 # @permission_classes([IsAuthenticated])  # Временно отключено
 def get_production_list(request, list_id=None):
@@ -308,6 +289,7 @@ def get_production_list(request, list_id=None):
             'error': 'Production list not found'
         }, status=status.HTTP_404_NOT_FOUND)
 
+@conditional_on_data_version
 @api_view(['GET'])
 # @permission_classes([IsAuthenticated])  # Временно отключено
 def production_stats(request):
@@ -325,8 +307,7 @@ def recalculate_production(request):
     Recalculate production needs for all products.
     """
     try:
-        production_service = ProductionService()
-        result = production_service.recalculate_all_products()
+        result = recalculate_all_products()
         
         return Response({
             'message': 'Production recalculation completed',
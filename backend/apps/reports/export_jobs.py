@@ -0,0 +1,257 @@
+"""
+Background exports (XLSX, CSV, Parquet) with artefact reuse.
+
+An export request is reduced to its export type and the filters that
+affect the file. Together with the current products data version they
+form a cache key: a finished export with the same key is returned as-is,
+an export in progress with the same key is shared, otherwise a new job is
+queued and the file is generated by a Celery worker into media storage.
+
+Old artefacts are evicted by age and by total size (least recently
+downloaded first), see evict_export_artefacts(). Jobs left pending or
+processing for longer than EXPORT_JOB_TIMEOUT (a killed worker, a task
+that was never queued) are marked failed, so they are not reused and
+are evicted like other failed jobs.
+"""
+import hashlib
+import json
+import logging
+import tempfile
+from datetime import timedelta
+from typing import Dict, Optional, Tuple
+from django.conf import settings
+from django.core.files import File
+from django.db.models import Count, Max
+from django.utils import timezone
+from apps.products.models import Product
+from apps.products.services.product_search import search_products
+from .exporters import ProductsExporter
+from .models import ExportJob
+
+logger = logging.getLogger(__name__)
+
+# Artefacts older than this are deleted (seconds)
+EXPORT_ARTEFACT_MAX_AGE = getattr(settings, 'EXPORT_ARTEFACT_MAX_AGE', 24 * 60 * 60)
+
+# Total size of kept artefacts (bytes)
+EXPORT_ARTEFACT_MAX_TOTAL_SIZE = getattr(settings, 'EXPORT_ARTEFACT_MAX_TOTAL_SIZE', 500 * 1024 * 1024)
+
+# Longest time an export may stay pending or processing (seconds),
+# also the time limit of the export task
+EXPORT_JOB_TIMEOUT = getattr(settings, 'EXPORT_JOB_TIMEOUT', 30 * 60)
+
+# Query parameters that change the contents of the products export
+PRODUCTS_FILTER_PARAMS = ('product_type', 'production_needed', 'min_priority', 'search')
+
+
+def get_export_params(export_type: str, query) -> Dict[str, str]:
+    """
+    Keep only the filters that affect the exported file.
+
+    Unrelated query parameters (auth_token, cache busters) must not
+    produce a different cache key. The file format is kept unless it
+    is the default xlsx.
+    """
+    params = {}
+    if export_type == 'products':
+        params = {
+            name: query.get(name)
+            for name in PRODUCTS_FILTER_PARAMS
+            if query.get(name)
+        }
+
+    file_format = query.get('format', 'xlsx')
+    if file_format != 'xlsx':
+        params['format'] = file_format
+    return params
+
+
+def build_export_queryset(export_type: str, params: Dict[str, str]):
+    """
+    Build the products queryset for an export.
+    """
+    if export_type == 'production_list':
+        queryset = Product.objects.filter(production_needed__gt=0)
+        return queryset.order_by('-production_priority', 'article')
+
+    queryset = Product.objects.all()
+
+    product_type = params.get('product_type')
+    if product_type:
+        queryset = queryset.filter(product_type=product_type)
+
+    if params.get('production_needed') == 'true':
+        queryset = queryset.filter(production_needed__gt=0)
+
+    min_priority = params.get('min_priority')
+    if min_priority:
+        try:
+            queryset = queryset.filter(production_priority__gte=int(min_priority))
+        except ValueError:
+            pass
+
+    search = params.get('search')
+    if search:
+        queryset = search_products(queryset, search, ranked=False)
+
+    return queryset.order_by('-production_priority', 'article')
+
+
+def get_products_data_version() -> str:
+    """
+    Products data version: changes whenever a product is added,
+    removed or updated.
+    """
+    stats = Product.objects.aggregate(count=Count('id'), last_update=Max('updated_at'))
+    last_update = stats['last_update'].isoformat() if stats['last_update'] else '-'
+    return f"{stats['count']}:{last_update}"
+
+
+def get_export_cache_key(export_type: str, params: Dict[str, str], data_version: str) -> str:
+    payload = json.dumps([export_type, params, data_version], sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def expire_stale_export_jobs(queryset=None) -> int:
+    """
+    Mark jobs pending or processing for longer than EXPORT_JOB_TIMEOUT as failed.
+
+    Returns:
+        Number of expired jobs
+    """
+    queryset = ExportJob.objects.all() if queryset is None else queryset
+    now = timezone.now()
+    expired = queryset.filter(
+        status__in=['pending', 'processing'],
+        updated_at__lt=now - timedelta(seconds=EXPORT_JOB_TIMEOUT)
+    ).update(
+        status='failed',
+        error_details='Export job timed out',
+        finished_at=now,
+        updated_at=now,
+    )
+    if expired:
+        logger.warning(f"Marked {expired} stuck export jobs as failed")
+    return expired
+
+
+def get_or_create_export_job(export_type: str, params: Dict[str, str]) -> Tuple[ExportJob, bool]:
+    """
+    Return a reusable export job or queue a new one.
+
+    Returns:
+        (job, cached) - cached is True when a finished artefact is reused
+    """
+    from .tasks import generate_export_task
+
+    data_version = get_products_data_version()
+    cache_key = get_export_cache_key(export_type, params, data_version)
+
+    expire_stale_export_jobs(ExportJob.objects.filter(cache_key=cache_key))
+    existing = ExportJob.objects.filter(
+        cache_key=cache_key,
+        status__in=['pending', 'processing', 'success']
+    ).first()
+
+    if existing and existing.status != 'success':
+        return existing, False
+
+    if existing and existing.file and existing.file.storage.exists(existing.file.name):
+        existing.last_accessed_at = timezone.now()
+        existing.save(update_fields=['last_accessed_at', 'updated_at'])
+        return existing, True
+
+    job = ExportJob.objects.create(
+        export_type=export_type,
+        params=params,
+        data_version=data_version,
+        cache_key=cache_key,
+    )
+    try:
+        generate_export_task.delay(str(job.job_id))
+    except Exception as e:
+        logger.error(f"Could not queue export job {job.job_id}: {e}")
+        job.status = 'failed'
+        job.error_details = f'Could not queue export: {e}'
+        job.finished_at = timezone.now()
+        job.save()
+        raise
+    job.refresh_from_db()
+
+    return job, False
+
+
+def run_export_job(job: ExportJob) -> ExportJob:
+    """
+    Generate the export file and store it in media storage.
+    """
+    job.status = 'processing'
+    job.save(update_fields=['status', 'updated_at'])
+
+    exporter = ProductsExporter()
+    file_format = job.params.get('format', 'xlsx')
+    try:
+        queryset = build_export_queryset(job.export_type, job.params)
+        with tempfile.TemporaryFile() as output:
+            exporter.write(queryset, output, file_format)
+            output.seek(0)
+
+            job.file_name = exporter.filename(file_format)
+            job.file.save(f'{job.job_id}.{file_format}', File(output), save=False)
+
+        job.file_size = job.file.size
+        job.status = 'success'
+    except Exception as e:
+        logger.error(f"Export job {job.job_id} failed: {e}")
+        job.status = 'failed'
+        job.error_details = str(e)
+
+    job.finished_at = timezone.now()
+    job.last_accessed_at = job.finished_at
+    job.save()
+
+    return job
+
+
+def delete_export_job(job: ExportJob):
+    """
+    Delete a job together with its file.
+    """
+    if job.file:
+        job.file.delete(save=False)
+    job.delete()
+
+
+def evict_export_artefacts(max_age: Optional[int] = None, max_total_size: Optional[int] = None) -> int:
+    """
+    Expire stuck jobs, delete finished exports older than max_age
+    seconds, then the least recently used artefacts until the rest fits
+    into max_total_size bytes.
+
+    Returns:
+        Number of deleted jobs
+    """
+    max_age = EXPORT_ARTEFACT_MAX_AGE if max_age is None else max_age
+    max_total_size = EXPORT_ARTEFACT_MAX_TOTAL_SIZE if max_total_size is None else max_total_size
+
+    expire_stale_export_jobs()
+    deleted = 0
+
+    expired = ExportJob.objects.filter(
+        status__in=['success', 'failed'],
+        finished_at__lt=timezone.now() - timedelta(seconds=max_age)
+    )
+    for job in expired:
+        delete_export_job(job)
+        deleted += 1
+
+    total_size = 0
+    for job in ExportJob.objects.filter(status='success').order_by('-last_accessed_at', '-finished_at'):
+        total_size += job.file_size
+        if total_size > max_total_size:
+            delete_export_job(job)
+            deleted += 1
+
+    if deleted:
+        logger.info(f"Evicted {deleted} export artefacts")
+    return deleted
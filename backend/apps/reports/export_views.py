@@ -1,12 +1,12 @@
 """
 Export views that support authentication via query parameters.
 """
-from django.http import HttpResponse, JsonResponse
-from django.views import View
-from django.db import models
+from django.http import FileResponse, JsonResponse
+from django.utils import timezone
 from rest_framework.authtoken.models import Token
-from apps.products.models import Product
-from .exporters import ProductsExporter
+from .export_jobs import get_export_params, get_or_create_export_job
+from .exporters import EXPORT_FORMATS, HAS_PYARROW
+from .models import ExportJob
 
 
 def authenticate_from_query(request):
@@ -38,61 +38,107 @@ def authenticate_from_query(request):
         return None
 
 
+def serialize_export_job(job, cached=False):
+    """
+    Build the export job status payload.
+    """
+    data = {
+        'job_id': str(job.job_id),
+        'export_type': job.export_type,
+        'status': job.status,
+        'ready': job.status in ['success', 'failed'],
+        'cached': cached,
+        'file_name': job.file_name,
+        'file_size': job.file_size,
+        'created_at': job.created_at.isoformat(),
+        'finished_at': job.finished_at.isoformat() if job.finished_at else None,
+        'download_url': None,
+    }
+
+    if job.status == 'success':
+        data['download_url'] = f'/api/v1/reports/export/jobs/{job.job_id}/download/'
+    elif job.status == 'failed':
+        data['error'] = job.error_details
+
+    return data
+
+
+def start_export(request, export_type):
+    """
+    Return a ready artefact for identical requests or queue a new export job.
+    """
+    user = authenticate_from_query(request)
+    if not user:
+        return JsonResponse({'detail': 'Authentication required'}, status=401)
+
+    params = get_export_params(export_type, request.GET)
+
+    file_format = params.get('format', 'xlsx')
+    if file_format not in EXPORT_FORMATS:
+        return JsonResponse({'detail': f'Unsupported export format: {file_format}'}, status=400)
+    if file_format == 'parquet' and not HAS_PYARROW:
+        return JsonResponse({'detail': 'Parquet export requires pyarrow'}, status=400)
+
+    job, cached = get_or_create_export_job(export_type, params)
+
+    status = 200 if job.status == 'success' else 202
+    return JsonResponse(serialize_export_job(job, cached=cached), status=status)
+
+
 def export_products_excel(request):
     """
-    Export products to Excel with query parameter authentication.
+    Start products export (filters and format are taken from query params).
+    """
+    return start_export(request, 'products')
+
+
+def export_production_list_excel(request, list_id=None):
+    """
+    Start production list export (format is taken from query params).
+    """
+    return start_export(request, 'production_list')
+
+
+def export_job_status(request, job_id):
+    """
+    Poll export job status.
     """
-    # Authenticate
     user = authenticate_from_query(request)
     if not user:
         return JsonResponse({'detail': 'Authentication required'}, status=401)
-    
-    # Apply filters from query params
-    queryset = Product.objects.all()
-    
-    product_type = request.GET.get('product_type')
-    if product_type:
-        queryset = queryset.filter(product_type=product_type)
-    
-    production_needed = request.GET.get('production_needed')
-    if production_needed == 'true':
-        queryset = queryset.filter(production_needed__gt=0)
-    
-    min_priority = request.GET.get('min_priority')
-    if min_priority:
-        try:
-            queryset = queryset.filter(production_priority__gte=int(min_priority))
-        except ValueError:
-            pass
-    
-    search = request.GET.get('search')
-    if search:
-        queryset = queryset.filter(
-            models.Q(article__icontains=search) | 
-            models.Q(name__icontains=search)
-        )
-    
-    # Order by priority
-    queryset = queryset.order_by('-production_priority', 'article')
-    
-    # Export
-    exporter = ProductsExporter()
-    return exporter.export_products(queryset)
 
+    try:
+        job = ExportJob.objects.get(job_id=job_id)
+    except ExportJob.DoesNotExist:
+        return JsonResponse({'detail': 'Export job not found'}, status=404)
 
-def export_production_list_excel(request):
+    return JsonResponse(serialize_export_job(job))
+
+
+def download_export(request, job_id):
     """
-    Export production list to Excel with query parameter authentication.
+    Download the generated export file.
     """
-    # Authenticate
     user = authenticate_from_query(request)
     if not user:
         return JsonResponse({'detail': 'Authentication required'}, status=401)
-    
-    # Get products that need production
-    queryset = Product.objects.filter(production_needed__gt=0)
-    queryset = queryset.order_by('-production_priority', 'article')
-    
-    # Export
-    exporter = ProductsExporter()
-    return exporter.export_products(queryset)
\ No newline at end of file
+
+    try:
+        job = ExportJob.objects.get(job_id=job_id)
+    except ExportJob.DoesNotExist:
+        return JsonResponse({'detail': 'Export job not found'}, status=404)
+
+    if job.status != 'success' or not job.file:
+        return JsonResponse(serialize_export_job(job), status=409)
+
+    if not job.file.storage.exists(job.file.name):
+        return JsonResponse({'detail': 'Export file has expired'}, status=410)
+
+    job.last_accessed_at = timezone.now()
+    job.save(update_fields=['last_accessed_at', 'updated_at'])
+
+    return FileResponse(
+        job.file.open('rb'),
+        as_attachment=True,
+        filename=job.file_name
+    )
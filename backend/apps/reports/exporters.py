@@ -1,211 +1,526 @@
 """
-Excel exporters for PrintFarm production system.
+Exporters for PrintFarm production system.
+
+Excel exports use openpyxl write-only mode: rows are written to a temporary
+file as they are produced and the finished file is streamed to the client,
+so memory stays flat regardless of the number of rows.
+
+CSV and Parquet exports are meant for downstream scripts. They follow the
+same column schema (ExportColumn) as the Excel exports, with column field
+names as headers and raw values instead of formatted ones.
 """
+import csv
 import io
+import tempfile
 from datetime import datetime
+from typing import Any, Callable, Iterable, Iterator, List, NamedTuple, Optional, Sequence
 from openpyxl import Workbook
-from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font, PatternFill, Alignment, Border, Side, NamedStyle
 from openpyxl.utils import get_column_letter
-from django.http import HttpResponse
+from django.db.models import Count, Max, Q, Sum
+from django.db.models.functions import Length
+from django.http import FileResponse, StreamingHttpResponse
+from django.utils.http import content_disposition_header
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+XLSX_CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+CSV_CONTENT_TYPE = 'text/csv; charset=utf-8'
+PARQUET_CONTENT_TYPE = 'application/vnd.apache.parquet'
+
+EXPORT_FORMATS = ('xlsx', 'csv', 'parquet')
+
+# Rows are fetched from the database in chunks of this size
+EXPORT_CHUNK_SIZE = 2000
+
+
+class ExportColumn(NamedTuple):
+    """
+    Column shared by the XLSX, CSV and Parquet exports.
+
+    kind is one of 'str', 'int', 'float', 'bool', 'datetime'. display,
+    if set, formats the value for Excel; CSV and Parquet get it raw.
+    """
+    field: str
+    title: str
+    width: int = 15
+    kind: str = 'str'
+    display: Optional[Callable[[Any], Any]] = None
+
+
+TOCHKA_PRODUCT_TYPE_LABELS = {
+    'new': 'Новый',
+    'old': 'Старый',
+    'critical': 'Критичный',
+}
+
+
+def _yes_no(value) -> str:
+    return 'Да' if value else 'Нет'
+
+
+def _tochka_product_type(value) -> str:
+    return TOCHKA_PRODUCT_TYPE_LABELS.get(value, value)
+
+
+PRODUCT_EXPORT_COLUMNS = [
+    ExportColumn('article', 'Артикул', 15),
+    ExportColumn('name', 'Название', 40),
+    ExportColumn('product_type', 'Тип', 12),
+    ExportColumn('product_group_name', 'Группа', 25),
+    ExportColumn('current_stock', 'Текущий\nостаток', 12, 'float'),
+    ExportColumn('sales_last_2_months', 'Продажи\nза 2 мес.', 12, 'float'),
+    ExportColumn('average_daily_consumption', 'Средн.\nпотр./день', 12, 'float'),
+    ExportColumn('days_of_stock', 'Дней\nостатка', 10, 'float'),
+    ExportColumn('production_needed', 'Нужно\nпроизвести', 12, 'float'),
+    ExportColumn('production_priority', 'Приоритет', 10, 'int'),
+    ExportColumn('last_synced_at', 'Последняя\nсинхронизация', 18, 'datetime'),
+]
+
+TOCHKA_DEDUPLICATED_COLUMNS = [
+    ExportColumn('article', 'Артикул'),
+    ExportColumn('orders', 'Заказов (шт.)', kind='int'),
+    ExportColumn('row_number', 'Номер строки', kind='int'),
+    ExportColumn('has_duplicates', 'Есть дубликаты', kind='bool', display=_yes_no),
+    ExportColumn('duplicate_rows', 'Строки дубликатов'),
+]
+
+TOCHKA_PRODUCTION_COLUMNS = [
+    ExportColumn('article', 'Артикул'),
+    ExportColumn('product_name', 'Название товара'),
+    ExportColumn('production_needed', 'К производству (шт.)', kind='float'),
+    ExportColumn('production_priority', 'Приоритет', kind='int'),
+    ExportColumn('current_stock', 'Текущий остаток', kind='float'),
+    ExportColumn('product_type', 'Тип товара', display=_tochka_product_type),
+    ExportColumn('sales_last_2_months', 'Продажи за 2 мес.', kind='float'),
+    ExportColumn('orders_in_tochka', 'Заказов в Точке', kind='int'),
+]
+
+TOCHKA_MERGE_COLUMNS = [
+    ExportColumn('article', 'Артикул'),
+    ExportColumn('product_name', 'Название товара'),
+    ExportColumn('product_type', 'Тип товара'),
+    ExportColumn('current_stock', 'Текущий остаток', kind='float'),
+    ExportColumn('sales_last_2_months', 'Продажи за 2 мес.', kind='float'),
+    ExportColumn('production_needed', 'К производству (шт.)', kind='float'),
+    ExportColumn('production_priority', 'Приоритет', kind='int'),
+    ExportColumn('days_of_stock', 'Дней остатка', kind='float'),
+    ExportColumn('orders_in_tochka', 'Заказов в Точке', kind='int'),
+    ExportColumn('is_in_tochka', 'Есть в Точке', kind='bool'),
+    ExportColumn('needs_registration', 'Требует регистрации', kind='bool'),
+]
+
+
+def compute_column_widths(rows: Iterable[Sequence[Any]], headers: Sequence[str],
+                          max_width: int = 50, padding: int = 2) -> List[int]:
+    """
+    Compute column widths from the longest value in each column.
+    """
+    lengths = [len(str(header)) for header in headers]
+    for row in rows:
+        for index, value in enumerate(row):
+            length = len(str(value)) if value is not None else 0
+            if length > lengths[index]:
+                lengths[index] = length
+    return [min(length + padding, max_width) for length in lengths]
+
+
+def _to_number(value, number_type):
+    if value is None or value == '':
+        return None
+    try:
+        return number_type(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class TableExporter:
+    """
+    CSV and Parquet export of rows that follow an ExportColumn schema.
+
+    Rows are sequences in column order and are consumed lazily, so a
+    queryset iterator can be exported without loading it into memory.
+    """
+
+    def __init__(self, columns: Sequence[ExportColumn]):
+        self.columns = columns
+
+    def _convert(self, row: Sequence[Any]) -> List[Any]:
+        values = []
+        for column, value in zip(self.columns, row):
+            if column.kind == 'float':
+                value = _to_number(value, float)
+            elif column.kind == 'int':
+                value = _to_number(value, int)
+            elif column.kind == 'bool' and value is not None:
+                value = bool(value)
+            elif column.kind == 'str' and value is not None:
+                value = str(value)
+            values.append(value)
+        return values
+
+    def _chunks(self, rows: Iterable[Sequence[Any]], chunk_rows: int) -> Iterator[List[List[Any]]]:
+        chunk = []
+        for row in rows:
+            chunk.append(self._convert(row))
+            if len(chunk) == chunk_rows:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    def iter_csv(self, rows: Iterable[Sequence[Any]], chunk_rows: int = EXPORT_CHUNK_SIZE) -> Iterator[str]:
+        """
+        Yield CSV text in chunks of chunk_rows rows, starting with the header.
+        """
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow([column.field for column in self.columns])
+
+        for chunk in self._chunks(rows, chunk_rows):
+            writer.writerows(
+                [value.isoformat() if isinstance(value, datetime) else value for value in row]
+                for row in chunk
+            )
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+
+        if buffer.tell():
+            yield buffer.getvalue()
+
+    def write_csv(self, rows: Iterable[Sequence[Any]], output):
+        for text in self.iter_csv(rows):
+            output.write(text.encode('utf-8'))
+
+    def csv_response(self, rows: Iterable[Sequence[Any]], filename: str) -> StreamingHttpResponse:
+        """
+        Stream CSV to the client while rows are being produced.
+        """
+        response = StreamingHttpResponse(
+            (text.encode('utf-8') for text in self.iter_csv(rows)),
+            content_type=CSV_CONTENT_TYPE
+        )
+        response['Content-Disposition'] = content_disposition_header(True, filename)
+        return response
+
+    def parquet_schema(self):
+        types = {
+            'str': pa.string(),
+            'int': pa.int64(),
+            'float': pa.float64(),
+            'bool': pa.bool_(),
+            'datetime': pa.timestamp('us', tz='UTC'),
+        }
+        return pa.schema([(column.field, types[column.kind]) for column in self.columns])
+
+    def write_parquet(self, rows: Iterable[Sequence[Any]], output, chunk_rows: int = EXPORT_CHUNK_SIZE):
+        """
+        Write rows as Parquet, one row group per chunk.
+        """
+        if not HAS_PYARROW:
+            raise RuntimeError('Parquet export requires pyarrow')
+
+        schema = self.parquet_schema()
+        with pq.ParquetWriter(output, schema) as writer:
+            written = False
+            for chunk in self._chunks(rows, chunk_rows):
+                columns = list(zip(*chunk))
+                writer.write_table(pa.Table.from_arrays(
+                    [pa.array(values, type=field.type) for values, field in zip(columns, schema)],
+                    schema=schema
+                ))
+                written = True
+            if not written:
+                writer.write_table(schema.empty_table())
+
+    def parquet_response(self, rows: Iterable[Sequence[Any]], filename: str) -> FileResponse:
+        output = tempfile.TemporaryFile()
+        self.write_parquet(rows, output)
+        output.seek(0)
+        return FileResponse(
+            output,
+            as_attachment=True,
+            filename=filename,
+            content_type=PARQUET_CONTENT_TYPE
+        )
+
+    def response(self, file_format: str, rows: Iterable[Sequence[Any]], filename: str):
+        if file_format == 'parquet':
+            return self.parquet_response(rows, filename)
+        return self.csv_response(rows, filename)
+
+
+class StreamingExcelWriter:
+    """
+    Write-only workbook with shared named styles and a streamed response.
+
+    Column widths and row heights must be set before the rows they apply to
+    are appended (write-only mode writes them ahead of the data).
+    """
+
+    def __init__(self, title: str, styles: Iterable[NamedStyle] = ()):
+        self.wb = Workbook(write_only=True)
+        self.ws = self.wb.create_sheet(title)
+        self.row_count = 0
+        for style in styles:
+            self.wb.add_named_style(style)
+
+    def set_column_widths(self, widths: Sequence[float]):
+        for col, width in enumerate(widths, 1):
+            self.ws.column_dimensions[get_column_letter(col)].width = width
+
+    def set_next_row_height(self, height: float):
+        self.ws.row_dimensions[self.row_count + 1].height = height
+
+    def cell(self, value: Any, style: Optional[str] = None) -> WriteOnlyCell:
+        cell = WriteOnlyCell(self.ws, value=value)
+        if style:
+            cell.style = style
+        return cell
+
+    def append(self, row: Sequence[Any] = ()):
+        self.ws.append(row)
+        self.row_count += 1
+
+    def merge(self, cell_range: str):
+        self.ws.merged_cells.add(cell_range)
+
+    def save(self, output):
+        """
+        Save the workbook to a path or a binary file object.
+        """
+        self.wb.save(output)
+
+    def response(self, filename: str) -> FileResponse:
+        """
+        Save the workbook to a temporary file and stream it in chunks.
+        """
+        output = tempfile.TemporaryFile()
+        self.save(output)
+        output.seek(0)
+        return FileResponse(
+            output,
+            as_attachment=True,
+            filename=filename,
+            content_type=XLSX_CONTENT_TYPE
+        )
+
 
 class ProductsExporter:
     """
     Export products list to Excel with PrintFarm branding.
     """
-    
+
+    headers = [(column.title, column.width) for column in PRODUCT_EXPORT_COLUMNS]
+
+    # Text columns sized by their longest value; the rest keep
+    # ExportColumn.width (numbers and labels have a known width)
+    measured_fields = ('article', 'name', 'product_group_name')
+
     def __init__(self):
-        self.wb = Workbook()
-        self.ws = self.wb.active
-        self.ws.title = "Товары"
-        
         # PrintFarm brand colors
         self.brand_color = "06EAFC"  # PrintFarm cyan
-        self.header_font = Font(bold=True, size=12, color="FFFFFF")
-        self.header_fill = PatternFill(start_color=self.brand_color, end_color=self.brand_color, fill_type="solid")
-        self.header_alignment = Alignment(horizontal="center", vertical="center", wrap_text=True)
-        
-        self.title_font = Font(bold=True, size=16, color="1E1E1E")
-        self.subtitle_font = Font(size=12, italic=True, color="595959")
-        
-        self.border = Border(
+
+        border = Border(
             left=Side(style='thin'),
             right=Side(style='thin'),
             top=Side(style='thin'),
             bottom=Side(style='thin')
         )
-        
-        # Type colors
-        self.type_fills = {
-            'new': PatternFill(start_color="E3F2FD", end_color="E3F2FD", fill_type="solid"),
-            'old': PatternFill(start_color="E8F5E9", end_color="E8F5E9", fill_type="solid"),
-            'critical': PatternFill(start_color="FFEBEE", end_color="FFEBEE", fill_type="solid"),
-        }
-        
-        # Number format
-        self.number_format = '#,##0.00'
-    
-    def export_products(self, products_queryset) -> HttpResponse:
+        number_format = '#,##0.00'
+
+        def style(name, **kwargs):
+            kwargs.setdefault('border', border)
+            return NamedStyle(name=name, **kwargs)
+
+        def fill(color):
+            return PatternFill(start_color=color, end_color=color, fill_type="solid")
+
+        right = Alignment(horizontal="right")
+        center = Alignment(horizontal="center")
+
+        # Shared styles - each cell references a style by name
+        # instead of carrying its own font/fill/border objects
+        self.styles = [
+            NamedStyle(name='pf_title', font=Font(bold=True, size=16, color="1E1E1E"),
+                       alignment=Alignment(horizontal="center", vertical="center")),
+            NamedStyle(name='pf_subtitle', font=Font(size=12, italic=True, color="595959")),
+            NamedStyle(name='pf_alert', font=Font(bold=True, color="FF0055")),
+            style('pf_header', font=Font(bold=True, size=12, color="FFFFFF"),
+                  fill=fill(self.brand_color),
+                  alignment=Alignment(horizontal="center", vertical="center", wrap_text=True)),
+            style('pf_text'),
+            style('pf_type_new', fill=fill("E3F2FD")),
+            style('pf_type_old', fill=fill("E8F5E9")),
+            style('pf_type_critical', fill=fill("FFEBEE")),
+            style('pf_number', number_format=number_format, alignment=right),
+            style('pf_number_production', number_format=number_format, alignment=right, fill=fill("FFFDE7")),
+            style('pf_consumption', number_format='#,##0.0000', alignment=right),
+            style('pf_days', number_format='#,##0.0', alignment=center),
+            style('pf_days_critical', number_format='#,##0.0', alignment=center,
+                  font=Font(bold=True, color="FF0055")),
+            style('pf_days_warning', number_format='#,##0.0', alignment=center, font=Font(color="FFB800")),
+            style('pf_center', alignment=center),
+            style('pf_priority_high', alignment=center, font=Font(bold=True, color="FF0055")),
+            style('pf_priority_medium', alignment=center, font=Font(color="FFB800")),
+            NamedStyle(name='pf_bold', font=Font(bold=True)),
+        ]
+
+    def export_products(self, products_queryset) -> FileResponse:
         """
         Export products to Excel file with formatting.
         """
-        # Add title
-        self.ws.merge_cells('A1:K1')
-        self.ws['A1'] = 'PRINTFARM - СПИСОК ТОВАРОВ'
-        self.ws['A1'].font = self.title_font
-        self.ws['A1'].alignment = Alignment(horizontal="center", vertical="center")
-        self.ws.row_dimensions[1].height = 30
-        
-        # Convert to list to handle both querysets and sliced querysets
-        products_list = list(products_queryset)
-        
-        # Add metadata
-        self.ws['A3'] = f'Дата выгрузки: {datetime.now().strftime("%d.%m.%Y %H:%M")}'
-        self.ws['A3'].font = self.subtitle_font
-        self.ws['A4'] = f'Всего товаров: {len(products_list)}'
-        self.ws['A4'].font = self.subtitle_font
-        
-        # Calculate statistics
-        total_stock = sum(float(p.current_stock) for p in products_list)
-        need_production = sum(1 for p in products_list if p.production_needed > 0)
-        critical_count = sum(1 for p in products_list if p.product_type == 'critical')
-        
-        self.ws['A5'] = f'Общий остаток: {total_stock:,.0f} ед.'
-        self.ws['A5'].font = self.subtitle_font
-        self.ws['A6'] = f'Требуют производства: {need_production} поз.'
-        self.ws['A6'].font = self.subtitle_font
-        self.ws['A7'] = f'Критических позиций: {critical_count}'
-        self.ws['A7'].font = Font(bold=True, color="FF0055")
-        
+        return self.build_workbook(products_queryset).response(self.filename())
+
+    def filename(self, file_format: str = 'xlsx') -> str:
+        return f'printfarm_products_{datetime.now().strftime("%Y%m%d_%H%M%S")}.{file_format}'
+
+    def write(self, products_queryset, output, file_format: str = 'xlsx'):
+        """
+        Write products in the given format to a binary file object.
+        """
+        if file_format == 'xlsx':
+            self.build_workbook(products_queryset).save(output)
+            return
+
+        table = TableExporter(PRODUCT_EXPORT_COLUMNS)
+        rows = self.product_rows(products_queryset)
+        if file_format == 'parquet':
+            table.write_parquet(rows, output)
+        else:
+            table.write_csv(rows, output)
+
+    def product_rows(self, products_queryset, named: bool = False) -> Iterator[tuple]:
+        """
+        Raw product values in PRODUCT_EXPORT_COLUMNS order, read through
+        a chunked cursor (server-side on PostgreSQL).
+        """
+        fields = [column.field for column in PRODUCT_EXPORT_COLUMNS]
+        return products_queryset.values_list(*fields, named=named).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+
+    def build_workbook(self, products_queryset) -> StreamingExcelWriter:
+        """
+        Write the formatted products sheet, ready to be saved.
+        """
+        writer = StreamingExcelWriter("Товары", self.styles)
+
+        # Statistics and text column lengths are calculated by the database
+        # in one query (write-only mode needs widths before any row),
+        # rows are streamed below
+        stats = products_queryset.aggregate(
+            total=Count('id'),
+            total_stock=Sum('current_stock'),
+            need_production=Count('id', filter=Q(production_needed__gt=0)),
+            critical_count=Count('id', filter=Q(product_type='critical')),
+            **{f'{field}_length': Max(Length(field)) for field in self.measured_fields},
+        )
+        writer.set_column_widths(self.column_widths(stats))
+        total_stock = float(stats['total_stock'] or 0)
+
+        # Title
+        writer.set_next_row_height(30)
+        writer.append([writer.cell('PRINTFARM - СПИСОК ТОВАРОВ', 'pf_title')])
+        writer.merge('A1:K1')
+        writer.append()
+
+        # Metadata
+        writer.append([writer.cell(f'Дата выгрузки: {datetime.now().strftime("%d.%m.%Y %H:%M")}', 'pf_subtitle')])
+        writer.append([writer.cell(f'Всего товаров: {stats["total"]}', 'pf_subtitle')])
+        writer.append([writer.cell(f'Общий остаток: {total_stock:,.0f} ед.', 'pf_subtitle')])
+        writer.append([writer.cell(f'Требуют производства: {stats["need_production"]} поз.', 'pf_subtitle')])
+        writer.append([writer.cell(f'Критических позиций: {stats["critical_count"]}', 'pf_alert')])
+        writer.append()
+
         # Headers
-        headers = [
-            ('Артикул', 15),
-            ('Название', 40),
-            ('Тип', 12),
-            ('Группа', 25),
-            ('Текущий\nостаток', 12),
-            ('Продажи\nза 2 мес.', 12),
-            ('Средн.\nпотр./день', 12),
-            ('Дней\nостатка', 10),
-            ('Нужно\nпроизвести', 12),
-            ('Приоритет', 10),
-            ('Последняя\nсинхронизация', 18)
-        ]
-        
-        row_start = 9
-        for col, (header, width) in enumerate(headers, 1):
-            cell = self.ws.cell(row=row_start, column=col, value=header)
-            cell.font = self.header_font
-            cell.fill = self.header_fill
-            cell.alignment = self.header_alignment
-            cell.border = self.border
-            self.ws.column_dimensions[get_column_letter(col)].width = width
-        
-        self.ws.row_dimensions[row_start].height = 40
-        
-        # Data
-        for row_num, product in enumerate(products_list, row_start + 1):
-            # Article
-            self.ws.cell(row=row_num, column=1, value=product.article).border = self.border
-            
-            # Name
-            self.ws.cell(row=row_num, column=2, value=product.name).border = self.border
-            
-            # Type
-            type_cell = self.ws.cell(row=row_num, column=3, value=self._get_product_type_display(product.product_type))
-            type_cell.border = self.border
-            if product.product_type in self.type_fills:
-                type_cell.fill = self.type_fills[product.product_type]
-            
-            # Group
-            self.ws.cell(row=row_num, column=4, value=product.product_group_name or '-').border = self.border
-            
-            # Current stock
-            stock_cell = self.ws.cell(row=row_num, column=5, value=float(product.current_stock))
-            stock_cell.border = self.border
-            stock_cell.number_format = self.number_format
-            stock_cell.alignment = Alignment(horizontal="right")
-            
-            # Sales last 2 months
-            sales_cell = self.ws.cell(row=row_num, column=6, value=float(product.sales_last_2_months))
-            sales_cell.border = self.border
-            sales_cell.number_format = self.number_format
-            sales_cell.alignment = Alignment(horizontal="right")
-            
-            # Average daily consumption
-            consumption_cell = self.ws.cell(row=row_num, column=7, value=float(product.average_daily_consumption))
-            consumption_cell.border = self.border
-            consumption_cell.number_format = '#,##0.0000'
-            consumption_cell.alignment = Alignment(horizontal="right")
-            
-            # Days of stock
-            days_cell = self.ws.cell(row=row_num, column=8)
-            if product.days_of_stock is not None:
-                days_cell.value = float(product.days_of_stock)
-                days_cell.number_format = '#,##0.0'
-                if product.days_of_stock < 5:
-                    days_cell.font = Font(bold=True, color="FF0055")
-                elif product.days_of_stock < 10:
-                    days_cell.font = Font(color="FFB800")
-            else:
-                days_cell.value = '-'
-            days_cell.border = self.border
-            days_cell.alignment = Alignment(horizontal="center")
-            
-            # Production needed
-            prod_cell = self.ws.cell(row=row_num, column=9, value=float(product.production_needed))
-            prod_cell.border = self.border
-            prod_cell.number_format = self.number_format
-            prod_cell.alignment = Alignment(horizontal="right")
-            if product.production_needed > 0:
-                prod_cell.fill = PatternFill(start_color="FFFDE7", end_color="FFFDE7", fill_type="solid")
-            
-            # Priority
-            priority_cell = self.ws.cell(row=row_num, column=10, value=product.production_priority)
-            priority_cell.border = self.border
-            priority_cell.alignment = Alignment(horizontal="center")
-            if product.production_priority >= 80:
-                priority_cell.font = Font(bold=True, color="FF0055")
-            elif product.production_priority >= 60:
-                priority_cell.font = Font(color="FFB800")
-            
-            # Last synced
-            sync_cell = self.ws.cell(row=row_num, column=11)
-            if product.last_synced_at:
-                sync_cell.value = product.last_synced_at.strftime("%d.%m.%Y %H:%M")
-            else:
-                sync_cell.value = '-'
-            sync_cell.border = self.border
-            sync_cell.alignment = Alignment(horizontal="center")
-        
+        writer.set_next_row_height(40)
+        writer.append([writer.cell(header, 'pf_header') for header, _ in self.headers])
+
+        # Data: named rows with only the exported columns
+        for product in self.product_rows(products_queryset, named=True):
+            writer.append(self._product_row(writer, product))
+
         # Add legend
-        legend_row = row_start + len(products_list) + 3
-        self.ws.merge_cells(f'A{legend_row}:D{legend_row}')
-        self.ws[f'A{legend_row}'] = 'Легенда:'
-        self.ws[f'A{legend_row}'].font = Font(bold=True)
-        
+        writer.append()
+        writer.append()
+        legend_row = writer.row_count + 1
+        writer.append([writer.cell('Легенда:', 'pf_bold')])
+        writer.merge(f'A{legend_row}:D{legend_row}')
+
         legend_items = [
-            ('Новая позиция', self.type_fills['new']),
-            ('Старая позиция', self.type_fills['old']),
-            ('Критическая позиция', self.type_fills['critical']),
+            ('Новая позиция', 'pf_type_new'),
+            ('Старая позиция', 'pf_type_old'),
+            ('Критическая позиция', 'pf_type_critical'),
         ]
-        
-        for i, (text, fill) in enumerate(legend_items):
-            row = legend_row + i + 1
-            cell = self.ws[f'B{row}']
-            cell.value = text
-            cell.fill = fill
-            cell.border = self.border
-        
-        # Save to response
-        response = HttpResponse(
-            content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-        )
-        filename = f'printfarm_products_{datetime.now().strftime("%Y%m%d_%H%M%S")}.xlsx'
-        response['Content-Disposition'] = f'attachment; filename={filename}'
-        
-        self.wb.save(response)
-        return response
-    
+        for text, style in legend_items:
+            writer.append([None, writer.cell(text, style)])
+
+        return writer
+
+    def column_widths(self, stats: dict, max_width: int = 50, padding: int = 2) -> List[int]:
+        """
+        Column widths: measured text columns fit the longest value or
+        header line (capped at max_width), others use ExportColumn.width.
+        """
+        widths = []
+        for column in PRODUCT_EXPORT_COLUMNS:
+            if column.field not in self.measured_fields:
+                widths.append(column.width)
+                continue
+            header_length = max(len(line) for line in column.title.split('\n'))
+            length = max(stats[f'{column.field}_length'] or 0, header_length)
+            widths.append(min(length + padding, max_width))
+        return widths
+
+    def _product_row(self, writer: StreamingExcelWriter, product) -> List[WriteOnlyCell]:
+        """
+        Build styled cells for one product.
+        """
+        cell = writer.cell
+
+        if product.days_of_stock is None:
+            days_cell = cell('-', 'pf_center')
+        elif product.days_of_stock < 5:
+            days_cell = cell(float(product.days_of_stock), 'pf_days_critical')
+        elif product.days_of_stock < 10:
+            days_cell = cell(float(product.days_of_stock), 'pf_days_warning')
+        else:
+            days_cell = cell(float(product.days_of_stock), 'pf_days')
+
+        if product.production_priority >= 80:
+            priority_style = 'pf_priority_high'
+        elif product.production_priority >= 60:
+            priority_style = 'pf_priority_medium'
+        else:
+            priority_style = 'pf_center'
+
+        type_style = f'pf_type_{product.product_type}'
+        if product.product_type not in ('new', 'old', 'critical'):
+            type_style = 'pf_text'
+
+        last_synced = product.last_synced_at.strftime("%d.%m.%Y %H:%M") if product.last_synced_at else '-'
+
+        return [
+            cell(product.article, 'pf_text'),
+            cell(product.name, 'pf_text'),
+            cell(self._get_product_type_display(product.product_type), type_style),
+            cell(product.product_group_name or '-', 'pf_text'),
+            cell(float(product.current_stock), 'pf_number'),
+            cell(float(product.sales_last_2_months), 'pf_number'),
+            cell(float(product.average_daily_consumption), 'pf_consumption'),
+            days_cell,
+            cell(float(product.production_needed),
+                 'pf_number_production' if product.production_needed > 0 else 'pf_number'),
+            cell(product.production_priority, priority_style),
+            cell(last_synced, 'pf_center'),
+        ]
+
     def _get_product_type_display(self, product_type: str) -> str:
         """
         Get display name for product type.
@@ -215,4 +530,70 @@ class ProductsExporter:
             'old': 'Старая',
             'critical': 'Критическая'
         }
-        return type_map.get(product_type, product_type)
\ No newline at end of file
+        return type_map.get(product_type, product_type)
+
+
+class TochkaListExporter:
+    """
+    Export Tochka lists (deduplicated Excel data, production list,
+    merge results) to Excel, CSV or Parquet.
+
+    Data comes from the request as a list of raw rows in column order.
+    Excel rows are formatted with the columns' display functions and
+    column widths are computed from the formatted values.
+    """
+
+    def __init__(self, title: str, columns: Sequence[ExportColumn], header_color: str):
+        self.title = title
+        self.columns = columns
+        self.headers = [column.title for column in columns]
+        self.styles = [
+            NamedStyle(name='tochka_header', font=Font(bold=True, color="FFFFFF"),
+                       fill=PatternFill(start_color=header_color, end_color=header_color, fill_type="solid"),
+                       alignment=Alignment(horizontal="center", vertical="center")),
+            NamedStyle(name='tochka_total', font=Font(bold=True),
+                       fill=PatternFill(start_color="E6F7FF", end_color="E6F7FF", fill_type="solid")),
+        ]
+
+    def export(self, rows: List[Sequence[Any]], filename: str,
+               total_row: Optional[Sequence[Any]] = None, file_format: str = 'xlsx'):
+        """
+        Export rows; filename is given without extension.
+
+        The optional total row is written to Excel only.
+        """
+        filename = f'{filename}.{file_format}'
+        if file_format != 'xlsx':
+            return TableExporter(self.columns).response(file_format, rows, filename)
+        return self.export_excel(rows, filename, total_row)
+
+    def export_excel(self, rows: List[Sequence[Any]], filename: str,
+                     total_row: Optional[Sequence[Any]] = None) -> FileResponse:
+        """
+        Write header, data rows and an optional bold total row
+        (separated from the data by an empty row).
+        """
+        writer = StreamingExcelWriter(self.title, self.styles)
+        rows = [self._display_row(row) for row in rows]
+
+        width_rows = rows + [total_row] if total_row else rows
+        writer.set_column_widths(compute_column_widths(width_rows, self.headers))
+
+        writer.append([writer.cell(header, 'tochka_header') for header in self.headers])
+        for row in rows:
+            writer.append(row)
+
+        if total_row:
+            writer.append()
+            writer.append([
+                writer.cell(value, 'tochka_total') if value is not None else None
+                for value in total_row
+            ])
+
+        return writer.response(filename)
+
+    def _display_row(self, row: Sequence[Any]) -> List[Any]:
+        return [
+            column.display(value) if column.display else value
+            for column, value in zip(self.columns, row)
+        ]
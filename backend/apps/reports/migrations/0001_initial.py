@@ -0,0 +1,39 @@
+# Generated by Django 4.2.7 on 2026-10-19 11:08
+
+from django.db import migrations, models
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExportJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('job_id', models.UUIDField(default=uuid.uuid4, editable=False, unique=True)),
+                ('export_type', models.CharField(choices=[('products', 'Товары'), ('production_list', 'Список на производство')], max_length=30)),
+                ('params', models.JSONField(blank=True, default=dict)),
+                ('data_version', models.CharField(max_length=64)),
+                ('cache_key', models.CharField(db_index=True, help_text='Hash of export type, filters and data version', max_length=64)),
+                ('status', models.CharField(choices=[('pending', 'В очереди'), ('processing', 'Формируется'), ('success', 'Готово'), ('failed', 'Ошибка')], default='pending', max_length=20)),
+                ('file', models.FileField(blank=True, upload_to='exports/')),
+                ('file_name', models.CharField(blank=True, max_length=255)),
+                ('file_size', models.BigIntegerField(default=0)),
+                ('error_details', models.TextField(blank=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('last_accessed_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['cache_key', 'status'], name='reports_exp_cache_k_203912_idx')],
+            },
+        ),
+    ]
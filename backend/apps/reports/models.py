@@ -1,3 +1,58 @@
+import uuid
 from django.db import models
+from apps.core.models import TimestampedModel
 
-# Create your models here.
+
+class ExportJob(TimestampedModel):
+    """
+    Background products export (XLSX, CSV or Parquet).
+
+    The generated file is kept in media storage and reused for identical
+    requests (same export type, filters and data version) until it is
+    evicted by age or total artefact size.
+    """
+    EXPORT_TYPE_CHOICES = [
+        ('products', 'Товары'),
+        ('production_list', 'Список на производство'),
+    ]
+
+    STATUS_CHOICES = [
+        ('pending', 'В очереди'),
+        ('processing', 'Формируется'),
+        ('success', 'Готово'),
+        ('failed', 'Ошибка'),
+    ]
+
+    job_id = models.UUIDField(default=uuid.uuid4, unique=True, editable=False)
+    export_type = models.CharField(max_length=30, choices=EXPORT_TYPE_CHOICES)
+    params = models.JSONField(default=dict, blank=True)
+    data_version = models.CharField(max_length=64)
+    cache_key = models.CharField(max_length=64, db_index=True,
+                                 help_text="Hash of export type, filters and data version")
+
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    file = models.FileField(upload_to='exports/', blank=True)
+    file_name = models.CharField(max_length=255, blank=True)
+    file_size = models.BigIntegerField(default=0)
+    error_details = models.TextField(blank=True)
+
+    finished_at = models.DateTimeField(null=True, blank=True)
+    last_accessed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['cache_key', 'status']),
+        ]
+
+    def __str__(self):
+        return f"Export {self.export_type} {self.job_id} - {self.status}"
+
+    @property
+    def duration(self):
+        """
+        Calculate generation duration if finished.
+        """
+        if self.finished_at:
+            return self.finished_at - self.created_at
+        return None
@@ -0,0 +1,38 @@
+"""
+Celery tasks for reports.
+"""
+import logging
+from celery import shared_task
+from .export_jobs import EXPORT_JOB_TIMEOUT, evict_export_artefacts, run_export_job
+from .models import ExportJob
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task(bind=True, time_limit=EXPORT_JOB_TIMEOUT)
+def generate_export_task(self, job_id: str):
+    """
+    Asynchronous task to generate an Excel export.
+    """
+    try:
+        job = ExportJob.objects.get(job_id=job_id)
+    except ExportJob.DoesNotExist:
+        logger.error(f"Export job {job_id} not found")
+        return {'error': 'Job not found'}
+
+    job = run_export_job(job)
+
+    logger.info(f"Export job {job_id} finished with status {job.status}")
+    return {
+        'job_id': str(job.job_id),
+        'status': job.status,
+    }
+
+
+@shared_task
+def evict_export_artefacts_task():
+    """
+    Periodic cleanup of old and oversized export artefacts.
+    """
+    deleted = evict_export_artefacts()
+    return {'deleted': deleted}
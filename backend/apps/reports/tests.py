@@ -1,3 +1,377 @@
-from django.test import TestCase
+"""
+Tests for streaming Excel exporters.
+"""
+import csv
+import io
+import json
+import shutil
+import tempfile
+import unittest
+from datetime import timedelta
+from decimal import Decimal
+from django.contrib.auth.models import User
+from django.http import FileResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.utils import timezone
+from openpyxl import load_workbook
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIRequestFactory
+from apps.api.v1.tochka_views import export_deduplicated_excel, export_merge_results, export_production_list
+from apps.products.models import Product
+from apps.reports.export_jobs import EXPORT_JOB_TIMEOUT, evict_export_artefacts
+from apps.reports.export_views import download_export, export_production_list_excel, export_products_excel
+from apps.reports.exporters import (
+    HAS_PYARROW, PRODUCT_EXPORT_COLUMNS, ExportColumn, ProductsExporter, TableExporter, compute_column_widths
+)
+from apps.reports.models import ExportJob
 
-# Create your tests here.
+
+def load_response_workbook(response):
+    """Read a streamed xlsx response back into a workbook."""
+    return load_workbook(io.BytesIO(b''.join(response.streaming_content)))
+
+
+class ProductsExporterTestCase(TestCase):
+    """Test cases for ProductsExporter."""
+    
+    def setUp(self):
+        """Set up test data."""
+        Product.objects.create(
+            moysklad_id='export-001',
+            article='EXP-001',
+            name='Critical Product',
+            current_stock=Decimal('1'),
+            sales_last_2_months=Decimal('30')
+        )
+        Product.objects.create(
+            moysklad_id='export-002',
+            article='EXP-002',
+            name='Stocked Product',
+            current_stock=Decimal('100'),
+            sales_last_2_months=Decimal('6')
+        )
+    
+    def test_export_is_streamed(self):
+        """Export returns a streaming xlsx attachment."""
+        response = ProductsExporter().export_products(Product.objects.order_by('article'))
+        
+        self.assertIsInstance(response, FileResponse)
+        self.assertTrue(response.streaming)
+        self.assertIn('attachment', response['Content-Disposition'])
+        self.assertIn('printfarm_products_', response['Content-Disposition'])
+    
+    def test_export_layout(self):
+        """Title, statistics, header, rows and legend are in place."""
+        response = ProductsExporter().export_products(Product.objects.order_by('article'))
+        ws = load_response_workbook(response).active
+        
+        self.assertEqual(ws['A1'].value, 'PRINTFARM - СПИСОК ТОВАРОВ')
+        self.assertIn('A1:K1', [str(cell_range) for cell_range in ws.merged_cells.ranges])
+        self.assertEqual(ws['A4'].value, 'Всего товаров: 2')
+        self.assertEqual(ws['A7'].value, 'Критических позиций: 1')
+        
+        self.assertEqual(ws['A9'].value, 'Артикул')
+        self.assertTrue(ws['A9'].font.bold)
+        # Text columns fit the longest value, numeric columns keep fixed widths
+        self.assertEqual(ws.column_dimensions['A'].width, len('Артикул') + 2)
+        self.assertEqual(ws.column_dimensions['B'].width, len('Critical Product') + 2)
+        self.assertEqual(ws.column_dimensions['E'].width, 12)
+        
+        self.assertEqual(ws['A10'].value, 'EXP-001')
+        self.assertEqual(ws['C10'].value, 'Критическая')
+        self.assertEqual(ws['C10'].fill.start_color.rgb, '00FFEBEE')
+        self.assertEqual(ws['E11'].value, 100)
+        self.assertEqual(ws['E11'].number_format, '#,##0.00')
+        
+        self.assertEqual(ws['A14'].value, 'Легенда:')
+        self.assertEqual(ws['B17'].value, 'Критическая позиция')
+
+
+def read_csv_response(response):
+    """Read a streamed CSV response into rows."""
+    return list(csv.reader(io.StringIO(b''.join(response.streaming_content).decode('utf-8'))))
+
+
+class TableExporterTestCase(TestCase):
+    """Test cases for CSV and Parquet exports."""
+    
+    columns = [
+        ExportColumn('article', 'Артикул'),
+        ExportColumn('orders', 'Заказов', kind='int'),
+        ExportColumn('stock', 'Остаток', kind='float'),
+        ExportColumn('in_tochka', 'В Точке', kind='bool'),
+    ]
+    
+    def test_csv_is_generated_in_chunks(self):
+        """CSV is yielded lazily in chunks with field names as header."""
+        rows = (['A-%d' % index, str(index), Decimal('1.5'), index % 2] for index in range(5))
+        chunks = list(TableExporter(self.columns).iter_csv(rows, chunk_rows=2))
+        
+        self.assertEqual(len(chunks), 3)
+        parsed = list(csv.reader(io.StringIO(''.join(chunks))))
+        self.assertEqual(parsed[0], ['article', 'orders', 'stock', 'in_tochka'])
+        self.assertEqual(parsed[2], ['A-1', '1', '1.5', 'True'])
+        self.assertEqual(len(parsed), 6)
+    
+    def test_invalid_numbers_are_empty(self):
+        """Values that are not numbers are exported as empty cells."""
+        chunks = TableExporter(self.columns).iter_csv([['A', '', 'n/a', None]])
+        self.assertEqual(''.join(chunks).splitlines()[1], 'A,,,')
+    
+    @unittest.skipUnless(HAS_PYARROW, 'pyarrow is not installed')
+    def test_parquet_uses_column_types(self):
+        """Parquet columns are typed from the shared schema."""
+        import pyarrow.parquet as pq
+        
+        output = io.BytesIO()
+        TableExporter(self.columns).write_parquet([['A', '3', '2.5', True]], output, chunk_rows=1)
+        table = pq.read_table(io.BytesIO(output.getvalue()))
+        
+        self.assertEqual(table.column_names, ['article', 'orders', 'stock', 'in_tochka'])
+        self.assertEqual(table.to_pylist(), [{'article': 'A', 'orders': 3, 'stock': 2.5, 'in_tochka': True}])
+
+
+class TochkaExportTestCase(TestCase):
+    """Test cases for Tochka list exports."""
+    
+    def setUp(self):
+        """Set up request factory."""
+        self.factory = APIRequestFactory()
+    
+    def test_export_deduplicated_excel(self):
+        """Deduplicated Excel data is exported with widths from the data."""
+        request = self.factory.post('/api/v1/tochka/export-deduplicated/', {'data': [
+            {'article': '375-42108', 'orders': 5, 'row_number': 2,
+             'has_duplicates': True, 'duplicate_rows': [4, 7]},
+            {'article': 'N323-13W', 'orders': 1, 'row_number': 3},
+        ]}, format='json')
+        
+        response = export_deduplicated_excel(request)
+        ws = load_response_workbook(response).active
+        
+        self.assertEqual([cell.value for cell in ws[1]][:2], ['Артикул', 'Заказов (шт.)'])
+        self.assertEqual([cell.value for cell in ws[2]], ['375-42108', 5, 2, 'Да', '4, 7'])
+        self.assertEqual(ws[3][3].value, 'Нет')
+        self.assertEqual(ws.column_dimensions['D'].width, len('Есть дубликаты') + 2)
+    
+    def test_export_production_list_total_row(self):
+        """Production list export ends with a bold total row."""
+        request = self.factory.post('/api/v1/tochka/export-production/', {'production_data': [
+            {'article': '375-42108', 'product_name': 'Товар', 'production_needed': 4,
+             'production_priority': 80, 'product_type': 'critical'},
+            {'article': 'N323-13W', 'product_name': 'Товар 2', 'production_needed': 6},
+        ]}, format='json')
+        
+        response = export_production_list(request)
+        ws = load_response_workbook(response).active
+        
+        self.assertEqual(ws['F2'].value, 'Критичный')
+        self.assertEqual(ws['B5'].value, 'ИТОГО К ПРОИЗВОДСТВУ:')
+        self.assertEqual(ws['C5'].value, 10)
+        self.assertTrue(ws['C5'].font.bold)
+
+
+    def test_export_production_list_csv(self):
+        """Production list CSV uses field names and has no total row."""
+        request = self.factory.post('/api/v1/tochka/export-production/', {'format': 'csv', 'production_data': [
+            {'article': '375-42108', 'product_name': 'Товар', 'production_needed': 4},
+        ]}, format='json')
+        
+        response = export_production_list(request)
+        rows = read_csv_response(response)
+        
+        self.assertIn('.csv', response['Content-Disposition'])
+        self.assertEqual(rows[0][:3], ['article', 'product_name', 'production_needed'])
+        self.assertEqual(rows[1][:3], ['375-42108', 'Товар', '4.0'])
+        self.assertEqual(len(rows), 2)
+    
+    def test_export_csv_has_raw_values(self):
+        """CSV gets booleans and product type codes, not Excel labels."""
+        request = self.factory.post('/api/v1/tochka/export-deduplicated/', {'format': 'csv', 'data': [
+            {'article': '375-42108', 'orders': 5, 'row_number': 2, 'has_duplicates': True},
+            {'article': 'N323-13W', 'orders': 1, 'row_number': 3},
+        ]}, format='json')
+        rows = read_csv_response(export_deduplicated_excel(request))
+        self.assertEqual([row[3] for row in rows], ['has_duplicates', 'True', 'False'])
+        
+        request = self.factory.post('/api/v1/tochka/export-production/', {'format': 'csv', 'production_data': [
+            {'article': '375-42108', 'product_type': 'critical'},
+        ]}, format='json')
+        record = dict(zip(*read_csv_response(export_production_list(request))))
+        self.assertEqual(record['product_type'], 'critical')
+    
+    def test_export_merge_results(self):
+        """Merge results are exported with the merge column schema."""
+        request = self.factory.post('/api/v1/tochka/export-merge/', {'format': 'csv', 'data': [
+            {'article': '375-42108', 'product_name': 'Товар', 'orders_in_tochka': 5,
+             'is_in_tochka': True, 'needs_registration': False, 'days_of_stock': None},
+        ]}, format='json')
+        
+        rows = read_csv_response(export_merge_results(request))
+        record = dict(zip(rows[0], rows[1]))
+        
+        self.assertEqual(record['orders_in_tochka'], '5')
+        self.assertEqual(record['is_in_tochka'], 'True')
+        self.assertEqual(record['days_of_stock'], '')
+    
+    def test_unsupported_format(self):
+        """Unknown formats are rejected."""
+        request = self.factory.post('/api/v1/tochka/export-deduplicated/', {
+            'format': 'pdf', 'data': [{'article': 'A'}]
+        }, format='json')
+        
+        self.assertEqual(export_deduplicated_excel(request).status_code, 400)
+
+
+class ComputeColumnWidthsTestCase(TestCase):
+    """Test cases for compute_column_widths."""
+    
+    def test_widths_are_capped(self):
+        """Widths follow the longest value and are capped."""
+        widths = compute_column_widths([['a' * 100, None], ['b', 12345]], ['H1', 'Header'])
+        self.assertEqual(widths, [50, 8])
+
+
+class ExportJobTestCase(TestCase):
+    """Test cases for background exports and artefact reuse."""
+    
+    def setUp(self):
+        """Set up media storage, token and products."""
+        self.media_root = tempfile.mkdtemp()
+        media_override = override_settings(MEDIA_ROOT=self.media_root)
+        media_override.enable()
+        self.addCleanup(media_override.disable)
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        
+        self.factory = RequestFactory()
+        user = User.objects.create_user(username='exporter', password='secret')
+        self.token = Token.objects.create(user=user).key
+        
+        Product.objects.create(
+            moysklad_id='job-001',
+            article='JOB-001',
+            name='Job Product',
+            current_stock=Decimal('1'),
+            sales_last_2_months=Decimal('30')
+        )
+    
+    def start_products_export(self, **params):
+        request = self.factory.get('/api/v1/reports/export/products/', {'auth_token': self.token, **params})
+        response = export_products_excel(request)
+        return response, json.loads(response.content)
+    
+    def test_authentication_required(self):
+        """Exports require a token outside of development mode."""
+        response = export_products_excel(self.factory.get('/api/v1/reports/export/products/'))
+        self.assertEqual(response.status_code, 401)
+    
+    def test_export_job_generates_file(self):
+        """Export job writes the file to media storage and it can be downloaded."""
+        response, data = self.start_products_export(search='JOB')
+        
+        self.assertEqual(data['status'], 'success')
+        self.assertFalse(data['cached'])
+        self.assertTrue(data['download_url'].endswith(f"/export/jobs/{data['job_id']}/download/"))
+        
+        job = ExportJob.objects.get(job_id=data['job_id'])
+        self.assertEqual(job.params, {'search': 'JOB'})
+        self.assertGreater(job.file_size, 0)
+        
+        download = download_export(
+            self.factory.get(data['download_url'], {'auth_token': self.token}),
+            job_id=job.job_id
+        )
+        self.assertIn('printfarm_products_', download['Content-Disposition'])
+        ws = load_workbook(io.BytesIO(b''.join(download.streaming_content))).active
+        self.assertEqual(ws['A10'].value, 'JOB-001')
+    
+    def test_identical_request_reuses_artefact(self):
+        """Same filters and data version return the finished artefact."""
+        _, first = self.start_products_export(search='JOB', auth_token=self.token)
+        _, second = self.start_products_export(search='JOB')
+        _, other_filters = self.start_products_export(search='OTHER')
+        
+        self.assertTrue(second['cached'])
+        self.assertEqual(second['job_id'], first['job_id'])
+        self.assertNotEqual(other_filters['job_id'], first['job_id'])
+    
+    def test_data_change_invalidates_artefact(self):
+        """A product update produces a new export."""
+        _, first = self.start_products_export()
+        
+        Product.objects.filter(article='JOB-001').update(updated_at=timezone.now() + timedelta(minutes=1))
+        _, second = self.start_products_export()
+        
+        self.assertFalse(second['cached'])
+        self.assertNotEqual(second['job_id'], first['job_id'])
+    
+    def test_csv_export_job(self):
+        """CSV export shares the products column schema and has its own artefact."""
+        _, xlsx = self.start_products_export()
+        _, data = self.start_products_export(format='csv')
+        
+        self.assertNotEqual(data['job_id'], xlsx['job_id'])
+        download = download_export(
+            self.factory.get(data['download_url'], {'auth_token': self.token}),
+            job_id=data['job_id']
+        )
+        self.assertIn('.csv', download['Content-Disposition'])
+        rows = list(csv.reader(io.StringIO(b''.join(download.streaming_content).decode('utf-8'))))
+        
+        self.assertEqual(rows[0], [column.field for column in PRODUCT_EXPORT_COLUMNS])
+        self.assertEqual(rows[1][:3], ['JOB-001', 'Job Product', 'critical'])
+    
+    def test_unsupported_export_format(self):
+        """Unknown formats are rejected before a job is created."""
+        response, _ = self.start_products_export(format='pdf')
+        
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(ExportJob.objects.exists())
+    
+    def test_production_list_export(self):
+        """Production list export ignores product filters."""
+        request = self.factory.get('/api/v1/reports/export/production-list/',
+                                   {'auth_token': self.token, 'search': 'ignored'})
+        data = json.loads(export_production_list_excel(request).content)
+        
+        job = ExportJob.objects.get(job_id=data['job_id'])
+        self.assertEqual(job.export_type, 'production_list')
+        self.assertEqual(job.params, {})
+    
+    def test_eviction_by_age_and_size(self):
+        """Expired and least recently used artefacts are deleted with their files."""
+        _, old = self.start_products_export(search='OLD')
+        _, recent = self.start_products_export(search='RECENT')
+        _, latest = self.start_products_export(search='LATEST')
+        
+        now = timezone.now()
+        ExportJob.objects.filter(job_id=old['job_id']).update(finished_at=now - timedelta(days=2))
+        ExportJob.objects.filter(job_id=recent['job_id']).update(last_accessed_at=now - timedelta(hours=1))
+        old_file = ExportJob.objects.get(job_id=old['job_id']).file
+        latest_size = ExportJob.objects.get(job_id=latest['job_id']).file_size
+        
+        deleted = evict_export_artefacts(max_age=24 * 60 * 60, max_total_size=latest_size)
+        
+        self.assertEqual(deleted, 2)
+        self.assertEqual(
+            list(ExportJob.objects.values_list('job_id', flat=True)),
+            [ExportJob.objects.get(job_id=latest['job_id']).job_id]
+        )
+        self.assertFalse(old_file.storage.exists(old_file.name))
+    
+    def test_stuck_job_is_not_reused(self):
+        """A job stuck in processing past the task time limit is failed and replaced."""
+        _, first = self.start_products_export()
+        stale = timezone.now() - timedelta(seconds=EXPORT_JOB_TIMEOUT + 60)
+        ExportJob.objects.filter(job_id=first['job_id']).update(status='processing', updated_at=stale)
+        
+        _, second = self.start_products_export()
+        
+        self.assertNotEqual(second['job_id'], first['job_id'])
+        self.assertEqual(second['status'], 'success')
+        stuck = ExportJob.objects.get(job_id=first['job_id'])
+        self.assertEqual(stuck.status, 'failed')
+        
+        ExportJob.objects.filter(job_id=first['job_id']).update(status='pending', updated_at=stale)
+        evict_export_artefacts(max_age=0)
+        self.assertFalse(ExportJob.objects.filter(job_id=first['job_id']).exists())
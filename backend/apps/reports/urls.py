@@ -1,10 +1,14 @@
 from django.urls import path
 from .views import reports_list
-from .export_views import export_production_list_excel, export_products_excel
+from .export_views import (
+    download_export, export_job_status, export_production_list_excel, export_products_excel
+)
 
 urlpatterns = [
     path('', reports_list, name='reports-list'),
     path('export/production-list/', export_production_list_excel, name='export-production-list'),
     path('export/production-list/<int:list_id>/', export_production_list_excel, name='export-production-list-by-id'),
     path('export/products/', export_products_excel, name='export-products'),
-]
\ No newline at end of file
+    path('export/jobs/<uuid:job_id>/', export_job_status, name='export-job-status'),
+    path('export/jobs/<uuid:job_id>/download/', download_export, name='export-job-download'),
+]
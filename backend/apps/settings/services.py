@@ -143,6 +143,7 @@ class SettingsService:
     @staticmethod
     def trigger_manual_sync(warehouse_id=None, excluded_groups=None):
         """Запустить ручную синхронизацию"""
+        from apps.core.sync_lock import MOYSKLAD_SYNC, start_single_flight
         from apps.sync.tasks import sync_products_task
         
         settings = SyncScheduleSettings.get_instance()
@@ -155,8 +156,10 @@ class SettingsService:
             excluded_groups = settings.excluded_group_ids
         
         try:
-            # Запускаем задачу асинхронно
-            task = sync_products_task.delay(
+            # Запускаем задачу асинхронно, если синхронизация еще не идет
+            task_id, started = start_single_flight(
+                MOYSKLAD_SYNC,
+                sync_products_task,
                 warehouse_id=warehouse_id,
                 excluded_groups=excluded_groups,
                 sync_type='manual'
@@ -164,8 +167,8 @@ class SettingsService:
             
             return {
                 'success': True,
-                'message': 'Синхронизация запущена',
-                'task_id': task.id
+                'message': 'Синхронизация запущена' if started else 'Синхронизация уже выполняется',
+                'task_id': task_id
             }
         except Exception as e:
             return {
@@ -2,137 +2,364 @@
 SimplePrint API Client
 
 Клиент для работы с SimplePrint API.
-Поддерживает rate limiting и retry логику.
+Оба клиента (файлы и принтеры) используют общий транспорт
+SimplePrintTransport: пул keep-alive соединений, лимит запросов на все
+процессы, повторы с jitter и учетом Retry-After, метрики задержки.
 """
 
+import hashlib
 import time
 import logging
+import random
+import threading
 import requests
-from typing import Dict, List, Optional
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime, timezone as dt_timezone
+from email.utils import parsedate_to_datetime
+from typing import Callable, Dict, Iterator, List, Optional
+from requests.adapters import HTTPAdapter
 from django.conf import settings
 from django.core.cache import cache
 
 logger = logging.getLogger(__name__)
 
+# Количество папок, загружаемых одновременно при обходе дерева
+DEFAULT_MAX_WORKERS = 4
+
+DEFAULT_RETRY_ATTEMPTS = 2
+DEFAULT_TIMEOUT = 10  # секунд
+
+# Задержка перед повтором: RETRY_BACKOFF_BASE * 2^попытка со случайным
+# разбросом, не больше MAX_RETRY_DELAY (в том числе для Retry-After)
+RETRY_BACKOFF_BASE = 1.0
+MAX_RETRY_DELAY = 60.0
+
+# Коды ответа, при которых запрос повторяется
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
 
 class SimplePrintAPIError(Exception):
     """Исключение для ошибок SimplePrint API"""
     pass
 
 
-class SimplePrintFilesClient:
+class RateLimiter:
     """
-    Клиент для работы с файлами и папками в SimplePrint API
+    Потокобезопасный ограничитель частоты запросов (requests per minute)
+
+    Каждый вызов acquire() резервирует следующий свободный слот под
+    блокировкой и ждет его уже без блокировки, поэтому запросы из
+    нескольких потоков идут параллельно, но не чаще rate_limit в минуту.
     """
 
-    def __init__(self):
-        """Инициализация клиента"""
-        config = settings.SIMPLEPRINT_CONFIG
+    def __init__(self, rate_limit: int):
+        self.interval = 60.0 / rate_limit
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
 
-        self.base_url = config['base_url'].rstrip('/')
-        self.api_token = config['api_token']
-        self.rate_limit = config['rate_limit']  # requests per minute
+    def acquire(self):
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+
+        sleep_time = slot - now
+        if sleep_time > 0:
+            logger.debug(f"Rate limiting: sleeping for {sleep_time:.2f} seconds")
+            time.sleep(sleep_time)
 
-        # Вычисляем задержку между запросами
-        self.request_delay = 60.0 / self.rate_limit  # секунды между запросами
 
-        self.retry_attempts = 2  # Уменьшили количество попыток
-        self.timeout = 10  # Уменьшили timeout до 10 секунд (было 30)
+_rate_limiters: Dict[str, RateLimiter] = {}
+_rate_limiters_lock = threading.Lock()
 
-        # Последнее время запроса для rate limiting
-        self._last_request_time = 0
 
-    def _get_headers(self) -> Dict[str, str]:
-        """Получить заголовки для запроса"""
-        return {
-            'X-API-KEY': self.api_token,
-            'Accept': 'application/json',
-        }
+def get_rate_limiter(api_token: str, rate_limit: int) -> RateLimiter:
+    """
+    Общий ограничитель для API токена
 
-    def _rate_limit(self):
-        """Применить rate limiting"""
-        current_time = time.time()
-        time_since_last_request = current_time - self._last_request_time
+    Лимит SimplePrint действует на аккаунт, поэтому все клиенты с одним
+    токеном в процессе используют один ограничитель.
+    """
+    with _rate_limiters_lock:
+        limiter = _rate_limiters.get(api_token)
+        if limiter is None or limiter.interval != 60.0 / rate_limit:
+            limiter = _rate_limiters[api_token] = RateLimiter(rate_limit)
+        return limiter
 
-        if time_since_last_request < self.request_delay:
-            sleep_time = self.request_delay - time_since_last_request
-            logger.debug(f"Rate limiting: sleeping for {sleep_time:.2f} seconds")
-            time.sleep(sleep_time)
 
-        self._last_request_time = time.time()
+class SharedRateLimiter:
+    """
+    Лимит запросов в минуту на все процессы (web, Celery воркеры)
 
-    def _make_request(
+    Запросы считаются в кеше (Redis) по минутным окнам; если окно
+    исчерпано, запрос ждет следующего. Внутри процесса запросы
+    дополнительно разносятся локальным RateLimiter. Если кеш недоступен,
+    действует только локальный лимит.
+    """
+
+    def __init__(self, key: str, rate_limit: int, local_limiter: RateLimiter):
+        self.key = key
+        self.rate_limit = rate_limit
+        self.local_limiter = local_limiter
+
+    def acquire(self):
+        self.local_limiter.acquire()
+
+        while True:
+            window = int(time.time() // 60)
+            window_key = f'{self.key}:{window}'
+            try:
+                cache.add(window_key, 0, 120)
+                count = cache.incr(window_key)
+            except Exception as e:
+                logger.debug(f"Shared rate limit unavailable, using local limit only: {e}")
+                return
+
+            if count <= self.rate_limit:
+                return
+
+            sleep_time = (window + 1) * 60 - time.time() + random.uniform(0, 0.5)
+            logger.info(f"SimplePrint rate limit reached across processes, waiting {sleep_time:.1f}s")
+            time.sleep(max(sleep_time, 0))
+
+
+def _parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Задержка из заголовка Retry-After (секунды или HTTP-дата)"""
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=dt_timezone.utc)
+    return max((retry_at - datetime.now(dt_timezone.utc)).total_seconds(), 0.0)
+
+
+class SimplePrintTransport:
+    """
+    Общий HTTP транспорт SimplePrint API
+
+    - requests.Session с пулом keep-alive соединений
+    - лимит запросов в минуту на аккаунт: RateLimiter в процессе и
+      SharedRateLimiter на все процессы
+    - повторы при таймаутах, ошибках соединения, 429 и 5xx: задержка из
+      Retry-After или экспоненциальная со случайным разбросом
+    - метрики задержки по endpoint (get_metrics)
+
+    Экземпляр потокобезопасен; клиенты получают общий через get_transport().
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        api_token: str,
+        rate_limit: int,
+        pool_size: int = DEFAULT_MAX_WORKERS,
+        retry_attempts: int = DEFAULT_RETRY_ATTEMPTS,
+        timeout: float = DEFAULT_TIMEOUT
+    ):
+        self.base_url = base_url.rstrip('/')
+        self.retry_attempts = max(retry_attempts, 1)
+        self.timeout = timeout
+
+        token_key = hashlib.sha256(api_token.encode('utf-8')).hexdigest()[:16]
+        self.rate_limiter = SharedRateLimiter(
+            f'simpleprint_rate:{token_key}', rate_limit, get_rate_limiter(api_token, rate_limit)
+        )
+
+        self.session = requests.Session()
+        self.session.headers.update({
+            'X-API-KEY': api_token,
+            'Accept': 'application/json',
+        })
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(pool_size, 1))
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+        self._metrics: Dict[str, Dict] = {}
+        self._metrics_lock = threading.Lock()
+
+    def request(
         self,
         method: str,
         endpoint: str,
         params: Optional[Dict] = None,
-        data: Optional[Dict] = None,
-        retry_count: int = 0
+        data: Optional[Dict] = None
     ) -> Dict:
         """
-        Выполнить HTTP запрос с retry логикой
+        Выполнить запрос к API с повторами
 
         Args:
             method: HTTP метод (GET, POST)
             endpoint: API endpoint
             params: Query параметры
-            data: Данные для POST запроса
-            retry_count: Текущая попытка (для рекурсии)
+            data: Данные для POST запроса (JSON)
 
         Returns:
             Ответ от API в виде словаря
 
         Raises:
-            SimplePrintAPIError: При ошибке API
+            SimplePrintAPIError: При ошибке API или исчерпании попыток
         """
-        # Применяем rate limiting
-        self._rate_limit()
+        if method not in ('GET', 'POST'):
+            raise SimplePrintAPIError(f"Unsupported HTTP method: {method}")
 
         url = f"{self.base_url}/{endpoint}"
-        headers = self._get_headers()
+        error = None
+
+        for attempt in range(self.retry_attempts):
+            self.rate_limiter.acquire()
+            logger.debug(f"{method} {url} (попытка {attempt + 1}/{self.retry_attempts})")
+
+            retry_after = None
+            response = None
+            started = time.monotonic()
+            try:
+                response = self.session.request(
+                    method, url, params=params, json=data if method == 'POST' else None, timeout=self.timeout
+                )
+                response.raise_for_status()
+                payload = response.json()
+
+            except requests.exceptions.Timeout:
+                logger.warning(f"Request timeout for {url}")
+                error = SimplePrintAPIError(f"Request timeout after {self.retry_attempts} attempts")
+
+            except requests.exceptions.HTTPError as e:
+                status_code = e.response.status_code
+                logger.error(f"HTTP error {status_code}: {e.response.text}")
+                error = SimplePrintAPIError(f"HTTP error {status_code}: {e.response.text}")
+                if status_code not in RETRY_STATUS_CODES:
+                    raise error
+                retry_after = _parse_retry_after(e.response.headers.get('Retry-After'))
+
+            except requests.exceptions.RequestException as e:
+                logger.error(f"Request error: {e}")
+                error = SimplePrintAPIError(f"Request failed: {e}")
 
-        try:
-            logger.debug(f"{method} {url} (попытка {retry_count + 1}/{self.retry_attempts})")
-
-            if method == 'GET':
-                response = requests.get(url, headers=headers, params=params, timeout=self.timeout)
-            elif method == 'POST':
-                response = requests.post(url, headers=headers, json=data, timeout=self.timeout)
             else:
-                raise SimplePrintAPIError(f"Unsupported HTTP method: {method}")
+                # Проверяем статус ответа SimplePrint
+                if not payload.get('status', False):
+                    error_message = payload.get('message', 'Unknown error')
+                    logger.error(f"SimplePrint API error: {error_message}")
+                    raise SimplePrintAPIError(f"API returned error: {error_message}")
+                return payload
+
+            finally:
+                self._record(endpoint, time.monotonic() - started, response)
+
+            if attempt + 1 < self.retry_attempts:
+                delay = retry_after if retry_after is not None else self._backoff(attempt)
+                delay = min(delay, MAX_RETRY_DELAY)
+                logger.info(f"Retrying {endpoint} in {delay:.1f}s")
+                time.sleep(delay)
+
+        raise error
+
+    def _backoff(self, attempt: int) -> float:
+        """Экспоненциальная задержка со случайным разбросом (50-100%)"""
+        delay = RETRY_BACKOFF_BASE * 2 ** attempt
+        return random.uniform(delay / 2, delay)
+
+    def _record(self, endpoint: str, elapsed: float, response: Optional[requests.Response]):
+        failed = response is None or response.status_code >= 400
+        with self._metrics_lock:
+            metrics = self._metrics.setdefault(endpoint, {'count': 0, 'errors': 0, 'total_time': 0.0, 'max_time': 0.0})
+            metrics['count'] += 1
+            metrics['errors'] += int(failed)
+            metrics['total_time'] += elapsed
+            metrics['max_time'] = max(metrics['max_time'], elapsed)
+
+    def get_metrics(self) -> Dict[str, Dict]:
+        """
+        Метрики запросов по endpoint с момента запуска процесса
 
-            response.raise_for_status()
+        Returns:
+            {endpoint: {'count', 'errors', 'avg_ms', 'max_ms'}}
+        """
+        with self._metrics_lock:
+            return {
+                endpoint: {
+                    'count': metrics['count'],
+                    'errors': metrics['errors'],
+                    'avg_ms': round(metrics['total_time'] / metrics['count'] * 1000, 1),
+                    'max_ms': round(metrics['max_time'] * 1000, 1),
+                }
+                for endpoint, metrics in self._metrics.items()
+            }
+
+
+_transports: Dict[tuple, SimplePrintTransport] = {}
+_transports_lock = threading.Lock()
+
+
+def get_transport() -> SimplePrintTransport:
+    """
+    Общий транспорт для текущих настроек SIMPLEPRINT_CONFIG
+
+    Клиенты файлов и принтеров с одним аккаунтом используют одну сессию,
+    один пул соединений и один лимит запросов.
+    """
+    config = settings.SIMPLEPRINT_CONFIG
+    key = (
+        config['base_url'].rstrip('/'),
+        config['api_token'],
+        config['rate_limit'],
+        config.get('max_workers', DEFAULT_MAX_WORKERS),
+        config.get('retry_attempts', DEFAULT_RETRY_ATTEMPTS),
+        config.get('timeout', DEFAULT_TIMEOUT),
+    )
+
+    with _transports_lock:
+        transport = _transports.get(key)
+        if transport is None:
+            base_url, api_token, rate_limit, max_workers, retry_attempts, timeout = key
+            transport = _transports[key] = SimplePrintTransport(
+                base_url, api_token, rate_limit,
+                pool_size=max_workers, retry_attempts=retry_attempts, timeout=timeout
+            )
+        return transport
+
+
+class SimplePrintFilesClient:
+    """
+    Клиент для работы с файлами и папками в SimplePrint API
+    """
 
-            data = response.json()
+    def __init__(self):
+        """Инициализация клиента"""
+        config = settings.SIMPLEPRINT_CONFIG
 
-            # Проверяем статус ответа SimplePrint
-            if not data.get('status', False):
-                error_message = data.get('message', 'Unknown error')
-                logger.error(f"SimplePrint API error: {error_message}")
-                raise SimplePrintAPIError(f"API returned error: {error_message}")
+        self.base_url = config['base_url'].rstrip('/')
+        self.api_token = config['api_token']
+        self.rate_limit = config['rate_limit']  # requests per minute
 
-            return data
+        # Параллельные запросы при обходе дерева папок
+        self.max_workers = config.get('max_workers', DEFAULT_MAX_WORKERS)
 
-        except requests.exceptions.Timeout:
-            logger.warning(f"Request timeout for {url}")
-            if retry_count < self.retry_attempts - 1:
-                return self._make_request(method, endpoint, params, data, retry_count + 1)
-            raise SimplePrintAPIError(f"Request timeout after {self.retry_attempts} attempts")
+        # Общие для аккаунта сессия, лимит запросов и повторы
+        self.transport = get_transport()
 
-        except requests.exceptions.HTTPError as e:
-            logger.error(f"HTTP error {e.response.status_code}: {e.response.text}")
-            if retry_count < self.retry_attempts - 1 and e.response.status_code >= 500:
-                # Retry только для серверных ошибок
-                time.sleep(2 ** retry_count)  # Exponential backoff
-                return self._make_request(method, endpoint, params, data, retry_count + 1)
-            raise SimplePrintAPIError(f"HTTP error {e.response.status_code}: {e.response.text}")
+    def _make_request(
+        self,
+        method: str,
+        endpoint: str,
+        params: Optional[Dict] = None,
+        data: Optional[Dict] = None
+    ) -> Dict:
+        """
+        Выполнить HTTP запрос через общий транспорт
 
-        except requests.exceptions.RequestException as e:
-            logger.error(f"Request error: {e}")
-            if retry_count < self.retry_attempts - 1:
-                time.sleep(2 ** retry_count)  # Exponential backoff
-                return self._make_request(method, endpoint, params, data, retry_count + 1)
-            raise SimplePrintAPIError(f"Request failed: {e}")
+        Raises:
+            SimplePrintAPIError: При ошибке API
+        """
+        return self.transport.request(method, endpoint, params=params, data=data)
 
     def test_connection(self) -> bool:
         """
@@ -208,85 +435,126 @@ class SimplePrintFilesClient:
 
         return data.get('folder', {})
 
+    def iter_folder_tree(
+        self,
+        parent_folder_id: Optional[int] = None,
+        max_depth: int = 50,
+        max_workers: Optional[int] = None,
+        skip_folder: Optional[Callable[[Dict], bool]] = None
+    ) -> Iterator[Dict]:
+        """
+        Обойти дерево папок в ширину, загружая соседние папки параллельно
+
+        Одновременно загружается не больше max_workers папок, общий лимит
+        запросов соблюдает RateLimiter. Содержимое папки отдается сразу
+        после загрузки; родительская папка всегда отдается раньше дочерних.
+
+        Args:
+            parent_folder_id: ID папки, с которой начинается обход (None = корень)
+            max_depth: Максимальная глубина обхода (защита от бесконечных циклов)
+            max_workers: Количество параллельных запросов (по умолчанию из настроек)
+            skip_folder: Функция от данных подпапки; если вернула True, папка
+                попадает в результат, но ее содержимое не загружается
+
+        Yields:
+            Словарь с ключами 'folder_id', 'path', 'depth', 'files', 'folders'.
+            У файлов и папок заполнены 'path' и 'parent_folder_id', у папок - 'depth'
+        """
+        max_workers = max(max_workers or self.max_workers, 1)
+
+        pending = deque([(parent_folder_id, '', 0)])
+        visited_folders = {parent_folder_id if parent_folder_id is not None else 'root'}
+        in_flight = {}
+
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='simpleprint-files') as executor:
+            try:
+                while pending or in_flight:
+                    while pending and len(in_flight) < max_workers:
+                        folder_id, path, depth = pending.popleft()
+                        future = executor.submit(self.get_files_and_folders, folder_id)
+                        in_flight[future] = (folder_id, path, depth)
+
+                    done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+
+                    for future in done:
+                        folder_id, path, depth = in_flight.pop(future)
+                        data = future.result()
+
+                        files = data['files']
+                        for file in files:
+                            file['path'] = path  # Добавляем путь к файлу
+                            file['parent_folder_id'] = folder_id  # Добавляем ID родительской папки
+
+                        folders = data['folders']
+                        for folder in folders:
+                            folder_name = folder.get('name', 'Без названия')
+                            full_path = f"{path}/{folder_name}".strip("/")
+                            folder['path'] = full_path  # Добавляем путь к папке
+                            folder.setdefault('parent_folder_id', folder_id)
+                            folder.setdefault('depth', depth)
+
+                            if depth + 1 > max_depth:
+                                logger.warning(f"⚠️ Максимальная глубина обхода достигнута ({max_depth}) для пути: {full_path}")
+                            elif folder['id'] in visited_folders:
+                                logger.warning(f"⚠️ Пропуск уже посещенной папки ID={folder['id']} (путь: {full_path})")
+                            elif skip_folder and skip_folder(folder):
+                                logger.debug(f"Папка не изменилась, содержимое не загружается: {full_path}")
+                            else:
+                                visited_folders.add(folder['id'])
+                                pending.append((folder['id'], full_path, depth + 1))
+
+                        logger.debug(f"Папка {folder_id}: {len(folders)} подпапок, {len(files)} файлов")
+
+                        yield {
+                            'folder_id': folder_id,
+                            'path': path,
+                            'depth': depth,
+                            'files': files,
+                            'folders': folders,
+                        }
+            finally:
+                # Обход прерван (ошибка или генератор закрыт) - не начинаем новые запросы
+                for future in in_flight:
+                    future.cancel()
+
     def get_all_files_recursive(
         self,
         parent_folder_id: Optional[int] = None,
-        max_depth: int = 50
+        max_depth: int = 50,
+        skip_folder: Optional[Callable[[Dict], bool]] = None
     ) -> Dict[str, List]:
         """
-        Рекурсивно получить все файлы и папки
+        Получить все файлы и папки
 
         Args:
             parent_folder_id: ID родительской папки (None = корень)
-            max_depth: Максимальная глубина рекурсии (защита от бесконечных циклов)
+            max_depth: Максимальная глубина обхода (защита от бесконечных циклов)
+            skip_folder: Функция от данных подпапки; True - не загружать ее содержимое
 
         Returns:
             Словарь с ключами 'all_files', 'all_folders', 'folder_count', 'file_count'
         """
         all_files = []
         all_folders = []
-        visited_folders = set()  # Защита от циклических ссылок
-        folder_count = 0
-        file_count = 0
-
-        def fetch_recursive(folder_id: Optional[int], current_path: str = "", depth: int = 0):
-            """Рекурсивная функция для получения всех файлов"""
-            nonlocal folder_count, file_count
-
-            # Защита от слишком глубокой рекурсии
-            if depth > max_depth:
-                logger.warning(f"⚠️ Максимальная глубина рекурсии достигнута ({max_depth}) для пути: {current_path}")
-                return
-
-            # Проверяем на циклические ссылки
-            folder_key = folder_id if folder_id is not None else 'root'
-            if folder_key in visited_folders:
-                logger.warning(f"⚠️ Пропуск уже посещенной папки ID={folder_id} (путь: {current_path})")
-                return
-
-            visited_folders.add(folder_key)
-            logger.debug(f"📂 Добавляем в visited: {folder_key} (глубина: {depth})")
+        visited_count = 0
 
-            data = self.get_files_and_folders(folder_id)
+        logger.info(f"📂 Загружаем структуру SimplePrint (параллельный обход, потоков: {self.max_workers})...")
 
-            # Добавляем файлы текущей папки
-            files = data['files']
-            for file in files:
-                file['path'] = current_path  # Добавляем путь к файлу
-                file['parent_folder_id'] = folder_id  # Добавляем ID родительской папки
-                all_files.append(file)
-                file_count += 1
-                logger.debug(f"📄 Файл: {file.get('name')} в {current_path}")
+        for listing in self.iter_folder_tree(parent_folder_id, max_depth=max_depth, skip_folder=skip_folder):
+            visited_count += 1
+            all_files.extend(listing['files'])
+            all_folders.extend(listing['folders'])
 
-            # Добавляем папки и рекурсивно обрабатываем подпапки
-            folders = data['folders']
-            for folder in folders:
-                folder_count += 1
-                folder_name = folder.get('name', 'Без названия')
-                full_path = f"{current_path}/{folder_name}".strip("/")
-                folder['path'] = full_path  # Добавляем путь к папке
-                all_folders.append(folder)
+            if visited_count % 100 == 0:
+                logger.info(f"📁 Загружено папок: {visited_count}, найдено файлов: {len(all_files)}")
 
-                logger.info(f"📁 Папка: {full_path} (ID: {folder.get('id')}, глубина: {depth + 1})")
-
-            logger.debug(f"Папка {folder_id}: {len(folders)} подпапок, {len(files)} файлов")
-
-            # Рекурсивно обрабатываем подпапки
-            for folder in folders:
-                folder_name = folder.get('name', 'Без названия')
-                full_path = f"{current_path}/{folder_name}".strip("/")
-                fetch_recursive(folder['id'], full_path, depth + 1)
-
-        logger.info(f"📂 Загружаем структуру SimplePrint (начало рекурсивного обхода)...")
-        fetch_recursive(parent_folder_id)
-
-        logger.info(f"✅ Готово! Папок: {folder_count}, файлов: {file_count} из {len(visited_folders)} уникальных локаций")
+        logger.info(f"✅ Готово! Папок: {len(all_folders)}, файлов: {len(all_files)} из {visited_count} уникальных локаций")
 
         return {
             'all_files': all_files,
             'all_folders': all_folders,
-            'folder_count': folder_count,
-            'file_count': file_count,
+            'folder_count': len(all_folders),
+            'file_count': len(all_files),
         }
 
 
@@ -303,107 +571,23 @@ class SimplePrintPrintersClient:
         self.api_token = config['api_token']
         self.rate_limit = config['rate_limit']  # requests per minute
 
-        # Вычисляем задержку между запросами
-        self.request_delay = 60.0 / self.rate_limit  # секунды между запросами
-
-        self.retry_attempts = 2  # Уменьшили количество попыток
-        self.timeout = 10  # Уменьшили timeout до 10 секунд (было 30)
-
-        # Последнее время запроса для rate limiting
-        self._last_request_time = 0
-
-    def _get_headers(self) -> Dict[str, str]:
-        """Получить заголовки для запроса"""
-        return {
-            'X-API-KEY': self.api_token,
-            'Accept': 'application/json',
-            'Content-Type': 'application/json',
-        }
-
-    def _rate_limit(self):
-        """Применить rate limiting"""
-        current_time = time.time()
-        time_since_last_request = current_time - self._last_request_time
-
-        if time_since_last_request < self.request_delay:
-            sleep_time = self.request_delay - time_since_last_request
-            logger.debug(f"Rate limiting: sleeping for {sleep_time:.2f} seconds")
-            time.sleep(sleep_time)
-
-        self._last_request_time = time.time()
+        # Общие для аккаунта сессия, лимит запросов и повторы
+        self.transport = get_transport()
 
     def _make_request(
         self,
         method: str,
         endpoint: str,
         params: Optional[Dict] = None,
-        data: Optional[Dict] = None,
-        retry_count: int = 0
+        data: Optional[Dict] = None
     ) -> Dict:
         """
-        Выполнить HTTP запрос с retry логикой
-
-        Args:
-            method: HTTP метод (GET, POST)
-            endpoint: API endpoint
-            params: Query параметры
-            data: Данные для POST запроса
-            retry_count: Текущая попытка (для рекурсии)
-
-        Returns:
-            Ответ от API в виде словаря
+        Выполнить HTTP запрос через общий транспорт
 
         Raises:
             SimplePrintAPIError: При ошибке API
         """
-        # Применяем rate limiting
-        self._rate_limit()
-
-        url = f"{self.base_url}/{endpoint}"
-        headers = self._get_headers()
-
-        try:
-            logger.debug(f"{method} {url} (попытка {retry_count + 1}/{self.retry_attempts})")
-
-            if method == 'GET':
-                response = requests.get(url, headers=headers, params=params, timeout=self.timeout)
-            elif method == 'POST':
-                response = requests.post(url, headers=headers, json=data, timeout=self.timeout)
-            else:
-                raise SimplePrintAPIError(f"Unsupported HTTP method: {method}")
-
-            response.raise_for_status()
-
-            data = response.json()
-
-            # Проверяем статус ответа SimplePrint
-            if not data.get('status', False):
-                error_message = data.get('message', 'Unknown error')
-                logger.error(f"SimplePrint API error: {error_message}")
-                raise SimplePrintAPIError(f"API returned error: {error_message}")
-
-            return data
-
-        except requests.exceptions.Timeout:
-            logger.warning(f"Request timeout for {url}")
-            if retry_count < self.retry_attempts - 1:
-                return self._make_request(method, endpoint, params, data, retry_count + 1)
-            raise SimplePrintAPIError(f"Request timeout after {self.retry_attempts} attempts")
-
-        except requests.exceptions.HTTPError as e:
-            logger.error(f"HTTP error {e.response.status_code}: {e.response.text}")
-            if retry_count < self.retry_attempts - 1 and e.response.status_code >= 500:
-                # Retry только для серверных ошибок
-                time.sleep(2 ** retry_count)  # Exponential backoff
-                return self._make_request(method, endpoint, params, data, retry_count + 1)
-            raise SimplePrintAPIError(f"HTTP error {e.response.status_code}: {e.response.text}")
-
-        except requests.exceptions.RequestException as e:
-            logger.error(f"Request error: {e}")
-            if retry_count < self.retry_attempts - 1:
-                time.sleep(2 ** retry_count)  # Exponential backoff
-                return self._make_request(method, endpoint, params, data, retry_count + 1)
-            raise SimplePrintAPIError(f"Request failed: {e}")
+        return self.transport.request(method, endpoint, params=params, data=data)
 
     def get_printers(self) -> List[Dict]:
         """
@@ -17,7 +17,12 @@ class Command(BaseCommand):
         parser.add_argument(
             '--full',
             action='store_true',
-            help='Полная синхронизация с удалением отсутствующих файлов',
+            help='Полная синхронизация с удалением отсутствующих файлов и папок',
+        )
+        parser.add_argument(
+            '--incremental',
+            action='store_true',
+            help='Не загружать содержимое папок, которые не изменились',
         )
         parser.add_argument(
             '--force',
@@ -28,6 +33,7 @@ class Command(BaseCommand):
     def handle(self, *args, **options):
         """Выполнить команду"""
         full_sync = options['full']
+        incremental = options['incremental']
         force = options['force']
 
         self.stdout.write(self.style.NOTICE('=' * 70))
@@ -62,6 +68,7 @@ class Command(BaseCommand):
         self.stdout.write('')
         self.stdout.write(self.style.NOTICE('Параметры синхронизации:'))
         self.stdout.write(f'  Полная синхронизация: {"Да" if full_sync else "Нет"}')
+        self.stdout.write(f'  Инкрементальная: {"Да" if incremental else "Нет"}')
         self.stdout.write(f'  Принудительная: {"Да" if force else "Нет"}')
         self.stdout.write('')
 
@@ -70,7 +77,7 @@ class Command(BaseCommand):
             self.stdout.write(self.style.NOTICE('Запуск синхронизации...'))
             start_time = timezone.now()
 
-            sync_log = service.sync_all_files(full_sync=full_sync)
+            sync_log = service.sync_all_files(full_sync=full_sync, incremental=incremental)
 
             end_time = timezone.now()
             duration = (end_time - start_time).total_seconds()
@@ -84,8 +91,11 @@ class Command(BaseCommand):
             self.stdout.write(f'  Папок синхронизировано: {sync_log.synced_folders}')
             self.stdout.write(f'  Файлов найдено: {sync_log.total_files}')
             self.stdout.write(f'  Файлов синхронизировано: {sync_log.synced_files}')
+            self.stdout.write(f'  Папок изменено: {sync_log.changed_folders}, пропущено без загрузки: {sync_log.skipped_folders}')
+            self.stdout.write(f'  Файлов изменено: {sync_log.changed_files}')
             if full_sync:
                 self.stdout.write(f'  Файлов удалено: {sync_log.deleted_files}')
+                self.stdout.write(f'  Папок удалено: {sync_log.deleted_folders}')
             self.stdout.write(f'  Длительность: {duration:.1f} секунд')
             self.stdout.write('')
 
@@ -0,0 +1,43 @@
+# Generated by Django 4.2.7 on 2026-10-19 11:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('simpleprint', '0004_alter_printersnapshot_current_layer_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='simpleprintfile',
+            name='fingerprint',
+            field=models.CharField(blank=True, default='', help_text='Отпечаток данных файла из API', max_length=64),
+        ),
+        migrations.AddField(
+            model_name='simpleprintfolder',
+            name='fingerprint',
+            field=models.CharField(blank=True, default='', help_text='Отпечаток данных папки из API', max_length=64),
+        ),
+        migrations.AddField(
+            model_name='simpleprintsync',
+            name='changed_files',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='simpleprintsync',
+            name='changed_folders',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='simpleprintsync',
+            name='incremental',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='simpleprintsync',
+            name='skipped_folders',
+            field=models.IntegerField(default=0, help_text='Неизмененные папки, содержимое которых не загружалось'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 4.2.7 on 2026-10-19 11:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('simpleprint', '0005_incremental_sync'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='simpleprintfile',
+            name='sync_generation',
+            field=models.PositiveBigIntegerField(db_index=True, default=0, help_text='ID синхронизации, в которой файл последний раз получен из API'),
+        ),
+        migrations.AddField(
+            model_name='simpleprintfolder',
+            name='sync_generation',
+            field=models.PositiveBigIntegerField(db_index=True, default=0, help_text='ID синхронизации, в которой папка последний раз получена из API'),
+        ),
+        migrations.AddField(
+            model_name='simpleprintsync',
+            name='deleted_folders',
+            field=models.IntegerField(default=0),
+        ),
+    ]
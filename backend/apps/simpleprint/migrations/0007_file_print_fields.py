@@ -0,0 +1,135 @@
+# Generated by Django 4.2.7 on 2026-10-19 11:47
+
+import math
+
+from django.db import migrations, models
+
+BATCH_SIZE = 1000
+
+PRINT_FIELDS = ['material_type', 'material_color', 'nozzle_size', 'print_time', 'weight', 'prints_done']
+
+
+# extract_print_fields скопирован из models на момент миграции, чтобы
+# миграция не зависела от последующих изменений модели.
+
+# Плотность и диаметр филамента по умолчанию (PLA)
+DEFAULT_FILAMENT_DENSITY = 1.24
+DEFAULT_FILAMENT_DIAMETER = 1.75
+
+
+def _first(value):
+    """Первый элемент списка или само значение"""
+    if isinstance(value, list):
+        return value[0] if value else None
+    return value
+
+
+def _as_number(value, cast=float):
+    try:
+        return cast(value) if value is not None and value != '' else None
+    except (TypeError, ValueError):
+        return None
+
+
+def extract_print_fields(tags, gcode_analysis, print_data) -> dict:
+    """
+    Извлечь часто фильтруемые значения из JSON-данных файла SimplePrint
+
+    Returns:
+        Словарь со значениями полей material_type, material_color,
+        nozzle_size, print_time, weight, prints_done
+    """
+    tags = tags if isinstance(tags, dict) else {}
+    gcode_analysis = gcode_analysis if isinstance(gcode_analysis, dict) else {}
+    print_data = print_data if isinstance(print_data, dict) else {}
+
+    tag_material = _first(tags.get('material')) or {}
+    gcode_material = _first(gcode_analysis.get('materialData')) or {}
+    tag_nozzle = _first(tags.get('nozzleData')) or {}
+
+    material_type = gcode_material.get('type') if isinstance(gcode_material, dict) else None
+    material_color = tag_material.get('color') if isinstance(tag_material, dict) else None
+
+    nozzle_size = _as_number(gcode_analysis.get('nozzleSize'))
+    if nozzle_size is None and isinstance(tag_nozzle, dict):
+        nozzle_size = _as_number(tag_nozzle.get('size'))
+
+    # Вес: длина филамента (мм) * площадь сечения * плотность
+    weight = None
+    filament_length = _as_number(_first(gcode_analysis.get('filament')))
+    if filament_length:
+        density = DEFAULT_FILAMENT_DENSITY
+        diameter = DEFAULT_FILAMENT_DIAMETER
+        if isinstance(gcode_material, dict):
+            density = _as_number(gcode_material.get('density')) or density
+            diameter = _as_number(gcode_material.get('diameter')) or diameter
+        radius = diameter / 2
+        volume_cm3 = (filament_length / 10) * math.pi * (radius / 10) ** 2  # переводим в см³
+        weight = round(volume_cm3 * density, 1)
+
+    return {
+        'material_type': str(material_type)[:50] if material_type else '',
+        'material_color': str(material_color)[:50] if material_color else '',
+        'nozzle_size': nozzle_size,
+        'print_time': _as_number(gcode_analysis.get('estimate'), int),
+        'weight': weight,
+        'prints_done': _as_number(print_data.get('printsDone'), int) or 0,
+    }
+
+
+def fill_print_fields(apps, schema_editor):
+    SimplePrintFile = apps.get_model('simpleprint', 'SimplePrintFile')
+    files = SimplePrintFile.objects.only('id', 'tags', 'gcode_analysis', 'print_data').order_by('pk')
+
+    batch = []
+    for file in files.iterator(chunk_size=BATCH_SIZE):
+        for field, value in extract_print_fields(file.tags, file.gcode_analysis, file.print_data).items():
+            setattr(file, field, value)
+        batch.append(file)
+        if len(batch) >= BATCH_SIZE:
+            SimplePrintFile.objects.bulk_update(batch, PRINT_FIELDS)
+            batch = []
+
+    if batch:
+        SimplePrintFile.objects.bulk_update(batch, PRINT_FIELDS)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('simpleprint', '0006_sync_generation'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='simpleprintfile',
+            name='material_color',
+            field=models.CharField(blank=True, db_index=True, help_text='Цвет материала', max_length=50),
+        ),
+        migrations.AddField(
+            model_name='simpleprintfile',
+            name='material_type',
+            field=models.CharField(blank=True, db_index=True, help_text='Тип материала (PLA, PETG...)', max_length=50),
+        ),
+        migrations.AddField(
+            model_name='simpleprintfile',
+            name='nozzle_size',
+            field=models.FloatField(blank=True, db_index=True, help_text='Диаметр сопла, мм', null=True),
+        ),
+        migrations.AddField(
+            model_name='simpleprintfile',
+            name='print_time',
+            field=models.IntegerField(blank=True, db_index=True, help_text='Оценка времени печати, секунды', null=True),
+        ),
+        migrations.AddField(
+            model_name='simpleprintfile',
+            name='prints_done',
+            field=models.IntegerField(db_index=True, default=0, help_text='Количество выполненных печатей'),
+        ),
+        migrations.AddField(
+            model_name='simpleprintfile',
+            name='weight',
+            field=models.FloatField(blank=True, help_text='Вес филамента, граммы', null=True),
+        ),
+        migrations.RunPython(fill_print_fields, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,60 @@
+# Generated by Django 4.2.7 on 2026-10-19 11:55
+
+from django.db import migrations, models
+
+BATCH_SIZE = 1000
+
+
+def build_tree_path(parent_path, simpleprint_id):
+    """Путь папки из ID от корня, /1/11/111/ (копия из models на момент миграции)"""
+    return f"{parent_path or '/'}{simpleprint_id}/"
+
+
+def fill_tree_paths(apps, schema_editor):
+    SimplePrintFolder = apps.get_model('simpleprint', 'SimplePrintFolder')
+    folders = {
+        pk: (simpleprint_id, parent_id)
+        for pk, simpleprint_id, parent_id in SimplePrintFolder.objects.values_list('pk', 'simpleprint_id', 'parent_id')
+    }
+
+    paths = {}
+
+    def get_path(pk):
+        # Путь строится от корня; цикл в parent обрывается на уже посещенной папке
+        chain = []
+        while pk is not None and pk not in paths and pk in folders and pk not in chain:
+            chain.append(pk)
+            pk = folders[pk][1]
+        parent_path = paths.get(pk, '')
+        for chain_pk in reversed(chain):
+            parent_path = paths[chain_pk] = build_tree_path(parent_path, folders[chain_pk][0])
+        return paths[chain[0]] if chain else parent_path
+
+    batch = []
+    for folder in SimplePrintFolder.objects.only('id', 'simpleprint_id', 'parent_id').order_by('pk').iterator(
+        chunk_size=BATCH_SIZE
+    ):
+        folder.tree_path = get_path(folder.pk)
+        batch.append(folder)
+        if len(batch) >= BATCH_SIZE:
+            SimplePrintFolder.objects.bulk_update(batch, ['tree_path'])
+            batch = []
+
+    if batch:
+        SimplePrintFolder.objects.bulk_update(batch, ['tree_path'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('simpleprint', '0007_file_print_fields'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='simpleprintfolder',
+            name='tree_path',
+            field=models.CharField(blank=True, db_index=True, default='', help_text='Материализованный путь из ID папок SimplePrint от корня (/1/11/)', max_length=1000),
+        ),
+        migrations.RunPython(fill_tree_paths, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,191 @@
+# Generated by Django 4.2.7 on 2026-10-19 11:58
+
+import re
+
+from django.db import migrations, models
+
+BATCH_SIZE = 1000
+
+ARTICLE_FIELDS = ['article', 'quantity']
+
+
+# Разбор имени файла и нормализация артикула скопированы из models и
+# apps.core.utils.article_normalizer на момент миграции, чтобы миграция
+# не зависела от последующих изменений этого кода.
+
+DASH_PATTERN = re.compile(r'[–—−‒]')
+INVISIBLE_PATTERN = re.compile(r'[\x00-\x1f\x7f-\x9f\xa0\u2000-\u200f\u2028-\u202f\u205f-\u206f]')
+SPACE_PATTERN = re.compile(r'\s+')
+
+
+def normalize_article(article):
+    if not article:
+        return ''
+    result = str(article).strip()
+    result = DASH_PATTERN.sub('-', result)
+    result = INVISIBLE_PATTERN.sub('', result)
+    return SPACE_PATTERN.sub(' ', result).strip()
+
+
+def parse_file_article(filename):
+    """
+    Извлечь артикул из имени файла
+
+    Артикул находится в начале имени файла, перед указателями:
+    - part1, part2... (части изделия)
+    - 25pcs, 3k (количество)
+    - временными метками (12h51m)
+
+    Форматы артикулов:
+    - 673-50930 (3 цифры - 5 цифр)
+    - N406-05-54.7 (с буквами, точками, тире, подчеркиваниями)
+    - 138_N406-12-138 (сложные комбинации)
+    - 710 (простые числа)
+    """
+    # Убираем расширение
+    name_without_ext = filename.rsplit('.', 1)[0] if '.' in filename else filename
+
+    # Паттерны для поиска границы артикула:
+    # ПРИОРИТЕТ: pcs/psc имеет приоритет над k
+    # - part\d (part1, part2)
+    # - \d+pcs, \d+psc (явное указание количества)
+    # - \d+k (количество ТОЛЬКО если идет отдельно после underscore)
+    # - \d+h\d*m (временные метки типа 12h51m)
+
+    # Находим первое вхождение этих паттернов
+    patterns = [
+        r'_part\d+',              # _part1, _part2
+        r'_\d+[,.]?\d*(pcs|psc)', # _25pcs, _42psc (опечатка), _1.5pcs (ПРИОРИТЕТ)
+        r'_\d+k(?=[_\s\d]|$)',   # _3k (количество, только если отдельно)
+        r'_\d+h\d*m',             # _12h51m, _2h (время печати с часами и минутами)
+        r'_\d+m_',                # _30m_ (только минуты, за которыми идет что-то еще)
+        r'_\d+g_',                # _370g_ (вес, за которым идет что-то еще)
+    ]
+
+    earliest_pos = len(name_without_ext)
+    for pattern in patterns:
+        match = re.search(pattern, name_without_ext, re.IGNORECASE)
+        if match:
+            earliest_pos = min(earliest_pos, match.start())
+
+    # Извлекаем артикул - все до первого найденного паттерна
+    article_part = name_without_ext[:earliest_pos]
+
+    # Очищаем артикул от trailing underscore
+    article = article_part.rstrip('_')
+
+    # Удаляем префикс с номером папки (например, "138_" в начале)
+    # Паттерн: 1-3 цифры + подчеркивание в начале строки
+    article = re.sub(r'^(\d{1,3})_', '', article)
+
+    # Удаляем распространенные суффиксы (NEW, OLD, V1, V2, V3, UPDATED, FINAL и т.д.)
+    # Паттерн: underscore + любые буквы/цифры в конце артикула
+    article = re.sub(r'_(NEW|OLD|V\d+|UPDATED|FINAL|TEST|DRAFT)$', '', article, flags=re.IGNORECASE)
+
+    # Если артикул не пустой и содержит хотя бы одну цифру или букву
+    if article and re.search(r'[A-Za-z0-9]', article):
+        return article
+
+    return None
+
+
+def parse_file_quantity(filename):
+    """
+    Извлечь количество деталей из имени файла
+
+    ПРИОРИТЕТ (от высокого к низкому):
+    1. pcs/psc (явное указание штук) - ВСЕГДА имеет приоритет
+    2. part (части изделия) = 0.5
+    3. k/K (только если идет ОТДЕЛЬНО после underscore, не в артикуле)
+
+    Примеры:
+    - 45_N421-11-45K_part2_10pcs_... → 10.0 (pcs приоритетнее, 45K - часть артикула)
+    - 102-43032_42psc_... → 42.0 (psc)
+    - N406-12-138_3K_... → 3.0 (отдельное k после underscore)
+    - 673-50930_part1_... → 0.5 (part)
+    """
+    filename = filename.lower()
+
+    # ПРИОРИТЕТ 1: Проверяем наличие pcs/psc (явное указание количества)
+
+    # 1a. Дробные значения с pcs/psc: "1,5pcs" или "1.5pcs"
+    match = re.search(r'(\d+)[,.](\d+)(pcs|psc)(?=[_\s\d]|$)', filename)
+    if match:
+        integer_part = int(match.group(1))
+        decimal_part = int(match.group(2))
+        return float(f"{integer_part}.{decimal_part}")
+
+    # 1b. Целые значения с pcs/psc: "25pcs", "42psc"
+    match = re.search(r'(\d+)(pcs|psc)(?=[_\s\d]|$)', filename)
+    if match:
+        return float(match.group(1))
+
+    # ПРИОРИТЕТ 2: Проверяем паттерн "part" (part1, part2, part3 и т.д.)
+    # Если изделие печатается по частям, каждая часть = 0.5
+    match = re.search(r'part\d+', filename)
+    if match:
+        return 0.5
+
+    # ПРИОРИТЕТ 3: Проверяем k ТОЛЬКО если нет pcs/psc
+    # ВАЖНО: k должен идти ПОСЛЕ underscore (не в начале имени, не в артикуле)
+    # Паттерн: _\d+k с lookahead для конца или разделителя
+    match = re.search(r'_(\d+)k(?=[_\s\d]|$)', filename)
+    if match:
+        return float(match.group(1))
+
+    # Дробные значения с k (только если после underscore)
+    match = re.search(r'_(\d+)[,.](\d+)k(?=[_\s\d]|$)', filename)
+    if match:
+        integer_part = int(match.group(1))
+        decimal_part = int(match.group(2))
+        return float(f"{integer_part}.{decimal_part}")
+
+    return None
+
+
+def extract_article_fields(filename):
+    """
+    Артикул (нормализованный, как у товаров) и количество из имени файла
+    """
+    return {
+        'article': normalize_article(parse_file_article(filename))[:255],
+        'quantity': parse_file_quantity(filename),
+    }
+
+
+def fill_article_fields(apps, schema_editor):
+    SimplePrintFile = apps.get_model('simpleprint', 'SimplePrintFile')
+    files = SimplePrintFile.objects.only('id', 'name').order_by('pk')
+
+    batch = []
+    for file in files.iterator(chunk_size=BATCH_SIZE):
+        for field, value in extract_article_fields(file.name).items():
+            setattr(file, field, value)
+        batch.append(file)
+        if len(batch) >= BATCH_SIZE:
+            SimplePrintFile.objects.bulk_update(batch, ARTICLE_FIELDS)
+            batch = []
+
+    if batch:
+        SimplePrintFile.objects.bulk_update(batch, ARTICLE_FIELDS)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('simpleprint', '0008_folder_tree_path'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='simpleprintfile',
+            name='article',
+            field=models.CharField(blank=True, db_index=True, default='', help_text='Нормализованный артикул товара из имени файла', max_length=255),
+        ),
+        migrations.AddField(
+            model_name='simpleprintfile',
+            name='quantity',
+            field=models.FloatField(blank=True, help_text='Количество изделий за одну печать (из имени файла)', null=True),
+        ),
+        migrations.RunPython(fill_article_fields, migrations.RunPython.noop),
+    ]
@@ -4,9 +4,219 @@ SimplePrint Integration Models
 Модели для хранения информации о файлах и папках из SimplePrint API.
 """
 
+import math
+import re
+from typing import Optional
+
 from django.db import models
 from django.utils import timezone
 
+from apps.core.utils.article_normalizer import normalize_article
+
+# JSON-поля файла, которые нужны только на детальной странице.
+# В списках они откладываются (defer), фильтры и сортировка используют
+# типизированные колонки, извлеченные из них при синхронизации
+FILE_JSON_FIELDS = ['tags', 'print_data', 'cost_data', 'gcode_analysis', 'custom_fields']
+
+# Плотность и диаметр филамента по умолчанию (PLA)
+DEFAULT_FILAMENT_DENSITY = 1.24
+DEFAULT_FILAMENT_DIAMETER = 1.75
+
+
+def _first(value):
+    """Первый элемент списка или само значение"""
+    if isinstance(value, list):
+        return value[0] if value else None
+    return value
+
+
+def _as_number(value, cast=float):
+    try:
+        return cast(value) if value is not None and value != '' else None
+    except (TypeError, ValueError):
+        return None
+
+
+def build_tree_path(parent_path: str, simpleprint_id) -> str:
+    """
+    Материализованный путь папки: ID папок SimplePrint от корня, "/1/11/111/"
+
+    Разделители с обеих сторон нужны, чтобы префикс "/1/" не совпадал с "/12/".
+    """
+    return f"{parent_path or '/'}{simpleprint_id}/"
+
+
+def extract_print_fields(tags, gcode_analysis, print_data) -> dict:
+    """
+    Извлечь часто фильтруемые значения из JSON-данных файла SimplePrint
+
+    Returns:
+        Словарь со значениями полей material_type, material_color,
+        nozzle_size, print_time, weight, prints_done
+    """
+    tags = tags if isinstance(tags, dict) else {}
+    gcode_analysis = gcode_analysis if isinstance(gcode_analysis, dict) else {}
+    print_data = print_data if isinstance(print_data, dict) else {}
+
+    tag_material = _first(tags.get('material')) or {}
+    gcode_material = _first(gcode_analysis.get('materialData')) or {}
+    tag_nozzle = _first(tags.get('nozzleData')) or {}
+
+    material_type = gcode_material.get('type') if isinstance(gcode_material, dict) else None
+    material_color = tag_material.get('color') if isinstance(tag_material, dict) else None
+
+    nozzle_size = _as_number(gcode_analysis.get('nozzleSize'))
+    if nozzle_size is None and isinstance(tag_nozzle, dict):
+        nozzle_size = _as_number(tag_nozzle.get('size'))
+
+    # Вес: длина филамента (мм) * площадь сечения * плотность
+    weight = None
+    filament_length = _as_number(_first(gcode_analysis.get('filament')))
+    if filament_length:
+        density = DEFAULT_FILAMENT_DENSITY
+        diameter = DEFAULT_FILAMENT_DIAMETER
+        if isinstance(gcode_material, dict):
+            density = _as_number(gcode_material.get('density')) or density
+            diameter = _as_number(gcode_material.get('diameter')) or diameter
+        radius = diameter / 2
+        volume_cm3 = (filament_length / 10) * math.pi * (radius / 10) ** 2  # переводим в см³
+        weight = round(volume_cm3 * density, 1)
+
+    return {
+        'material_type': str(material_type)[:50] if material_type else '',
+        'material_color': str(material_color)[:50] if material_color else '',
+        'nozzle_size': nozzle_size,
+        'print_time': _as_number(gcode_analysis.get('estimate'), int),
+        'weight': weight,
+        'prints_done': _as_number(print_data.get('printsDone'), int) or 0,
+    }
+
+
+def parse_file_article(filename: str) -> Optional[str]:
+    """
+    Извлечь артикул из имени файла
+
+    Артикул находится в начале имени файла, перед указателями:
+    - part1, part2... (части изделия)
+    - 25pcs, 3k (количество)
+    - временными метками (12h51m)
+
+    Форматы артикулов:
+    - 673-50930 (3 цифры - 5 цифр)
+    - N406-05-54.7 (с буквами, точками, тире, подчеркиваниями)
+    - 138_N406-12-138 (сложные комбинации)
+    - 710 (простые числа)
+    """
+    # Убираем расширение
+    name_without_ext = filename.rsplit('.', 1)[0] if '.' in filename else filename
+
+    # Паттерны для поиска границы артикула:
+    # ПРИОРИТЕТ: pcs/psc имеет приоритет над k
+    # - part\d (part1, part2)
+    # - \d+pcs, \d+psc (явное указание количества)
+    # - \d+k (количество ТОЛЬКО если идет отдельно после underscore)
+    # - \d+h\d*m (временные метки типа 12h51m)
+
+    # Находим первое вхождение этих паттернов
+    patterns = [
+        r'_part\d+',              # _part1, _part2
+        r'_\d+[,.]?\d*(pcs|psc)', # _25pcs, _42psc (опечатка), _1.5pcs (ПРИОРИТЕТ)
+        r'_\d+k(?=[_\s\d]|$)',   # _3k (количество, только если отдельно)
+        r'_\d+h\d*m',             # _12h51m, _2h (время печати с часами и минутами)
+        r'_\d+m_',                # _30m_ (только минуты, за которыми идет что-то еще)
+        r'_\d+g_',                # _370g_ (вес, за которым идет что-то еще)
+    ]
+
+    earliest_pos = len(name_without_ext)
+    for pattern in patterns:
+        match = re.search(pattern, name_without_ext, re.IGNORECASE)
+        if match:
+            earliest_pos = min(earliest_pos, match.start())
+
+    # Извлекаем артикул - все до первого найденного паттерна
+    article_part = name_without_ext[:earliest_pos]
+
+    # Очищаем артикул от trailing underscore
+    article = article_part.rstrip('_')
+
+    # Удаляем префикс с номером папки (например, "138_" в начале)
+    # Паттерн: 1-3 цифры + подчеркивание в начале строки
+    article = re.sub(r'^(\d{1,3})_', '', article)
+
+    # Удаляем распространенные суффиксы (NEW, OLD, V1, V2, V3, UPDATED, FINAL и т.д.)
+    # Паттерн: underscore + любые буквы/цифры в конце артикула
+    article = re.sub(r'_(NEW|OLD|V\d+|UPDATED|FINAL|TEST|DRAFT)$', '', article, flags=re.IGNORECASE)
+
+    # Если артикул не пустой и содержит хотя бы одну цифру или букву
+    if article and re.search(r'[A-Za-z0-9]', article):
+        return article
+
+    return None
+
+
+def parse_file_quantity(filename: str) -> Optional[float]:
+    """
+    Извлечь количество деталей из имени файла
+
+    ПРИОРИТЕТ (от высокого к низкому):
+    1. pcs/psc (явное указание штук) - ВСЕГДА имеет приоритет
+    2. part (части изделия) = 0.5
+    3. k/K (только если идет ОТДЕЛЬНО после underscore, не в артикуле)
+
+    Примеры:
+    - 45_N421-11-45K_part2_10pcs_... → 10.0 (pcs приоритетнее, 45K - часть артикула)
+    - 102-43032_42psc_... → 42.0 (psc)
+    - N406-12-138_3K_... → 3.0 (отдельное k после underscore)
+    - 673-50930_part1_... → 0.5 (part)
+    """
+    filename = filename.lower()
+
+    # ПРИОРИТЕТ 1: Проверяем наличие pcs/psc (явное указание количества)
+
+    # 1a. Дробные значения с pcs/psc: "1,5pcs" или "1.5pcs"
+    match = re.search(r'(\d+)[,.](\d+)(pcs|psc)(?=[_\s\d]|$)', filename)
+    if match:
+        integer_part = int(match.group(1))
+        decimal_part = int(match.group(2))
+        return float(f"{integer_part}.{decimal_part}")
+
+    # 1b. Целые значения с pcs/psc: "25pcs", "42psc"
+    match = re.search(r'(\d+)(pcs|psc)(?=[_\s\d]|$)', filename)
+    if match:
+        return float(match.group(1))
+
+    # ПРИОРИТЕТ 2: Проверяем паттерн "part" (part1, part2, part3 и т.д.)
+    # Если изделие печатается по частям, каждая часть = 0.5
+    match = re.search(r'part\d+', filename)
+    if match:
+        return 0.5
+
+    # ПРИОРИТЕТ 3: Проверяем k ТОЛЬКО если нет pcs/psc
+    # ВАЖНО: k должен идти ПОСЛЕ underscore (не в начале имени, не в артикуле)
+    # Паттерн: _\d+k с lookahead для конца или разделителя
+    match = re.search(r'_(\d+)k(?=[_\s\d]|$)', filename)
+    if match:
+        return float(match.group(1))
+
+    # Дробные значения с k (только если после underscore)
+    match = re.search(r'_(\d+)[,.](\d+)k(?=[_\s\d]|$)', filename)
+    if match:
+        integer_part = int(match.group(1))
+        decimal_part = int(match.group(2))
+        return float(f"{integer_part}.{decimal_part}")
+
+    return None
+
+
+def extract_article_fields(filename: str) -> dict:
+    """
+    Артикул (нормализованный, как у товаров) и количество из имени файла
+    """
+    return {
+        'article': normalize_article(parse_file_article(filename))[:255],
+        'quantity': parse_file_quantity(filename),
+    }
+
 
 class SimplePrintFolder(models.Model):
     """
@@ -26,6 +236,10 @@ class SimplePrintFolder(models.Model):
         help_text="Родительская папка"
     )
     depth = models.IntegerField(default=0, help_text="Уровень вложенности")
+    tree_path = models.CharField(
+        max_length=1000, blank=True, default='', db_index=True,
+        help_text="Материализованный путь из ID папок SimplePrint от корня (/1/11/)"
+    )
 
     # Статистика
     files_count = models.IntegerField(default=0, help_text="Количество файлов в папке")
@@ -37,6 +251,12 @@ class SimplePrintFolder(models.Model):
     can_modify = models.BooleanField(default=True)
     can_download = models.BooleanField(default=True)
 
+    # Отпечаток данных папки из API (счетчики items, даты) для инкрементальной синхронизации
+    fingerprint = models.CharField(max_length=64, blank=True, default='', help_text="Отпечаток данных папки из API")
+    sync_generation = models.PositiveBigIntegerField(
+        default=0, db_index=True, help_text="ID синхронизации, в которой папка последний раз получена из API"
+    )
+
     # Метаданные
     created_at_sp = models.DateTimeField(help_text="Дата создания в SimplePrint")
     created_at = models.DateTimeField(auto_now_add=True, help_text="Дата создания в локальной БД")
@@ -56,11 +276,35 @@ class SimplePrintFolder(models.Model):
     def __str__(self):
         return f"{self.name} (ID: {self.simpleprint_id})"
 
+    def get_path_ids(self):
+        """ID папок SimplePrint от корня до этой папки включительно"""
+        return [int(sp_id) for sp_id in self.tree_path.strip('/').split('/') if sp_id]
+
     def get_full_path(self):
         """Получить полный путь к папке"""
-        if self.parent:
-            return f"{self.parent.get_full_path()}/{self.name}"
-        return self.name
+        path_ids = self.get_path_ids()
+        if not path_ids:
+            if self.parent:
+                return f"{self.parent.get_full_path()}/{self.name}"
+            return self.name
+
+        # Имена всех папок пути - одним запросом
+        names = dict(
+            SimplePrintFolder.objects.filter(simpleprint_id__in=path_ids).values_list('simpleprint_id', 'name')
+        )
+        names[self.simpleprint_id] = self.name
+        return '/'.join(names.get(sp_id, str(sp_id)) for sp_id in path_ids)
+
+    def get_descendants(self, include_self=False):
+        """Вложенные папки на любой глубине - запрос по префиксу tree_path"""
+        folders = SimplePrintFolder.objects.filter(tree_path__startswith=self.tree_path)
+        if not include_self:
+            folders = folders.exclude(pk=self.pk)
+        return folders
+
+    def get_subtree_files(self):
+        """Файлы этой папки и всех вложенных"""
+        return SimplePrintFile.objects.filter(folder__tree_path__startswith=self.tree_path)
 
 
 class SimplePrintFile(models.Model):
@@ -111,6 +355,26 @@ class SimplePrintFile(models.Model):
     # Пользовательские поля
     custom_fields = models.JSONField(default=list, blank=True, help_text="Пользовательские поля")
 
+    # Значения из JSON-полей для фильтрации и сортировки (см. extract_print_fields)
+    material_type = models.CharField(max_length=50, blank=True, db_index=True, help_text="Тип материала (PLA, PETG...)")
+    material_color = models.CharField(max_length=50, blank=True, db_index=True, help_text="Цвет материала")
+    nozzle_size = models.FloatField(null=True, blank=True, db_index=True, help_text="Диаметр сопла, мм")
+    print_time = models.IntegerField(null=True, blank=True, db_index=True, help_text="Оценка времени печати, секунды")
+    weight = models.FloatField(null=True, blank=True, help_text="Вес филамента, граммы")
+    prints_done = models.IntegerField(default=0, db_index=True, help_text="Количество выполненных печатей")
+
+    # Извлекаются из имени файла - связь с Product.article
+    article = models.CharField(
+        max_length=255, blank=True, default='', db_index=True, help_text="Нормализованный артикул товара из имени файла"
+    )
+    quantity = models.FloatField(null=True, blank=True, help_text="Количество изделий за одну печать (из имени файла)")
+
+    # Отпечаток данных файла из API - неизмененные файлы не перезаписываются
+    fingerprint = models.CharField(max_length=64, blank=True, default='', help_text="Отпечаток данных файла из API")
+    sync_generation = models.PositiveBigIntegerField(
+        default=0, db_index=True, help_text="ID синхронизации, в которой файл последний раз получен из API"
+    )
+
     # Метаданные
     created_at_sp = models.DateTimeField(help_text="Дата создания в SimplePrint")
     created_at = models.DateTimeField(auto_now_add=True, help_text="Дата создания в локальной БД")
@@ -150,9 +414,17 @@ class SimplePrintFile(models.Model):
 
     def get_print_time_estimate(self):
         """Получить оценку времени печати в секундах"""
-        if 'gcodeAnalysis' in self.__dict__ and 'estimate' in self.gcode_analysis:
-            return self.gcode_analysis['estimate']
-        return None
+        return self.print_time
+
+    def update_print_fields(self):
+        """Заполнить типизированные поля из JSON-данных"""
+        for field, value in extract_print_fields(self.tags, self.gcode_analysis, self.print_data).items():
+            setattr(self, field, value)
+
+    def update_article_fields(self):
+        """Заполнить артикул и количество из имени файла"""
+        for field, value in extract_article_fields(self.name).items():
+            setattr(self, field, value)
 
     def get_filament_usage(self):
         """Получить использование филамента в мм"""
@@ -188,6 +460,13 @@ class SimplePrintSync(models.Model):
     total_files = models.IntegerField(default=0)
     synced_files = models.IntegerField(default=0)
     deleted_files = models.IntegerField(default=0)
+    deleted_folders = models.IntegerField(default=0)
+
+    # Инкрементальная синхронизация: сколько записей действительно изменено
+    incremental = models.BooleanField(default=False)
+    changed_folders = models.IntegerField(default=0)
+    changed_files = models.IntegerField(default=0)
+    skipped_folders = models.IntegerField(default=0, help_text="Неизмененные папки, содержимое которых не загружалось")
 
     # Детали ошибок
     error_details = models.TextField(blank=True)
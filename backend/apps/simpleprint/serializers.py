@@ -18,7 +18,7 @@ class SimplePrintFolderSerializer(serializers.ModelSerializer):
     class Meta:
         model = SimplePrintFolder
         fields = [
-            'id', 'simpleprint_id', 'name', 'parent', 'depth',
+            'id', 'simpleprint_id', 'name', 'parent', 'depth', 'tree_path',
             'files_count', 'folders_count', 'full_path', 'subfolders_count',
             'can_view', 'can_upload', 'can_modify', 'can_download',
             'created_at_sp', 'created_at', 'updated_at', 'last_synced_at'
@@ -41,7 +41,7 @@ class SimplePrintFolderListSerializer(serializers.ModelSerializer):
     class Meta:
         model = SimplePrintFolder
         fields = [
-            'id', 'simpleprint_id', 'name', 'depth',
+            'id', 'simpleprint_id', 'name', 'depth', 'tree_path',
             'files_count', 'folders_count', 'last_synced_at'
         ]
 
@@ -66,6 +66,7 @@ class SimplePrintFileSerializer(serializers.ModelSerializer):
             'for_printer_models', 'for_printers',
             'tags', 'print_data', 'cost_data', 'gcode_analysis',
             'material_info', 'print_time', 'filament_usage',
+            'article', 'quantity',
             'custom_fields',
             'created_at_sp', 'created_at', 'updated_at', 'last_synced_at'
         ]
@@ -91,22 +92,20 @@ class SimplePrintFileSerializer(serializers.ModelSerializer):
 class SimplePrintFileListSerializer(serializers.ModelSerializer):
     """
     Упрощенный serializer для списка файлов
+
+    Использует только типизированные колонки - JSON-поля файла
+    (FILE_JSON_FIELDS) в списке не загружаются.
     """
     folder_name = serializers.CharField(source='folder.name', read_only=True)
     size_display = serializers.SerializerMethodField()
-    material_color = serializers.SerializerMethodField()
-    print_time = serializers.SerializerMethodField()
-    weight = serializers.SerializerMethodField()
-    quantity = serializers.SerializerMethodField()
-    article = serializers.SerializerMethodField()
 
     class Meta:
         model = SimplePrintFile
         fields = [
             'id', 'simpleprint_id', 'name', 'folder', 'folder_name',
             'ext', 'file_type', 'size', 'size_display',
-            'tags', 'gcode_analysis', 'print_data',
-            'material_color', 'print_time', 'weight', 'quantity', 'article',
+            'material_type', 'material_color', 'nozzle_size', 'print_time', 'weight', 'prints_done',
+            'quantity', 'article',
             'created_at_sp', 'last_synced_at'
         ]
 
@@ -114,175 +113,6 @@ class SimplePrintFileListSerializer(serializers.ModelSerializer):
         """Размер в человекочитаемом формате"""
         return obj.get_size_display()
 
-    def get_material_color(self, obj):
-        """Получить цвет материала из тегов"""
-        if 'material' in obj.tags and len(obj.tags['material']) > 0:
-            return obj.tags['material'][0].get('color', None)
-        return None
-
-    def get_article(self, obj):
-        """
-        Извлечь артикул из имени файла
-
-        Артикул находится в начале имени файла, перед указателями:
-        - part1, part2... (части изделия)
-        - 25pcs, 3k (количество)
-        - временными метками (12h51m)
-
-        Форматы артикулов:
-        - 673-50930 (3 цифры - 5 цифр)
-        - N406-05-54.7 (с буквами, точками, тире, подчеркиваниями)
-        - 138_N406-12-138 (сложные комбинации)
-        - 710 (простые числа)
-        """
-        import re
-        filename = obj.name
-
-        # Убираем расширение
-        name_without_ext = filename.rsplit('.', 1)[0] if '.' in filename else filename
-
-        # Паттерны для поиска границы артикула:
-        # ПРИОРИТЕТ: pcs/psc имеет приоритет над k
-        # - part\d (part1, part2)
-        # - \d+pcs, \d+psc (явное указание количества)
-        # - \d+k (количество ТОЛЬКО если идет отдельно после underscore)
-        # - \d+h\d*m (временные метки типа 12h51m)
-
-        # Находим первое вхождение этих паттернов
-        patterns = [
-            r'_part\d+',              # _part1, _part2
-            r'_\d+[,.]?\d*(pcs|psc)', # _25pcs, _42psc (опечатка), _1.5pcs (ПРИОРИТЕТ)
-            r'_\d+k(?=[_\s\d]|$)',   # _3k (количество, только если отдельно)
-            r'_\d+h\d*m',             # _12h51m, _2h (время печати с часами и минутами)
-            r'_\d+m_',                # _30m_ (только минуты, за которыми идет что-то еще)
-            r'_\d+g_',                # _370g_ (вес, за которым идет что-то еще)
-        ]
-
-        earliest_pos = len(name_without_ext)
-        for pattern in patterns:
-            match = re.search(pattern, name_without_ext, re.IGNORECASE)
-            if match:
-                earliest_pos = min(earliest_pos, match.start())
-
-        # Извлекаем артикул - все до первого найденного паттерна
-        article_part = name_without_ext[:earliest_pos]
-
-        # Очищаем артикул от trailing underscore
-        article = article_part.rstrip('_')
-
-        # Удаляем префикс с номером папки (например, "138_" в начале)
-        # Паттерн: 1-3 цифры + подчеркивание в начале строки
-        article = re.sub(r'^(\d{1,3})_', '', article)
-
-        # Удаляем распространенные суффиксы (NEW, OLD, V1, V2, V3, UPDATED, FINAL и т.д.)
-        # Паттерн: underscore + любые буквы/цифры в конце артикула
-        article = re.sub(r'_(NEW|OLD|V\d+|UPDATED|FINAL|TEST|DRAFT)$', '', article, flags=re.IGNORECASE)
-
-        # Если артикул не пустой и содержит хотя бы одну цифру или букву
-        if article and re.search(r'[A-Za-z0-9]', article):
-            return article
-
-        return None
-
-    def get_quantity(self, obj):
-        """
-        Извлечь количество деталей из имени файла
-
-        ПРИОРИТЕТ (от высокого к низкому):
-        1. pcs/psc (явное указание штук) - ВСЕГДА имеет приоритет
-        2. part (части изделия) = 0.5
-        3. k/K (только если идет ОТДЕЛЬНО после underscore, не в артикуле)
-
-        Примеры:
-        - 45_N421-11-45K_part2_10pcs_... → 10.0 (pcs приоритетнее, 45K - часть артикула)
-        - 102-43032_42psc_... → 42.0 (psc)
-        - N406-12-138_3K_... → 3.0 (отдельное k после underscore)
-        - 673-50930_part1_... → 0.5 (part)
-        """
-        import re
-        filename = obj.name.lower()
-
-        # ПРИОРИТЕТ 1: Проверяем наличие pcs/psc (явное указание количества)
-
-        # 1a. Дробные значения с pcs/psc: "1,5pcs" или "1.5pcs"
-        match = re.search(r'(\d+)[,.](\d+)(pcs|psc)(?=[_\s\d]|$)', filename)
-        if match:
-            integer_part = int(match.group(1))
-            decimal_part = int(match.group(2))
-            return float(f"{integer_part}.{decimal_part}")
-
-        # 1b. Целые значения с pcs/psc: "25pcs", "42psc"
-        match = re.search(r'(\d+)(pcs|psc)(?=[_\s\d]|$)', filename)
-        if match:
-            return float(match.group(1))
-
-        # ПРИОРИТЕТ 2: Проверяем паттерн "part" (part1, part2, part3 и т.д.)
-        # Если изделие печатается по частям, каждая часть = 0.5
-        match = re.search(r'part\d+', filename)
-        if match:
-            return 0.5
-
-        # ПРИОРИТЕТ 3: Проверяем k ТОЛЬКО если нет pcs/psc
-        # ВАЖНО: k должен идти ПОСЛЕ underscore (не в начале имени, не в артикуле)
-        # Паттерн: _\d+k с lookahead для конца или разделителя
-        match = re.search(r'_(\d+)k(?=[_\s\d]|$)', filename)
-        if match:
-            return float(match.group(1))
-
-        # Дробные значения с k (только если после underscore)
-        match = re.search(r'_(\d+)[,.](\d+)k(?=[_\s\d]|$)', filename)
-        if match:
-            integer_part = int(match.group(1))
-            decimal_part = int(match.group(2))
-            return float(f"{integer_part}.{decimal_part}")
-
-        return None
-
-    def get_print_time(self, obj):
-        """Получить время печати в секундах из gcode_analysis"""
-        if obj.gcode_analysis and 'estimate' in obj.gcode_analysis:
-            return obj.gcode_analysis['estimate']
-        return None
-
-    def get_weight(self, obj):
-        """
-        Получить вес филамента в граммах из gcode_analysis
-        Вычисляется как: (filament_length_mm * π * (diameter/2)^2 * density) / 1000
-        """
-        if not obj.gcode_analysis:
-            return None
-
-        # Получаем длину филамента в мм
-        filament_length = None
-        if 'filament' in obj.gcode_analysis:
-            filament_data = obj.gcode_analysis['filament']
-            if isinstance(filament_data, list) and len(filament_data) > 0:
-                filament_length = filament_data[0]  # первый элемент - длина в мм
-            elif isinstance(filament_data, (int, float)):
-                filament_length = filament_data
-
-        if not filament_length:
-            return None
-
-        # Получаем плотность и диаметр из materialData
-        density = 1.24  # плотность по умолчанию для PLA
-        diameter = 1.75  # диаметр по умолчанию
-
-        if 'materialData' in obj.gcode_analysis:
-            material_data = obj.gcode_analysis['materialData']
-            if isinstance(material_data, list) and len(material_data) > 0:
-                material = material_data[0]
-                density = material.get('density', density)
-                diameter = material.get('diameter', diameter)
-
-        # Вычисляем вес: Volume = length * π * (radius)^2, Weight = Volume * density
-        import math
-        radius = diameter / 2
-        volume_cm3 = (filament_length / 10) * math.pi * (radius / 10) ** 2  # переводим в см³
-        weight_g = volume_cm3 * density
-
-        return round(weight_g, 1)
-
 
 class SimplePrintSyncSerializer(serializers.ModelSerializer):
     """
@@ -297,7 +127,8 @@ class SimplePrintSyncSerializer(serializers.ModelSerializer):
             'id', 'status', 'status_display',
             'started_at', 'finished_at', 'duration',
             'total_folders', 'synced_folders',
-            'total_files', 'synced_files', 'deleted_files',
+            'total_files', 'synced_files', 'deleted_files', 'deleted_folders',
+            'incremental', 'changed_folders', 'changed_files', 'skipped_folders',
             'error_details'
         ]
         read_only_fields = ['started_at', 'finished_at']
@@ -338,7 +169,8 @@ class TriggerSyncSerializer(serializers.Serializer):
     """
     Serializer для запроса синхронизации
     """
-    full_sync = serializers.BooleanField(default=False, help_text="Полная синхронизация с удалением отсутствующих файлов")
+    full_sync = serializers.BooleanField(default=False, help_text="Полная синхронизация с удалением отсутствующих файлов и папок")
+    incremental = serializers.BooleanField(default=False, help_text="Не загружать содержимое неизменившихся папок")
     force = serializers.BooleanField(default=False, help_text="Принудительная синхронизация")
 
 
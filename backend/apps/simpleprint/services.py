@@ -4,18 +4,91 @@ SimplePrint Synchronization Service
 Сервис для синхронизации файлов и папок из SimplePrint в локальную БД.
 """
 
+import hashlib
+import json
 import logging
+import math
 from datetime import datetime
-from typing import Dict, List, Optional
-from django.db import transaction
+from typing import Dict, Iterable, List, Optional, Tuple
+from django.core.cache import cache
+from django.db import DatabaseError, transaction
+from django.db.models import CharField, Count, F, Sum, Value
+from django.db.models.functions import Concat, Substr
 from django.utils import timezone
 from django.utils.dateparse import parse_datetime
 
+from apps.core.data_version import SIMPLEPRINT_FILES_DATA, bump_data_version, get_data_version
+from apps.core.utils.article_normalizer import normalize_article
+
 from .client import SimplePrintFilesClient, SimplePrintPrintersClient, SimplePrintAPIError
-from .models import SimplePrintFolder, SimplePrintFile, SimplePrintSync, PrinterSnapshot
+from .models import SimplePrintFolder, SimplePrintFile, SimplePrintSync, PrinterSnapshot, build_tree_path
 
 logger = logging.getLogger(__name__)
 
+# Размер порции при массовой записи папок и файлов
+SYNC_BATCH_SIZE = 1000
+
+# Поля, обновляемые у существующих записей при синхронизации
+FOLDER_UPDATE_FIELDS = [
+    'name', 'parent', 'depth', 'tree_path', 'files_count', 'folders_count',
+    'can_view', 'can_upload', 'can_modify', 'can_download', 'fingerprint', 'sync_generation',
+    'created_at_sp', 'updated_at', 'last_synced_at',
+]
+FILE_UPDATE_FIELDS = [
+    'name', 'folder', 'ext', 'file_type', 'size', 'zip_printable', 'zip_no_model',
+    'user_id', 'thumbnail', 'for_printer_models', 'for_printers', 'tags', 'print_data',
+    'cost_data', 'gcode_analysis', 'custom_fields',
+    'material_type', 'material_color', 'nozzle_size', 'print_time', 'weight', 'prints_done',
+    'article', 'quantity', 'fingerprint', 'sync_generation',
+    'created_at_sp', 'updated_at', 'last_synced_at',
+]
+
+# Ключевые поля не обрезаются: запись с такими значениями не сохраняется
+UNTRUNCATED_FIELDS = {'simpleprint_id', 'tree_path'}
+
+# Статистика файлов кешируется по версии данных SIMPLEPRINT_FILES_DATA,
+# таймаут только убирает записи устаревших версий
+FILE_STATS_CACHE_TIMEOUT = 60 * 60 * 24
+
+# Поля файлов, возвращаемые для позиций списка производства
+ARTICLE_FILE_FIELDS = [
+    'id', 'simpleprint_id', 'name', 'article', 'quantity',
+    'print_time', 'weight', 'material_type', 'material_color', 'nozzle_size',
+]
+
+# Ключи, добавляемые при обходе дерева и не влияющие на отпечаток
+FINGERPRINT_EXCLUDED_KEYS = {'path'}
+
+
+def fit_char_fields(obj) -> None:
+    """
+    Обрезать значения, не помещающиеся в CharField модели
+
+    Одно слишком длинное значение из API иначе обрывает запись всей порции.
+    """
+    for field in obj._meta.concrete_fields:
+        if not isinstance(field, CharField) or not field.max_length or field.name in UNTRUNCATED_FIELDS:
+            continue
+        value = getattr(obj, field.attname)
+        if isinstance(value, str) and len(value) > field.max_length:
+            logger.warning(
+                f"{obj.__class__.__name__} {obj.simpleprint_id}: {field.name} truncated "
+                f"from {len(value)} to {field.max_length} characters"
+            )
+            setattr(obj, field.attname, value[:field.max_length])
+
+
+def compute_fingerprint(item_data: Dict) -> str:
+    """
+    Отпечаток данных папки или файла из API
+
+    Для папки в него входят счетчики items и даты из API, поэтому
+    изменение содержимого папки меняет отпечаток.
+    """
+    payload = {key: value for key, value in item_data.items() if key not in FINGERPRINT_EXCLUDED_KEYS}
+    serialized = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(serialized.encode('utf-8')).hexdigest()
+
 
 class SimplePrintSyncService:
     """
@@ -26,21 +99,31 @@ class SimplePrintSyncService:
         """Инициализация сервиса"""
         self.client = SimplePrintFilesClient()
 
-    def sync_all_files(self, full_sync: bool = False) -> SimplePrintSync:
+    def sync_all_files(self, full_sync: bool = False, incremental: bool = False) -> SimplePrintSync:
         """
         Синхронизировать все файлы и папки из SimplePrint
 
+        В любом режиме записываются только папки и файлы, отпечаток
+        данных которых изменился.
+
         Args:
-            full_sync: Полная синхронизация (удалить отсутствующие файлы)
+            full_sync: Полная синхронизация (удалить отсутствующие файлы и папки)
+            incremental: Не загружать содержимое папок, данные которых
+                (счетчики items, даты) не изменились. Не применяется при
+                full_sync и если предыдущая синхронизация не завершилась успешно
 
         Returns:
             Объект SimplePrintSync с результатами синхронизации
         """
+        if incremental and (full_sync or not self._last_sync_succeeded()):
+            logger.info("Incremental sync is not possible, walking all folders")
+            incremental = False
+
         # Создаем запись о синхронизации
-        sync_log = SimplePrintSync.objects.create(status='pending')
+        sync_log = SimplePrintSync.objects.create(status='pending', incremental=incremental)
 
         try:
-            logger.info("Starting SimplePrint synchronization")
+            logger.info(f"Starting SimplePrint synchronization (incremental={incremental})")
 
             # Проверяем подключение
             if not self.client.test_connection():
@@ -48,7 +131,8 @@ class SimplePrintSyncService:
 
             # Получаем все данные рекурсивно
             logger.info("Fetching all files and folders from SimplePrint...")
-            data = self.client.get_all_files_recursive()
+            skip_folder = self._make_unchanged_folder_filter(sync_log) if incremental else None
+            data = self.client.get_all_files_recursive(skip_folder=skip_folder)
 
             all_folders = data['all_folders']
             all_files = data['all_files']
@@ -57,26 +141,38 @@ class SimplePrintSyncService:
             sync_log.total_files = len(all_files)
             sync_log.save()
 
-            logger.info(f"Fetched {len(all_folders)} folders and {len(all_files)} files")
+            logger.info(
+                f"Fetched {len(all_folders)} folders and {len(all_files)} files "
+                f"({sync_log.skipped_folders} unchanged folders skipped)"
+            )
 
             # Синхронизируем папки
             logger.info("Synchronizing folders...")
-            synced_folders = self._sync_folders(all_folders)
+            # Номер синхронизации - поколение записей, полученных из API
+            generation = sync_log.pk
+            synced_folders, changed_folders = self._sync_folders(
+                all_folders, generation=generation, mark_unchanged=full_sync
+            )
             sync_log.synced_folders = synced_folders
+            sync_log.changed_folders = changed_folders
             sync_log.save()
 
             # Синхронизируем файлы (передаем sync_log для обновления прогресса)
             logger.info("Synchronizing files...")
-            synced_files = self._sync_files(all_files, sync_log)
+            synced_files, changed_files = self._sync_files(
+                all_files, sync_log, generation=generation, mark_unchanged=full_sync
+            )
             sync_log.synced_files = synced_files
+            sync_log.changed_files = changed_files
             sync_log.save()
 
-            # Удаляем отсутствующие файлы (если full_sync)
+            # Удаляем отсутствующие файлы и папки (если full_sync)
             deleted_files = 0
             if full_sync:
-                logger.info("Cleaning up deleted files...")
-                deleted_files = self._cleanup_deleted_files(all_files)
+                logger.info("Cleaning up deleted files and folders...")
+                deleted_files, deleted_folders = self._cleanup_deleted(generation)
                 sync_log.deleted_files = deleted_files
+                sync_log.deleted_folders = deleted_folders
                 sync_log.save()
 
             # Завершаем синхронизацию
@@ -86,8 +182,10 @@ class SimplePrintSyncService:
 
             logger.info(
                 f"Synchronization completed: "
-                f"{synced_folders} folders, {synced_files} files, {deleted_files} deleted"
+                f"{synced_folders} folders ({changed_folders} changed), "
+                f"{synced_files} files ({changed_files} changed), {deleted_files} deleted"
             )
+            logger.info(f"SimplePrint API latency by endpoint: {self.client.transport.get_metrics()}")
 
             return sync_log
 
@@ -101,117 +199,339 @@ class SimplePrintSyncService:
 
             raise
 
-    def _sync_folders(self, folders_data: List[Dict]) -> int:
+        finally:
+            # Статистика файлов пересчитывается только после изменений
+            if sync_log.status != 'success' or any((
+                sync_log.changed_folders, sync_log.changed_files,
+                sync_log.deleted_files, sync_log.deleted_folders,
+            )):
+                bump_data_version(SIMPLEPRINT_FILES_DATA)
+
+    def _last_sync_succeeded(self) -> bool:
+        last_sync = SimplePrintSync.objects.filter(finished_at__isnull=False).order_by('-started_at').first()
+        return last_sync is not None and last_sync.status == 'success'
+
+    def _make_unchanged_folder_filter(self, sync_log: SimplePrintSync):
+        """
+        Фильтр для обхода: True для папок, отпечаток которых совпадает с сохраненным
+
+        Args:
+            sync_log: Запись синхронизации, в skipped_folders считаются пропущенные папки
+        """
+        known_fingerprints = dict(SimplePrintFolder.objects.values_list('simpleprint_id', 'fingerprint'))
+
+        def is_unchanged(folder_data: Dict) -> bool:
+            unchanged = known_fingerprints.get(folder_data['id']) == compute_fingerprint(folder_data)
+            if unchanged:
+                sync_log.skipped_folders += 1
+            return unchanged
+
+        return is_unchanged
+
+    def _sync_folders(
+        self,
+        folders_data: List[Dict],
+        generation: int = 0,
+        mark_unchanged: bool = False
+    ) -> Tuple[int, int]:
         """
         Синхронизировать папки
 
+        Папки записываются по уровням: сначала те, чей родитель не входит
+        в синхронизируемый набор (корневые или уже сохраненные), затем их
+        подпапки и т.д. Каждый уровень - один bulk_create(update_conflicts)
+        на порцию; родитель берется из карты simpleprint_id -> pk.
+        Папки с неизменившимся отпечатком и путем не перезаписываются,
+        у перемещенных папок пути вложенных переписываются по префиксу.
+
         Args:
             folders_data: Список данных папок из API
+            generation: Поколение, записываемое в sync_generation
+            mark_unchanged: Записать поколение и неизменившимся папкам
+                (нужно перед удалением отсутствующих)
 
         Returns:
-            Количество синхронизированных папок
+            (количество синхронизированных папок, количество записанных)
         """
+        folder_pks = {}
+        known_fingerprints = {}
+        known_paths = {}
+        for sp_id, pk, fingerprint, tree_path in SimplePrintFolder.objects.values_list(
+            'simpleprint_id', 'pk', 'fingerprint', 'tree_path'
+        ):
+            folder_pks[sp_id] = pk
+            known_fingerprints[sp_id] = fingerprint
+            known_paths[sp_id] = tree_path
+
+        # Пути папок после записи текущего уровня - для вычисления путей подпапок
+        folder_paths = dict(known_paths)
+
+        # Папка могла попасть в список дважды - берем последние данные
+        pending = {folder_data['id']: folder_data for folder_data in folders_data}
         synced_count = 0
+        changed_count = 0
+        unchanged_ids = []
+
+        while pending:
+            level = [
+                folder_data for folder_data in pending.values()
+                if self._get_parent_id(folder_data) not in pending
+            ]
+            if not level:
+                logger.warning(f"Cyclic parent references in {len(pending)} folders, saving them without order")
+                level = list(pending.values())
+
+            for folder_data in level:
+                del pending[folder_data['id']]
+
+            folders = []
+            moved_paths = {}
+            for folder_data in level:
+                sp_id = folder_data['id']
+                parent_id = self._get_parent_id(folder_data)
+                parent_path = folder_paths.get(parent_id) if parent_id in folder_pks else None
+                tree_path = build_tree_path(parent_path, sp_id)
+
+                fingerprint = compute_fingerprint(folder_data)
+                if known_fingerprints.get(sp_id) == fingerprint and known_paths.get(sp_id) == tree_path:
+                    synced_count += 1
+                    unchanged_ids.append(sp_id)
+                    continue
+
+                folder = self._build_folder(folder_data, folder_pks, fingerprint, generation, tree_path)
+                if folder is not None:
+                    folders.append(folder)
+                elif sp_id in folder_pks:
+                    # Некорректные данные - оставляем сохраненную папку
+                    unchanged_ids.append(sp_id)
+
+            if not folders:
+                continue
 
-        # Сортируем папки по уровню вложенности (depth)
-        folders_data_sorted = sorted(folders_data, key=lambda x: x.get('depth', 0))
+            folders = self._bulk_upsert(SimplePrintFolder, folders, FOLDER_UPDATE_FIELDS)
+            for folder in folders:
+                old_path = known_paths.get(folder.simpleprint_id)
+                if old_path and old_path != folder.tree_path:
+                    moved_paths[old_path] = folder.tree_path
+                folder_paths[folder.simpleprint_id] = folder.tree_path
 
-        for folder_data in folders_data_sorted:
+            # При update_conflicts pk не возвращаются - дочитываем для следующего уровня
+            folder_pks.update(self._get_folder_pk_map([folder.simpleprint_id for folder in folders]))
+            self._move_subtrees(moved_paths)
+
+            synced_count += len(folders)
+            changed_count += len(folders)
+            logger.info(f"Synced {synced_count}/{len(folders_data)} folders ({changed_count} changed)")
+
+        if mark_unchanged:
+            self._mark_generation(SimplePrintFolder, unchanged_ids, generation)
+
+        return synced_count, changed_count
+
+    def _bulk_upsert(self, model, objs: List, update_fields: List[str]) -> List:
+        """
+        Записать объекты через bulk_create(update_conflicts)
+
+        Если порция не записалась (ошибка БД на одной из строк), объекты
+        записываются по одному, а строки с ошибкой пропускаются. Каждая
+        попытка идет в своей точке сохранения, чтобы ошибка не прерывала
+        внешнюю транзакцию.
+
+        Returns:
+            Записанные объекты
+        """
+        def write(batch):
+            with transaction.atomic():
+                model.objects.bulk_create(
+                    batch,
+                    batch_size=SYNC_BATCH_SIZE,
+                    update_conflicts=True,
+                    unique_fields=['simpleprint_id'],
+                    update_fields=update_fields,
+                )
+
+        try:
+            write(objs)
+            return objs
+        except DatabaseError as e:
+            logger.warning(f"Bulk write of {len(objs)} {model.__name__} rows failed, saving one by one: {e}")
+
+        written = []
+        for obj in objs:
             try:
-                self._sync_folder(folder_data)
-                synced_count += 1
+                write([obj])
+                written.append(obj)
+            except DatabaseError as e:
+                logger.error(f"Failed to save {model.__name__} {obj.simpleprint_id}: {e}")
+        return written
+
+    def _get_parent_id(self, folder_data: Dict) -> Optional[int]:
+        return folder_data.get('parent_folder_id') or None
 
-                if synced_count % 50 == 0:
-                    logger.info(f"Synced {synced_count}/{len(folders_data)} folders")
+    def _move_subtrees(self, moved_paths: Dict[str, str]) -> None:
+        """
+        Переписать пути и глубину вложенных папок перемещенных папок
 
-            except Exception as e:
-                logger.error(f"Failed to sync folder {folder_data.get('id')}: {e}")
+        Вложенные папки могли не попасть в обход (инкрементальная
+        синхронизация), поэтому пути меняются в БД по префиксу старого пути.
 
-        return synced_count
+        Args:
+            moved_paths: Карта старый путь -> новый путь перемещенных папок
+        """
+        for old_path, new_path in moved_paths.items():
+            moved = SimplePrintFolder.objects.filter(tree_path__startswith=old_path).update(
+                tree_path=Concat(Value(new_path), Substr('tree_path', len(old_path) + 1), output_field=CharField()),
+                depth=F('depth') + new_path.count('/') - old_path.count('/'),
+            )
+            if moved:
+                logger.info(f"Moved {moved} nested folders from {old_path} to {new_path}")
 
-    def _sync_folder(self, folder_data: Dict) -> SimplePrintFolder:
+    def _get_folder_pk_map(self, simpleprint_ids: Optional[List[int]] = None) -> Dict[int, int]:
         """
-        Синхронизировать одну папку
+        Карта simpleprint_id -> pk для всех папок или для указанных
+        """
+        folders = SimplePrintFolder.objects.all()
+        if simpleprint_ids is None:
+            return dict(folders.values_list('simpleprint_id', 'pk'))
+
+        folder_pks = {}
+        for start in range(0, len(simpleprint_ids), SYNC_BATCH_SIZE):
+            chunk = simpleprint_ids[start:start + SYNC_BATCH_SIZE]
+            folder_pks.update(folders.filter(simpleprint_id__in=chunk).values_list('simpleprint_id', 'pk'))
+        return folder_pks
+
+    def _build_folder(
+        self,
+        folder_data: Dict,
+        folder_pks: Dict[int, int],
+        fingerprint: str = '',
+        generation: int = 0,
+        tree_path: str = ''
+    ) -> Optional[SimplePrintFolder]:
+        """
+        Подготовить папку к записи
 
         Args:
             folder_data: Данные папки из API
+            folder_pks: Карта simpleprint_id -> pk уже сохраненных папок
+            fingerprint: Отпечаток данных папки
+            generation: Поколение синхронизации
+            tree_path: Материализованный путь папки
 
         Returns:
-            Объект SimplePrintFolder
+            Объект SimplePrintFolder или None, если данные некорректны
         """
-        sp_id = folder_data['id']
-        name = folder_data['name']
-        depth = folder_data.get('depth', 0)
-        parent_id = folder_data.get('parent_folder_id', 0)
+        try:
+            sp_id = folder_data['id']
+            parent_id = self._get_parent_id(folder_data)
 
-        # Получаем родительскую папку
-        parent = None
-        if parent_id and parent_id != 0:
-            try:
-                parent = SimplePrintFolder.objects.get(simpleprint_id=parent_id)
-            except SimplePrintFolder.DoesNotExist:
+            # Получаем родительскую папку
+            parent_pk = folder_pks.get(parent_id) if parent_id else None
+            if parent_id and parent_pk is None:
                 logger.warning(f"Parent folder {parent_id} not found for folder {sp_id}")
 
-        # Парсим дату создания
-        created_at_sp = parse_datetime(folder_data['created'])
-        if not created_at_sp:
-            created_at_sp = timezone.now()
-
-        # Права доступа из org
-        org = folder_data.get('org', {})
-        items = folder_data.get('items', {})
-
-        # Создаем или обновляем папку
-        folder, created = SimplePrintFolder.objects.update_or_create(
-            simpleprint_id=sp_id,
-            defaults={
-                'name': name,
-                'parent': parent,
-                'depth': depth,
-                'files_count': items.get('files', 0),
-                'folders_count': items.get('folders', 0),
-                'can_view': org.get('view', True),
-                'can_upload': org.get('upload', True),
-                'can_modify': org.get('modify', True),
-                'can_download': org.get('download', True),
-                'created_at_sp': created_at_sp,
-                'last_synced_at': timezone.now(),
-            }
-        )
-
-        action = "Created" if created else "Updated"
-        logger.debug(f"{action} folder: {name} (ID: {sp_id})")
-
-        return folder
+            # Парсим дату создания
+            created_at_sp = parse_datetime(folder_data['created'])
+            if not created_at_sp:
+                created_at_sp = timezone.now()
+
+            # Права доступа из org
+            org = folder_data.get('org', {})
+            items = folder_data.get('items', {})
+
+            folder = SimplePrintFolder(
+                simpleprint_id=sp_id,
+                name=folder_data['name'],
+                parent_id=parent_pk,
+                depth=folder_data.get('depth', 0),
+                tree_path=tree_path or build_tree_path(None, sp_id),
+                files_count=items.get('files', 0),
+                folders_count=items.get('folders', 0),
+                can_view=org.get('view', True),
+                can_upload=org.get('upload', True),
+                can_modify=org.get('modify', True),
+                can_download=org.get('download', True),
+                fingerprint=fingerprint,
+                sync_generation=generation,
+                created_at_sp=created_at_sp,
+                last_synced_at=timezone.now(),
+            )
+            fit_char_fields(folder)
+            return folder
 
-    def _sync_files(self, files_data: List[Dict], sync_log: Optional[SimplePrintSync] = None) -> int:
+        except Exception as e:
+            logger.error(f"Failed to sync folder {folder_data.get('id')}: {e}")
+            return None
+
+    def _sync_files(
+        self,
+        files_data: List[Dict],
+        sync_log: Optional[SimplePrintSync] = None,
+        generation: int = 0,
+        mark_unchanged: bool = False
+    ) -> Tuple[int, int]:
         """
         Синхронизировать файлы с сохранением прогресса
 
+        Файлы записываются порциями по SYNC_BATCH_SIZE через
+        bulk_create(update_conflicts), папка берется из карты
+        simpleprint_id -> pk, построенной одним запросом. Файлы, отпечаток
+        данных которых не изменился, не перезаписываются.
+
         Args:
             files_data: Список данных файлов из API
             sync_log: Объект SimplePrintSync для обновления прогресса
+            generation: Поколение, записываемое в sync_generation
+            mark_unchanged: Записать поколение и неизменившимся файлам
+                (нужно перед удалением отсутствующих)
 
         Returns:
-            Количество синхронизированных файлов
+            (количество синхронизированных файлов, количество записанных)
         """
+        folder_pks = self._get_folder_pk_map()
+        known_fingerprints = dict(SimplePrintFile.objects.values_list('simpleprint_id', 'fingerprint'))
+
+        # Файл мог попасть в список дважды - берем последние данные
+        files_by_id = {str(file_data['id']): file_data for file_data in files_data}
         synced_count = 0
+        changed_count = 0
+        unchanged_ids = []
+        batch = []
 
         try:
-            for file_data in files_data:
-                try:
-                    self._sync_file(file_data)
+            for sp_id, file_data in files_by_id.items():
+                fingerprint = compute_fingerprint(file_data)
+                if known_fingerprints.get(sp_id) == fingerprint:
                     synced_count += 1
-
-                    # Сохраняем прогресс каждые 50 файлов
-                    if synced_count % 50 == 0:
-                        logger.info(f"📄 Синхронизировано: {synced_count}/{len(files_data)} файлов")
-                        if sync_log:
-                            sync_log.synced_files = synced_count
-                            sync_log.save()
-
-                except Exception as e:
-                    logger.error(f"Failed to sync file {file_data.get('id')}: {e}")
+                    unchanged_ids.append(sp_id)
+                    continue
+
+                file_obj = self._build_file(file_data, folder_pks, fingerprint, generation)
+                if file_obj is not None:
+                    batch.append(file_obj)
+                elif sp_id in known_fingerprints:
+                    # Некорректные данные - оставляем сохраненный файл
+                    unchanged_ids.append(sp_id)
+
+                if len(batch) >= SYNC_BATCH_SIZE:
+                    written = self._upsert_files(batch)
+                    synced_count += written
+                    changed_count += written
+                    batch = []
+
+                    # Сохраняем прогресс после каждой порции
+                    logger.info(f"📄 Синхронизировано: {synced_count}/{len(files_by_id)} файлов")
+                    if sync_log:
+                        sync_log.synced_files = synced_count
+                        sync_log.save(update_fields=['synced_files'])
+
+            if batch:
+                written = self._upsert_files(batch)
+                synced_count += written
+                changed_count += written
+
+            if mark_unchanged:
+                self._mark_generation(SimplePrintFile, unchanged_ids, generation)
 
         except KeyboardInterrupt:
             logger.warning(f"🛑 Остановка пользователем. Синхронизировано {synced_count} файлов.")
@@ -223,86 +543,113 @@ class SimplePrintSyncService:
                 sync_log.save()
             raise
 
-        return synced_count
+        return synced_count, changed_count
+
+    def _upsert_files(self, files: List[SimplePrintFile]) -> int:
+        return len(self._bulk_upsert(SimplePrintFile, files, FILE_UPDATE_FIELDS))
 
-    def _sync_file(self, file_data: Dict) -> SimplePrintFile:
+    def _build_file(
+        self,
+        file_data: Dict,
+        folder_pks: Dict[int, int],
+        fingerprint: str = '',
+        generation: int = 0
+    ) -> Optional[SimplePrintFile]:
         """
-        Синхронизировать один файл
+        Подготовить файл к записи
 
         Args:
             file_data: Данные файла из API
+            folder_pks: Карта simpleprint_id -> pk папок
+            fingerprint: Отпечаток данных файла
+            generation: Поколение синхронизации
 
         Returns:
-            Объект SimplePrintFile
+            Объект SimplePrintFile или None, если данные некорректны
         """
-        sp_id = file_data['id']
-        name = file_data['name']
+        try:
+            sp_id = file_data['id']
 
-        # Парсим дату создания
-        created_at_sp = parse_datetime(file_data['created'])
-        if not created_at_sp:
-            created_at_sp = timezone.now()
+            # Парсим дату создания
+            created_at_sp = parse_datetime(file_data['created'])
+            if not created_at_sp:
+                created_at_sp = timezone.now()
 
-        # Получаем папку (файл может быть в корне, без папки)
-        folder = None
-        parent_folder_id = file_data.get('parent_folder_id')
-        if parent_folder_id:
-            try:
-                folder = SimplePrintFolder.objects.get(simpleprint_id=parent_folder_id)
-            except SimplePrintFolder.DoesNotExist:
+            # Получаем папку (файл может быть в корне, без папки)
+            parent_folder_id = file_data.get('parent_folder_id')
+            folder_pk = folder_pks.get(parent_folder_id) if parent_folder_id else None
+            if parent_folder_id and folder_pk is None:
                 logger.warning(f"Parent folder {parent_folder_id} not found for file {sp_id}")
 
-        # Создаем или обновляем файл
-        file_obj, created = SimplePrintFile.objects.update_or_create(
-            simpleprint_id=sp_id,
-            defaults={
-                'name': name,
-                'folder': folder,
-                'ext': file_data.get('ext', ''),
-                'file_type': file_data.get('type', ''),
-                'size': file_data.get('size', 0),
-                'zip_printable': file_data.get('zipPrintable', False),
-                'zip_no_model': file_data.get('zipNoModel', False),
-                'user_id': file_data.get('user_id'),
-                'thumbnail': file_data.get('thumbnail', 0),
-                'for_printer_models': file_data.get('forPrinterModels', []),
-                'for_printers': file_data.get('forPrinters', []),
-                'tags': file_data.get('tags', {}),
-                'print_data': file_data.get('printData', {}),
-                'cost_data': file_data.get('cost', {}),
-                'gcode_analysis': file_data.get('gcodeAnalysis', {}),
-                'custom_fields': file_data.get('customFields', []),
-                'created_at_sp': created_at_sp,
-                'last_synced_at': timezone.now(),
-            }
-        )
+            file_obj = SimplePrintFile(
+                simpleprint_id=sp_id,
+                name=file_data['name'],
+                folder_id=folder_pk,
+                ext=file_data.get('ext', ''),
+                file_type=file_data.get('type', ''),
+                size=file_data.get('size', 0),
+                zip_printable=file_data.get('zipPrintable', False),
+                zip_no_model=file_data.get('zipNoModel', False),
+                user_id=file_data.get('user_id'),
+                thumbnail=file_data.get('thumbnail', 0),
+                for_printer_models=file_data.get('forPrinterModels', []),
+                for_printers=file_data.get('forPrinters', []),
+                tags=file_data.get('tags', {}),
+                print_data=file_data.get('printData', {}),
+                cost_data=file_data.get('cost', {}),
+                gcode_analysis=file_data.get('gcodeAnalysis', {}),
+                custom_fields=file_data.get('customFields', []),
+                fingerprint=fingerprint,
+                sync_generation=generation,
+                created_at_sp=created_at_sp,
+                last_synced_at=timezone.now(),
+            )
+            file_obj.update_print_fields()
+            file_obj.update_article_fields()
+            fit_char_fields(file_obj)
+            return file_obj
 
-        action = "Created" if created else "Updated"
-        logger.debug(f"{action} file: {name} (ID: {sp_id})")
+        except Exception as e:
+            logger.error(f"Failed to sync file {file_data.get('id')}: {e}")
+            return None
 
-        return file_obj
+    def _mark_generation(self, model, simpleprint_ids: List, generation: int) -> None:
+        """
+        Записать поколение записям, полученным из API без изменений
 
-    def _cleanup_deleted_files(self, current_files: List[Dict]) -> int:
+        Обновляется только узкая колонка sync_generation, порциями по SYNC_BATCH_SIZE.
         """
-        Удалить файлы которых нет в SimplePrint
+        for start in range(0, len(simpleprint_ids), SYNC_BATCH_SIZE):
+            chunk = simpleprint_ids[start:start + SYNC_BATCH_SIZE]
+            model.objects.filter(simpleprint_id__in=chunk).update(sync_generation=generation)
+
+    def _cleanup_deleted(self, generation: int) -> Tuple[int, int]:
+        """
+        Удалить файлы и папки, которых нет в SimplePrint
+
+        Все полученные в этой синхронизации записи помечены поколением
+        generation, поэтому отсутствующие удаляются одним запросом по
+        индексу sync_generation, без списка актуальных ID.
 
         Args:
-            current_files: Текущий список файлов из API
+            generation: Поколение текущей синхронизации
 
         Returns:
-            Количество удаленных файлов
+            (количество удаленных файлов, количество удаленных папок)
         """
-        current_file_ids = {f['id'] for f in current_files}
-
-        # Находим файлы в БД которых нет в SimplePrint
-        deleted_files = SimplePrintFile.objects.exclude(simpleprint_id__in=current_file_ids)
-        deleted_count = deleted_files.count()
+        deleted_files = SimplePrintFile.objects.filter(sync_generation__lt=generation).delete()[1].get(
+            SimplePrintFile._meta.label, 0
+        )
+        deleted_folders = SimplePrintFolder.objects.filter(sync_generation__lt=generation).delete()[1].get(
+            SimplePrintFolder._meta.label, 0
+        )
 
-        if deleted_count > 0:
-            logger.info(f"Deleting {deleted_count} files that are no longer in SimplePrint")
-            deleted_files.delete()
+        if deleted_files or deleted_folders:
+            logger.info(
+                f"Deleted {deleted_files} files and {deleted_folders} folders that are no longer in SimplePrint"
+            )
 
-        return deleted_count
+        return deleted_files, deleted_folders
 
     def get_sync_stats(self) -> Dict:
         """
@@ -327,6 +674,172 @@ class SimplePrintSyncService:
         }
 
 
+def get_file_stats(parent_id: Optional[int] = None) -> Dict:
+    """
+    Статистика файлов SimplePrint
+
+    Агрегаты считаются в БД и кешируются до следующей синхронизации,
+    которая изменила файлы или папки.
+
+    Args:
+        parent_id: ID папки, для подпапок которой вернуть сводку
+            (по умолчанию - папки верхнего уровня)
+
+    Returns:
+        Словарь с total_files, total_size, by_type и by_folder
+    """
+    version, _ = get_data_version(SIMPLEPRINT_FILES_DATA)
+    cache_key = f'simpleprint_file_stats:{version}'
+
+    stats = None
+    try:
+        stats = cache.get(cache_key)
+    except Exception as e:
+        logger.debug(f"Could not read cached file stats: {e}")
+
+    if stats is None:
+        stats = _compute_file_stats()
+        try:
+            cache.add(cache_key, stats, FILE_STATS_CACHE_TIMEOUT)
+        except Exception as e:
+            logger.debug(f"Could not cache file stats: {e}")
+
+    by_folder = [folder for folder in stats['folders'].values() if folder['parent'] == parent_id]
+    by_folder.sort(key=lambda folder: (-folder['total_size'], folder['name']))
+
+    return {
+        'total_files': stats['total_files'],
+        'total_size': stats['total_size'],
+        'by_type': stats['by_type'],
+        'by_folder': by_folder,
+    }
+
+
+def _compute_file_stats() -> Dict:
+    """
+    Посчитать статистику файлов: группировка по типу и сводка по папкам
+
+    Файлы агрегируются двумя запросами GROUP BY (по типу и по папке),
+    итоги по поддеревьям собираются от самых глубоких папок к корню.
+    """
+    by_type = {}
+    rows = SimplePrintFile.objects.order_by().values('file_type').annotate(count=Count('id'), size=Sum('size'))
+    for row in rows:
+        entry = by_type.setdefault(row['file_type'] or 'unknown', {'count': 0, 'size': 0})
+        entry['count'] += row['count']
+        entry['size'] += row['size'] or 0
+
+    direct = {
+        row['folder']: (row['count'], row['size'] or 0)
+        for row in SimplePrintFile.objects.order_by().values('folder').annotate(count=Count('id'), size=Sum('size'))
+    }
+
+    folders = {}
+    for folder in SimplePrintFolder.objects.order_by('-depth').values('id', 'simpleprint_id', 'name', 'parent', 'depth'):
+        files_count, size = direct.get(folder['id'], (0, 0))
+        folder.update(files_count=files_count, size=size, total_files=files_count, total_size=size)
+        folders[folder['id']] = folder
+
+    # Папки идут от самых глубоких, поэтому итоги дочерних уже собраны
+    for folder in folders.values():
+        parent = folders.get(folder['parent'])
+        if parent is not None:
+            parent['total_files'] += folder['total_files']
+            parent['total_size'] += folder['total_size']
+
+    return {
+        'total_files': sum(entry['count'] for entry in by_type.values()),
+        'total_size': sum(entry['size'] for entry in by_type.values()),
+        'by_type': by_type,
+        'folders': folders,
+    }
+
+
+def get_files_by_article(articles: Iterable[str]) -> Dict[str, List[Dict]]:
+    """
+    Файлы SimplePrint для артикулов товаров
+
+    Артикулы нормализуются так же, как при синхронизации файлов, и
+    ищутся по индексу SimplePrintFile.article.
+
+    Args:
+        articles: Артикулы товаров
+
+    Returns:
+        Словарь {нормализованный артикул: [данные файлов]}
+    """
+    normalized = sorted({normalize_article(article) for article in articles} - {''})
+
+    files_by_article = {}
+    for start in range(0, len(normalized), SYNC_BATCH_SIZE):
+        chunk = normalized[start:start + SYNC_BATCH_SIZE]
+        files = SimplePrintFile.objects.filter(article__in=chunk).order_by('article', 'name').values(*ARTICLE_FILE_FIELDS)
+        for file_data in files:
+            files_by_article.setdefault(file_data['article'], []).append(file_data)
+
+    return files_by_article
+
+
+def estimate_print_time(items: List[Dict]) -> Dict:
+    """
+    Оценить машинное время печати позиций списка производства
+
+    Для позиции выбирается файл с наименьшим временем печати на одно
+    изделие: print_time / quantity (файл без количества в имени - одно
+    изделие за печать, part-файлы - по 0.5). Оценка позиции - число
+    печатей, нужное для ее количества, умноженное на время печати файла.
+
+    Args:
+        items: Позиции [{'article', 'quantity', ...}], остальные ключи сохраняются
+
+    Returns:
+        Словарь с позициями (files, print_file, prints_needed,
+        estimated_print_time в секундах) и итогами
+    """
+    files_by_article = get_files_by_article(item['article'] for item in items)
+
+    result_items = []
+    total_print_time = 0
+    items_with_estimate = 0
+
+    for item in items:
+        files = files_by_article.get(normalize_article(item['article']), [])
+
+        best_file = None
+        for file_data in files:
+            if not file_data['print_time']:
+                continue
+            per_unit = file_data['print_time'] / (file_data['quantity'] or 1)
+            if best_file is None or per_unit < best_file[0]:
+                best_file = (per_unit, file_data)
+
+        prints_needed = None
+        estimated_print_time = None
+        if best_file is not None:
+            file_data = best_file[1]
+            prints_needed = math.ceil(float(item['quantity'] or 0) / (file_data['quantity'] or 1))
+            estimated_print_time = prints_needed * file_data['print_time']
+            total_print_time += estimated_print_time
+            items_with_estimate += 1
+
+        result_items.append({
+            **item,
+            'files': files,
+            'print_file': best_file[1]['id'] if best_file else None,
+            'prints_needed': prints_needed,
+            'estimated_print_time': estimated_print_time,
+        })
+
+    return {
+        'items': result_items,
+        'total_items': len(result_items),
+        'items_with_estimate': items_with_estimate,
+        'items_without_files': sum(1 for item in result_items if not item['files']),
+        'total_print_time': total_print_time,
+        'total_machine_hours': round(total_print_time / 3600, 1),
+    }
+
+
 class PrinterSyncService:
     """
     Сервис для синхронизации данных принтеров из SimplePrint
@@ -5,28 +5,41 @@ SimplePrint Celery Tasks
 """
 
 import logging
+from datetime import timedelta
+
 from celery import shared_task
+from django.conf import settings
+from django.utils import timezone
+
+from apps.core.sync_lock import SIMPLEPRINT_SYNC, single_flight
+
+from .models import SimplePrintSync
 from .services import SimplePrintSyncService
 
 logger = logging.getLogger(__name__)
 
 
 @shared_task(bind=True, time_limit=3600)  # 1 час максимум
-def sync_simpleprint_task(self, full_sync=False):
+@single_flight(SIMPLEPRINT_SYNC)
+def sync_simpleprint_task(self, full_sync=False, incremental=False):
     """
     Асинхронная задача синхронизации SimplePrint
+
+    Одновременно выполняется только одна синхронизация; если она уже
+    идет, задача возвращает ее task_id без запуска.
     
     Args:
         full_sync: Полная синхронизация с удалением
+        incremental: Не загружать содержимое неизменившихся папок
         
     Returns:
         ID синхронизации
     """
-    logger.info(f"Starting SimplePrint sync task (full_sync={full_sync})")
+    logger.info(f"Starting SimplePrint sync task (full_sync={full_sync}, incremental={incremental})")
     
     try:
         service = SimplePrintSyncService()
-        sync_log = service.sync_all_files(full_sync=full_sync)
+        sync_log = service.sync_all_files(full_sync=full_sync, incremental=incremental)
         
         logger.info(f"SimplePrint sync completed: {sync_log.id}")
         return {
@@ -34,8 +47,40 @@ def sync_simpleprint_task(self, full_sync=False):
             'status': sync_log.status,
             'total_files': sync_log.total_files,
             'synced_files': sync_log.synced_files,
+            'changed_files': sync_log.changed_files,
         }
         
     except Exception as e:
         logger.error(f"SimplePrint sync failed: {e}", exc_info=True)
         raise
+
+
+def is_full_walk_due() -> bool:
+    """
+    Нужен ли полный обход дерева папок
+
+    Инкрементальная синхронизация не загружает папки с неизменившимися
+    счетчиками и может пропустить изменения, которые их не затрагивают,
+    поэтому раз в SIMPLEPRINT_CONFIG['full_walk_interval'] часов
+    выполняется полный обход.
+    """
+    interval = timedelta(hours=settings.SIMPLEPRINT_CONFIG.get('full_walk_interval', 24))
+    last_full_walk = SimplePrintSync.objects.filter(
+        status='success', incremental=False
+    ).values_list('started_at', flat=True).first()
+    return last_full_walk is None or last_full_walk < timezone.now() - interval
+
+
+@shared_task(name='simpleprint.scheduled_sync', time_limit=3600)
+def scheduled_simpleprint_sync_task():
+    """
+    Периодическая синхронизация SimplePrint (beat: simpleprint-sync-30min)
+
+    Инкрементальная: загружается только содержимое изменившихся папок,
+    записываются только изменившиеся файлы. Если последний успешный
+    полный обход старше full_walk_interval, выполняется полный обход.
+    """
+    incremental = not is_full_walk_due()
+    if not incremental:
+        logger.info("Scheduled SimplePrint sync: full folder walk is due")
+    return sync_simpleprint_task(incremental=incremental)
@@ -0,0 +1,289 @@
+"""
+Тесты массовой записи папок и файлов SimplePrint
+"""
+
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.db import DataError
+from django.db.models import QuerySet
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from apps.core.data_version import SIMPLEPRINT_FILES_DATA, bump_data_version, get_data_version
+from apps.simpleprint.models import SimplePrintFile, SimplePrintFolder, SimplePrintSync
+from apps.simpleprint.services import SimplePrintSyncService, get_file_stats
+from apps.simpleprint.tasks import scheduled_simpleprint_sync_task
+
+LOCMEM_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'file-stats-tests'}}
+
+
+def make_folder(sp_id, parent_id=None, depth=0, name=None):
+    return {
+        'id': sp_id,
+        'name': name or f'Folder {sp_id}',
+        'parent_folder_id': parent_id,
+        'depth': depth,
+        'created': '2024-01-15T10:30:00Z',
+        'items': {'files': 1, 'folders': 1},
+    }
+
+
+def make_file(sp_id, parent_id=None, size=100):
+    return {
+        'id': sp_id,
+        'name': f'{sp_id}.gcode',
+        'parent_folder_id': parent_id,
+        'ext': 'gcode',
+        'size': size,
+        'created': '2024-01-15T10:30:00Z',
+        'tags': {'material': [{'type': 'PLA', 'color': 'BLACK'}]},
+    }
+
+
+class BulkSyncTestCase(TestCase):
+    """Тесты для SimplePrintSyncService._sync_folders / _sync_files"""
+
+    def setUp(self):
+        self.service = SimplePrintSyncService()
+
+    def test_folders_are_linked_to_parents_in_any_order(self):
+        """Тест: родители находятся, даже если дочерние папки идут раньше"""
+        folders = [make_folder(3, parent_id=2, depth=2), make_folder(2, parent_id=1, depth=1), make_folder(1)]
+
+        # карта pk + (точка сохранения с записью + чтение pk) на каждый из трех уровней
+        with self.assertNumQueries(13):
+            synced = self.service._sync_folders(folders)
+
+        self.assertEqual(synced, (3, 3))
+        deepest = SimplePrintFolder.objects.get(simpleprint_id=3)
+        self.assertEqual(deepest.get_full_path(), 'Folder 1/Folder 2/Folder 3')
+
+    def test_files_are_upserted_in_chunks(self):
+        """Тест: повторная синхронизация обновляет файлы без дублей, число запросов не зависит от числа файлов"""
+        self.service._sync_folders([make_folder(1), make_folder(2, parent_id=1, depth=1)])
+        files = [make_file(f'file-{index}', parent_id=2 if index % 2 else None) for index in range(25)]
+
+        with self.assertNumQueries(5):  # карта папок, отпечатки, запись в точке сохранения
+            self.assertEqual(self.service._sync_files(files), (25, 25))
+
+        created_at = SimplePrintFile.objects.get(simpleprint_id='file-1').created_at
+        files[1]['size'] = 500
+        files.append(dict(files[1]))  # дубль в одном ответе
+        self.assertEqual(self.service._sync_files(files), (25, 1))
+
+        self.assertEqual(SimplePrintFile.objects.count(), 25)
+        updated = SimplePrintFile.objects.get(simpleprint_id='file-1')
+        self.assertEqual(updated.size, 500)
+        self.assertEqual(updated.created_at, created_at)
+        self.assertEqual(updated.folder.simpleprint_id, 2)
+        self.assertEqual(updated.get_material_info(), 'PLA - BLACK')
+        self.assertEqual(SimplePrintFile.objects.filter(folder__isnull=True).count(), 13)
+
+    def test_invalid_items_are_skipped(self):
+        """Тест: запись с некорректными данными пропускается, остальные сохраняются"""
+        broken = make_file('broken')
+        del broken['created']
+
+        self.assertEqual(self.service._sync_files([broken, make_file('ok')]), (1, 1))
+        self.assertTrue(SimplePrintFile.objects.filter(simpleprint_id='ok').exists())
+
+    def test_long_values_are_truncated(self):
+        """Тест: слишком длинные строки из API обрезаются до длины колонки"""
+        file_data = make_file('long')
+        file_data['name'] = 'x' * 600 + '.gcode'
+        file_data['ext'] = 'gcode' * 10
+
+        self.service._sync_files([file_data])
+
+        file_obj = SimplePrintFile.objects.get(simpleprint_id='long')
+        self.assertEqual((len(file_obj.name), len(file_obj.ext)), (500, 20))
+
+    def test_failed_batch_is_written_row_by_row(self):
+        """Тест: ошибка БД на одной строке не обрывает запись порции"""
+        bulk_create = QuerySet.bulk_create
+
+        def failing_bulk_create(queryset, objs, *args, **kwargs):
+            if any(obj.simpleprint_id == 'bad' for obj in objs):
+                raise DataError('value too long')
+            return bulk_create(queryset, objs, *args, **kwargs)
+
+        files = [make_file('a'), make_file('bad'), make_file('b')]
+        with patch.object(QuerySet, 'bulk_create', failing_bulk_create):
+            self.assertEqual(self.service._sync_files(files), (2, 2))
+
+        self.assertEqual(set(SimplePrintFile.objects.values_list('simpleprint_id', flat=True)), {'a', 'b'})
+
+
+class FolderTreePathTestCase(TestCase):
+    """Тесты материализованного пути папок"""
+
+    def setUp(self):
+        self.service = SimplePrintSyncService()
+        self.service._sync_folders([
+            make_folder(1), make_folder(2, parent_id=1, depth=1), make_folder(3, parent_id=2, depth=2), make_folder(12),
+        ])
+        self.service._sync_files([make_file('a', parent_id=1), make_file('c', parent_id=3), make_file('x', parent_id=12)])
+
+    def test_paths_and_subtree_queries(self):
+        """Тест: путь строится по ID, поддерево выбирается по префиксу"""
+        folder = SimplePrintFolder.objects.get(simpleprint_id=1)
+
+        self.assertEqual(SimplePrintFolder.objects.get(simpleprint_id=3).tree_path, '/1/2/3/')
+        self.assertEqual(set(folder.get_descendants().values_list('simpleprint_id', flat=True)), {2, 3})
+        self.assertEqual(set(folder.get_subtree_files().values_list('simpleprint_id', flat=True)), {'a', 'c'})
+
+        deepest = SimplePrintFolder.objects.get(simpleprint_id=3)
+        with self.assertNumQueries(1):
+            self.assertEqual(deepest.get_full_path(), 'Folder 1/Folder 2/Folder 3')
+
+    def test_moved_folder_rewrites_nested_paths(self):
+        """Тест: при перемещении папки пути вложенных папок переписываются, даже если их нет в обходе"""
+        self.assertEqual(self.service._sync_folders([make_folder(2, parent_id=12, depth=1)]), (1, 1))
+
+        self.assertEqual(SimplePrintFolder.objects.get(simpleprint_id=2).tree_path, '/12/2/')
+        nested = SimplePrintFolder.objects.get(simpleprint_id=3)
+        self.assertEqual((nested.tree_path, nested.depth), ('/12/2/3/', 2))
+        self.assertEqual(
+            set(SimplePrintFolder.objects.get(simpleprint_id=12).get_subtree_files().values_list('simpleprint_id', flat=True)),
+            {'c', 'x'}
+        )
+
+
+class IncrementalSyncTestCase(TestCase):
+    """Тесты инкрементальной синхронизации"""
+
+    def setUp(self):
+        self.service = SimplePrintSyncService()
+        # parent_id -> (папки, файлы)
+        self.tree = {
+            None: ([make_folder(1), make_folder(2)], []),
+            1: ([make_folder(11)], [make_file('a')]),
+            2: ([], [make_file('b'), make_file('c')]),
+            11: ([], [make_file('aa')]),
+        }
+        self.fetched = []
+
+        def listing(folder_id=None):
+            self.fetched.append(folder_id)
+            folders, files = self.tree[folder_id]
+            return {'folders': [dict(folder) for folder in folders], 'files': [dict(file) for file in files]}
+
+        patch.object(self.service.client, 'test_connection', return_value=True).start()
+        patch.object(self.service.client, 'get_files_and_folders', side_effect=listing).start()
+        self.addCleanup(patch.stopall)
+
+    def test_unchanged_data_is_not_rewritten(self):
+        """Тест: без изменений инкрементальная синхронизация загружает только корень и ничего не пишет"""
+        first = self.service.sync_all_files(incremental=True)
+        self.assertFalse(first.incremental)  # первая синхронизация - полный обход
+        self.assertEqual((first.changed_folders, first.changed_files), (3, 4))
+
+        self.fetched.clear()
+        second = self.service.sync_all_files(incremental=True)
+
+        self.assertTrue(second.incremental)
+        self.assertEqual(self.fetched, [None])
+        self.assertEqual(get_data_version(SIMPLEPRINT_FILES_DATA)[0], 1)  # статистика файлов не сбрасывается
+        self.assertEqual(second.skipped_folders, 2)
+        self.assertEqual((second.changed_folders, second.changed_files), (0, 0))
+
+    def test_changed_folder_is_walked(self):
+        """Тест: загружается только папка с изменившимися счетчиками, пишется только измененный файл"""
+        self.service.sync_all_files()
+
+        self.tree[2][1][0]['size'] = 999
+        self.tree[None][0][1]['items'] = {'files': 2, 'folders': 0}
+        self.fetched.clear()
+
+        sync_log = self.service.sync_all_files(incremental=True)
+
+        self.assertEqual(self.fetched, [None, 2])
+        self.assertEqual((sync_log.changed_folders, sync_log.changed_files), (1, 1))
+        self.assertEqual(SimplePrintFile.objects.get(simpleprint_id='b').size, 999)
+        self.assertEqual(SimplePrintFile.objects.count(), 4)
+
+    def test_full_sync_sweeps_missing_files_and_folders(self):
+        """Тест: полная синхронизация удаляет отсутствующие файлы и папки по поколению"""
+        self.service.sync_all_files()
+
+        # Папка 11 с файлом aa и файл c удалены в SimplePrint
+        self.tree[1] = ([], [make_file('a')])
+        del self.tree[11]
+        self.tree[2] = ([], [make_file('b')])
+
+        sync_log = self.service.sync_all_files(full_sync=True)
+
+        self.assertEqual((sync_log.deleted_files, sync_log.deleted_folders), (2, 1))
+        self.assertEqual(set(SimplePrintFile.objects.values_list('simpleprint_id', flat=True)), {'a', 'b'})
+        self.assertEqual(set(SimplePrintFolder.objects.values_list('simpleprint_id', flat=True)), {1, 2})
+        self.assertEqual(set(SimplePrintFile.objects.values_list('sync_generation', flat=True)), {sync_log.pk})
+
+    def test_sync_without_full_keeps_missing_files(self):
+        """Тест: обычная синхронизация ничего не удаляет"""
+        self.service.sync_all_files()
+        self.tree[2] = ([], [])
+
+        sync_log = self.service.sync_all_files()
+
+        self.assertEqual(sync_log.deleted_files, 0)
+        self.assertEqual(SimplePrintFile.objects.count(), 4)
+
+    def test_scheduled_sync_falls_back_to_full_walk(self):
+        """Тест: плановая синхронизация делает полный обход, если последний устарел"""
+        full_walk = SimplePrintSync.objects.create(status='success', incremental=False)
+        SimplePrintSync.objects.create(status='success', incremental=True)
+
+        with patch('apps.simpleprint.tasks.sync_simpleprint_task') as sync_task:
+            scheduled_simpleprint_sync_task()
+            sync_task.assert_called_once_with(incremental=True)
+
+            SimplePrintSync.objects.filter(pk=full_walk.pk).update(started_at=timezone.now() - timedelta(hours=25))
+            sync_task.reset_mock()
+            scheduled_simpleprint_sync_task()
+            sync_task.assert_called_once_with(incremental=False)
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class FileStatsTestCase(TestCase):
+    """Тесты для get_file_stats"""
+
+    def setUp(self):
+        cache.clear()
+        self.service = SimplePrintSyncService()
+        self.service._sync_folders([make_folder(1), make_folder(2, parent_id=1, depth=1), make_folder(3)])
+        self.service._sync_files([
+            make_file('root', size=5),
+            dict(make_file('a', parent_id=1, size=10), type='printable'),
+            make_file('b', parent_id=2, size=20),
+            make_file('c', parent_id=2, size=30),
+        ])
+
+    def test_totals_and_folder_rollup(self):
+        """Тест: итоги по типам и по поддеревьям папок"""
+        stats = get_file_stats()
+
+        self.assertEqual((stats['total_files'], stats['total_size']), (4, 65))
+        self.assertEqual(stats['by_type'], {'printable': {'count': 1, 'size': 10}, 'unknown': {'count': 3, 'size': 55}})
+
+        top = {folder['simpleprint_id']: folder for folder in stats['by_folder']}
+        self.assertEqual(set(top), {1, 3})
+        self.assertEqual((top[1]['files_count'], top[1]['total_files'], top[1]['total_size']), (1, 3, 60))
+        self.assertEqual(top[3]['total_files'], 0)
+
+        children = get_file_stats(parent_id=top[1]['id'])['by_folder']
+        self.assertEqual([(folder['simpleprint_id'], folder['total_size']) for folder in children], [(2, 50)])
+
+    def test_stats_are_cached_until_data_changes(self):
+        """Тест: повторный запрос не обращается к БД, изменение данных сбрасывает кеш"""
+        get_file_stats()
+        with self.assertNumQueries(0):
+            get_file_stats()
+
+        SimplePrintFile.objects.filter(simpleprint_id='root').delete()
+        self.assertEqual(get_file_stats()['total_files'], 4)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            bump_data_version(SIMPLEPRINT_FILES_DATA)
+        self.assertEqual(get_file_stats()['total_files'], 3)
@@ -0,0 +1,104 @@
+"""
+Тесты типизированных полей печати файлов SimplePrint
+"""
+
+from django.test import TestCase
+
+from apps.simpleprint.models import SimplePrintFile, extract_print_fields
+from apps.simpleprint.services import SimplePrintSyncService, estimate_print_time, get_files_by_article
+
+# Фрагмент ответа files/GetFiles (см. simpleprint_test_response.json)
+FILE_DATA = {
+    'id': 'f-1',
+    'name': '375-42108_part1.gcode',
+    'ext': 'gcode',
+    'size': 1024,
+    'created': '2024-01-15T10:30:00Z',
+    'tags': {'material': [{'type': 'PETG', 'color': 'Black'}], 'nozzle': 0.4},
+    'gcodeAnalysis': {
+        'estimate': 16261,
+        'nozzleSize': 0.4,
+        'filament': [40764],
+        'materialData': [{'type': 'PETG', 'density': 1.27}],
+    },
+    'printData': {'printsDone': 3},
+}
+
+
+class PrintFieldsTestCase(TestCase):
+    """Тесты для extract_print_fields и заполнения колонок при синхронизации"""
+
+    def test_extract_print_fields(self):
+        """Тест: поля печати извлекаются из JSON SimplePrint"""
+        fields = extract_print_fields(FILE_DATA['tags'], FILE_DATA['gcodeAnalysis'], FILE_DATA['printData'])
+
+        self.assertEqual(fields['material_type'], 'PETG')
+        self.assertEqual(fields['material_color'], 'Black')
+        self.assertEqual(fields['nozzle_size'], 0.4)
+        self.assertEqual(fields['print_time'], 16261)
+        self.assertEqual(fields['prints_done'], 3)
+        self.assertAlmostEqual(fields['weight'], 124.5, places=1)
+
+    def test_extract_print_fields_from_empty_data(self):
+        """Тест: пустые и некорректные JSON дают пустые значения"""
+        fields = extract_print_fields({}, {'materialData': 'broken', 'estimate': 'n/a'}, None)
+
+        self.assertEqual(fields['material_type'], '')
+        self.assertIsNone(fields['print_time'])
+        self.assertIsNone(fields['weight'])
+        self.assertEqual(fields['prints_done'], 0)
+
+    def test_sync_fills_print_fields(self):
+        """Тест: синхронизация заполняет типизированные колонки"""
+        service = SimplePrintSyncService()
+        service._sync_files([dict(FILE_DATA)])
+
+        file_obj = SimplePrintFile.objects.get(simpleprint_id='f-1')
+        self.assertEqual(file_obj.material_type, 'PETG')
+        self.assertEqual(file_obj.print_time, 16261)
+        self.assertEqual(file_obj.prints_done, 3)
+
+
+
+class ArticleIndexTestCase(TestCase):
+    """Тесты для артикулов файлов и оценки времени печати"""
+
+    def setUp(self):
+        def make(sp_id, name, estimate):
+            return dict(FILE_DATA, id=sp_id, name=name, gcodeAnalysis={'estimate': estimate} if estimate else {})
+
+        SimplePrintSyncService()._sync_files([
+            make('f-1', '138_375–42108_10pcs_5h33m.gcode', 20000),
+            make('f-2', '375-42108_2h30m.gcode', 3000),
+            make('f-3', '673-50930_part1.gcode', 1800),
+            make('f-4', 'N323-13W_NEW.gcode', None),
+        ])
+
+    def test_article_and_quantity_from_name(self):
+        """Тест: артикул нормализуется и хранится вместе с количеством"""
+        file_obj = SimplePrintFile.objects.get(simpleprint_id='f-1')
+        self.assertEqual((file_obj.article, file_obj.quantity), ('375-42108', 10.0))
+        self.assertEqual(SimplePrintFile.objects.get(simpleprint_id='f-4').article, 'N323-13W')
+        files = get_files_by_article([' 375-42108 ', ''])
+        self.assertEqual({file_data['simpleprint_id'] for file_data in files['375-42108']}, {'f-1', 'f-2'})
+
+    def test_estimate_print_time(self):
+        """Тест: выбирается файл с наименьшим временем на изделие"""
+        result = estimate_print_time([
+            {'article': '375-42108', 'quantity': 25},
+            {'article': '673-50930', 'quantity': 3},
+            {'article': 'N323-13W', 'quantity': 1},
+            {'article': '999-00000', 'quantity': 1},
+        ])
+        items = {item['article']: item for item in result['items']}
+
+        # 2000 с на изделие (10 шт за печать) против 3000 с
+        self.assertEqual(items['375-42108']['print_file'], SimplePrintFile.objects.get(simpleprint_id='f-1').pk)
+        self.assertEqual((items['375-42108']['prints_needed'], items['375-42108']['estimated_print_time']), (3, 60000))
+        self.assertEqual(items['673-50930']['estimated_print_time'], 6 * 1800)
+        self.assertIsNone(items['N323-13W']['estimated_print_time'])
+        self.assertEqual(len(items['N323-13W']['files']), 1)
+
+        self.assertEqual((result['items_with_estimate'], result['items_without_files']), (2, 1))
+        self.assertEqual(result['total_print_time'], 60000 + 10800)
+        self.assertEqual(result['total_machine_hours'], 19.7)
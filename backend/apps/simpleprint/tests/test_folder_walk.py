@@ -0,0 +1,213 @@
+"""
+Тесты параллельного обхода дерева папок SimplePrint
+"""
+
+import json
+import threading
+import time
+from unittest.mock import patch
+
+import requests
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+
+from apps.simpleprint import client as client_module
+from apps.simpleprint.client import (
+    RateLimiter, SharedRateLimiter, SimplePrintAPIError, SimplePrintFilesClient, SimplePrintPrintersClient,
+    SimplePrintTransport
+)
+
+# parent_id -> (папки, файлы)
+TREE = {
+    None: ([1, 2, 3], ['root.gcode']),
+    1: ([11, 12], ['a.gcode']),
+    2: ([21], []),
+    3: ([], ['c.gcode']),
+    11: ([111], ['aa.gcode']),
+    12: ([], []),
+    21: ([], ['ba.gcode', 'bb.gcode']),
+    111: ([], ['aaa.gcode']),
+}
+
+
+class FakeListing:
+    """Ответы files/GetFiles по дереву TREE с подсчетом параллельных запросов"""
+
+    def __init__(self, delay=0.02):
+        self.delay = delay
+        self.lock = threading.Lock()
+        self.active = 0
+        self.max_active = 0
+
+    def __call__(self, folder_id=None):
+        with self.lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        try:
+            time.sleep(self.delay)
+            folder_ids, file_names = TREE[folder_id]
+            return {
+                'folders': [{'id': child_id, 'name': f'F{child_id}'} for child_id in folder_ids],
+                'files': [{'id': f'{folder_id}-{name}', 'name': name} for name in file_names],
+            }
+        finally:
+            with self.lock:
+                self.active -= 1
+
+
+class FolderWalkTestCase(SimpleTestCase):
+    """Тесты для SimplePrintFilesClient.iter_folder_tree"""
+
+    def setUp(self):
+        self.client = SimplePrintFilesClient()
+        self.listing = FakeListing()
+        patcher = patch.object(self.client, 'get_files_and_folders', side_effect=self.listing)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_parents_before_children_with_paths(self):
+        """Тест: папка отдается раньше вложенных, пути и родители заполнены"""
+        listings = list(self.client.iter_folder_tree(max_workers=3))
+        order = [listing['folder_id'] for listing in listings]
+
+        self.assertCountEqual(order, TREE.keys())
+        for folder_id, (children, _) in TREE.items():
+            for child_id in children:
+                self.assertLess(order.index(folder_id), order.index(child_id))
+
+        deepest = next(listing for listing in listings if listing['folder_id'] == 111)
+        self.assertEqual(deepest['path'], 'F1/F11/F111')
+        self.assertEqual(deepest['depth'], 3)
+        self.assertEqual(deepest['files'][0]['parent_folder_id'], 111)
+        self.assertEqual(deepest['files'][0]['path'], 'F1/F11/F111')
+
+    def test_sibling_folders_are_fetched_concurrently(self):
+        """Тест: соседние папки загружаются параллельно, но не больше max_workers"""
+        list(self.client.iter_folder_tree(max_workers=2))
+
+        self.assertEqual(self.listing.max_active, 2)
+
+    def test_get_all_files_recursive(self):
+        """Тест: сводный результат совпадает с деревом"""
+        data = self.client.get_all_files_recursive()
+
+        self.assertEqual(data['folder_count'], 7)
+        self.assertEqual(data['file_count'], 7)
+        self.assertIn('F2/F21', {folder['path'] for folder in data['all_folders']})
+
+    def test_max_depth(self):
+        """Тест: папки глубже max_depth перечисляются, но не загружаются"""
+        order = [listing['folder_id'] for listing in self.client.iter_folder_tree(max_depth=1)]
+
+        self.assertCountEqual(order, [None, 1, 2, 3])
+
+    def test_error_stops_walk(self):
+        """Тест: ошибка загрузки папки прерывает обход"""
+        def failing_listing(folder_id=None):
+            if folder_id == 2:
+                raise SimplePrintAPIError('boom')
+            return self.listing(folder_id)
+
+        self.client.get_files_and_folders.side_effect = failing_listing
+
+        with self.assertRaises(SimplePrintAPIError):
+            list(self.client.iter_folder_tree())
+
+
+class RateLimiterTestCase(SimpleTestCase):
+    """Тесты для RateLimiter"""
+
+    def test_requests_from_threads_are_spaced(self):
+        """Тест: запросы из разных потоков разнесены на интервал лимита"""
+        limiter = RateLimiter(rate_limit=1200)  # 50 мс между запросами
+        times = []
+
+        def worker():
+            limiter.acquire()
+            times.append(time.monotonic())
+
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        times.sort()
+        gaps = [later - earlier for earlier, later in zip(times, times[1:])]
+        self.assertTrue(all(gap >= 0.045 for gap in gaps), gaps)
+
+
+def make_response(status_code, payload=None, headers=None):
+    response = requests.Response()
+    response.status_code = status_code
+    response._content = json.dumps(payload if payload is not None else {'status': True}).encode()
+    response.headers.update(headers or {})
+    response.url = 'https://api.test/files/GetFiles'
+    return response
+
+
+class TransportTestCase(SimpleTestCase):
+    """Тесты для SimplePrintTransport"""
+
+    def setUp(self):
+        self.transport = SimplePrintTransport('https://api.test/', 'token', rate_limit=60, retry_attempts=3)
+        patch.object(self.transport.rate_limiter, 'acquire').start()
+        self.sleep = patch.object(client_module.time, 'sleep').start()
+        self.addCleanup(patch.stopall)
+
+    def test_clients_share_transport(self):
+        """Тест: клиенты файлов и принтеров используют одну сессию"""
+        self.assertIs(SimplePrintFilesClient().transport, SimplePrintPrintersClient().transport)
+
+    def test_retry_honours_retry_after(self):
+        """Тест: 429 повторяется через время из Retry-After, метрики учитывают попытки"""
+        responses = [make_response(429, headers={'Retry-After': '7'}), make_response(200, {'status': True, 'files': []})]
+
+        with patch.object(self.transport.session, 'request', side_effect=responses) as request:
+            data = self.transport.request('GET', 'files/GetFiles', params={'f': 1})
+
+        self.assertEqual(data['files'], [])
+        self.assertEqual(request.call_count, 2)
+        self.sleep.assert_called_once_with(7.0)
+        metrics = self.transport.get_metrics()['files/GetFiles']
+        self.assertEqual((metrics['count'], metrics['errors']), (2, 1))
+
+    def test_jittered_backoff_for_server_errors(self):
+        """Тест: 5xx повторяется с экспоненциальной задержкой, после попыток - ошибка"""
+        with patch.object(self.transport.session, 'request', return_value=make_response(502)):
+            with self.assertRaises(SimplePrintAPIError):
+                self.transport.request('POST', 'printers/Get')
+
+        delays = [call.args[0] for call in self.sleep.call_args_list]
+        self.assertEqual(len(delays), 2)
+        self.assertTrue(0.5 <= delays[0] <= 1.0 and 1.0 <= delays[1] <= 2.0, delays)
+
+    def test_client_errors_are_not_retried(self):
+        """Тест: 4xx и ошибка в ответе API не повторяются"""
+        with patch.object(self.transport.session, 'request', return_value=make_response(403)) as request:
+            with self.assertRaises(SimplePrintAPIError):
+                self.transport.request('GET', 'account/Test')
+        self.assertEqual(request.call_count, 1)
+
+        with patch.object(self.transport.session, 'request', return_value=make_response(200, {'status': False})):
+            with self.assertRaises(SimplePrintAPIError):
+                self.transport.request('GET', 'account/Test')
+        self.sleep.assert_not_called()
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'rate'}})
+class SharedRateLimiterTestCase(SimpleTestCase):
+    """Тесты для SharedRateLimiter"""
+
+    def test_waits_for_next_window_when_exhausted(self):
+        """Тест: после исчерпания минутного лимита запрос ждет следующего окна"""
+        cache.clear()
+        limiter = SharedRateLimiter('test_rate', 2, RateLimiter(rate_limit=60000))
+        limiter.acquire()
+        limiter.acquire()
+
+        with patch.object(client_module.time, 'sleep', side_effect=InterruptedError) as sleep:
+            with self.assertRaises(InterruptedError):
+                limiter.acquire()
+
+        self.assertTrue(0 <= sleep.call_args.args[0] <= 60.5)
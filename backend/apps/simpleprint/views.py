@@ -17,8 +17,14 @@ from django_filters.rest_framework import DjangoFilterBackend
 from django.utils import timezone
 from django.conf import settings
 
-from .models import SimplePrintWebhookEvent, SimplePrintFile, SimplePrintFolder, SimplePrintSync, PrinterSnapshot
-from .services import SimplePrintSyncService, PrinterSyncService
+from apps.core.sync_lock import SIMPLEPRINT_SYNC, get_sync_holder, release_sync_lock, start_single_flight
+from apps.products.models import Product
+
+from .models import (
+    SimplePrintWebhookEvent, SimplePrintFile, SimplePrintFolder, SimplePrintSync, PrinterSnapshot,
+    FILE_JSON_FIELDS
+)
+from .services import SimplePrintSyncService, PrinterSyncService, estimate_print_time, get_file_stats
 from .serializers import (
     SimplePrintFileSerializer, SimplePrintFileListSerializer,
     SimplePrintFolderSerializer, SimplePrintFolderListSerializer,
@@ -286,17 +292,35 @@ class SimplePrintFileViewSet(viewsets.ReadOnlyModelViewSet):
     GET /api/v1/simpleprint/files/ - список файлов
     GET /api/v1/simpleprint/files/{id}/ - детали файла
     GET /api/v1/simpleprint/files/stats/ - статистика файлов
+    GET /api/v1/simpleprint/files/production/ - файлы и время печати товаров к производству
     """
     queryset = SimplePrintFile.objects.select_related('folder').all()
     authentication_classes = [TokenAuthentication, SessionAuthentication]
     permission_classes = [IsAuthenticated]
     pagination_class = SimplePrintFilePagination
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
-    filterset_fields = ['folder', 'file_type', 'ext']
+    filterset_fields = {
+        'folder': ['exact'],
+        'file_type': ['exact'],
+        'ext': ['exact'],
+        'article': ['exact'],
+        'material_type': ['exact', 'iexact'],
+        'material_color': ['exact', 'iexact'],
+        'nozzle_size': ['exact'],
+        'print_time': ['gte', 'lte'],
+        'prints_done': ['gte', 'lte'],
+    }
     search_fields = ['name', 'simpleprint_id']
-    ordering_fields = ['name', 'size', 'created_at_sp', 'last_synced_at']
+    ordering_fields = ['name', 'size', 'created_at_sp', 'last_synced_at', 'print_time', 'prints_done', 'weight']
     ordering = ['-created_at_sp']
 
+    def get_queryset(self):
+        """В списке JSON-поля файла не загружаются - хватает типизированных колонок"""
+        queryset = super().get_queryset()
+        if self.action == 'list':
+            queryset = queryset.defer(*FILE_JSON_FIELDS)
+        return queryset
+
     def get_serializer_class(self):
         """Выбрать serializer в зависимости от action"""
         if self.action == 'list':
@@ -305,24 +329,60 @@ class SimplePrintFileViewSet(viewsets.ReadOnlyModelViewSet):
 
     @action(detail=False, methods=['get'])
     def stats(self, request):
-        """Статистика по файлам"""
-        total_files = self.get_queryset().count()
-        total_size = sum(f.size for f in self.get_queryset())
-
-        # Группировка по типам
-        by_type = {}
-        for file in self.get_queryset():
-            file_type = file.file_type or 'unknown'
-            if file_type not in by_type:
-                by_type[file_type] = {'count': 0, 'size': 0}
-            by_type[file_type]['count'] += 1
-            by_type[file_type]['size'] += file.size
-
-        return Response({
-            'total_files': total_files,
-            'total_size': total_size,
-            'by_type': by_type
-        })
+        """
+        Статистика по файлам
+
+        Query params:
+            folder: ID папки, для подпапок которой вернуть сводку by_folder
+                (по умолчанию - папки верхнего уровня)
+        """
+        parent_id = request.query_params.get('folder')
+        if parent_id is not None:
+            try:
+                parent_id = int(parent_id)
+            except ValueError:
+                return Response({
+                    'status': 'error',
+                    'message': 'folder must be an integer'
+                }, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response(get_file_stats(parent_id=parent_id))
+
+    @action(detail=False, methods=['get'])
+    def production(self, request):
+        """
+        Файлы печати и оценка машинного времени для товаров к производству
+
+        Query params:
+            min_priority: Минимальный приоритет производства (по умолчанию 20)
+            limit: Количество позиций (по умолчанию 50)
+        """
+        try:
+            min_priority = int(request.query_params.get('min_priority', 20))
+            limit = int(request.query_params.get('limit', 50))
+        except ValueError:
+            return Response({
+                'status': 'error',
+                'message': 'min_priority and limit must be integers'
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        products = Product.objects.filter(
+            production_needed__gt=0,
+            production_priority__gte=min_priority
+        ).order_by('-production_priority', 'article')[:max(limit, 0)]
+
+        items = [
+            {
+                'product_id': product['id'],
+                'article': product['article'],
+                'name': product['name'],
+                'quantity': float(product['production_needed']),
+                'production_priority': product['production_priority'],
+            }
+            for product in products.values('id', 'article', 'name', 'production_needed', 'production_priority')
+        ]
+
+        return Response(estimate_print_time(items))
 
 
 class SimplePrintFolderViewSet(viewsets.ReadOnlyModelViewSet):
@@ -331,13 +391,17 @@ class SimplePrintFolderViewSet(viewsets.ReadOnlyModelViewSet):
 
     GET /api/v1/simpleprint/folders/ - список папок
     GET /api/v1/simpleprint/folders/{id}/ - детали папки
-    GET /api/v1/simpleprint/folders/{id}/files/ - файлы в папке
+    GET /api/v1/simpleprint/folders/{id}/files/ - файлы в папке (?recursive=true - с вложенными)
     """
     queryset = SimplePrintFolder.objects.all()
     authentication_classes = [TokenAuthentication, SessionAuthentication]
     permission_classes = [IsAuthenticated]
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
-    filterset_fields = ['parent', 'depth']
+    filterset_fields = {
+        'parent': ['exact'],
+        'depth': ['exact'],
+        'tree_path': ['startswith'],
+    }
     search_fields = ['name', 'simpleprint_id']
     ordering_fields = ['name', 'depth', 'files_count', 'last_synced_at']
     ordering = ['depth', 'name']
@@ -350,9 +414,17 @@ class SimplePrintFolderViewSet(viewsets.ReadOnlyModelViewSet):
 
     @action(detail=True, methods=['get'])
     def files(self, request, pk=None):
-        """Получить файлы в папке"""
+        """
+        Получить файлы в папке
+
+        Query params:
+            recursive: true - файлы папки и всех вложенных папок
+                (один запрос по префиксу tree_path)
+        """
         folder = self.get_object()
-        files = folder.files.all()
+        recursive = request.query_params.get('recursive', 'false').lower() == 'true'
+        files = folder.get_subtree_files() if recursive else folder.files.all()
+        files = files.select_related('folder').defer(*FILE_JSON_FIELDS)
         serializer = SimplePrintFileListSerializer(files, many=True)
         return Response(serializer.data)
 
@@ -380,6 +452,7 @@ class SimplePrintSyncViewSet(viewsets.ReadOnlyModelViewSet):
         Body:
         {
             "full_sync": false,  // полная синхронизация с удалением
+            "incremental": false,  // загружать только изменившиеся папки
             "force": false       // принудительная синхронизация
         }
         """
@@ -387,11 +460,22 @@ class SimplePrintSyncViewSet(viewsets.ReadOnlyModelViewSet):
         serializer.is_valid(raise_exception=True)
 
         full_sync = serializer.validated_data.get('full_sync', False)
+        incremental = serializer.validated_data.get('incremental', False)
         force = serializer.validated_data.get('force', False)
 
         # Логируем полученные параметры
         logger.info(f"🔍 Sync trigger request: full_sync={full_sync}, force={force}, user={request.user.username}")
 
+        # Синхронизация уже идет - возвращаем ее задачу вместо запуска новой
+        holder = get_sync_holder(SIMPLEPRINT_SYNC)
+        if holder:
+            logger.info(f"Sync already running: task_id={holder.get('owner')}")
+            return Response({
+                'status': 'running',
+                'task_id': holder.get('owner'),
+                'message': 'Синхронизация уже выполняется'
+            }, status=status.HTTP_202_ACCEPTED)
+
         # Проверяем последнюю синхронизацию
         service = SimplePrintSyncService()
         stats = service.get_sync_stats()
@@ -417,13 +501,22 @@ class SimplePrintSyncViewSet(viewsets.ReadOnlyModelViewSet):
             # Запускаем асинхронную задачу синхронизации
             from .tasks import sync_simpleprint_task
 
-            task = sync_simpleprint_task.delay(full_sync=full_sync)
+            task_id, started = start_single_flight(
+                SIMPLEPRINT_SYNC, sync_simpleprint_task, full_sync=full_sync, incremental=incremental
+            )
+
+            if not started:
+                return Response({
+                    'status': 'running',
+                    'task_id': task_id,
+                    'message': 'Синхронизация уже выполняется'
+                }, status=status.HTTP_202_ACCEPTED)
 
-            logger.info(f"✅ Sync started: task_id={task.id}, full_sync={full_sync}")
+            logger.info(f"✅ Sync started: task_id={task_id}, full_sync={full_sync}, incremental={incremental}")
 
             return Response({
                 'status': 'started',
-                'task_id': task.id,
+                'task_id': task_id,
                 'message': 'Синхронизация запущена в фоновом режиме'
             }, status=status.HTTP_202_ACCEPTED)
 
@@ -507,8 +600,9 @@ class SimplePrintSyncViewSet(viewsets.ReadOnlyModelViewSet):
 
             logger.info(f"Attempting to cancel task: {task_id}, state: {task.state}")
 
-            # Отменяем задачу
+            # Отменяем задачу; убитый процесс не освободит блокировку сам
             task.revoke(terminate=True, signal='SIGKILL')
+            release_sync_lock(SIMPLEPRINT_SYNC, owner=task_id)
 
             # Обновляем статус синхронизации в БД
             try:
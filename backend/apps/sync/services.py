@@ -12,7 +12,9 @@ from django.core.files.base import ContentFile
 from django.db import transaction
 from django.utils import timezone
 
+from apps.core.data_version import bump_data_version
 from apps.products.models import Product, ProductImage
+from apps.products.services.article_index import rebuild_article_index
 from .models import SyncLog
 from .moysklad_client import MoySkladClient
 from apps.core.exceptions import SyncException
@@ -92,6 +94,15 @@ class SyncService:
             sync_log.save()
             logger.error(f"Sync failed: {str(e)}")
             raise
+        finally:
+            # Products may have been written even if the sync failed
+            bump_data_version()
+        
+        # Articles changed - rebuild fuzzy matching index for Tochka
+        try:
+            rebuild_article_index()
+        except Exception as e:
+            logger.warning(f"Article index rebuild failed: {str(e)}")
         
         return sync_log
     
@@ -304,6 +315,9 @@ class SyncService:
                 product_image.save()
                 synced_count += 1
             
+            if synced_count:
+                bump_data_version()
+            
             return synced_count
             
         except Exception as e:
@@ -380,4 +394,7 @@ class SyncService:
         # Simple direct update - no transaction issues since we're outside main transaction
         sync_log.synced_products = synced_products
         sync_log.current_article = current_article
-        sync_log.save()
\ No newline at end of file
+        sync_log.save()
+        
+        # Products are saved one by one outside a transaction - let polling clients see them
+        bump_data_version()
\ No newline at end of file
@@ -5,11 +5,13 @@ import logging
 from celery import shared_task
 from django.conf import settings
 from .services import SyncService
+from apps.core.sync_lock import MOYSKLAD_SYNC, single_flight
 from apps.products.models import Product
 
 logger = logging.getLogger(__name__)
 
 @shared_task(bind=True)
+@single_flight(MOYSKLAD_SYNC)
 def sync_products_task(self, warehouse_id: str, excluded_groups: list = None, sync_type: str = 'manual', sync_images: bool = True):
     """
     Asynchronous task to sync products from МойСклад.
@@ -53,6 +55,7 @@ def sync_products_task(self, warehouse_id: str, excluded_groups: list = None, sy
         self.retry(countdown=60, max_retries=3)
 
 @shared_task
+@single_flight(MOYSKLAD_SYNC)
 def scheduled_sync_task(warehouse_id=None, excluded_groups=None):
     """
     Scheduled task for automatic sync based on settings.
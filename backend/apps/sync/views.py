@@ -3,6 +3,7 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status
+from apps.core.sync_lock import MOYSKLAD_SYNC, SyncAlreadyRunning, SyncLock, start_single_flight
 from .models import SyncLog
 from .tasks import sync_products_task
 from .services import SyncService
@@ -250,25 +251,24 @@ def start_sync(request):
             status=status.HTTP_400_BAD_REQUEST
         )
     
-    # Check if sync is already running
-    running_sync = SyncLog.objects.filter(status='pending').first()
-    if running_sync:
-        return Response(
-            {'error': 'Sync is already running', 'sync_id': running_sync.id},
-            status=status.HTTP_409_CONFLICT
-        )
-    
     try:
         # For development, run sync synchronously if DEBUG=True
         from django.conf import settings
         if settings.DEBUG:
-            sync_service = SyncService()
-            sync_log = sync_service.sync_products(
-                warehouse_id=warehouse_id,
-                excluded_groups=excluded_groups,
-                sync_type='manual',
-                sync_images=sync_images
-            )
+            try:
+                with SyncLock(MOYSKLAD_SYNC):
+                    sync_service = SyncService()
+                    sync_log = sync_service.sync_products(
+                        warehouse_id=warehouse_id,
+                        excluded_groups=excluded_groups,
+                        sync_type='manual',
+                        sync_images=sync_images
+                    )
+            except SyncAlreadyRunning as e:
+                return Response(
+                    {'error': 'Sync is already running', 'task_id': e.holder.get('owner')},
+                    status=status.HTTP_409_CONFLICT
+                )
             
             # Update sync settings stats for manual sync
             from apps.settings.models import SyncScheduleSettings
@@ -286,16 +286,19 @@ def start_sync(request):
                 'failed_products': sync_log.failed_products
             }, status=status.HTTP_200_OK)
         else:
-            # Production: use async task
-            task = sync_products_task.delay(
+            # Production: use async task; a running sync is reused instead of starting another
+            task_id, started = start_single_flight(
+                MOYSKLAD_SYNC,
+                sync_products_task,
                 warehouse_id=warehouse_id,
                 excluded_groups=excluded_groups,
                 sync_type='manual',
                 sync_images=sync_images
             )
             return Response({
-                'message': 'Sync started',
-                'task_id': task.id
+                'message': 'Sync started' if started else 'Sync is already running',
+                'task_id': task_id,
+                'already_running': not started
             }, status=status.HTTP_202_ACCEPTED)
             
     except Exception as e:
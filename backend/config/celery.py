@@ -29,6 +29,16 @@ app.conf.beat_schedule = {
         'schedule': 60.0 * 30.0,  # 30 minutes
         'options': {'expires': 60.0 * 25.0}  # expire after 25 minutes
     },
+    'export-artefacts-cleanup': {
+        'task': 'apps.reports.tasks.evict_export_artefacts_task',
+        'schedule': 60.0 * 60.0,  # 1 hour
+        'options': {'expires': 60.0 * 50.0}  # expire after 50 minutes
+    },
+    'tochka-jobs-cleanup': {
+        'task': 'apps.products.tasks.cleanup_tochka_jobs_task',
+        'schedule': 60.0 * 60.0,  # 1 hour
+        'options': {'expires': 60.0 * 50.0}  # expire after 50 minutes
+    },
 }
 
 app.conf.timezone = settings.TIME_ZONE
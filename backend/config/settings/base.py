@@ -187,6 +187,8 @@ SIMPLEPRINT_CONFIG = {
     'company_id': config('SIMPLEPRINT_COMPANY_ID', default='27286'),
     'base_url': config('SIMPLEPRINT_BASE_URL', default='https://api.simplyprint.io/27286/'),
     'rate_limit': config('SIMPLEPRINT_RATE_LIMIT', default=180, cast=int),  # requests per minute
+    'max_workers': config('SIMPLEPRINT_MAX_WORKERS', default=4, cast=int),  # parallel folder requests
+    'full_walk_interval': config('SIMPLEPRINT_FULL_WALK_INTERVAL', default=24, cast=int),  # hours between full folder walks
 }
 
 # Logging
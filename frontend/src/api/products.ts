@@ -58,12 +58,17 @@ export interface ProductListParams {
   min_priority?: number;
   production_needed?: boolean;
   ordering?: string;
+  // Keyset pagination (infinite scroll)
+  pagination?: 'cursor';
+  cursor?: string;
+  count?: boolean;
 }
 
 export interface ProductListResponse {
   count: number;
   next: string | null;
   previous: string | null;
+  next_cursor?: string | null;
   results: Product[];
 }
 
@@ -101,6 +106,20 @@ export interface ProductionStats {
   };
 }
 
+export interface ExportJob {
+  job_id: string;
+  export_type: 'products' | 'production_list';
+  status: 'pending' | 'processing' | 'success' | 'failed';
+  ready: boolean;
+  cached: boolean;
+  file_name: string;
+  file_size: number;
+  created_at: string;
+  finished_at: string | null;
+  download_url: string | null;
+  error?: string;
+}
+
 export const productsApi = {
   // Products
   getProducts: (params?: ProductListParams): Promise<ProductListResponse> =>
@@ -127,36 +146,58 @@ export const productsApi = {
   recalculateProduction: () =>
     apiClient.post('/products/production/recalculate/'),
 
-  // Export
+  // Export (background job: wait until the file is ready, then download it)
   exportProducts: (params?: ProductListParams) => {
-    const queryParams = new URLSearchParams();
-    
-    // Add auth token to query params for file download
-    const token = localStorage.getItem('auth_token');
-    if (token) {
-      queryParams.append('auth_token', token);
-    }
-    
+    const queryParams: Record<string, string> = {};
     if (params) {
       Object.entries(params).forEach(([key, value]) => {
         if (value !== undefined && value !== null) {
-          queryParams.append(key, String(value));
+          queryParams[key] = String(value);
         }
       });
     }
-    
-    const url = `/reports/export/products/?${queryParams.toString()}`;
-    window.open(`${apiClient.defaults.baseURL}${url}`, '_blank');
+    return runExportJob('/reports/export/products/', queryParams);
   },
 
-  exportProductionList: () => {
-    const token = localStorage.getItem('auth_token');
-    const queryParams = new URLSearchParams();
-    if (token) {
-      queryParams.append('auth_token', token);
+  exportProductionList: () => runExportJob('/reports/export/production-list/'),
+};
+
+const EXPORT_POLL_INTERVAL_MS = 1000;
+// Совпадает с лимитом времени задачи экспорта на сервере (30 минут)
+const EXPORT_MAX_POLL_ATTEMPTS = 30 * 60;
+
+const runExportJob = async (url: string, params: Record<string, string> = {}): Promise<ExportJob> => {
+  let job = await apiClient.get<ExportJob, ExportJob>(url, { params });
+
+  for (let attempt = 0; !job.ready; attempt++) {
+    if (attempt >= EXPORT_MAX_POLL_ATTEMPTS) {
+      throw new Error('Превышено время ожидания экспорта');
     }
-    
-    const url = `/reports/export/production-list/?${queryParams.toString()}`;
-    window.open(`${apiClient.defaults.baseURL}${url}`, '_blank');
-  },
-};
\ No newline at end of file
+    await new Promise((resolve) => setTimeout(resolve, EXPORT_POLL_INTERVAL_MS));
+    job = await apiClient.get<ExportJob, ExportJob>(`/reports/export/jobs/${job.job_id}/`);
+  }
+
+  if (job.status !== 'success') {
+    throw new Error(job.error || 'Ошибка при формировании экспорта');
+  }
+
+  // Скачиваем файл через blob: window.open после ожидания блокируется как всплывающее окно
+  const blob = await apiClient.get<Blob, Blob>(`/reports/export/jobs/${job.job_id}/download/`, {
+    responseType: 'blob',
+  });
+
+  const downloadUrl = window.URL.createObjectURL(blob);
+  const link = document.createElement('a');
+  link.href = downloadUrl;
+  link.download = job.file_name;
+  document.body.appendChild(link);
+  link.click();
+  document.body.removeChild(link);
+
+  // Освобождаем URL blob после скачивания
+  setTimeout(() => {
+    window.URL.revokeObjectURL(downloadUrl);
+  }, 100);
+
+  return job;
+};
@@ -78,6 +78,17 @@ export interface TochkaProductsResponse {
   count: number;
   next: string | null;
   previous: string | null;
+  next_cursor?: string | null;
+}
+
+// Keyset pagination: pass next_cursor from the previous page to load the next one
+export interface TochkaProductsParams {
+  page?: number;
+  page_size?: number;
+  pagination?: 'cursor';
+  cursor?: string;
+  count?: boolean;
+  include_reserve?: boolean;
 }
 
 export interface TochkaProductionResponse {
@@ -94,12 +105,25 @@ export interface UploadExcelResponse {
   unique_articles: number;
 }
 
+export interface ArticleCandidate {
+  article: string;
+  product_id: number;
+  score: number;
+}
+
+export interface UnmatchedExcelArticle {
+  article: string;
+  orders: number;
+  candidates: ArticleCandidate[];
+}
+
 export interface MergeWithProductsResponse {
   message: string;
   data: MergedDataItem[];
   coverage_rate: string;
   found_products: number;
   total_articles: number;
+  unmatched_excel_articles?: UnmatchedExcelArticle[];
 }
 
 export interface FilteredProductionResponse {
@@ -157,7 +181,7 @@ export interface AutoProcessResponse {
 // API функции
 export const tochkaApi = {
   // Получить товары Точки
-  getProducts: (params?: { page?: number; page_size?: number }): Promise<TochkaProductsResponse> =>
+  getProducts: (params?: TochkaProductsParams): Promise<TochkaProductsResponse> =>
     apiClient.get('/tochka/products/', { params }),
 
   // Получить список на производство
@@ -105,12 +105,16 @@ export const ProductTable: React.FC = () => {
     message.success('Данные обновлены');
   };
 
-  const handleExport = () => {
-    message.loading('Подготовка экспорта...');
-    productsApi.exportProducts(filters);
-    setTimeout(() => {
-      message.success('Экспорт начат. Файл загрузится автоматически.');
-    }, 1000);
+  const handleExport = async () => {
+    const hide = message.loading('Подготовка экспорта...', 0);
+    try {
+      const job = await productsApi.exportProducts(filters);
+      message.success(job.cached ? 'Файл уже готов, загрузка начата.' : 'Экспорт готов. Файл загрузится автоматически.');
+    } catch (error) {
+      message.error('Ошибка при экспорте товаров');
+    } finally {
+      hide();
+    }
   };
 
   const handleDownloadImages = async () => {
@@ -38,10 +38,10 @@ export const ProductionListView: React.FC = () => {
     dispatch(fetchProductionStats());
   };
 
-  const handleExport = () => {
+  const handleExport = async () => {
     try {
-      productsApi.exportProductionList();
-      message.success('Экспорт начат. Файл загрузится автоматически.');
+      await productsApi.exportProductionList();
+      message.success('Экспорт готов. Файл загрузится автоматически.');
     } catch (error) {
       message.error('Ошибка при экспорте списка производства');
     }
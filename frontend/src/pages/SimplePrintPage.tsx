@@ -144,10 +144,12 @@ const SimplePrintPage: React.FC = () => {
         `✅ API Response: ${JSON.stringify(result, null, 2)}`,
       ]);
 
-      if (result.status === 'started' && result.task_id) {
+      if ((result.status === 'started' || result.status === 'running') && result.task_id) {
         setSyncLogs(prev => [
           ...prev,
-          `📋 Задача создана: ${result.task_id}`,
+          result.status === 'running'
+            ? `📋 Синхронизация уже выполняется: ${result.task_id}`
+            : `📋 Задача создана: ${result.task_id}`,
           `⏳ Ожидание начала синхронизации...`,
           `🔄 Запуск polling (интервал: 2 сек)...`,
         ]);
@@ -311,12 +313,21 @@ const SimplePrintPage: React.FC = () => {
               `📄 Всего файлов: ${statusResult.sync_log.total_files}`,
               `✓ Синхронизировано папок: ${statusResult.sync_log.synced_folders}`,
               `✓ Синхронизировано файлов: ${statusResult.sync_log.synced_files}`,
+              `✎ Изменено папок: ${statusResult.sync_log.changed_folders ?? 0}, файлов: ${statusResult.sync_log.changed_files ?? 0}`,
             ];
 
+            if (statusResult.sync_log.skipped_folders > 0) {
+              logs.push(`⏭️ Папок без изменений (не загружались): ${statusResult.sync_log.skipped_folders}`);
+            }
+
             if (statusResult.sync_log.deleted_files > 0) {
               logs.push(`🗑️ Удалено файлов: ${statusResult.sync_log.deleted_files}`);
             }
 
+            if (statusResult.sync_log.deleted_folders > 0) {
+              logs.push(`🗑️ Удалено папок: ${statusResult.sync_log.deleted_folders}`);
+            }
+
             const duration = statusResult.sync_log.duration;
             if (duration) {
               logs.push(`⏱️ Длительность: ${Math.round(duration)} сек`);
@@ -1396,7 +1396,7 @@ export const TochkaPage: React.FC = () => {
       >
         <div style={{ padding: '20px 0' }}>
           <Paragraph>
-            Выберите Excel файл (.xlsx или .xls) который содержит следующие колонки:
+            Выберите файл Excel (.xlsx, .xls), CSV (.csv, .csv.gz) или Parquet, который содержит следующие колонки:
           </Paragraph>
           <ul style={{ marginBottom: 20 }}>
             <li><strong>"Артикул товара"</strong> - артикулы товаров</li>
@@ -1406,7 +1406,7 @@ export const TochkaPage: React.FC = () => {
           <Upload.Dragger
             name="file"
             multiple={false}
-            accept=".xlsx,.xls"
+            accept=".xlsx,.xls,.csv,.gz,.parquet"
             beforeUpload={handleExcelUpload}
             showUploadList={false}
             disabled={loading.autoProcess}
@@ -1432,7 +1432,7 @@ export const TochkaPage: React.FC = () => {
             <p className="ant-upload-hint">
               {loading.autoProcess 
                 ? 'Анализ и формирование списка производства...' 
-                : 'Поддерживаются форматы .xlsx и .xls'
+                : 'Поддерживаются форматы .xlsx, .xls, .csv, .csv.gz и .parquet'
               }
             </p>
           </Upload.Dragger>
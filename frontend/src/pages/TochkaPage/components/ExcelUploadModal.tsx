@@ -35,7 +35,7 @@ export const ExcelUploadModal: React.FC<ExcelUploadModalProps> = ({
     >
       <div style={{ padding: '20px 0' }}>
         <Paragraph>
-          Выберите Excel файл (.xlsx или .xls) который содержит следующие колонки:
+          Выберите файл Excel (.xlsx, .xls), CSV (.csv, .csv.gz) или Parquet, который содержит следующие колонки:
         </Paragraph>
         <ul style={{ marginBottom: 20 }}>
           <li><strong>"Артикул товара"</strong> - артикулы товаров</li>
@@ -45,7 +45,7 @@ export const ExcelUploadModal: React.FC<ExcelUploadModalProps> = ({
         <Upload.Dragger
           name="file"
           multiple={false}
-          accept=".xlsx,.xls"
+          accept=".xlsx,.xls,.csv,.gz,.parquet"
           beforeUpload={onUpload}
           showUploadList={false}
           disabled={loading}
@@ -71,7 +71,7 @@ export const ExcelUploadModal: React.FC<ExcelUploadModalProps> = ({
           <p className="ant-upload-hint">
             {loading
               ? 'Анализ и формирование списка производства...'
-              : 'Поддерживаются форматы .xlsx и .xls'
+              : 'Поддерживаются форматы .xlsx, .xls, .csv, .csv.gz и .parquet'
             }
           </p>
         </Upload.Dragger>
@@ -16,14 +16,14 @@ export interface SimplePrintFile {
   file_type: string;
   size: number;
   size_display: string;
-  tags: any;
-  gcode_analysis: any;
-  print_data: any;
-  material_color: string | null;
+  material_type: string;
+  material_color: string;
+  nozzle_size: number | null;
   print_time: number | null;
   weight: number | null;
+  prints_done: number;
   quantity: number | null;
-  article: string | null;
+  article: string;
   created_at_sp: string;
   last_synced_at: string;
 }
@@ -33,6 +33,7 @@ export interface SimplePrintFolder {
   simpleprint_id: number;
   name: string;
   depth: number;
+  tree_path: string;
   files_count: number;
   folders_count: number;
   last_synced_at: string;
@@ -55,6 +56,19 @@ export interface FileStats {
       size: number;
     };
   };
+  by_folder: FolderStats[];
+}
+
+export interface FolderStats {
+  id: number;
+  simpleprint_id: number;
+  name: string;
+  parent: number | null;
+  depth: number;
+  files_count: number;
+  size: number;
+  total_files: number;
+  total_size: number;
 }
 
 interface SimplePrintState {
@@ -123,7 +137,7 @@ export const fetchFileStats = createAsyncThunk(
 
 export const triggerSync = createAsyncThunk(
   'simpleprint/triggerSync',
-  async (params: { full_sync?: boolean; force?: boolean } = {}) => {
+  async (params: { full_sync?: boolean; incremental?: boolean; force?: boolean } = {}) => {
     const response = await apiClient.post('/simpleprint/sync/trigger/', params);
     return response; // apiClient уже возвращает response.data
   }